@@ -0,0 +1,170 @@
+#---------------------------------------------------------
+# CPU cost per 1,000 items: PyGithub objects vs the raw REST backend
+#---------------------------------------------------------
+#
+# Usage: python benchmarks/bench_backends.py [--items 20000] [--rounds 3]
+#
+# Both backends run on a real PyGithub client whose requester answers from
+# canned, pre-serialized pages of full-size API payloads, so only decoding
+# and object construction are measured, never the network. Both page by 100.
+
+import argparse
+import json
+import sys
+import time
+import urllib.parse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from github import Github
+
+from github_stats import rest
+from github_stats.metrics.records import list_repo_records
+from github_stats.rest import RestClient
+
+BASE = "https://api.github.com"
+PAGE_SIZE = 100
+
+
+class CannedApi:
+    """Answers requestJson from pages serialized once up front."""
+
+    def __init__(self, listings):
+        self.pages = {}
+        for path, items in listings.items():
+            search = isinstance(items, dict)
+            entries = items['items'] if search else items
+            for start in range(0, len(entries), PAGE_SIZE):
+                page = start // PAGE_SIZE + 1
+                chunk = entries[start:start + PAGE_SIZE]
+                body = {'total_count': len(entries), 'items': chunk} if search else chunk
+                headers = {}
+                if start + PAGE_SIZE < len(entries):
+                    headers['link'] = f'<{BASE}{path}?per_page={PAGE_SIZE}&page={page + 1}>; rel="next"'
+                self.pages[(path, page)] = (200, headers, json.dumps(body))
+        self.pages[('/users/octocat', 1)] = (200, {}, json.dumps(_user()))
+
+    def requestJson(self, verb, url, parameters=None, headers=None, input=None, cnx=None):
+        parsed = urllib.parse.urlparse(url)
+        query = dict(urllib.parse.parse_qsl(parsed.query))
+        query.update(parameters or {})
+        return self.pages[(parsed.path, int(query.get('page', 1)))]
+
+
+def _owner():
+    return {
+        'login': 'octocat', 'id': 583231, 'node_id': 'MDQ6VXNlcjU4MzIzMQ==', 'type': 'User', 'site_admin': False,
+        **{f"{name}_url": f"{BASE}/users/octocat/{name}" for name in (
+            'avatar', 'gravatar', 'html', 'followers', 'following', 'gists', 'starred',
+            'subscriptions', 'organizations', 'repos', 'events', 'received_events',
+        )},
+    }
+
+
+def _user():
+    return dict(_owner(), url=f"{BASE}/users/octocat", name='The Octocat', public_repos=20000,
+                followers=9000, following=9, created_at='2011-01-25T18:44:36Z')
+
+
+def _repo(n):
+    full_name = f"octocat/repo{n}"
+    return {
+        'id': n, 'node_id': f"R_{n}", 'name': f"repo{n}", 'full_name': full_name, 'private': False,
+        'owner': _owner(), 'description': 'A repository used to benchmark listing', 'fork': n % 7 == 0,
+        'url': f"{BASE}/repos/{full_name}", 'homepage': None, 'size': 1024 + n, 'stargazers_count': n % 500,
+        'watchers_count': n % 500, 'language': 'Python', 'forks_count': n % 20, 'archived': False,
+        'disabled': False, 'open_issues_count': 3, 'license': {'key': 'mit', 'name': 'MIT License'},
+        'topics': ['cli', 'github'], 'visibility': 'public', 'default_branch': 'main',
+        'created_at': '2020-01-01T00:00:00Z', 'updated_at': '2024-01-01T00:00:00Z',
+        'pushed_at': '2024-01-01T00:00:00Z',
+        **{f"{name}_url": f"{BASE}/repos/{full_name}/{name}" for name in (
+            'html', 'forks', 'keys', 'collaborators', 'teams', 'hooks', 'issue_events', 'events', 'assignees',
+            'branches', 'tags', 'blobs', 'git_tags', 'git_refs', 'trees', 'statuses', 'languages',
+            'stargazers', 'contributors', 'subscribers', 'subscription', 'commits', 'git_commits', 'comments',
+            'issue_comment', 'contents', 'compare', 'merges', 'archive', 'downloads', 'issues', 'pulls',
+            'milestones', 'notifications', 'labels', 'releases', 'deployments',
+        )},
+    }
+
+
+def _commit(n):
+    sha = f"{n:040x}"
+    person = {'name': 'The Octocat', 'email': 'octocat@github.com', 'date': '2024-01-01T00:00:00Z'}
+    return {
+        'sha': sha, 'node_id': f"C_{n}", 'url': f"{BASE}/repos/octocat/repo0/commits/{sha}",
+        'html_url': f"https://github.com/octocat/repo0/commit/{sha}",
+        'commit': {'author': person, 'committer': person, 'message': f"Commit number {n}",
+                   'tree': {'sha': sha, 'url': f"{BASE}/repos/octocat/repo0/git/trees/{sha}"},
+                   'comment_count': 0, 'verification': {'verified': False, 'reason': 'unsigned'}},
+        'author': _owner(), 'committer': _owner(), 'parents': [{'sha': sha}],
+    }
+
+
+def _issue(n):
+    return {
+        'id': n, 'number': n, 'title': f"Issue {n}", 'state': 'open' if n % 3 else 'closed',
+        'url': f"{BASE}/repos/octocat/repo0/issues/{n}", 'user': _owner(), 'labels': [], 'assignees': [],
+        'comments': 2, 'created_at': '2024-01-01T00:00:00Z', 'updated_at': '2024-01-02T00:00:00Z',
+        'closed_at': None, 'author_association': 'OWNER', 'body': 'Benchmark issue body ' * 5,
+        'pull_request': {'url': f"{BASE}/repos/octocat/repo0/pulls/{n}"}, 'score': 1.0,
+    }
+
+
+#---------------------------------------------------------
+# Workloads: what the metrics read from each listing
+#---------------------------------------------------------
+
+def list_repos(client):
+    return sum(1 for _ in list_repo_records(client.get_user('octocat')))
+
+
+def list_commits(client):
+    return sum(1 for _ in client.get_repo('octocat/repo0', lazy=True).get_commits(author='octocat'))
+
+
+def search_issues(client):
+    states = [item.state for item in client.search_issues('type:pr author:octocat')]
+    return len(states)
+
+
+WORKLOADS = {'repositories': list_repos, 'commits': list_commits, 'search results': search_issues}
+
+
+def cpu_per_thousand(workload, client, items, rounds):
+    """Best CPU milliseconds per 1,000 items over the rounds."""
+    best = None
+    for _ in range(rounds):
+        start = time.process_time()
+        workload(client)
+        elapsed = time.process_time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000 / items * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare CPU per 1,000 items of the two REST backends")
+    parser.add_argument('--items', type=int, default=20000, help='Items per listing (default: 20000)')
+    parser.add_argument('--rounds', type=int, default=3, help='Rounds per measurement; the best counts (default: 3)')
+    args = parser.parse_args()
+
+    api = CannedApi({
+        '/users/octocat/repos': [_repo(n) for n in range(args.items)],
+        '/repos/octocat/repo0/commits': [_commit(n) for n in range(args.items)],
+        '/search/issues': {'items': [_issue(n) for n in range(args.items)]},
+    })
+    github_client = Github(per_page=PAGE_SIZE)
+    github_client._Github__requester.requestJson = api.requestJson
+    backends = {'pygithub': github_client, 'rest': RestClient(github_client)}
+
+    decoder = 'orjson' if rest.orjson is not None else 'json'
+    print(f"CPU ms per 1,000 items ({args.items:,} items, best of {args.rounds}, rest decodes with {decoder})")
+    print(f"{'listing':<16}{'pygithub':>10}{'rest':>10}{'speedup':>10}")
+    for name, workload in WORKLOADS.items():
+        times = {backend: cpu_per_thousand(workload, client, args.items, args.rounds)
+                 for backend, client in backends.items()}
+        print(f"{name:<16}{times['pygithub']:>10.1f}{times['rest']:>10.1f}{times['pygithub'] / times['rest']:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
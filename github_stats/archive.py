@@ -0,0 +1,299 @@
+#---------------------------------------------------------
+# Offline statistics from GH Archive event dumps
+#---------------------------------------------------------
+
+import gzip
+import heapq
+import json
+import os
+from array import array
+from datetime import datetime, timezone
+from multiprocessing import Pool
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from github_stats.metrics.commits import CommitMetric
+from github_stats.metrics.issues import IssueMetric
+from github_stats.metrics.pull_requests import PullRequestMetric
+from github_stats.metrics.records import SearchSample
+from github_stats.metrics.stars import StarMetric
+
+# Per-user counters kept for every login
+FIELDS = ('commits', 'prs_opened', 'prs_closed', 'issues_opened', 'issues_closed', 'stars')
+
+# Event types the metrics use; other lines are skipped before decoding
+EVENT_TYPES = (b'"PushEvent"', b'"PullRequestEvent"', b'"IssuesEvent"', b'"WatchEvent"')
+
+
+class ArchiveTable:
+    """
+    Per-user counters in compact integer-keyed tables.
+
+    Logins and repository names are interned to small integer ids; the
+    per-user counters are typed arrays indexed by user id, and per-repo
+    counts live in one {repo id: count} dict per user id, so a user's
+    repositories are read without walking everyone else's. Tables built
+    by separate workers are combined with merge().
+    """
+
+    def __init__(self):
+        self.logins: List[str] = []
+        self.user_ids: Dict[str, int] = {}
+        self.repo_names: List[str] = []
+        self.repo_ids: Dict[str, int] = {}
+        self.counters: Dict[str, array] = {field: array('q') for field in FIELDS}
+        self.repo_commits: Dict[int, Dict[int, int]] = {}
+        self.repo_stars: Dict[int, Dict[int, int]] = {}
+        self.events = 0
+
+    def user_id(self, login: str) -> int:
+        uid = self.user_ids.get(login)
+        if uid is None:
+            uid = self.user_ids[login] = len(self.logins)
+            self.logins.append(login)
+            for counter in self.counters.values():
+                counter.append(0)
+        return uid
+
+    def repo_id(self, name: str) -> int:
+        rid = self.repo_ids.get(name)
+        if rid is None:
+            rid = self.repo_ids[name] = len(self.repo_names)
+            self.repo_names.append(name)
+        return rid
+
+    def add(self, field: str, login: str, count: int = 1, repo: Optional[str] = None) -> None:
+        uid = self.user_id(login)
+        self.counters[field][uid] += count
+        if repo is not None:
+            repos = self._repos(field).setdefault(uid, {})
+            rid = self.repo_id(repo)
+            repos[rid] = repos.get(rid, 0) + count
+
+    def merge(self, other: 'ArchiveTable') -> None:
+        """Add another table's counts, translating its ids to this table's."""
+        uids = [self.user_id(login) for login in other.logins]
+        rids = [self.repo_id(name) for name in other.repo_names]
+        for field, counter in other.counters.items():
+            mine = self.counters[field]
+            for uid, count in enumerate(counter):
+                if count:
+                    mine[uids[uid]] += count
+        for mine, theirs in ((self.repo_commits, other.repo_commits), (self.repo_stars, other.repo_stars)):
+            for uid, repos in theirs.items():
+                merged = mine.setdefault(uids[uid], {})
+                for rid, count in repos.items():
+                    merged[rids[rid]] = merged.get(rids[rid], 0) + count
+        self.events += other.events
+
+    def get(self, field: str, login: str) -> int:
+        uid = self.user_ids.get(login)
+        return self.counters[field][uid] if uid is not None else 0
+
+    def top_repos(self, field: str, login: str, limit: int = 10) -> List[Tuple[str, int]]:
+        """
+        Get a user's repositories with the highest counts, highest first.
+        """
+        repos = self._user_repos(field, login)
+        top = heapq.nlargest(limit, repos.items(), key=lambda item: item[1])
+        return [(self.repo_names[rid].split('/', 1)[-1], count) for rid, count in top]
+
+    def repo_count(self, field: str, login: str) -> int:
+        return len(self._user_repos(field, login))
+
+    def _repos(self, field: str) -> Dict[int, Dict[int, int]]:
+        return self.repo_commits if field == 'commits' else self.repo_stars
+
+    def _user_repos(self, field: str, login: str) -> Dict[int, int]:
+        uid = self.user_ids.get(login)
+        return self._repos(field).get(uid, {}) if uid is not None else {}
+
+
+#---------------------------------------------------------
+# Scanning
+#---------------------------------------------------------
+
+def scan(
+    paths: Iterable[Path],
+    logins: Optional[Iterable[str]] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    processes: Optional[int] = None,
+) -> ArchiveTable:
+    """
+    Aggregate GH Archive hourly dumps into one table.
+
+    Files are decompressed and scanned in parallel worker processes, each
+    returning a table of its own; the tables are merged as they arrive.
+
+    Args:
+        paths: .json.gz files (or directories of them)
+        logins: Only count these users (case-insensitive); None counts everyone
+        since: Only count events at or after this time (optional)
+        until: Only count events at or before this time (optional)
+        processes: Worker processes (default: CPU count)
+
+    Returns:
+        Merged table; logins are lowercase
+    """
+    files = sorted(expand_paths(paths))
+    wanted = frozenset(login.lower() for login in logins) if logins is not None else None
+    window = (_timestamp(since), _timestamp(until))
+
+    table = ArchiveTable()
+    if not files:
+        return table
+
+    processes = min(processes or os.cpu_count() or 1, len(files))
+    if processes == 1:
+        for path in files:
+            table.merge(scan_file(path, wanted, window))
+        return table
+
+    with Pool(processes) as pool:
+        for part in pool.imap_unordered(_scan_file_args, [(path, wanted, window) for path in files]):
+            table.merge(part)
+    return table
+
+
+def scan_file(
+    path: Path,
+    logins: Optional[FrozenSet[str]] = None,
+    window: Tuple[Optional[str], Optional[str]] = (None, None),
+) -> ArchiveTable:
+    """
+    Aggregate one hourly dump.
+
+    Args:
+        path: GH Archive .json.gz file
+        logins: Only count these lowercase logins; None counts everyone
+        window: Earliest and latest created_at to count, as UTC ISO strings
+    """
+    since, until = window
+    table = ArchiveTable()
+    with gzip.open(path, 'rb') as lines:
+        for line in lines:
+            # Cheap byte test first; most events are of other types
+            if not any(event_type in line for event_type in EVENT_TYPES):
+                continue
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            created = event.get('created_at') or ''
+            if (since and created < since) or (until and created > until):
+                continue
+            table.events += 1
+            _count_event(table, event, logins)
+    return table
+
+
+def expand_paths(paths: Iterable[Path]) -> List[Path]:
+    files = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            files.extend(path.glob('*.json.gz'))
+        else:
+            files.append(path)
+    return files
+
+
+#---------------------------------------------------------
+# Metric results
+#---------------------------------------------------------
+
+def archive_metrics(table: ArchiveTable, login: str, selected: List[str]) -> Dict[str, Any]:
+    """
+    Build the regular metric objects from a user's counters.
+
+    The metrics format their own summaries, so an archive run reads exactly
+    like an API run. Stars are those gained within the scanned dumps.
+
+    Args:
+        table: Scanned archive
+        login: User to report
+        selected: Metric names to build (Commits, Stars, Pull Requests, Issues)
+
+    Returns:
+        Mapping of metric name to a loaded, unprocessed metric
+    """
+    key = login.lower()
+    metrics: Dict[str, Any] = {}
+
+    if 'Commits' in selected:
+        metric = CommitMetric(None, login)
+        metric.data = {
+            'total_commits': table.get('commits', key),
+            'repositories': table.repo_count('commits', key),
+            'top_repositories': table.top_repos('commits', key),
+        }
+        metrics['Commits'] = metric
+
+    if 'Stars' in selected:
+        metric = StarMetric(None, login)
+        metric.data = {
+            'total_stars': table.get('stars', key),
+            'repositories_with_stars': table.repo_count('stars', key),
+            'top_repositories': table.top_repos('stars', key),
+        }
+        metrics['Stars'] = metric
+
+    # Every opened PR/issue is in the dumps, so the "sample" is all of them
+    for name, metric_class, prefix in (
+        ('Pull Requests', PullRequestMetric, 'prs'),
+        ('Issues', IssueMetric, 'issues'),
+    ):
+        if name in selected:
+            opened = table.get(f'{prefix}_opened', key)
+            closed = min(opened, table.get(f'{prefix}_closed', key))
+            metric = metric_class(None, login)
+            sample = SearchSample(total=opened, sampled=opened, open=opened - closed)
+            metric.load(dict.fromkeys(metric.requires(), sample))
+            metrics[name] = metric
+
+    return metrics
+
+
+#---------------------------------------------------------
+# Helper functions
+#---------------------------------------------------------
+
+def _scan_file_args(args: Tuple[Any, ...]) -> ArchiveTable:
+    return scan_file(*args)
+
+
+def _timestamp(moment: Optional[datetime]) -> Optional[str]:
+    # GH Archive's created_at format, which compares correctly as a string
+    if moment is None:
+        return None
+    return moment.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def _count_event(table: ArchiveTable, event: Dict[str, Any], logins: Optional[FrozenSet[str]]) -> None:
+    kind = event.get('type')
+    actor = ((event.get('actor') or {}).get('login') or '').lower()
+    repo = (event.get('repo') or {}).get('name') or ''
+    payload = event.get('payload') or {}
+
+    def wanted(login: str) -> bool:
+        return bool(login) and (logins is None or login in logins)
+
+    if kind == 'PushEvent':
+        if wanted(actor):
+            size = payload.get('distinct_size', payload.get('size', len(payload.get('commits') or ())))
+            if size:
+                table.add('commits', actor, size, repo)
+    elif kind == 'WatchEvent':
+        # Stars gained by repositories the user owns
+        owner = repo.split('/', 1)[0].lower()
+        if wanted(owner):
+            table.add('stars', owner, 1, repo)
+    elif kind in ('PullRequestEvent', 'IssuesEvent'):
+        prefix = 'prs' if kind == 'PullRequestEvent' else 'issues'
+        item = payload.get('pull_request' if prefix == 'prs' else 'issue') or {}
+        author = ((item.get('user') or {}).get('login') or actor).lower()
+        action = payload.get('action')
+        if action == 'opened' and wanted(author):
+            table.add(f'{prefix}_opened', author)
+        elif action == 'closed' and wanted(author):
+            table.add(f'{prefix}_closed', author)
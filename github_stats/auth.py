@@ -4,8 +4,9 @@
 
 import os
 import sys
-from typing import Optional
+from typing import Any, Optional
 from github import Github, GithubException
+from github.Requester import Requester
 from github_stats.output import print_auth_error, print_auth_failed
 
 
@@ -42,6 +43,21 @@ def check_rate_limit(client: Github) -> dict:
     }
 
 
+def get_requester(client: Any) -> Optional[Requester]:
+    """
+    Get the PyGithub Requester a client sends its requests with.
+
+    PyGithub keeps it private, so this is the one place that reaches in.
+
+    Args:
+        client: PyGithub client, or a stand-in wrapping one (e.g. RestClient)
+
+    Returns:
+        The requester, or None for clients without one (e.g. test doubles)
+    """
+    return getattr(client, '_Github__requester', None)
+
+
 #---------------------------------------------------------
 # Helper functions
 #---------------------------------------------------------
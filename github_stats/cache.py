@@ -0,0 +1,191 @@
+#---------------------------------------------------------
+# Local cache of collected metric data
+#---------------------------------------------------------
+
+import json
+import sqlite3
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from github_stats.paths import get_data_file
+
+CACHE_DB = 'cache.db'
+
+# Seconds entries of metrics that no webhook keeps current are served for
+CACHE_TTL = 24 * 60 * 60
+
+# One row per (user, metric, scope); the scope encodes everything besides
+# the user that the data depends on (time window, commit strategy). The
+# window bounds are kept as columns so webhook deltas can tell which
+# entries an event falls into.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS metrics (
+    username TEXT NOT NULL COLLATE NOCASE,
+    metric TEXT NOT NULL,
+    scope TEXT NOT NULL,
+    since INTEGER,
+    until INTEGER,
+    data TEXT NOT NULL,
+    stored_at INTEGER NOT NULL,
+    PRIMARY KEY (username, metric, scope)
+);
+"""
+
+
+class MetricsCache:
+    """
+    Metric data (each metric's self.data) from earlier runs, backed by SQLite.
+
+    `github-stats webhook` keeps entries of the metrics it handles current
+    by dropping or adjusting the entries an event affects; entries of other
+    metrics are read with a maximum age instead.
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = None):
+        """
+        Open (and create if needed) the cache database.
+
+        Args:
+            path: Database file, defaults to cache.db in the data directory
+        """
+        self.path = Path(path) if path else get_data_file(CACHE_DB)
+        self.connection = sqlite3.connect(str(self.path))
+        self.connection.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> 'MetricsCache':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    #---------------------------------------------------------
+    # Reading and storing
+    #---------------------------------------------------------
+
+    def get(
+        self,
+        username: str,
+        metric: str,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        strategy: str = '',
+        max_age: Optional[float] = None,
+    ) -> Optional[Any]:
+        """
+        Get the cached data of one metric, or None on a miss.
+
+        Args:
+            max_age: Seconds after which an entry counts as a miss (None
+                serves entries of any age)
+        """
+        row = self.connection.execute(
+            "SELECT data, stored_at FROM metrics WHERE username = ? AND metric = ? AND scope = ?",
+            (username, metric, _scope(since, until, strategy))
+        ).fetchone()
+        if row is None or (max_age is not None and time.time() - row[1] > max_age):
+            return None
+        return json.loads(row[0])
+
+    def put(
+        self,
+        username: str,
+        metric: str,
+        data: Any,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        strategy: str = '',
+    ) -> None:
+        """
+        Store the data of one metric, replacing any earlier entry.
+        """
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO metrics (username, metric, scope, since, until, data, stored_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    username, metric, _scope(since, until, strategy),
+                    _timestamp(since), _timestamp(until),
+                    json.dumps(data), int(time.time())
+                )
+            )
+
+    #---------------------------------------------------------
+    # Invalidation and deltas
+    #---------------------------------------------------------
+
+    def invalidate(self, username: str, metric: Optional[str] = None) -> int:
+        """
+        Drop a user's entries for one metric (or all metrics).
+
+        Returns:
+            Number of entries dropped
+        """
+        query = "DELETE FROM metrics WHERE username = ?"
+        params: List[Any] = [username]
+        if metric is not None:
+            query += " AND metric = ?"
+            params.append(metric)
+        with self.connection:
+            return self.connection.execute(query, params).rowcount
+
+    def update(
+        self,
+        username: str,
+        metric: str,
+        change: Callable[[Any], bool],
+        at: Optional[int] = None,
+    ) -> int:
+        """
+        Adjust a user's entries of one metric in place.
+
+        Args:
+            username: User whose entries to adjust
+            metric: Metric name
+            change: Modifies an entry's data; returns False if it cannot
+                apply the change, which drops the entry instead
+            at: Unix time of the activity; entries whose window does not
+                contain it are left alone (None adjusts every entry)
+
+        Returns:
+            Number of entries adjusted or dropped
+        """
+        rows = self.connection.execute(
+            "SELECT scope, since, until, data FROM metrics WHERE username = ? AND metric = ?",
+            (username, metric)
+        ).fetchall()
+
+        touched = 0
+        with self.connection:
+            for scope, since, until, data in rows:
+                if at is not None and ((since is not None and at < since) or (until is not None and at > until)):
+                    continue
+                data = json.loads(data)
+                if change(data):
+                    self.connection.execute(
+                        "UPDATE metrics SET data = ? WHERE username = ? AND metric = ? AND scope = ?",
+                        (json.dumps(data), username, metric, scope)
+                    )
+                else:
+                    self.connection.execute(
+                        "DELETE FROM metrics WHERE username = ? AND metric = ? AND scope = ?",
+                        (username, metric, scope)
+                    )
+                touched += 1
+        return touched
+
+
+#---------------------------------------------------------
+# Helper functions
+#---------------------------------------------------------
+
+def _timestamp(moment: Optional[datetime]) -> Optional[int]:
+    return int(moment.timestamp()) if moment else None
+
+
+def _scope(since: Optional[datetime], until: Optional[datetime], strategy: str) -> str:
+    return f"{_timestamp(since) or ''}|{_timestamp(until) or ''}|{strategy}"
@@ -3,20 +3,56 @@
 #---------------------------------------------------------
 
 import argparse
+import os
+import sqlite3
 import sys
-from typing import Dict, Any, List
+import time
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Dict, Any, List, Optional, Tuple
 from github import GithubException
 from dotenv import load_dotenv
 
-from github_stats.auth import get_github_client, check_rate_limit
+from github_stats.archive import archive_metrics, expand_paths, scan
+from github_stats.auth import get_github_client, get_requester, check_rate_limit
+from github_stats.cache import CACHE_DB, CACHE_TTL, MetricsCache
+from github_stats.concurrency import MAX_CONCURRENCY, ConcurrencyController
+from github_stats.deadline import Deadline, DeadlineExceeded
+from github_stats.graph import FOLLOWERS, FOLLOWING, GraphStore, refresh_list
+from github_stats.history import HistoryStore
+from github_stats.journal import JOURNAL_FILE, Journal, JournalMismatch
+from github_stats.policy import REQUEST_TIMEOUT, RequestPolicy
+from github_stats.rest import BACKENDS, PYGITHUB, REST, RestClient
+from github_stats.stargazers import SECONDS_PER_DAY, StarHistoryStore, refresh_repo
+from github_stats.watch import EventWatcher
+from github_stats.webhook import MAINTAINED_METRICS, create_server
+from github_stats.metrics.estimate import ESTIMATE_BUDGET
+from github_stats.metrics.exhaustive import UPSTREAM_REPO_LIMIT
+from github_stats.metrics.filters import RepoFilter
+from github_stats.metrics.graphql import GraphQLBatcher
+from github_stats.metrics.local_git import LocalRepos
+from github_stats.metrics.planner import FetchPlanner
+from github_stats.metrics.records import RepoRecord, UserProfile, list_repo_records
 from github_stats.display import (
     display_header,
     create_summary_table,
+    create_history_table,
+    create_trend_table,
+    create_star_history_table,
+    create_follower_graph_table,
+    create_overlap_table,
+    create_contribution_heatmap,
+    create_estimate_table,
+    create_instrumentation_table,
+    create_batch_table,
+    create_live_display,
+    create_watch_table,
     create_progress_bar,
     display_rate_limit_warning,
     display_error
 )
 from github_stats.output import (
+    print_info,
     print_low_rate_limit_warning,
     print_table,
     print_warning
@@ -25,17 +61,40 @@ from github_stats.output import (
 # Load environment variables from .env file if it exists
 load_dotenv()
 
+# --metrics keys and the metric names they select
+METRIC_NAMES = {
+    'commits': 'Commits',
+    'followers': 'Followers',
+    'stars': 'Stars',
+    'prs': 'Pull Requests',
+    'issues': 'Issues',
+    'languages': 'Languages',
+    'contributions': 'Contributions',
+}
+
+# Metrics the GH Archive event dumps can answer
+ARCHIVE_METRICS = ['Commits', 'Stars', 'Pull Requests', 'Issues']
+
 
 #---------------------------------------------------------
 # Main execution
 #---------------------------------------------------------
 
 def main() -> None:
+    # Subcommands are dispatched before the default stats parser so a
+    # plain `github-stats <username>` keeps working
+    argv = sys.argv[1:]
+    if argv and argv[0] in SUBCOMMANDS:
+        SUBCOMMANDS[argv[0]](argv[1:])
+        return
+
     args = parse_arguments()
     try:
         github_client = get_github_client(args.token)
     except SystemExit:
         return
+    policy, controller = _install_policy(github_client, args)
+    github_client = _select_backend(github_client, args, policy)
 
     # Check rate limit
     rate_info = check_rate_limit(github_client)
@@ -51,19 +110,452 @@ def main() -> None:
         sys.exit(1)
 
     # Display header
-    display_header(args.username)
+    display_header(args.username, _describe_window(args.since, args.until))
+
+    # Estimate API cost before fetching anything
+    selected = args.metrics
+    if args.dry_run or args.budget is not None:
+        metrics = build_metrics(
+            github_client, args.username, selected,
+            args.since, args.until, args.commit_strategy,
+            exhaustive=args.exhaustive, upstream=args.upstream, language_bytes=args.language_bytes,
+            repo_filter=_repo_filter(args), estimate=args.estimate
+        )
+        planner = FetchPlanner(github_client, args.username)
+        planner.seed_user(user)
+        profile = UserProfile.from_user(user)
+
+        if args.dry_run:
+            rows = estimate_costs(planner, metrics, profile)
+            total = planner.estimate(metrics.values(), profile)
+            print_table(create_estimate_table(rows, total, rate_info['remaining']))
+            return
+
+        allowed = min(args.budget, rate_info['remaining'])
+        selected = fit_budget(planner, metrics, profile, allowed)
+        if not selected:
+            display_error(
+                f"Estimated {planner.estimate(metrics.values(), profile):,} API calls "
+                f"exceed the budget of {allowed:,}; nothing was fetched."
+            )
+            sys.exit(1)
+        skipped = [name for name in metrics if name not in selected]
+        if skipped:
+            print_warning(
+                f"Estimated cost exceeds the budget of {allowed:,} calls; "
+                f"skipping: {', '.join(skipped)}"
+            )
 
-    # Collect metrics
-    metrics_data = collect_metrics(github_client, args.username)
+    # Collect metrics; the deadline clock starts here. Work abandoned at the
+    # deadline stays bound to it; watch refreshes run outside without one
+    deadline = Deadline(args.deadline)
+    with policy.bind(deadline):
+        metrics_data = collect_metrics(
+            github_client, args.username,
+            since=args.since, until=args.until,
+            commit_strategy=args.commit_strategy,
+            user=user,
+            selected=selected,
+            deadline=deadline,
+            concurrency=controller,
+            local_repos=args.local_repos,
+            use_cache=args.use_cache,
+            exhaustive=args.exhaustive,
+            upstream=args.upstream,
+            language_bytes=args.language_bytes,
+            repo_filter=_repo_filter(args),
+            estimate=args.estimate
+        )
 
     # Display results
     if metrics_data:
-        table = create_summary_table(metrics_data)
-        print_table(table)
+        if not args.watch:
+            print_table(create_summary_table(metrics_data))
+            if args.heatmap and 'Contributions' in metrics_data:
+                calendar = metrics_data['Contributions']['detailed']['calendar']
+                print_table(create_contribution_heatmap(date.fromisoformat(calendar['start']), calendar['counts']))
+        _report_commit_notes(metrics_data)
         display_rate_limit_warning(rate_info['remaining'], rate_info['limit'])
+        if not args.no_history:
+            record_snapshot(args.username, metrics_data)
+        if args.watch:
+            watch_user(github_client, args, user, metrics_data, controller)
     else:
         display_error("No metrics could be collected.")
 
+    _finish_run(args, policy, controller)
+
+
+def watch_user(
+    github_client,
+    args: argparse.Namespace,
+    user: Any,
+    metrics_data: Dict[str, Dict[str, Any]],
+    controller: Optional[ConcurrencyController] = None,
+) -> None:
+    # Poll the user's event feeds (free while unchanged) and recompute
+    # only the metrics new events affect, until Ctrl-C
+    requester = get_requester(github_client)
+    watcher = EventWatcher(
+        lambda url, headers: requester.requestJsonAndCheck("GET", url, None, headers),
+        args.username
+    )
+
+    with create_live_display(create_watch_table(metrics_data, "Watching for new activity...")) as live:
+        live.refresh()
+        try:
+            while True:
+                try:
+                    changed = watcher.poll()
+                    affected = [name for name in metrics_data if name in changed]
+                    status = f"Checked {datetime.now():%H:%M:%S}"
+                except GithubException as e:
+                    affected = []
+                    status = f"Check failed at {datetime.now():%H:%M:%S}: {e.status}"
+
+                if affected:
+                    fresh = collect_metrics(
+                        github_client, args.username,
+                        since=args.since, until=args.until,
+                        commit_strategy=args.commit_strategy,
+                        user=user,
+                        selected=affected,
+                        concurrency=controller,
+                        local_repos=args.local_repos,
+                        show_progress=False,
+                        exhaustive=args.exhaustive,
+                        upstream=args.upstream,
+                        language_bytes=args.language_bytes,
+                        repo_filter=_repo_filter(args),
+                        estimate=args.estimate
+                    )
+                    metrics_data.update(fresh)
+                    if not args.no_history and fresh:
+                        record_snapshot(args.username, fresh)
+                    status += f", refreshed {', '.join(fresh) or 'nothing'}"
+                else:
+                    status += ", no new activity"
+
+                status += f"; next check in {watcher.interval}s (Ctrl-C to stop)"
+                live.update(create_watch_table(metrics_data, status), refresh=True)
+                time.sleep(watcher.interval)
+        except KeyboardInterrupt:
+            pass
+
+
+def batch_main(argv: List[str]) -> None:
+    args = parse_batch_arguments(argv)
+    usernames = _read_usernames(args.usernames, args.users_file)
+    if not usernames:
+        display_error("No usernames given.")
+        sys.exit(1)
+
+    try:
+        github_client = get_github_client(args.token)
+    except SystemExit:
+        return
+    policy, controller = _install_policy(github_client, args)
+    github_client = _select_backend(github_client, args, policy)
+
+    rate_info = check_rate_limit(github_client)
+    if rate_info['remaining'] < 50:
+        print_low_rate_limit_warning(rate_info['remaining'])
+
+    # Results depend on these settings, so a journal is only resumed with
+    # the same ones
+    params = {
+        'since': args.since.isoformat() if args.since else None,
+        'until': args.until.isoformat() if args.until else None,
+        'commit_strategy': args.commit_strategy,
+        'metrics': args.metrics or list(METRIC_NAMES.values()),
+    }
+    repo_filter = _repo_filter(args)
+    if repo_filter:
+        params['repo_filter'] = repo_filter.key()
+    for option in ('upstream', 'exhaustive', 'language_bytes', 'estimate'):
+        if getattr(args, option):
+            params[option] = True
+
+    with Journal(args.journal) as journal:
+        try:
+            state = journal.resume(params) if args.resume else journal.start(params)
+        except JournalMismatch as e:
+            display_error(str(e))
+            sys.exit(1)
+
+        display_header(f"{len(usernames)} users", _describe_window(args.since, args.until))
+        pending = [username for username in usernames if username not in state.done]
+        batcher = GraphQLBatcher(get_requester(github_client)) if args.graphql else None
+        try:
+            for group in _batch_groups(github_client, pending, args, journal, batcher):
+                prefetched = _prefetch(batcher, group) if batcher else {}
+                for username in group:
+                    collect_user(github_client, username, args, journal, controller, prefetched.get(username))
+        except KeyboardInterrupt:
+            # Keep everything finished so far; the journal is flushed on close
+            print_warning("Interrupted; rerun with --resume to continue where this run stopped.")
+            _finish_run(args, policy, controller)
+            sys.exit(130)
+
+    results = {username: state.results.get(username, {}) for username in usernames}
+    print_table(create_batch_table(results, params['metrics']))
+    display_rate_limit_warning(rate_info['remaining'], rate_info['limit'])
+    _finish_run(args, policy, controller)
+
+
+def collect_user(
+    github_client,
+    username: str,
+    args: argparse.Namespace,
+    journal: Journal,
+    controller: Optional[ConcurrencyController] = None,
+    prefetched: Optional[Dict[Any, Any]] = None,
+) -> None:
+    # A user resolved by the GraphQL batch exists; it is only fetched if
+    # a metric still needs the REST listing
+    user = None
+    if not prefetched:
+        try:
+            user = github_client.get_user(username)
+            user.login  # Trigger API call to validate user exists
+        except GithubException:
+            print_warning(f"Skipping {username}: not found or inaccessible.")
+            journal.finish_user(username)
+            return
+
+    # Metrics finished by an earlier run are not fetched again, and the
+    # commit scan skips repositories it already counted
+    finished = journal.state.results.get(username, {})
+    selected = [name for name in (args.metrics or METRIC_NAMES.values()) if name not in finished]
+    metrics_data = {}
+    if selected:
+        metrics_data = collect_metrics(
+            github_client, username,
+            since=args.since, until=args.until,
+            commit_strategy=args.commit_strategy,
+            user=user,
+            selected=selected,
+            concurrency=controller,
+            local_repos=args.local_repos,
+            use_cache=args.use_cache,
+            prefetched=prefetched,
+            exhaustive=args.exhaustive,
+            upstream=args.upstream,
+            language_bytes=args.language_bytes,
+            repo_filter=_repo_filter(args),
+            estimate=args.estimate,
+            resume_counts=journal.state.repo_counts.get(username),
+            on_count=lambda record, count: journal.record_repo(username, record.full_name, count)
+        )
+        for name, data in metrics_data.items():
+            journal.record_result(username, name, data)
+
+    if not args.no_history and metrics_data:
+        record_snapshot(username, metrics_data)
+
+    # A user with failed metrics is retried by the next --resume
+    if len(metrics_data) == len(selected):
+        journal.finish_user(username)
+    else:
+        journal.flush()
+
+
+def archive_main(argv: List[str]) -> None:
+    args = parse_archive_arguments(argv)
+    usernames = _read_usernames(args.usernames, args.users_file)
+    if not usernames:
+        display_error("No usernames given.")
+        sys.exit(1)
+
+    files = expand_paths(args.data)
+    if not files:
+        display_error("No GH Archive files (*.json.gz) found.")
+        sys.exit(1)
+
+    selected = args.metrics or ARCHIVE_METRICS
+    unavailable = [name for name in selected if name not in ARCHIVE_METRICS]
+    selected = [name for name in selected if name in ARCHIVE_METRICS]
+    if not selected:
+        display_error(f"Not available from event dumps: {', '.join(unavailable)}")
+        sys.exit(1)
+    if unavailable:
+        print_warning(f"Not available from event dumps, skipping: {', '.join(unavailable)}")
+
+    with create_progress_bar() as progress:
+        task = progress.add_task(f"Scanning {len(files):,} archive files...", total=None)
+        table = scan(files, usernames, since=args.since, until=args.until, processes=args.processes)
+        progress.update(task, completed=True)
+
+    results = {
+        username: {
+            name: metric_result(metric)
+            for name, metric in archive_metrics(table, username, selected).items()
+        }
+        for username in usernames
+    }
+
+    window = _describe_window(args.since, args.until)
+    if len(usernames) == 1:
+        display_header(usernames[0], window)
+        print_table(create_summary_table(results[usernames[0]]))
+    else:
+        display_header(f"{len(usernames)} users", window)
+        print_table(create_batch_table(results, selected))
+
+
+def webhook_main(argv: List[str]) -> None:
+    args = parse_webhook_arguments(argv)
+    secret = args.secret or os.getenv('GITHUB_WEBHOOK_SECRET')
+    if not secret:
+        display_error("A webhook secret is required (--secret or GITHUB_WEBHOOK_SECRET).")
+        sys.exit(1)
+
+    server = create_server(args.host, args.port, secret, log=print_info)
+    host, port = server.server_address[:2]
+    print_info(f"Listening for webhooks on http://{host}:{port}/ (Ctrl-C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def stars_main(argv: List[str]) -> None:
+    args = parse_stars_arguments(argv)
+    if args.trend:
+        full_name = args.trend if '/' in args.trend else f"{args.username}/{args.trend}"
+        with StarHistoryStore() as store:
+            points = store.series(full_name)
+        if not points:
+            display_error(f"No star history for {full_name}; run `github-stats stars {args.username}` first.")
+            sys.exit(1)
+        display_header(full_name, "cumulative stars")
+        print_table(create_trend_table(points[-args.limit:]))
+        return
+
+    try:
+        github_client = get_github_client(args.token)
+    except SystemExit:
+        return
+    try:
+        user = github_client.get_user(args.username)
+        records = list(list_repo_records(user))
+    except GithubException:
+        display_error(f"User '{args.username}' not found or inaccessible.")
+        sys.exit(1)
+
+    repos = _star_history_repos(records, args.repos, args.top)
+    if not repos:
+        display_error(f"No starred repositories found for {args.username}.")
+        sys.exit(1)
+
+    now = int(time.time())
+    rows = []
+    with StarHistoryStore() as store, create_progress_bar() as progress:
+        task = progress.add_task("Fetching stargazers...", total=len(repos))
+        for record in repos:
+            progress.update(task, description=f"Fetching stargazers of {record.full_name}...")
+            try:
+                pages = refresh_repo(get_requester(github_client), store, record.full_name, record.stars)
+            except GithubException as e:
+                print_warning(f"Failed to fetch stargazers of {record.full_name}: {str(e)}")
+                continue
+            finally:
+                progress.advance(task)
+            # Without a cursor only the current count is known
+            complete = store.cursor(record.full_name) is not None or record.stars == 0
+            gained = [
+                _stars_gained(store, record, now - days * SECONDS_PER_DAY, complete)
+                for days in (7, 30)
+            ]
+            rows.append((record.full_name, record.stars, gained[0], gained[1], pages))
+
+    display_header(args.username, "star history")
+    print_table(create_star_history_table(rows))
+
+
+def followers_main(argv: List[str]) -> None:
+    args = parse_followers_arguments(argv)
+    try:
+        github_client = get_github_client(args.token)
+    except SystemExit:
+        return
+    controller = ConcurrencyController(maximum=args.max_concurrency) if args.max_concurrency > 1 else None
+    submit = controller.submit if controller is not None else None
+
+    rows = []
+    followers = {}
+    try:
+        with GraphStore() as store, create_progress_bar() as progress:
+            task = progress.add_task("Fetching follower lists...", total=len(args.usernames))
+            for username in args.usernames:
+                progress.update(task, description=f"Fetching follower lists of {username}...")
+                try:
+                    user = github_client.get_user(username)
+                    lists = {
+                        kind: refresh_list(
+                            get_requester(github_client), store, user.login, kind, count, submit=submit
+                        )
+                        for kind, count in ((FOLLOWERS, user.followers), (FOLLOWING, user.following))
+                    }
+                except GithubException as e:
+                    print_warning(f"Failed to fetch follower lists of {username}: {str(e)}")
+                    continue
+                finally:
+                    progress.advance(task)
+
+                followers[user.login] = lists[FOLLOWERS].ids
+                rows.append((
+                    user.login,
+                    len(lists[FOLLOWERS].ids),
+                    len(lists[FOLLOWING].ids),
+                    len(lists[FOLLOWERS].ids & lists[FOLLOWING].ids),
+                    lists[FOLLOWERS].added,
+                    lists[FOLLOWERS].removed,
+                    sum(refresh.requests - refresh.not_modified for refresh in lists.values()),
+                ))
+    finally:
+        if controller is not None:
+            controller.close()
+
+    if not rows:
+        display_error("No follower lists could be fetched.")
+        sys.exit(1)
+
+    display_header(", ".join(row[0] for row in rows), "follower graph")
+    print_table(create_follower_graph_table(rows))
+    if len(followers) > 1:
+        names = list(followers)
+        pairs = [
+            (a, b, len(followers[a] & followers[b]), followers[a].jaccard(followers[b]))
+            for i, a in enumerate(names) for b in names[i + 1:]
+        ]
+        print_table(create_overlap_table(pairs))
+
+
+def history_main(argv: List[str]) -> None:
+    args = parse_history_arguments(argv)
+    since = int(args.since.timestamp()) if args.since else None
+    until = int(args.until.timestamp()) if args.until else None
+
+    with HistoryStore() as store:
+        if args.trend:
+            metric, _, field = args.trend.rpartition('.')
+            points = store.trend(args.username, metric, field, since, until)
+            if not points:
+                display_error(f"No history for '{args.trend}' of {args.username}.")
+                sys.exit(1)
+            display_header(args.username, args.trend)
+            print_table(create_trend_table(points[-args.limit:]))
+        else:
+            rows = store.diff(args.username, since, until)
+            if not rows:
+                display_error(f"No history recorded for {args.username}.")
+                sys.exit(1)
+            display_header(args.username, _describe_window(args.since, args.until))
+            print_table(create_history_table(rows))
+
 
 def parse_arguments() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
@@ -73,6 +565,11 @@ def parse_arguments() -> argparse.Namespace:
 Examples:
   github-stats octocat
   github-stats torvalds --token ghp_your_token
+  github-stats octocat --since 2024-01-01 --until 2024-03-31
+  github-stats octocat --metrics stars,followers
+  github-stats octocat --dry-run
+  github-stats octocat --deadline 30
+  github-stats octocat --watch
   python -m github_stats username
         """
     )
@@ -82,16 +579,520 @@ Examples:
         help='GitHub username to analyze'
     )
 
+    _add_collection_arguments(parser)
+
+    parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='Estimate the API calls each selected metric would make, then exit'
+    )
+
+    parser.add_argument(
+        '--budget',
+        type=int,
+        metavar='N',
+        help='Maximum API calls to spend; the most expensive metrics are '
+             'skipped when the estimate exceeds it or the remaining quota',
+        default=None
+    )
+
+    parser.add_argument(
+        '--watch',
+        action='store_true',
+        help='Keep the summary on screen and refresh the metrics new activity '
+             'affects, polling the events API at the rate it asks for'
+    )
+
+    parser.add_argument(
+        '--deadline',
+        type=_parse_seconds,
+        metavar='SECONDS',
+        help='Stop fetching after this many seconds and show partial results '
+             'with their coverage',
+        default=None
+    )
+
+    parser.add_argument(
+        '--heatmap',
+        action='store_true',
+        help='Show the contribution calendar as a heatmap below the summary'
+    )
+
+    args = parser.parse_args()
+    if args.since and args.until and args.since > args.until:
+        parser.error('--since must not be later than --until')
+    if args.heatmap and args.metrics and 'Contributions' not in args.metrics:
+        args.metrics.append('Contributions')
+
+    return args
+
+
+def parse_batch_arguments(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog='github-stats batch',
+        description="Collect statistics for many users, resumable after interruptions",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  github-stats batch octocat torvalds gvanrossum
+  github-stats batch --users-file team.txt --metrics commits,stars
+  github-stats batch --users-file team.txt --resume
+  github-stats batch --users-file team.txt --graphql
+        """
+    )
+
+    parser.add_argument(
+        'usernames',
+        nargs='*',
+        help='GitHub usernames to analyze'
+    )
+
+    parser.add_argument(
+        '--users-file',
+        metavar='PATH',
+        help='File with one username per line (blank lines and # comments are ignored)',
+        default=None
+    )
+
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Skip users and repositories a previous, interrupted run already finished'
+    )
+
+    parser.add_argument(
+        '--graphql',
+        action='store_true',
+        help='Fetch profiles, small repository listings and search totals for '
+             'many users per request through aliased GraphQL queries'
+    )
+
+    parser.add_argument(
+        '--journal',
+        metavar='PATH',
+        help=f'Checkpoint journal to write (default: {JOURNAL_FILE} in the data directory)',
+        default=None
+    )
+
+    _add_collection_arguments(parser)
+
+    args = parser.parse_args(argv)
+    if args.since and args.until and args.since > args.until:
+        parser.error('--since must not be later than --until')
+
+    return args
+
+
+def _add_collection_arguments(parser: argparse.ArgumentParser) -> None:
+    # Options shared by single-user and batch runs
     parser.add_argument(
         '--token',
         help='GitHub Personal Access Token (overrides GITHUB_TOKEN env var)',
         default=None
     )
 
-    return parser.parse_args()
+    parser.add_argument(
+        '--since',
+        type=_parse_since,
+        help='Only count activity on or after this date (YYYY-MM-DD)',
+        default=None
+    )
+
+    parser.add_argument(
+        '--until',
+        type=_parse_until,
+        help='Only count activity on or before this date (YYYY-MM-DD)',
+        default=None
+    )
+
+    parser.add_argument(
+        '--commit-strategy',
+        choices=['stats', 'list'],
+        help='How to count commits: precomputed contributor statistics with '
+             'listing as fallback (default), or always list commits',
+        default='stats'
+    )
+
+    parser.add_argument(
+        '--metrics',
+        type=_parse_metrics,
+        help=f"Comma-separated metrics to collect (default: all): {', '.join(METRIC_NAMES)}",
+        default=None
+    )
+
+    parser.add_argument(
+        '--local-repos',
+        type=_parse_local_repos,
+        metavar='PATH',
+        help='Directory of local clones or mirrors (<owner>/<name> or <name>, '
+             'optionally .git); their commits are counted with git instead of the API',
+        default=None
+    )
+
+    parser.add_argument(
+        '--timeout',
+        type=_parse_seconds,
+        metavar='SECONDS',
+        help=f'Seconds a single API request may take before it is retried (default: {REQUEST_TIMEOUT})',
+        default=REQUEST_TIMEOUT
+    )
+
+    parser.add_argument(
+        '--max-concurrency',
+        type=_parse_positive_int,
+        metavar='N',
+        help=f'Upper bound for parallel per-repository requests; the actual level '
+             f'adapts to latency and secondary rate limits (default: {MAX_CONCURRENCY}, 1 = serial)',
+        default=MAX_CONCURRENCY
+    )
+
+    parser.add_argument(
+        '--instrument',
+        action='store_true',
+        help='Show request counts, retries, hedged requests and latency after the run'
+    )
+
+    parser.add_argument(
+        '--no-history',
+        action='store_true',
+        help='Do not append this run to the local snapshot history'
+    )
+
+    parser.add_argument(
+        '--use-cache',
+        action='store_true',
+        help=f'Serve metrics from the local cache ({CACHE_DB}) where present and '
+             f'cache the rest; `github-stats webhook` keeps it current'
+    )
+
+    parser.add_argument(
+        '--exhaustive',
+        action='store_true',
+        help='Fetch every pull request and issue, beyond the 1000-result search cap, '
+             'for exact counts and time-to-merge/close statistics'
+    )
+
+    parser.add_argument(
+        '--upstream',
+        action='store_true',
+        help="Also count commits to other people's repositories, from commit search"
+    )
+
+    parser.add_argument(
+        '--language-bytes',
+        action='store_true',
+        help='Weigh languages by bytes of code (one GraphQL request per 100 repositories) '
+             'instead of counting primary languages from the listing'
+    )
+
+    parser.add_argument(
+        '--exclude-forks',
+        action='store_true',
+        help='Do not count commits in forks'
+    )
+
+    parser.add_argument(
+        '--exclude-archived',
+        action='store_true',
+        help='Do not count commits in archived repositories'
+    )
+
+    parser.add_argument(
+        '--min-pushed',
+        type=_parse_since,
+        metavar='DATE',
+        help='Do not count commits in repositories last pushed before this date (YYYY-MM-DD); '
+             'the listing is sorted by push date and stops there',
+        default=None
+    )
+
+    parser.add_argument(
+        '--owner-only',
+        action='store_true',
+        help="Only count commits in repositories the user owns (listed with type=owner)"
+    )
+
+    parser.add_argument(
+        '--estimate',
+        action='store_true',
+        help=f'Bound commit counts that would be listed with at most {ESTIMATE_BUDGET} page probes '
+             'per repository instead, and show the interval'
+    )
+
+    parser.add_argument(
+        '--backend',
+        choices=BACKENDS,
+        default=PYGITHUB,
+        help='How REST responses are read: pygithub builds PyGithub objects, rest decodes the '
+             'JSON directly (with orjson when installed) and pages by 100 (default: pygithub)'
+    )
 
 
-def collect_metrics(github_client, username: str) -> Dict[str, Dict[str, Any]]:
+def parse_archive_arguments(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog='github-stats archive',
+        description="Compute statistics offline from GH Archive hourly event dumps",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  github-stats archive octocat --data ~/gharchive
+  github-stats archive --users-file team.txt --data ~/gharchive/2024-01-*.json.gz
+  github-stats archive octocat --data ~/gharchive --since 2024-01-01 --until 2024-01-31
+        """
+    )
+
+    parser.add_argument(
+        'usernames',
+        nargs='*',
+        help='GitHub usernames to analyze'
+    )
+
+    parser.add_argument(
+        '--users-file',
+        metavar='PATH',
+        help='File with one username per line (blank lines and # comments are ignored)',
+        default=None
+    )
+
+    parser.add_argument(
+        '--data',
+        nargs='+',
+        metavar='PATH',
+        required=True,
+        help='GH Archive .json.gz files, or directories holding them'
+    )
+
+    parser.add_argument(
+        '--since',
+        type=_parse_since,
+        help='Only count events on or after this date (YYYY-MM-DD)',
+        default=None
+    )
+
+    parser.add_argument(
+        '--until',
+        type=_parse_until,
+        help='Only count events on or before this date (YYYY-MM-DD)',
+        default=None
+    )
+
+    parser.add_argument(
+        '--metrics',
+        type=_parse_metrics,
+        help=f"Comma-separated metrics to compute (default: all available): "
+             f"{', '.join(key for key, name in METRIC_NAMES.items() if name in ARCHIVE_METRICS)}",
+        default=None
+    )
+
+    parser.add_argument(
+        '--processes',
+        type=_parse_positive_int,
+        metavar='N',
+        help='Worker processes decompressing files in parallel (default: CPU count)',
+        default=None
+    )
+
+    args = parser.parse_args(argv)
+    if args.since and args.until and args.since > args.until:
+        parser.error('--since must not be later than --until')
+
+    return args
+
+
+def parse_webhook_arguments(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog='github-stats webhook',
+        description="Receive GitHub webhooks and keep the metrics cache (--use-cache) current",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  GITHUB_WEBHOOK_SECRET=s3cret github-stats webhook --port 8080
+  github-stats webhook --host 0.0.0.0 --port 9000 --secret s3cret
+        """
+    )
+
+    parser.add_argument(
+        '--host',
+        help='Interface to listen on (default: 127.0.0.1)',
+        default='127.0.0.1'
+    )
+
+    parser.add_argument(
+        '--port',
+        type=int,
+        help='Port to listen on (default: 8080)',
+        default=8080
+    )
+
+    parser.add_argument(
+        '--secret',
+        help='Webhook secret deliveries are signed with (overrides GITHUB_WEBHOOK_SECRET env var)',
+        default=None
+    )
+
+    return parser.parse_args(argv)
+
+
+def parse_stars_arguments(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog='github-stats stars',
+        description="Record star history per repository, fetching only stars added since the last run",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  github-stats stars octocat
+  github-stats stars octocat --repos Hello-World,Spoon-Knife
+  github-stats stars octocat --trend Hello-World
+        """
+    )
+
+    parser.add_argument(
+        'username',
+        help='GitHub username whose repositories to track'
+    )
+
+    parser.add_argument(
+        '--token',
+        help='GitHub Personal Access Token (overrides GITHUB_TOKEN env var)',
+        default=None
+    )
+
+    parser.add_argument(
+        '--repos',
+        type=lambda value: [name.strip() for name in value.split(',') if name.strip()],
+        metavar='NAMES',
+        help='Comma-separated repositories to track (default: the most starred ones)',
+        default=None
+    )
+
+    parser.add_argument(
+        '--top',
+        type=_parse_positive_int,
+        metavar='N',
+        help='Number of most starred repositories to track without --repos (default: 10)',
+        default=10
+    )
+
+    parser.add_argument(
+        '--trend',
+        metavar='REPO',
+        help='Show the recorded cumulative stars of one repository (no API calls)',
+        default=None
+    )
+
+    parser.add_argument(
+        '--limit',
+        type=int,
+        help='Maximum number of trend points to show (default: 20)',
+        default=20
+    )
+
+    return parser.parse_args(argv)
+
+
+def parse_followers_arguments(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog='github-stats followers',
+        description="Fetch follower lists as compact ID sets: mutual follows, "
+                    "audience overlap and changes since the last run",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  github-stats followers octocat
+  github-stats followers alice bob carol
+        """
+    )
+
+    parser.add_argument(
+        'usernames',
+        nargs='+',
+        help='GitHub usernames to fetch follower lists for'
+    )
+
+    parser.add_argument(
+        '--token',
+        help='GitHub Personal Access Token (overrides GITHUB_TOKEN env var)',
+        default=None
+    )
+
+    parser.add_argument(
+        '--max-concurrency',
+        type=_parse_positive_int,
+        metavar='N',
+        help=f'Upper bound for pages fetched in parallel (default: {MAX_CONCURRENCY}, 1 = serial)',
+        default=MAX_CONCURRENCY
+    )
+
+    return parser.parse_args(argv)
+
+
+def parse_history_arguments(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog='github-stats history',
+        description="Show trends from locally recorded snapshots (no API calls)",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  github-stats history octocat
+  github-stats history octocat --since 2024-01-01
+  github-stats history octocat --trend Stars.total_stars
+        """
+    )
+
+    parser.add_argument(
+        'username',
+        help='GitHub username to show history for'
+    )
+
+    parser.add_argument(
+        '--trend',
+        metavar='METRIC.FIELD',
+        help='Show the timeline of one value, e.g. Followers.followers',
+        default=None
+    )
+
+    parser.add_argument(
+        '--since',
+        type=_parse_since,
+        help='Only use snapshots taken on or after this date (YYYY-MM-DD)',
+        default=None
+    )
+
+    parser.add_argument(
+        '--until',
+        type=_parse_until,
+        help='Only use snapshots taken on or before this date (YYYY-MM-DD)',
+        default=None
+    )
+
+    parser.add_argument(
+        '--limit',
+        type=int,
+        help='Maximum number of trend points to show (default: 20)',
+        default=20
+    )
+
+    return parser.parse_args(argv)
+
+
+def build_metrics(
+    github_client,
+    username: str,
+    selected: Optional[List[str]] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    commit_strategy: str = 'stats',
+    deadline: Optional[Deadline] = None,
+    concurrency: Optional[ConcurrencyController] = None,
+    resume_counts: Optional[Dict[str, Optional[int]]] = None,
+    on_count: Optional[Callable[[Any, Optional[int]], None]] = None,
+    local_repos: Optional[LocalRepos] = None,
+    exhaustive: bool = False,
+    upstream: bool = False,
+    language_bytes: bool = False,
+    repo_filter: Optional[RepoFilter] = None,
+    estimate: bool = False,
+) -> Dict[str, Any]:
     # Import metrics (these will be implemented next)
     try:
         from github_stats.metrics.commits import CommitMetric
@@ -99,41 +1100,433 @@ def collect_metrics(github_client, username: str) -> Dict[str, Dict[str, Any]]:
         from github_stats.metrics.stars import StarMetric
         from github_stats.metrics.pull_requests import PullRequestMetric
         from github_stats.metrics.issues import IssueMetric
+        from github_stats.metrics.languages import LanguageMetric
+        from github_stats.metrics.contributions import ContributionMetric
     except ImportError:
         # Metrics not yet implemented
         display_error("Metric modules not found. Please ensure all metrics are implemented.")
         return {}
 
-    # Define metrics to collect
-    metrics = {
-        'Commits': CommitMetric(github_client, username),
-        'Followers': FollowerMetric(github_client, username),
-        'Stars': StarMetric(github_client, username),
-        'Pull Requests': PullRequestMetric(github_client, username),
-        'Issues': IssueMetric(github_client, username),
+    # Define metrics to collect; unselected ones are never constructed
+    window = {'since': since, 'until': until, 'deadline': deadline}
+    searches = dict(window, exhaustive=exhaustive)
+    factories = {
+        'Commits': lambda: CommitMetric(
+            github_client, username, strategy=commit_strategy, concurrency=concurrency,
+            resume_counts=resume_counts, on_count=on_count, local_repos=local_repos,
+            upstream=upstream, repo_filter=repo_filter, estimate=estimate, **window
+        ),
+        'Followers': lambda: FollowerMetric(github_client, username, **window),
+        'Stars': lambda: StarMetric(github_client, username, **window),
+        'Pull Requests': lambda: PullRequestMetric(github_client, username, **searches),
+        'Issues': lambda: IssueMetric(github_client, username, **searches),
+        'Languages': lambda: LanguageMetric(github_client, username, language_bytes=language_bytes, **window),
+        'Contributions': lambda: ContributionMetric(github_client, username, **window),
+    }
+
+    return {
+        name: factory()
+        for name, factory in factories.items()
+        if selected is None or name in selected
     }
 
+
+def collect_metrics(
+    github_client,
+    username: str,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    commit_strategy: str = 'stats',
+    user: Any = None,
+    selected: Optional[List[str]] = None,
+    deadline: Optional[Deadline] = None,
+    concurrency: Optional[ConcurrencyController] = None,
+    resume_counts: Optional[Dict[str, Optional[int]]] = None,
+    on_count: Optional[Callable[[Any, Optional[int]], None]] = None,
+    local_repos: Optional[LocalRepos] = None,
+    show_progress: bool = True,
+    use_cache: bool = False,
+    prefetched: Optional[Dict[Any, Any]] = None,
+    exhaustive: bool = False,
+    upstream: bool = False,
+    language_bytes: bool = False,
+    repo_filter: Optional[RepoFilter] = None,
+    estimate: bool = False,
+) -> Dict[str, Dict[str, Any]]:
+    metrics = build_metrics(
+        github_client, username, selected, since, until, commit_strategy, deadline, concurrency,
+        resume_counts, on_count, local_repos, exhaustive, upstream, language_bytes, repo_filter, estimate
+    )
+    if not metrics:
+        return {}
+
     results = {}
 
-    # Collect each metric with progress indication
-    with create_progress_bar() as progress:
+    # Metrics kept current in the cache (by `github-stats webhook`) are
+    # not fetched again
+    cached = _restore_cached(metrics, username, since, until) if use_cache else set()
+
+    # Plan all metrics together so shared data (profile, repository
+    # listing) is fetched once, then process each metric
+    planner = FetchPlanner(github_client, username, deadline=deadline, concurrency=concurrency)
+    if user is not None:
+        planner.seed_user(user)
+    if prefetched:
+        planner.seed(prefetched)
+
+    with create_progress_bar(disable=not show_progress) as progress:
+        task = progress.add_task("Fetching metrics...", total=None)
+        planner.on_step = lambda description: progress.update(task, description=description)
+        pending = [metric for name, metric in metrics.items() if name not in cached]
+        failures = planner.run(pending) if pending else {}
+
         for metric_name, metric in metrics.items():
-            task = progress.add_task(f"Fetching {metric_name}...", total=None)
+            if metric in failures:
+                # Continue with other metrics if one fails
+                if isinstance(failures[metric], DeadlineExceeded):
+                    print_warning(f"Skipped {metric_name}: deadline reached")
+                else:
+                    print_warning(f"Failed to fetch {metric_name}: {str(failures[metric])}")
+                continue
 
             try:
-                metric.collect()
-                results[metric_name] = {
-                    'value': metric.get_summary().split(',')[0].strip() if ',' in metric.get_summary() else metric.get_summary(),
-                    'details': metric.get_summary().split(',', 1)[1].strip() if ',' in metric.get_summary() else ''
-                }
-                progress.update(task, completed=True)
+                results[metric_name] = metric_result(metric)
+                if metric.partial:
+                    results[metric_name]['partial'] = metric.coverage
+                    results[metric_name]['details'] += f" (partial: {metric.coverage})"
             except Exception as e:
-                # Continue with other metrics if one fails
                 print_warning(f"Failed to fetch {metric_name}: {str(e)}")
                 continue
+        progress.update(task, completed=True)
+
+    if use_cache:
+        fetched = {
+            name: metric for name, metric in metrics.items()
+            if name in results and name not in cached and not metric.partial
+        }
+        _store_cached(fetched, username, since, until)
 
     return results
 
 
+def metric_result(metric: Any) -> Dict[str, Any]:
+    # Process a loaded metric into the row shown in tables and journals
+    metric.process()
+    summary = metric.get_summary()
+    return {
+        'value': summary.split(',')[0].strip() if ',' in summary else summary,
+        'details': summary.split(',', 1)[1].strip() if ',' in summary else '',
+        'detailed': metric.get_detailed()
+    }
+
+
+def estimate_costs(planner: FetchPlanner, metrics: Dict[str, Any], profile: UserProfile) -> List[Tuple[str, int]]:
+    # Cost of each metric on its own; shared data makes the total smaller
+    # than the sum
+    return [(name, planner.estimate([metric], profile)) for name, metric in metrics.items()]
+
+
+def fit_budget(
+    planner: FetchPlanner,
+    metrics: Dict[str, Any],
+    profile: UserProfile,
+    allowed: int,
+) -> List[str]:
+    # Drop the metric whose removal saves the most calls until the rest fit
+    kept = dict(metrics)
+    while kept and planner.estimate(kept.values(), profile) > allowed:
+        total = planner.estimate(kept.values(), profile)
+        savings = {
+            name: total - planner.estimate([m for n, m in kept.items() if n != name], profile)
+            for name in kept
+        }
+        del kept[max(savings, key=savings.get)]
+    return list(kept)
+
+
+def record_snapshot(username: str, metrics_data: Dict[str, Dict[str, Any]]) -> None:
+    # Partial results would show up as drops in the trends, so only
+    # complete metrics are recorded
+    detailed = {
+        name: data['detailed'] for name, data in metrics_data.items()
+        if 'detailed' in data and not data.get('partial')
+    }
+    if not detailed:
+        return
+    try:
+        with HistoryStore() as store:
+            store.record(username, detailed)
+    except (OSError, sqlite3.Error) as e:
+        # History is best effort; never fail a run because of it
+        print_warning(f"Could not record snapshot: {str(e)}")
+
+
+SUBCOMMANDS = {
+    'history': history_main,
+    'batch': batch_main,
+    'archive': archive_main,
+    'webhook': webhook_main,
+    'stars': stars_main,
+    'followers': followers_main,
+}
+
+
+#---------------------------------------------------------
+# Helper functions
+#---------------------------------------------------------
+
+def _install_policy(
+    github_client,
+    args: argparse.Namespace,
+) -> Tuple[RequestPolicy, Optional[ConcurrencyController]]:
+    # Time out, retry and hedge every request from here on; per-repo
+    # requests run in parallel under an adaptive limit
+    controller = ConcurrencyController(maximum=args.max_concurrency) if args.max_concurrency > 1 else None
+    policy = RequestPolicy(timeout=args.timeout, controller=controller)
+    policy.install(github_client)
+    return policy, controller
+
+
+def _select_backend(github_client, args: argparse.Namespace, policy: RequestPolicy):
+    # The raw backend sends through the same policy but skips PyGithub's
+    # object construction for the calls made per item
+    if args.backend == REST:
+        return RestClient(github_client, policy)
+    return github_client
+
+
+def _finish_run(
+    args: argparse.Namespace,
+    policy: RequestPolicy,
+    controller: Optional[ConcurrencyController],
+) -> None:
+    if args.instrument:
+        stats = policy.stats.summary()
+        if controller is not None:
+            stats.update(controller.summary())
+        print_table(create_instrumentation_table(stats))
+    policy.close()
+    if controller is not None:
+        controller.close()
+    if args.local_repos is not None:
+        args.local_repos.close()
+
+
+def _restore_cached(
+    metrics: Dict[str, Any],
+    username: str,
+    since: Optional[datetime],
+    until: Optional[datetime],
+) -> set:
+    restored = set()
+    try:
+        with MetricsCache() as cache:
+            for name, metric in metrics.items():
+                # Entries no webhook keeps current are only trusted for a while
+                max_age = None if name in MAINTAINED_METRICS else CACHE_TTL
+                data = cache.get(username, name, since, until, _cache_strategy(metric), max_age)
+                if data is not None:
+                    metric.restore(data)
+                    restored.add(name)
+    except (OSError, sqlite3.Error) as e:
+        # The cache is best effort; fetch everything without it
+        print_warning(f"Could not read cache: {str(e)}")
+    return restored
+
+
+def _store_cached(
+    metrics: Dict[str, Any],
+    username: str,
+    since: Optional[datetime],
+    until: Optional[datetime],
+) -> None:
+    if not metrics:
+        return
+    try:
+        with MetricsCache() as cache:
+            for name, metric in metrics.items():
+                cache.put(username, name, metric.data, since, until, _cache_strategy(metric))
+    except (OSError, sqlite3.Error, TypeError) as e:
+        print_warning(f"Could not update cache: {str(e)}")
+
+
+def _cache_strategy(metric: Any) -> str:
+    # Cached data depends on how it was collected: the commit counting
+    # strategy, upstream commits, exhaustive searches, language bytes,
+    # estimates, repository filters, and the calendar days, whose default
+    # window rolls with the date
+    options = []
+    if hasattr(metric, 'days'):
+        first, last = metric.days()
+        options.append(f"{first.isoformat()}..{last.isoformat()}")
+    if getattr(metric, 'strategy', None):
+        options.append(metric.strategy)
+    for option in ('upstream', 'exhaustive', 'language_bytes', 'estimate'):
+        if getattr(metric, option, False):
+            options.append(option)
+    if getattr(metric, 'repo_filter', None):
+        options.append(metric.repo_filter.key())
+    return '+'.join(options)
+
+
+def _report_commit_notes(metrics_data: Dict[str, Dict[str, Any]]) -> None:
+    detailed = metrics_data.get('Commits', {}).get('detailed', {})
+    if 'skipped_repos' in detailed:
+        print_info(
+            f"Repository filters skipped {detailed['skipped_repos']:,} repos, "
+            f"saving about {detailed['calls_saved']:,} API calls"
+        )
+    if detailed.get('upstream_unattributed'):
+        print_info(
+            f"Upstream breakdown capped at {UPSTREAM_REPO_LIMIT} repositories; "
+            f"{detailed['upstream_unattributed']:,} commits elsewhere count toward the total only"
+        )
+
+
+def _repo_filter(args: argparse.Namespace) -> Optional[RepoFilter]:
+    repo_filter = RepoFilter(
+        exclude_forks=args.exclude_forks,
+        exclude_archived=args.exclude_archived,
+        min_pushed=args.min_pushed,
+        owner_only=args.owner_only,
+    )
+    return repo_filter if repo_filter else None
+
+
+def _star_history_repos(
+    records: List[RepoRecord],
+    names: Optional[List[str]],
+    top: int,
+) -> List[RepoRecord]:
+    # Named repositories match by name or owner/name; otherwise the most
+    # starred ones are tracked
+    if names is not None:
+        wanted = {name.lower() for name in names}
+        return [
+            record for record in records
+            if record.name.lower() in wanted or record.full_name.lower() in wanted
+        ]
+    starred = sorted((record for record in records if record.stars > 0), key=lambda record: -record.stars)
+    return starred[:top]
+
+
+def _stars_gained(store: StarHistoryStore, record: RepoRecord, since: int, complete: bool) -> Optional[int]:
+    earlier = store.total_at(record.full_name, since)
+    if earlier is None:
+        # No point that early: either no stars yet, or history unknown
+        return record.stars if complete else None
+    return record.stars - earlier
+
+
+def _batch_groups(
+    github_client,
+    usernames: List[str],
+    args: argparse.Namespace,
+    journal: Journal,
+    batcher: Optional[GraphQLBatcher],
+) -> List[Dict[str, List[Any]]]:
+    # Users in GraphQL document sized groups, each with the needs of its
+    # unfinished metrics; without a batcher one group holds everyone
+    if batcher is None:
+        return [{username: [] for username in usernames}]
+    needs = {}
+    for username in usernames:
+        finished = journal.state.results.get(username, {})
+        selected = [name for name in (args.metrics or METRIC_NAMES.values()) if name not in finished]
+        metrics = build_metrics(
+            github_client, username, selected, args.since, args.until, args.commit_strategy,
+            exhaustive=args.exhaustive, upstream=args.upstream, language_bytes=args.language_bytes,
+            repo_filter=_repo_filter(args), estimate=args.estimate
+        )
+        needs[username] = FetchPlanner(github_client, username).plan(metrics.values())
+    return batcher.groups(needs)
+
+
+def _prefetch(batcher: GraphQLBatcher, group: Dict[str, List[Any]]) -> Dict[str, Dict[Any, Any]]:
+    try:
+        prefetched = batcher.fetch(group)
+    except Exception as e:
+        # Fall back to fetching every user on its own
+        print_warning(f"GraphQL batch failed, fetching users one by one: {str(e)}")
+        return {}
+    for username in group:
+        if username in batcher.errors:
+            print_warning(f"GraphQL could not resolve {username}: {batcher.errors.pop(username)}")
+    return prefetched
+
+
+def _read_usernames(usernames: List[str], users_file: Optional[str]) -> List[str]:
+    names = list(usernames)
+    if users_file:
+        with open(users_file, encoding='utf-8') as lines:
+            for line in lines:
+                name = line.split('#', 1)[0].strip()
+                if name:
+                    names.append(name)
+    # Keep the first occurrence of each user
+    return list(dict.fromkeys(names))
+
+
+def _parse_metrics(value: str) -> List[str]:
+    keys = [key.strip().lower() for key in value.split(',') if key.strip()]
+    unknown = [key for key in keys if key not in METRIC_NAMES]
+    if unknown or not keys:
+        raise argparse.ArgumentTypeError(
+            f"unknown metric(s) '{', '.join(unknown)}' (choose from {', '.join(METRIC_NAMES)})"
+        )
+    return [METRIC_NAMES[key] for key in keys]
+
+
+def _parse_date(value: str) -> datetime:
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').replace(tzinfo=timezone.utc)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date '{value}' (expected YYYY-MM-DD)") from None
+
+
+def _parse_since(value: str) -> datetime:
+    return _parse_date(value)
+
+
+def _parse_until(value: str) -> datetime:
+    # Include the whole final day
+    return _parse_date(value) + timedelta(days=1) - timedelta(seconds=1)
+
+
+def _parse_local_repos(value: str) -> LocalRepos:
+    path = Path(value).expanduser()
+    if not path.is_dir():
+        raise argparse.ArgumentTypeError(f"'{value}' is not a directory")
+    return LocalRepos(path)
+
+
+def _parse_positive_int(value: str) -> int:
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"invalid number '{value}' (expected a positive integer)")
+    return number
+
+
+def _parse_seconds(value: str) -> float:
+    try:
+        seconds = float(value)
+    except ValueError:
+        seconds = 0
+    if seconds <= 0:
+        raise argparse.ArgumentTypeError(f"invalid duration '{value}' (expected a positive number of seconds)")
+    return seconds
+
+
+def _describe_window(since: Optional[datetime], until: Optional[datetime]) -> Optional[str]:
+    if not since and not until:
+        return None
+    start = since.date().isoformat() if since else 'beginning'
+    end = until.date().isoformat() if until else 'now'
+    return f"{start} to {end}"
+
+
 if __name__ == '__main__':
     main()
@@ -0,0 +1,190 @@
+#---------------------------------------------------------
+# Adaptive (AIMD) concurrency for API fan-out
+#---------------------------------------------------------
+
+import contextvars
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+# Concurrency limits: start modestly, never exceed MAX_CONCURRENCY
+INITIAL_CONCURRENCY = 4
+MAX_CONCURRENCY = 16
+
+# Multiplicative decrease on throttling or rising latency
+BACKOFF_FACTOR = 0.5
+
+# Latency counts as rising once its moving average exceeds the healthy
+# baseline by this factor
+LATENCY_TOLERANCE = 2.0
+LATENCY_SMOOTHING = 0.2
+
+# Minimum seconds between two decreases, so one burst of slow or throttled
+# responses only halves the limit once
+DECREASE_COOLDOWN = 1.0
+
+# Pause after a secondary rate limit without a Retry-After header
+THROTTLE_PAUSE = 5.0
+
+
+class ConcurrencyController:
+    """
+    Additive-increase/multiplicative-decrease limit for concurrent requests.
+
+    The request policy reports every request's latency and every secondary
+    rate limit (403) or 429. While latency stays near its healthy baseline
+    the limit grows by about one per round of completed requests; throttling
+    or latency rising above LATENCY_TOLERANCE times the baseline halves it.
+    The limit thus settles at the highest parallelism the current token and
+    load allow.
+    """
+
+    def __init__(
+        self,
+        initial: int = INITIAL_CONCURRENCY,
+        maximum: int = MAX_CONCURRENCY,
+        minimum: int = 1,
+    ):
+        """
+        Initialize the controller.
+
+        Args:
+            initial: Starting concurrency limit
+            maximum: Upper bound for the limit
+            minimum: Lower bound for the limit
+        """
+        self.minimum = minimum
+        self.maximum = max(minimum, maximum)
+        self.limit = float(min(max(initial, minimum), self.maximum))
+        self.in_flight = 0
+        self.peak = self.limit
+        self.decreases = 0
+        self.throttles = 0
+
+        self._latency: Optional[float] = None
+        self._baseline: Optional[float] = None
+        self._last_decrease = 0.0
+        self._paused_until = 0.0
+        self._condition = threading.Condition()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    #---------------------------------------------------------
+    # Main execution
+    #---------------------------------------------------------
+
+    def submit(self, fn: Callable[..., Any], *args: Any, timeout: Optional[float] = None) -> Future:
+        """
+        Run fn in the background once a concurrency slot is free.
+
+        Blocks while the limit is reached, which also bounds how much work
+        callers can queue up.
+
+        Args:
+            timeout: Seconds to wait for a slot, or None to wait indefinitely
+
+        Raises:
+            TimeoutError: If no slot became free in time
+        """
+        self._acquire(timeout)
+        try:
+            # Work runs in a copy of the caller's context, so a deadline the
+            # request policy is bound to follows it onto the pool
+            future = self._get_executor().submit(contextvars.copy_context().run, fn, *args)
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(lambda _: self._release())
+        return future
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    #---------------------------------------------------------
+    # Feedback from the request policy
+    #---------------------------------------------------------
+
+    def observe(self, latency: float) -> None:
+        """
+        Record the latency of a successful request.
+        """
+        with self._condition:
+            self._latency = latency if self._latency is None else (
+                LATENCY_SMOOTHING * latency + (1 - LATENCY_SMOOTHING) * self._latency
+            )
+            if self._baseline is None or self._latency < self._baseline:
+                self._baseline = self._latency
+            else:
+                # Let the baseline follow slow drifts (e.g. time of day)
+                self._baseline += (self._latency - self._baseline) * 0.01
+
+            if self._latency > LATENCY_TOLERANCE * self._baseline:
+                self._decrease()
+            else:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+                self.peak = max(self.peak, self.limit)
+                self._condition.notify_all()
+
+    def throttle(self, retry_after: Optional[float] = None) -> None:
+        """
+        Record a secondary rate limit or 429 and pause new requests.
+
+        Args:
+            retry_after: Seconds the server asked to wait, if it said
+        """
+        with self._condition:
+            self.throttles += 1
+            self._decrease()
+            pause = retry_after if retry_after is not None else THROTTLE_PAUSE
+            self._paused_until = max(self._paused_until, time.monotonic() + pause)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'concurrency': int(self.limit),
+            'peak_concurrency': int(self.peak),
+            'throttles': self.throttles,
+        }
+
+    #---------------------------------------------------------
+    # Helper functions
+    #---------------------------------------------------------
+
+    def _decrease(self) -> None:
+        now = time.monotonic()
+        if now - self._last_decrease < DECREASE_COOLDOWN:
+            return
+        self._last_decrease = now
+        self.decreases += 1
+        self.limit = max(float(self.minimum), self.limit * BACKOFF_FACTOR)
+
+    def _acquire(self, timeout: Optional[float]) -> None:
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                paused = self._paused_until - now
+                if paused <= 0 and self.in_flight < int(self.limit):
+                    self.in_flight += 1
+                    return
+
+                wait = paused if paused > 0 else None
+                if deadline is not None:
+                    left = deadline - now
+                    if left <= 0:
+                        raise TimeoutError("no concurrency slot became free")
+                    wait = left if wait is None else min(wait, left)
+                self._condition.wait(wait)
+
+    def _release(self) -> None:
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.maximum, thread_name_prefix='github-stats-fanout'
+            )
+        return self._executor
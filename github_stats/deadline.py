@@ -0,0 +1,88 @@
+#---------------------------------------------------------
+# Deadline propagation for time-bounded collection
+#---------------------------------------------------------
+
+import contextvars
+import threading
+import time
+from typing import Any, Callable, Optional
+
+
+class DeadlineExceeded(Exception):
+    """Raised when work is cut off by the collection deadline."""
+
+
+class Deadline:
+    """
+    A point in time by which collection has to finish.
+
+    Metrics check expired() between units of work and run API calls through
+    call(), which stops waiting when time runs out. A Deadline without
+    seconds never expires and call() runs the function directly.
+    """
+
+    def __init__(self, seconds: Optional[float] = None):
+        """
+        Start the clock.
+
+        Args:
+            seconds: Time budget from now, or None for no deadline
+        """
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds if seconds is not None else None
+
+    def remaining(self) -> Optional[float]:
+        """
+        Get the seconds left, or None when there is no deadline.
+        """
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    def sleep(self, seconds: float) -> None:
+        """
+        Sleep, but never past the deadline.
+        """
+        remaining = self.remaining()
+        time.sleep(seconds if remaining is None else min(seconds, remaining))
+
+    def call(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Run fn, giving up when the deadline passes.
+
+        The call runs in a daemon thread. If the deadline passes first, its
+        result is discarded and the thread is abandoned, so neither the caller
+        nor interpreter exit waits for the in-flight request. A RequestPolicy
+        bound to this deadline keeps the thread from starting further requests.
+
+        Raises:
+            DeadlineExceeded: If the deadline passed before fn returned
+        """
+        if self.expires_at is None:
+            return fn(*args, **kwargs)
+        if self.expired():
+            raise DeadlineExceeded("deadline reached")
+
+        outcome = {}
+        done = threading.Event()
+
+        def run() -> None:
+            try:
+                outcome['result'] = fn(*args, **kwargs)
+            except BaseException as e:
+                outcome['error'] = e
+            finally:
+                done.set()
+
+        # The thread runs in a copy of the caller's context, which carries
+        # the deadline a RequestPolicy is bound to
+        threading.Thread(target=contextvars.copy_context().run, args=(run,), daemon=True).start()
+        if not done.wait(self.remaining()):
+            raise DeadlineExceeded("deadline reached")
+
+        if 'error' in outcome:
+            raise outcome['error']
+        return outcome['result']
@@ -3,9 +3,12 @@
 # # Display utilities using Rich for beautiful terminal output.
 # -------------------------------------------------------------
 
-from typing import Dict, List, Any
-from datetime import datetime
+import math
+from typing import Dict, List, Any, Optional, Sequence, Tuple
+from datetime import date, datetime, timedelta, timezone
+from rich.live import Live
 from rich.table import Table
+from rich.text import Text
 from rich.progress import Progress, SpinnerColumn, TextColumn
 from rich import box
 from github_stats.output import console, print_header as output_print_header, print_rate_limit, print_error, print_warning
@@ -19,11 +22,13 @@ HEADER_STYLE = "cyan"
 HEADER_BOX = box.ROUNDED
 
 
-def display_header(username: str) -> None:
+def display_header(username: str, window: Optional[str] = None) -> None:
     text = (
         "[bold cyan]GitHub Stats for:[/bold cyan] "
         f"[bold white]{username}[/bold white]"
     )
+    if window:
+        text += f" [dim]({window})[/dim]"
     output_print_header(text, HEADER_BOX, HEADER_STYLE)
 
 #---------------------------------------------------------
@@ -50,17 +55,237 @@ def create_summary_table(metrics_data: Dict[str, Dict[str, Any]]) -> Table:
 
     return table
 
+#---------------------------------------------------------
+# Batch summary display
+#---------------------------------------------------------
+def create_batch_table(results: Dict[str, Dict[str, Dict[str, Any]]], metric_names: List[str]) -> Table:
+    table = Table(box=box.ROUNDED, border_style="cyan", show_header=True, header_style="bold cyan")
+
+    table.add_column("User", style="bold white", no_wrap=True)
+    for name in metric_names:
+        table.add_column(name, style="bold green", justify="right")
+
+    # One row per user; metrics that could not be collected show a dash
+    for username, metrics_data in results.items():
+        values = [str(metrics_data[name]['value']) if name in metrics_data else "-" for name in metric_names]
+        table.add_row(username, *values)
+
+    return table
+
+#---------------------------------------------------------
+# History display
+#---------------------------------------------------------
+def create_history_table(rows: List[Tuple[str, str, float, float]]) -> Table:
+    table = Table(box=box.ROUNDED, border_style="cyan", show_header=True, header_style="bold cyan")
+
+    table.add_column("Metric", style="bold white", no_wrap=True)
+    table.add_column("Field", style="white")
+    table.add_column("First", justify="right")
+    table.add_column("Latest", style="bold green", justify="right")
+    table.add_column("Change", justify="right")
+
+    for metric, field, first, latest in rows:
+        table.add_row(metric, field, _format_value(first), _format_value(latest), _format_change(latest - first))
+
+    return table
+
+
+def create_trend_table(points: List[Tuple[int, float]]) -> Table:
+    table = Table(box=box.ROUNDED, border_style="cyan", show_header=True, header_style="bold cyan")
+
+    table.add_column("Taken (UTC)", style="bold white", no_wrap=True)
+    table.add_column("Value", style="bold green", justify="right")
+    table.add_column("Change", justify="right")
+
+    previous = None
+    for taken_at, value in points:
+        taken = datetime.fromtimestamp(taken_at, tz=timezone.utc).strftime("%Y-%m-%d %H:%M")
+        change = _format_change(value - previous) if previous is not None else ""
+        table.add_row(taken, _format_value(value), change)
+        previous = value
+
+    return table
+
+def create_star_history_table(rows: List[Tuple[str, int, Optional[int], Optional[int], int]]) -> Table:
+    table = Table(box=box.ROUNDED, border_style="cyan", show_header=True, header_style="bold cyan")
+
+    table.add_column("Repository", style="bold white", no_wrap=True)
+    table.add_column("Stars", style="bold green", justify="right")
+    table.add_column("7 days", justify="right")
+    table.add_column("30 days", justify="right")
+    table.add_column("Pages", style="dim white", justify="right")
+
+    # Gains are unknown for repositories too large to list
+    for full_name, stars, week, month, pages in rows:
+        table.add_row(
+            full_name, f"{stars:,}",
+            _format_change(week) if week is not None else "-",
+            _format_change(month) if month is not None else "-",
+            str(pages)
+        )
+
+    return table
+
+#---------------------------------------------------------
+# Follower graph display
+#---------------------------------------------------------
+def create_follower_graph_table(rows: List[Tuple[str, int, int, int, int, int, int]]) -> Table:
+    table = Table(box=box.ROUNDED, border_style="cyan", show_header=True, header_style="bold cyan")
+
+    table.add_column("User", style="bold white", no_wrap=True)
+    table.add_column("Followers", style="bold green", justify="right")
+    table.add_column("Following", justify="right")
+    table.add_column("Mutual", justify="right")
+    table.add_column("New", justify="right")
+    table.add_column("Lost", justify="right")
+    table.add_column("Pages fetched", style="dim white", justify="right")
+
+    for username, followers, following, mutual, added, removed, pages in rows:
+        table.add_row(
+            username, f"{followers:,}", f"{following:,}", f"{mutual:,}",
+            _format_change(added), _format_change(-removed), f"{pages:,}"
+        )
+
+    return table
+
+
+def create_overlap_table(pairs: List[Tuple[str, str, int, float]]) -> Table:
+    table = Table(
+        box=box.ROUNDED, border_style="cyan", show_header=True, header_style="bold cyan",
+        title="Shared followers"
+    )
+
+    table.add_column("Users", style="bold white", no_wrap=True)
+    table.add_column("Shared", style="bold green", justify="right")
+    table.add_column("Overlap", justify="right")
+
+    for first, second, shared, overlap in pairs:
+        table.add_row(f"{first} & {second}", f"{shared:,}", f"{overlap:.1%}")
+
+    return table
+
+#---------------------------------------------------------
+# Cost estimate display
+#---------------------------------------------------------
+def create_estimate_table(rows: List[Tuple[str, int]], total: int, remaining: int) -> Table:
+    table = Table(
+        box=box.ROUNDED, border_style="cyan", show_header=True, header_style="bold cyan",
+        title="Estimated API calls", show_footer=True
+    )
+
+    table.add_column("Metric", style="bold white", no_wrap=True, footer="Total (shared data fetched once)")
+    table.add_column("Calls", style="bold green", justify="right", footer=f"{total:,}")
+
+    for name, calls in rows:
+        table.add_row(name, f"{calls:,}")
+
+    color = "green" if total <= remaining else "red"
+    table.caption = f"[{color}]{remaining:,} calls remaining in the current rate limit window[/{color}]"
+
+    return table
+
+#---------------------------------------------------------
+# Instrumentation display
+#---------------------------------------------------------
+def create_instrumentation_table(stats: Dict[str, Any]) -> Table:
+    table = Table(
+        box=box.ROUNDED, border_style="cyan", show_header=True, header_style="bold cyan",
+        title="API requests"
+    )
+
+    table.add_column("Measure", style="bold white", no_wrap=True)
+    table.add_column("Value", style="bold green", justify="right")
+
+    table.add_row("Requests sent", f"{stats['requests']:,}")
+    table.add_row("Retries", f"{stats['retries']:,}")
+    table.add_row("Timeouts", f"{stats['timeouts']:,}")
+    table.add_row("Hedged requests", f"{stats['hedges']:,}")
+    table.add_row("Hedges that won", f"{stats['hedge_wins']:,}")
+    for label, key in (("Latency p50", 'p50'), ("Latency p95", 'p95')):
+        value = stats[key]
+        table.add_row(label, f"{value * 1000:,.0f} ms" if value is not None else "-")
+    if 'concurrency' in stats:
+        table.add_row("Secondary limits hit", f"{stats['throttles']:,}")
+        table.add_row("Concurrency (final/peak)", f"{stats['concurrency']}/{stats['peak_concurrency']}")
+
+    return table
+
 #---------------------------------------------------------
 # Progress bar and rate limit display
 #---------------------------------------------------------
-def create_progress_bar() -> Progress:
+def create_progress_bar(disable: bool = False) -> Progress:
+    # Disabled inside --watch, where the live summary already owns the screen
     return Progress(
         SpinnerColumn(),
         TextColumn("[progress.description]{task.description}"),
         console=console,
-        transient=True
+        transient=True,
+        disable=disable
     )
 
+#---------------------------------------------------------
+# Live display for --watch
+#---------------------------------------------------------
+def create_live_display(table: Table) -> Live:
+    return Live(table, console=console, auto_refresh=False)
+
+
+def create_watch_table(metrics_data: Dict[str, Dict[str, Any]], status: str) -> Table:
+    table = create_summary_table(metrics_data)
+    table.caption = status
+    table.caption_style = "dim"
+    return table
+
+#---------------------------------------------------------
+# Contribution heatmap display
+#---------------------------------------------------------
+HEATMAP_WEEKS = 53
+HEATMAP_CELL = "■"
+HEATMAP_STYLES = ["grey23", "dark_green", "green4", "green3", "green1"]
+HEATMAP_LABELS = {0: "Mon", 2: "Wed", 4: "Fri"}
+
+
+def create_contribution_heatmap(start: date, counts: Sequence[int], weeks: int = HEATMAP_WEEKS) -> Text:
+    heatmap = Text()
+    if not counts:
+        return heatmap
+
+    # One column per week, Monday on top; only the last weeks are shown
+    end = start + timedelta(days=len(counts) - 1)
+    first = max(start, end - timedelta(days=end.weekday() + 7 * (weeks - 1)))
+    first -= timedelta(days=first.weekday())
+    columns = (end - first).days // 7 + 1
+    peak = max(counts)
+
+    # Month names start above the first week of each month
+    header = " " * 4
+    month = None
+    for column in range(columns):
+        monday = max(start, first + timedelta(weeks=column))
+        if monday.month != month and len(header) <= 4 + column:
+            header = header.ljust(4 + column) + monday.strftime("%b ")
+        month = monday.month
+    heatmap.append(header.rstrip() + "\n", style="dim")
+
+    for weekday in range(7):
+        heatmap.append(f"{HEATMAP_LABELS.get(weekday, ''):<4}", style="dim")
+        for column in range(columns):
+            day = first + timedelta(days=7 * column + weekday)
+            if day < start or day > end:
+                heatmap.append(" ")
+                continue
+            count = counts[(day - start).days]
+            level = math.ceil(4 * count / peak) if count else 0
+            heatmap.append(HEATMAP_CELL, style=HEATMAP_STYLES[level])
+        heatmap.append("\n")
+
+    # Legend
+    heatmap.append(" " * 4 + "Less ", style="dim")
+    for style in HEATMAP_STYLES:
+        heatmap.append(HEATMAP_CELL, style=style)
+    heatmap.append(" More", style="dim")
+    return heatmap
+
 #---------------------------------------------------------
 # Rate limit display
 #---------------------------------------------------------
@@ -84,6 +309,20 @@ def format_number(num: int) -> str:
     return str(num)
 
 
+def _format_value(value: float) -> str:
+    if float(value).is_integer():
+        return f"{int(value):,}"
+    return f"{value:,.2f}"
+
+
+def _format_change(change: float) -> str:
+    if change > 0:
+        return f"[green]+{_format_value(change)}[/green]"
+    if change < 0:
+        return f"[red]-{_format_value(-change)}[/red]"
+    return "[dim]0[/dim]"
+
+
 def display_error(message: str) -> None:
     print_error(message)
 
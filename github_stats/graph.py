@@ -0,0 +1,321 @@
+#---------------------------------------------------------
+# Follower graph as compact sorted user-ID sets
+#---------------------------------------------------------
+
+import math
+import sqlite3
+import time
+from array import array
+from bisect import bisect_left
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from github_stats.deadline import Deadline, DeadlineExceeded
+from github_stats.paths import get_data_file
+
+GRAPH_DB = 'graph.db'
+
+# Users per page (the API maximum)
+PAGE_SIZE = 100
+
+# Bytes per stored user ID
+ID_SIZE = array('q').itemsize
+
+# Lists kept per user
+FOLLOWERS = 'followers'
+FOLLOWING = 'following'
+
+# Each list is stored per page, with the page's ETag, so a refresh can ask
+# for changed pages only; unchanged pages (304) cost no rate limit. A
+# refresh records how many IDs were added and removed, which is the
+# growth series.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    username TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    page INTEGER NOT NULL,
+    etag TEXT,
+    ids BLOB NOT NULL,
+    PRIMARY KEY (username, kind, page)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS changes (
+    username TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    taken_at INTEGER NOT NULL,
+    added INTEGER NOT NULL,
+    removed INTEGER NOT NULL,
+    total INTEGER NOT NULL,
+    PRIMARY KEY (username, kind, taken_at)
+) WITHOUT ROWID;
+"""
+
+
+class IdSet:
+    """
+    Immutable set of user IDs as a sorted array of 64-bit integers.
+
+    8 bytes per ID, so 100k followers take under a megabyte; membership is
+    a binary search and set operations are linear merges.
+    """
+
+    __slots__ = ('ids',)
+
+    def __init__(self, ids: Iterable[int] = ()):
+        self.ids = array('q', sorted(set(ids)))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'IdSet':
+        """
+        Load a set stored with to_bytes().
+        """
+        result = cls()
+        result.ids.frombytes(data)
+        return result
+
+    def to_bytes(self) -> bytes:
+        return self.ids.tobytes()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.ids)
+
+    def __contains__(self, user_id: int) -> bool:
+        index = bisect_left(self.ids, user_id)
+        return index < len(self.ids) and self.ids[index] == user_id
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, IdSet) and self.ids == other.ids
+
+    def __and__(self, other: 'IdSet') -> 'IdSet':
+        return self._merge(other, keep_left=False, keep_both=True, keep_right=False)
+
+    def __or__(self, other: 'IdSet') -> 'IdSet':
+        return self._merge(other, keep_left=True, keep_both=True, keep_right=True)
+
+    def __sub__(self, other: 'IdSet') -> 'IdSet':
+        return self._merge(other, keep_left=True, keep_both=False, keep_right=False)
+
+    def jaccard(self, other: 'IdSet') -> float:
+        """
+        Get the share of IDs in either set that are in both (0 to 1).
+        """
+        union = len(self | other)
+        return len(self & other) / union if union else 0.0
+
+    def _merge(self, other: 'IdSet', keep_left: bool, keep_both: bool, keep_right: bool) -> 'IdSet':
+        left, right = self.ids, other.ids
+        merged = array('q')
+        i = j = 0
+        while i < len(left) and j < len(right):
+            if left[i] < right[j]:
+                if keep_left:
+                    merged.append(left[i])
+                i += 1
+            elif left[i] > right[j]:
+                if keep_right:
+                    merged.append(right[j])
+                j += 1
+            else:
+                if keep_both:
+                    merged.append(left[i])
+                i += 1
+                j += 1
+        if keep_left:
+            merged.extend(left[i:])
+        if keep_right:
+            merged.extend(right[j:])
+
+        result = IdSet()
+        result.ids = merged
+        return result
+
+
+class Refresh(NamedTuple):
+    """Outcome of refreshing one list."""
+    ids: IdSet
+    added: int
+    removed: int
+    requests: int
+    not_modified: int
+
+
+class GraphStore:
+    """Follower and following lists per user, backed by SQLite."""
+
+    def __init__(self, path: Optional[Union[str, Path]] = None):
+        """
+        Open (and create if needed) the graph database.
+
+        Args:
+            path: Database file, defaults to graph.db in the data directory
+        """
+        self.path = Path(path) if path else get_data_file(GRAPH_DB)
+        self.connection = sqlite3.connect(str(self.path))
+        self.connection.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> 'GraphStore':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    #---------------------------------------------------------
+    # Lists and growth
+    #---------------------------------------------------------
+
+    def pages(self, username: str, kind: str) -> Dict[int, Tuple[Optional[str], bytes]]:
+        """
+        Get the stored pages of a list, as page number to (ETag, IDs).
+        """
+        cursor = self.connection.execute(
+            "SELECT page, etag, ids FROM pages WHERE username = ? AND kind = ?",
+            (username.lower(), kind)
+        )
+        return {page: (etag, ids) for page, etag, ids in cursor.fetchall()}
+
+    def current(self, username: str, kind: str) -> IdSet:
+        """
+        Get the list as of the last refresh (empty before the first).
+        """
+        ids = array('q')
+        for _, data in self.pages(username, kind).values():
+            ids.frombytes(data)
+        return IdSet(ids)
+
+    def replace(
+        self,
+        username: str,
+        kind: str,
+        pages: Dict[int, Tuple[Optional[str], bytes]],
+        added: int,
+        removed: int,
+        total: int,
+        taken_at: Optional[int] = None,
+    ) -> None:
+        """
+        Store the pages of a refreshed list and record its change.
+        """
+        taken_at = int(time.time()) if taken_at is None else int(taken_at)
+        username = username.lower()
+        with self.connection:
+            self.connection.execute("DELETE FROM pages WHERE username = ? AND kind = ?", (username, kind))
+            self.connection.executemany(
+                "INSERT INTO pages (username, kind, page, etag, ids) VALUES (?, ?, ?, ?, ?)",
+                [(username, kind, page, etag, data) for page, (etag, data) in pages.items()]
+            )
+            self.connection.execute(
+                "INSERT OR REPLACE INTO changes (username, kind, taken_at, added, removed, total) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (username, kind, taken_at, added, removed, total)
+            )
+
+    def growth(self, username: str, kind: str) -> List[Tuple[int, int, int, int]]:
+        """
+        Get the (taken_at, added, removed, total) of every refresh in time order.
+        """
+        cursor = self.connection.execute(
+            "SELECT taken_at, added, removed, total FROM changes "
+            "WHERE username = ? AND kind = ? ORDER BY taken_at",
+            (username.lower(), kind)
+        )
+        return cursor.fetchall()
+
+
+#---------------------------------------------------------
+# Refreshing from the API
+#---------------------------------------------------------
+
+def refresh_list(
+    requester: Any,
+    store: GraphStore,
+    username: str,
+    kind: str,
+    count: int,
+    submit: Optional[Callable[..., Future]] = None,
+    deadline: Optional[Deadline] = None,
+) -> Refresh:
+    """
+    Refresh a user's follower or following list and diff it with the last one.
+
+    The page count follows from the profile's count, so all pages are
+    requested at once (concurrently when a submit function such as
+    ConcurrencyController.submit is given). Each request carries the
+    page's stored ETag; pages that did not change answer 304 and are taken
+    from the store. Nothing is stored unless every page was fetched.
+
+    Args:
+        requester: PyGithub Requester (see auth.get_requester)
+        store: Graph store
+        username: User whose list to refresh
+        kind: FOLLOWERS or FOLLOWING
+        count: The list's length according to the profile
+        submit: Runs a page fetch in the background and returns its future
+        deadline: Time by which fetching must stop (optional)
+
+    Raises:
+        DeadlineExceeded: If the deadline passed before every page was fetched
+    """
+    deadline = deadline or Deadline()
+    previous = store.current(username, kind)
+    cached = store.pages(username, kind)
+
+    def fetch(page: int) -> Tuple[Optional[str], bytes, bool]:
+        return _fetch_page(requester, username, kind, page, cached.get(page), deadline)
+
+    last = max(1, math.ceil(count / PAGE_SIZE))
+    if submit is None:
+        results = {page: fetch(page) for page in range(1, last + 1)}
+    else:
+        futures = {page: submit(fetch, page) for page in range(1, last + 1)}
+        results = {page: future.result() for page, future in futures.items()}
+
+    # The list may have grown since the profile was read
+    while len(results[last][1]) == PAGE_SIZE * ID_SIZE:
+        last += 1
+        results[last] = fetch(last)
+
+    ids = array('q')
+    for _, data, _ in results.values():
+        ids.frombytes(data)
+    current = IdSet(ids)
+
+    added = len(current - previous)
+    removed = len(previous - current)
+    pages = {page: (etag, data) for page, (etag, data, _) in results.items() if data}
+    store.replace(username, kind, pages, added, removed, len(current))
+
+    not_modified = sum(1 for _, _, modified in results.values() if not modified)
+    return Refresh(current, added, removed, len(results), not_modified)
+
+
+#---------------------------------------------------------
+# Helper functions
+#---------------------------------------------------------
+
+def _fetch_page(
+    requester: Any,
+    username: str,
+    kind: str,
+    page: int,
+    cached: Optional[Tuple[Optional[str], bytes]],
+    deadline: Deadline,
+) -> Tuple[Optional[str], bytes, bool]:
+    # Returns (ETag, IDs as bytes, whether the page changed)
+    if deadline.expired():
+        raise DeadlineExceeded()
+    headers = {'If-None-Match': cached[0]} if cached and cached[0] else None
+    response_headers, data = requester.requestJsonAndCheck(
+        "GET", f"/users/{username}/{kind}", {'per_page': PAGE_SIZE, 'page': page}, headers
+    )
+    if data is None and cached is not None:
+        # 304 Not Modified
+        return cached[0], cached[1], False
+
+    ids = array('q', (user['id'] for user in data or []))
+    return (response_headers or {}).get('etag'), ids.tobytes(), True
@@ -0,0 +1,189 @@
+#---------------------------------------------------------
+# Local snapshot store for historical statistics
+#---------------------------------------------------------
+
+import math
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from github_stats.paths import get_data_file
+
+HISTORY_DB = 'history.db'
+
+# Each (user, metric, field) is interned once in `series`; the per-run
+# values live in `points`, clustered on (series_id, taken_at) so a trend
+# is one primary-key range scan and a diff is two point lookups.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS series (
+    id INTEGER PRIMARY KEY,
+    username TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    field TEXT NOT NULL,
+    UNIQUE (username, metric, field)
+);
+CREATE TABLE IF NOT EXISTS points (
+    series_id INTEGER NOT NULL,
+    taken_at INTEGER NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (series_id, taken_at)
+) WITHOUT ROWID;
+"""
+
+
+class HistoryStore:
+    """Append-only store of per-run metric snapshots backed by SQLite."""
+
+    def __init__(self, path: Optional[Union[str, Path]] = None):
+        """
+        Open (and create if needed) the snapshot database.
+
+        Args:
+            path: Database file, defaults to history.db in the data directory
+        """
+        self.path = Path(path) if path else get_data_file(HISTORY_DB)
+        self.connection = sqlite3.connect(str(self.path))
+        self.connection.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> 'HistoryStore':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    #---------------------------------------------------------
+    # Writing snapshots
+    #---------------------------------------------------------
+
+    def record(
+        self,
+        username: str,
+        detailed: Dict[str, Dict[str, Any]],
+        taken_at: Optional[int] = None,
+    ) -> int:
+        """
+        Append one snapshot of numeric metric values.
+
+        Args:
+            username: GitHub username the values belong to
+            detailed: Mapping of metric name to its get_detailed() output
+            taken_at: Unix timestamp of the snapshot, defaults to now
+
+        Returns:
+            Number of values stored
+        """
+        taken_at = int(time.time()) if taken_at is None else int(taken_at)
+        rows = [
+            (self._series_id(username, metric, field), taken_at, value)
+            for metric, values in detailed.items()
+            for field, value in _numeric_fields(values)
+        ]
+
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO points (series_id, taken_at, value) VALUES (?, ?, ?)",
+                rows
+            )
+        return len(rows)
+
+    #---------------------------------------------------------
+    # Queries
+    #---------------------------------------------------------
+
+    def series(self, username: str) -> List[Tuple[str, str]]:
+        """
+        List the (metric, field) pairs recorded for a user.
+        """
+        cursor = self.connection.execute(
+            "SELECT metric, field FROM series WHERE username = ? ORDER BY metric, field",
+            (username,)
+        )
+        return cursor.fetchall()
+
+    def trend(
+        self,
+        username: str,
+        metric: str,
+        field: str,
+        since: Optional[int] = None,
+        until: Optional[int] = None,
+    ) -> List[Tuple[int, float]]:
+        """
+        Get the (taken_at, value) points of one series in time order.
+        """
+        series_id = self._find_series(username, metric, field)
+        if series_id is None:
+            return []
+
+        cursor = self.connection.execute(
+            "SELECT taken_at, value FROM points "
+            "WHERE series_id = ? AND taken_at BETWEEN ? AND ? ORDER BY taken_at",
+            (series_id, since if since is not None else 0, until if until is not None else 2 ** 62)
+        )
+        return cursor.fetchall()
+
+    def diff(
+        self,
+        username: str,
+        since: Optional[int] = None,
+        until: Optional[int] = None,
+    ) -> List[Tuple[str, str, float, float]]:
+        """
+        Compare the first and last value of every series within a range.
+
+        Returns:
+            List of (metric, field, first_value, last_value) tuples
+        """
+        low = since if since is not None else 0
+        high = until if until is not None else 2 ** 62
+        cursor = self.connection.execute(
+            "SELECT s.metric, s.field, "
+            "  (SELECT value FROM points WHERE series_id = s.id AND taken_at BETWEEN ? AND ? "
+            "   ORDER BY taken_at ASC LIMIT 1), "
+            "  (SELECT value FROM points WHERE series_id = s.id AND taken_at BETWEEN ? AND ? "
+            "   ORDER BY taken_at DESC LIMIT 1) "
+            "FROM series s WHERE s.username = ? ORDER BY s.metric, s.field",
+            (low, high, low, high, username)
+        )
+        return [row for row in cursor.fetchall() if row[2] is not None]
+
+    #---------------------------------------------------------
+    # Helper methods
+    #---------------------------------------------------------
+
+    def _find_series(self, username: str, metric: str, field: str) -> Optional[int]:
+        row = self.connection.execute(
+            "SELECT id FROM series WHERE username = ? AND metric = ? AND field = ?",
+            (username, metric, field)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _series_id(self, username: str, metric: str, field: str) -> int:
+        series_id = self._find_series(username, metric, field)
+        if series_id is None:
+            with self.connection:
+                cursor = self.connection.execute(
+                    "INSERT INTO series (username, metric, field) VALUES (?, ?, ?)",
+                    (username, metric, field)
+                )
+            series_id = cursor.lastrowid
+        return series_id
+
+
+#---------------------------------------------------------
+# Helper functions
+#---------------------------------------------------------
+
+def _numeric_fields(values: Dict[str, Any]):
+    # Only plain finite numbers are stored; lists such as
+    # top_repositories stay out of the compact snapshot
+    for field, value in values.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            continue
+        if not math.isfinite(value):
+            continue
+        yield field, float(value)
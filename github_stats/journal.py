@@ -0,0 +1,179 @@
+#---------------------------------------------------------
+# Append-only checkpoint journal for resumable batch runs
+#---------------------------------------------------------
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Union
+
+from github_stats.paths import get_data_file
+
+JOURNAL_FILE = 'batch-journal.jsonl'
+
+# Buffered entries are written out once this many have accumulated, and
+# always when a user finishes or the run is interrupted
+FLUSH_EVERY = 50
+
+
+class JournalMismatch(Exception):
+    """Raised when resuming a journal written with different batch settings."""
+
+
+class JournalState:
+    """What an earlier run of the batch already finished."""
+
+    def __init__(self):
+        self.params: Optional[Dict[str, Any]] = None
+        self.done: Set[str] = set()
+        self.results: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.repo_counts: Dict[str, Dict[str, Optional[int]]] = {}
+
+    def apply(self, entry: Dict[str, Any]) -> None:
+        kind = entry.get('kind')
+        if kind == 'batch':
+            self.params = entry['params']
+        elif kind == 'result':
+            self.results.setdefault(entry['user'], {})[entry['metric']] = entry['data']
+        elif kind == 'repo':
+            self.repo_counts.setdefault(entry['user'], {})[entry['repo']] = entry['count']
+        elif kind == 'done':
+            self.done.add(entry['user'])
+
+
+class Journal:
+    """
+    JSON-lines journal of completed work in a batch run.
+
+    Every finished (user, metric) result, every repository CommitMetric
+    counted and every finished user is one line. Lines are only ever
+    appended, so a run killed at any point leaves at most one torn last
+    line, which loading ignores.
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = None):
+        """
+        Open the journal file.
+
+        Args:
+            path: Journal file, defaults to batch-journal.jsonl in the data directory
+        """
+        self.path = Path(path) if path else get_data_file(JOURNAL_FILE)
+        self.state = JournalState()
+        self._buffer: List[str] = []
+        self._lock = threading.Lock()
+        self._file = None
+
+    def close(self) -> None:
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> 'Journal':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    #---------------------------------------------------------
+    # Starting and resuming
+    #---------------------------------------------------------
+
+    def start(self, params: Dict[str, Any]) -> JournalState:
+        """
+        Begin a fresh batch, discarding any earlier journal.
+
+        Args:
+            params: Settings the results depend on (time window, strategy, ...)
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'w', encoding='utf-8')
+        self.state = JournalState()
+        self.state.params = params
+        self._append({'kind': 'batch', 'params': params})
+        self.flush()
+        return self.state
+
+    def resume(self, params: Dict[str, Any]) -> JournalState:
+        """
+        Load the work an earlier run finished and continue its journal.
+
+        Starts a fresh batch when there is no journal yet.
+
+        Raises:
+            JournalMismatch: If the journal was written with other settings
+        """
+        if not self.path.exists():
+            return self.start(params)
+
+        state = JournalState()
+        with open(self.path, encoding='utf-8') as journal:
+            for line in journal:
+                try:
+                    state.apply(json.loads(line))
+                except (ValueError, KeyError):
+                    # Torn write from an interrupted run
+                    continue
+
+        if state.params is not None and state.params != params:
+            raise JournalMismatch(
+                f"{self.path} was written with different settings; rerun without --resume to start over"
+            )
+
+        self.state = state
+        self._file = open(self.path, 'a', encoding='utf-8')
+        if not _ends_with_newline(self.path):
+            # End the torn line so the next entry starts on its own
+            self._file.write('\n')
+        if state.params is None:
+            state.params = params
+            self._append({'kind': 'batch', 'params': params})
+        return state
+
+    #---------------------------------------------------------
+    # Recording progress
+    #---------------------------------------------------------
+
+    def record_repo(self, username: str, full_name: str, count: Optional[int]) -> None:
+        """Record one repository CommitMetric finished counting."""
+        self._append({'kind': 'repo', 'user': username, 'repo': full_name, 'count': count})
+
+    def record_result(self, username: str, metric: str, data: Dict[str, Any]) -> None:
+        """Record one finished metric of a user."""
+        self.state.results.setdefault(username, {})[metric] = data
+        self._append({'kind': 'result', 'user': username, 'metric': metric, 'data': data})
+
+    def finish_user(self, username: str) -> None:
+        """Record that every metric of a user is done, and write it out."""
+        self.state.done.add(username)
+        self._append({'kind': 'done', 'user': username})
+        self.flush()
+
+    def flush(self) -> None:
+        """Write buffered entries and push them to disk."""
+        with self._lock:
+            if self._file is None or not self._buffer:
+                return
+            self._file.write(''.join(self._buffer))
+            self._buffer = []
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def _append(self, entry: Dict[str, Any]) -> None:
+        line = json.dumps(entry, separators=(',', ':')) + '\n'
+        with self._lock:
+            self._buffer.append(line)
+            full = len(self._buffer) >= FLUSH_EVERY
+        if full:
+            self.flush()
+
+
+def _ends_with_newline(path: Path) -> bool:
+    with open(path, 'rb') as journal:
+        journal.seek(0, os.SEEK_END)
+        if journal.tell() == 0:
+            return True
+        journal.seek(-1, os.SEEK_END)
+        return journal.read(1) == b'\n'
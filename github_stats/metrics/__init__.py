@@ -6,6 +6,8 @@ from github_stats.metrics.followers import FollowerMetric
 from github_stats.metrics.stars import StarMetric
 from github_stats.metrics.pull_requests import PullRequestMetric
 from github_stats.metrics.issues import IssueMetric
+from github_stats.metrics.languages import LanguageMetric
+from github_stats.metrics.contributions import ContributionMetric
 
 __all__ = [
     "BaseMetric",
@@ -14,4 +16,6 @@ __all__ = [
     "StarMetric",
     "PullRequestMetric",
     "IssueMetric",
+    "LanguageMetric",
+    "ContributionMetric",
 ]
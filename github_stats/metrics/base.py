@@ -1,8 +1,12 @@
 """Base metric class for all GitHub statistics collectors."""
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
 from github import Github
+from github_stats.deadline import Deadline
+from github_stats.metrics.planner import FetchPlanner, Need
+from github_stats.metrics.records import RepoRecord, UserProfile
 
 
 class BaseMetric(ABC):
@@ -13,27 +17,122 @@ class BaseMetric(ABC):
     the required abstract methods.
     """
 
-    def __init__(self, github_client: Github, username: str):
+    def __init__(
+        self,
+        github_client: Github,
+        username: str,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        deadline: Optional[Deadline] = None,
+    ):
         """
         Initialize the metric.
 
         Args:
             github_client: Authenticated PyGithub client
             username: GitHub username to analyze
+            since: Only count activity at or after this time (optional)
+            until: Only count activity at or before this time (optional)
+            deadline: Time by which fetching must stop (optional)
         """
         self.github_client = github_client
         self.username = username
+        self.since = since
+        self.until = until
+        self.deadline = deadline or Deadline()
         self.data: Any = None
 
-    @abstractmethod
-    def fetch(self) -> None:
+        # Set when the deadline cut fetching short
+        self.partial = False
+        self.coverage: Optional[str] = None
+
+    #---------------------------------------------------------
+    # Data dependencies
+    #---------------------------------------------------------
+
+    def requires(self) -> List[Need]:
         """
-        Fetch data from GitHub API.
+        Declare the data sets this metric needs.
+
+        The fetch planner resolves the needs of all metrics into one
+        deduplicated set of API calls.
+
+        Returns:
+            List of needs (profile, repository listing, searches)
+        """
+        return []
 
-        This method should retrieve all necessary data from the GitHub API
-        and store it in self.data for processing.
+    def load(self, inputs: Dict[Need, Any]) -> None:
         """
-        pass
+        Receive the fetched data sets this metric declared.
+
+        Optional: metrics that only read the REPOS stream keep this default,
+        which ignores the inputs.
+
+        Args:
+            inputs: Mapping of each declared need (except REPOS) to its data
+        """
+        return None
+
+    def restore(self, data: Any) -> None:
+        """
+        Take over self.data saved by an earlier run instead of fetching.
+
+        Args:
+            data: A previous run's self.data (after a JSON round trip)
+        """
+        self.data = data
+
+    def repo_listing(self) -> Dict[str, Any]:
+        """
+        Get listing parameters this metric prefers for the REPOS stream.
+
+        Returns:
+            get_repos() parameters, e.g. {'sort': 'pushed'}
+        """
+        return {}
+
+    def begin_repos(self, expected: int = 0) -> None:
+        """
+        Prepare for the REPOS stream; the default keeps no state.
+
+        Args:
+            expected: Number of repositories the listing is expected to yield
+        """
+        return None
+
+    def consume_repo(self, record: RepoRecord) -> bool:
+        """
+        Receive one repository from the REPOS stream.
+
+        Args:
+            record: Compact repository record
+
+        Returns:
+            False once no further repositories are needed
+        """
+        return True
+
+    def end_repos(self, complete: bool = True) -> None:
+        """
+        Finish after the REPOS stream has ended; the default has nothing to do.
+
+        Args:
+            complete: False when the deadline stopped the listing early
+        """
+        return None
+
+    def estimate_calls(self, profile: UserProfile) -> int:
+        """
+        Estimate API calls this metric makes beyond its declared needs.
+
+        Args:
+            profile: The user's profile, for their repository count
+
+        Returns:
+            Estimated number of extra requests (e.g. per-repository calls)
+        """
+        return 0
 
     @abstractmethod
     def process(self) -> None:
@@ -69,6 +168,27 @@ class BaseMetric(ABC):
     # Main execution
     #---------------------------------------------------------
 
+    def fetch(self) -> None:
+        """
+        Fetch data from GitHub API.
+
+        Runs the fetch planner for this metric alone; collect_metrics()
+        plans all metrics together instead so shared data is fetched once.
+        """
+        failures = FetchPlanner(self.github_client, self.username, deadline=self.deadline).run([self])
+        if self in failures:
+            raise failures[self]
+
+    def mark_partial(self, coverage: str) -> None:
+        """
+        Mark the result as partial because the deadline cut fetching short.
+
+        Args:
+            coverage: How much was covered, e.g. "counted 412/900 repos"
+        """
+        self.partial = True
+        self.coverage = coverage
+
     def collect(self) -> None:
         """
         Collect and process the metric data.
@@ -78,3 +198,26 @@ class BaseMetric(ABC):
         """
         self.fetch()
         self.process()
+
+    #---------------------------------------------------------
+    # Time window helpers
+    #---------------------------------------------------------
+
+    def _created_qualifier(self) -> str:
+        """
+        Build a search qualifier restricting results to the time window.
+
+        Returns:
+            Qualifier such as " created:2024-01-01..2024-03-31", or an
+            empty string when no window is set
+        """
+        since = self.since.date().isoformat() if self.since else None
+        until = self.until.date().isoformat() if self.until else None
+
+        if since and until:
+            return f" created:{since}..{until}"
+        if since:
+            return f" created:>={since}"
+        if until:
+            return f" created:<={until}"
+        return ""
@@ -0,0 +1,206 @@
+"""Contribution calendars as compact day arrays, fetched a year per GraphQL query."""
+
+import json
+from array import array
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from github import GithubException
+from github_stats.deadline import Deadline, DeadlineExceeded
+
+DAYS_PER_WEEK = 7
+
+
+class ContributionCalendar:
+    """
+    Contributions per day as one array of counts from a start date.
+
+    4 bytes per day, so ten years of history take under 15 KB; streaks and
+    weekday histograms are single passes over the array.
+    """
+
+    __slots__ = ('start', 'counts')
+
+    def __init__(self, start: date, counts: Iterable[int] = ()):
+        self.start = start
+        self.counts = array('I', counts)
+
+    def __repr__(self) -> str:
+        return f"ContributionCalendar({self.start.isoformat()}, days={len(self.counts)})"
+
+    @classmethod
+    def from_days(cls, first: date, last: date, days: Dict[date, int]) -> 'ContributionCalendar':
+        """
+        Lay out per-day counts from first to last; missing days count zero.
+        """
+        length = max(0, (last - first).days + 1)
+        counts = array('I', [0]) * length
+        for day, count in days.items():
+            index = (day - first).days
+            if 0 <= index < length:
+                counts[index] = count
+        calendar = cls(first)
+        calendar.counts = counts
+        return calendar
+
+    @property
+    def end(self) -> date:
+        """The last day of the calendar."""
+        return self.start + timedelta(days=len(self.counts) - 1)
+
+
+#---------------------------------------------------------
+# Day array statistics
+#---------------------------------------------------------
+
+def longest_streak(counts: array) -> Tuple[int, int]:
+    """
+    Find the longest run of days with contributions.
+
+    Returns:
+        (length in days, index of its first day); (0, 0) without contributions
+    """
+    best, best_start, run = 0, 0, 0
+    for index, count in enumerate(counts):
+        if count:
+            run += 1
+            if run > best:
+                best, best_start = run, index - run + 1
+        else:
+            run = 0
+    return best, best_start
+
+
+def current_streak(counts: array) -> int:
+    """
+    Count the days with contributions up to the last day.
+
+    A last day without contributions (usually today, which is not over
+    yet) does not end the streak; it is counted from the day before.
+    """
+    index = len(counts) - 1
+    if index >= 0 and not counts[index]:
+        index -= 1
+    streak = 0
+    while index >= 0 and counts[index]:
+        streak += 1
+        index -= 1
+    return streak
+
+
+def weekday_histogram(start: date, counts: array) -> List[int]:
+    """
+    Sum contributions by day of the week, Monday first.
+    """
+    totals = [0] * DAYS_PER_WEEK
+    offset = start.weekday()
+    for index, count in enumerate(counts):
+        totals[(offset + index) % DAYS_PER_WEEK] += count
+    return totals
+
+
+#---------------------------------------------------------
+# Fetching
+#---------------------------------------------------------
+
+def year_windows(first: date, last: date) -> List[Tuple[date, date]]:
+    """
+    Split an inclusive day range into windows one query can cover.
+
+    contributionsCollection refuses ranges longer than a year, so each
+    window ends the day before the same date a year later.
+    """
+    windows = []
+    while first <= last:
+        end = min(last, _next_year(first) - timedelta(days=1))
+        windows.append((first, end))
+        first = end + timedelta(days=1)
+    return windows
+
+
+def fetch_calendar(
+    requester: Any,
+    username: str,
+    first: date,
+    last: date,
+    submit: Optional[Callable[..., Any]] = None,
+    deadline: Optional[Deadline] = None,
+) -> ContributionCalendar:
+    """
+    Fetch a user's contributions per day between two dates (inclusive).
+
+    Ranges longer than a year take one GraphQL query per year, issued
+    concurrently when a submit function such as
+    ConcurrencyController.submit is given.
+
+    Args:
+        requester: PyGithub Requester (see auth.get_requester)
+        username: User whose calendar to fetch
+        first: First day of the range
+        last: Last day of the range
+        submit: Runs a query in the background and returns its future
+        deadline: Time by which fetching must stop (optional)
+
+    Raises:
+        DeadlineExceeded: If the deadline passed before every year was fetched
+        GithubException: If a query failed, e.g. for an unknown user
+    """
+    deadline = deadline or Deadline()
+
+    def fetch(window: Tuple[date, date]) -> Dict[date, int]:
+        if deadline.expired():
+            raise DeadlineExceeded()
+        return _fetch_window(requester, username, *window)
+
+    windows = year_windows(first, last)
+    if submit is None or len(windows) == 1:
+        results = [fetch(window) for window in windows]
+    else:
+        futures = [submit(fetch, window) for window in windows]
+        results = [future.result() for future in futures]
+
+    days: Dict[date, int] = {}
+    for result in results:
+        days.update(result)
+    return ContributionCalendar.from_days(first, last, days)
+
+
+def build_calendar_query(username: str, first: date, last: date) -> str:
+    """
+    Build the GraphQL document asking for one window's contribution days.
+    """
+    return (
+        f"query {{ user(login: {json.dumps(username)}) {{ "
+        f"contributionsCollection(from: \"{first.isoformat()}T00:00:00Z\", to: \"{last.isoformat()}T23:59:59Z\") {{ "
+        f"contributionCalendar {{ weeks {{ contributionDays {{ date contributionCount }} }} }} }} }} }}"
+    )
+
+
+#---------------------------------------------------------
+# Helper functions
+#---------------------------------------------------------
+
+def _next_year(day: date) -> date:
+    try:
+        return day.replace(year=day.year + 1)
+    except ValueError:
+        # February 29th
+        return day.replace(year=day.year + 1, day=28)
+
+
+def _fetch_window(requester: Any, username: str, first: date, last: date) -> Dict[date, int]:
+    _, response = requester.requestJsonAndCheck(
+        "POST", "/graphql", input={'query': build_calendar_query(username, first, last)}
+    )
+    user = ((response or {}).get('data') or {}).get('user')
+    if user is None:
+        raise GithubException(404, response, None)
+
+    # Weeks are padded to whole weeks; days outside the window are dropped
+    days: Dict[date, int] = {}
+    calendar = user['contributionsCollection']['contributionCalendar']
+    for week in calendar.get('weeks') or []:
+        for entry in week.get('contributionDays') or []:
+            day = date.fromisoformat(entry['date'])
+            if first <= day <= last:
+                days[day] = entry.get('contributionCount') or 0
+    return days
@@ -1,71 +1,263 @@
 """Commit statistics metric."""
 
-from typing import Dict, Any, List
-from github import GithubException
+import threading
+from concurrent.futures import Future, wait
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, Any, List, Optional, Set
+from github import GithubException, RateLimitExceededException
+from github_stats.auth import get_requester
+from github_stats.concurrency import ConcurrencyController
+from github_stats.deadline import DeadlineExceeded
 from github_stats.metrics.base import BaseMetric
+from github_stats.metrics.estimate import estimate_commits
+from github_stats.metrics.filters import DORMANT, RepoFilter
+from github_stats.metrics.local_git import LocalRepos, author_patterns, count_commits
+from github_stats.metrics.planner import Need, COMMIT_SEARCH, PROFILE, REPOS
+from github_stats.metrics.records import RepoRecord, UserProfile
+from github_stats.metrics.streaming import RepoTally
+
+# Counting strategies
+STRATEGY_STATS = 'stats'
+STRATEGY_LIST = 'list'
+STRATEGIES = (STRATEGY_STATS, STRATEGY_LIST)
+
+# GitHub only reports the top 100 contributors in /stats/contributors and
+# the top 500 in /contributors; beyond that a missing user may still have commits
+STATS_CONTRIBUTOR_LIMIT = 100
+CONTRIBUTORS_LIMIT = 500
+
+# Maximum commits counted per repo when listing
+LIST_LIMIT = 1000
+
+# Typical requests per repo for each strategy: one /stats/contributors
+# call, or one or two pages of commits for most repos
+STRATEGY_CALLS_PER_REPO = {STRATEGY_STATS: 1, STRATEGY_LIST: 2}
 
 
 class CommitMetric(BaseMetric):
     """Analyze commit activity across all user repositories."""
 
-    def __init__(self, github_client, username: str):
-        """Initialize commit metric."""
-        super().__init__(github_client, username)
+    # Seconds to wait between polling rounds for repos whose contributor
+    # statistics are still being computed (HTTP 202)
+    STATS_POLL_DELAYS = (1, 2, 4)
+
+    def __init__(
+        self,
+        github_client,
+        username: str,
+        strategy: str = STRATEGY_STATS,
+        concurrency: Optional[ConcurrencyController] = None,
+        resume_counts: Optional[Dict[str, Optional[int]]] = None,
+        on_count: Optional[Callable[[RepoRecord, Optional[int]], None]] = None,
+        local_repos: Optional[LocalRepos] = None,
+        upstream: bool = False,
+        repo_filter: Optional[RepoFilter] = None,
+        estimate: bool = False,
+        **kwargs
+    ):
+        """
+        Initialize commit metric.
+
+        Args:
+            strategy: 'stats' to use precomputed contributor statistics with
+                listing as a fallback, or 'list' to always list commits
+            concurrency: Controller to count repositories in parallel with,
+                or None to count them one at a time
+            resume_counts: Counts from an interrupted run, by repository
+                full name; these repositories are not counted again
+            on_count: Called with each repository and its count as soon as
+                it is counted (e.g. to checkpoint progress)
+            local_repos: Local clones to count from with git; repositories
+                without one are counted through the API
+            upstream: Also count commits to repositories the user does not
+                own, from commit search
+            repo_filter: Repositories to skip before any per-repository call
+            estimate: Bound counts that would be listed with a few page
+                probes instead, and report the interval
+        """
+        super().__init__(github_client, username, **kwargs)
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown commit counting strategy: {strategy}")
+        self.strategy = strategy
+        self.concurrency = concurrency
+        self.resume_counts = resume_counts or {}
+        self.on_count = on_count
+        self.local_repos = local_repos
+        self.upstream = upstream
+        self.repo_filter = repo_filter or RepoFilter()
+        self.skipped: Dict[str, int] = {}
+        self.estimate = estimate
+        self.slack: Optional[int] = 0
+        self.upstream_counts: Dict[str, int] = {}
+        self.upstream_unattributed = 0
+        self.authors = author_patterns(username)
+        self.in_flight: Set[Future] = set()
+        self.error: Optional[BaseException] = None
+        self.lock = threading.Lock()
         self.total_commits = 0
         self.top_repo = None
-        self.repo_commits = {}
+        self.tally = RepoTally()
+        self.pending: List[RepoRecord] = []
+        self.expected_repos = 0
+        self.seen_repos = 0
+        self.counted_repos = 0
+        self.cut_short = False
 
     #---------------------------------------------------------
     # Main execution
     #---------------------------------------------------------
 
-    def fetch(self) -> None:
-        """Fetch commit data from all user repositories."""
-        user = self.github_client.get_user(self.username)
-        repos = user.get_repos()
-
-        self.repo_commits = {}
-
-        for repo in repos:
-            try:
-                # Only count commits authored by this user
-                commits = repo.get_commits(author=self.username)
-
-                # Count commits (limited to avoid rate limit issues)
-                count = 0
-                try:
-                    # PyGithub's totalCount can be unreliable, so we iterate
-                    for _ in commits:
-                        count += 1
-                        # Limit to avoid excessive API calls per repo
-                        if count >= 1000:
-                            break
-                except GithubException:
-                    # If we can't access commits, skip this repo
-                    continue
-
-                if count > 0:
-                    self.repo_commits[repo.name] = count
-
-            except GithubException:
-                # Skip repos we can't access (private, deleted, etc.)
-                continue
+    def requires(self) -> List[Need]:
+        """
+        Commits are counted per repository from the repository listing;
+        local counting also matches the profile email, and commits to
+        other people's repositories come from commit search.
+        """
+        needs = [Need(REPOS)]
+        if self.local_repos is not None:
+            needs.insert(0, Need(PROFILE))
+        if self.upstream:
+            needs.append(Need(COMMIT_SEARCH, (self.username, self.since, self.until)))
+        return needs
+
+    def load(self, inputs: Dict[Need, Any]) -> None:
+        """
+        Match local commits by the profile email as well as the login, and
+        keep the commit search counts for merging.
+        """
+        profile = inputs.get(Need(PROFILE))
+        if profile is not None:
+            self.authors = author_patterns(self.username, profile.email)
+        if self.upstream:
+            breakdown = inputs[Need(COMMIT_SEARCH, (self.username, self.since, self.until))]
+            self.upstream_counts = breakdown.counts
+            self.upstream_unattributed = breakdown.unattributed
+
+    def repo_listing(self) -> Dict[str, Any]:
+        """
+        With a window start, list most recently pushed repos first so
+        dormant ones can be skipped without paging through them; the
+        repository filter adds what the listing can apply itself.
+        """
+        listing = {'sort': 'pushed', 'direction': 'desc'} if self.since else {}
+        listing.update(self.repo_filter.listing())
+        return listing
+
+    def estimate_calls(self, profile: UserProfile) -> int:
+        """
+        Commits are counted with per-repository calls (an upper bound when
+        some repositories have local clones).
+        """
+        return profile.public_repos * STRATEGY_CALLS_PER_REPO[self.strategy]
+
+    def begin_repos(self, expected: int = 0) -> None:
+        """Start a fresh tally."""
+        self.tally = RepoTally()
+        self.pending = []
+        self.expected_repos = expected
+        self.seen_repos = 0
+        self.counted_repos = 0
+        self.cut_short = False
+        self.skipped = {}
+        self.slack = 0
+        self.in_flight = set()
+        self.error = None
+
+    def consume_repo(self, record: RepoRecord) -> bool:
+        """Count the user's commits in one repository."""
+        # Repos are sorted by push date, so everything after the first
+        # repo pushed before the window can't have commits in it
+        if self.since and record.pushed_at and record.pushed_at < self.since:
+            self.expected_repos = self.seen_repos
+            return False
+
+        reason = self.repo_filter.reason(record, self.username)
+        if reason == DORMANT:
+            # The same holds for the minimum push date; the rest of the
+            # listing is not fetched
+            self._skip(DORMANT, max(1, self.expected_repos - self.seen_repos))
+            self.expected_repos = self.seen_repos
+            return False
+        if reason is not None:
+            self._skip(reason)
+            self.expected_repos = max(self.seen_repos, self.expected_repos - 1)
+            return True
 
-        self.data = self.repo_commits
+        self.seen_repos += 1
+        if record.full_name in self.resume_counts:
+            self._add_count(record, self.resume_counts[record.full_name])
+            return True
+
+        path = self.local_repos.find(record) if self.local_repos is not None else None
+        if path is not None:
+            self._track(self.local_repos.submit(self._count_local, record, path))
+            return True
+
+        if self.concurrency is not None:
+            return self._submit(record)
+
+        try:
+            self.deadline.call(self._count_repo, record)
+        except DeadlineExceeded:
+            # Keep what was counted so far
+            self.cut_short = True
+            return False
+        except Exception as e:
+            # Fail this metric only, not the others sharing the listing
+            self.error = e
+            return False
+        return True
+
+    def end_repos(self, complete: bool = True) -> None:
+        """Resolve repos still computing statistics and store the aggregates."""
+        if self.in_flight:
+            _, not_done = wait(list(self.in_flight), timeout=self.deadline.remaining())
+            if not_done:
+                # Counts that have not started yet never will
+                for future in not_done:
+                    future.cancel()
+                self.cut_short = True
+        if self.error is not None:
+            raise self.error
+
+        try:
+            self._resolve_pending(self.pending)
+        except DeadlineExceeded:
+            pass
+        self.pending = []
+
+        if self.deadline.expired():
+            # A listing cut short leaves repos unseen as well as uncounted
+            total = max(self.expected_repos, self.seen_repos) if not complete or self.cut_short else self.seen_repos
+            if self.counted_repos < total:
+                self.mark_partial(f"counted {self.counted_repos:,}/{total:,} repos")
+
+        upstream_commits = self._add_upstream()
+        self.data = {
+            'total_commits': self.tally.total,
+            'repositories': self.tally.count,
+            'top_repositories': self.tally.top(),
+        }
+        if self.upstream:
+            self.data['upstream_commits'] = upstream_commits
+            if self.upstream_unattributed:
+                self.data['upstream_unattributed'] = self.upstream_unattributed
+        if self.repo_filter:
+            self.data['skipped_repos'] = dict(self.skipped)
+        if self.estimate:
+            self.data['commits_high'] = self.tally.total + self.slack if self.slack is not None else None
 
     def process(self) -> None:
         """Process commit data to calculate statistics."""
-        if not self.data:
+        if not self.data or not self.data['repositories']:
             self.total_commits = 0
             self.top_repo = None
             return
 
-        # Calculate total commits
-        self.total_commits = sum(self.data.values())
-
-        # Find top repository by commits
-        if self.data:
-            self.top_repo = max(self.data.items(), key=lambda x: x[1])
+        # Totals and the top repos were aggregated while streaming
+        self.total_commits = self.data['total_commits']
+        self.top_repo = self.data['top_repositories'][0]
 
     def get_summary(self) -> str:
         """
@@ -75,13 +267,13 @@ class CommitMetric(BaseMetric):
             Summary string in format "X commits, Most: repo_name"
         """
         if self.total_commits == 0:
-            return "0, No commits found"
+            return f"0, No commits found{self._interval()}"
 
         if self.top_repo:
             repo_name, count = self.top_repo
-            return f"{self.total_commits:,}, Most: {repo_name} ({count:,})"
+            return f"{self.total_commits:,}, Most: {repo_name} ({count:,}){self._interval()}"
         else:
-            return f"{self.total_commits:,}, "
+            return f"{self.total_commits:,}, {self._interval()}"
 
     def get_detailed(self) -> Dict[str, Any]:
         """
@@ -90,16 +282,304 @@ class CommitMetric(BaseMetric):
         Returns:
             Dictionary with detailed commit information
         """
-        # Sort repos by commit count
-        sorted_repos = sorted(
-            self.data.items(),
-            key=lambda x: x[1],
-            reverse=True
-        )
+        repositories = self.data['repositories'] if self.data else 0
 
-        return {
+        detailed = {
             'total_commits': self.total_commits,
-            'repositories': len(self.data),
-            'top_repositories': sorted_repos[:10],  # Top 10 repos
-            'average_per_repo': self.total_commits // len(self.data) if self.data else 0
+            'repositories': repositories,
+            'top_repositories': self.data['top_repositories'] if self.data else [],  # Top 10 repos
+            'average_per_repo': self.total_commits // repositories if repositories else 0
         }
+        if self.data and 'upstream_commits' in self.data:
+            detailed['upstream_commits'] = self.data['upstream_commits']
+            detailed['upstream_unattributed'] = self.data.get('upstream_unattributed', 0)
+        if self.data and 'commits_high' in self.data:
+            detailed['commits_high'] = self.data['commits_high']
+        if self.data and 'skipped_repos' in self.data:
+            skipped = sum(self.data['skipped_repos'].values())
+            detailed['skipped_repos'] = skipped
+            detailed['calls_saved'] = skipped * STRATEGY_CALLS_PER_REPO[self.strategy]
+        return detailed
+
+    #---------------------------------------------------------
+    # Counting strategies
+    #---------------------------------------------------------
+
+    def _submit(self, record: RepoRecord) -> bool:
+        """Count one repository in the background, once a slot is free."""
+        if self.error is not None:
+            return False
+        try:
+            future = self.concurrency.submit(self._count_repo, record, timeout=self.deadline.remaining())
+        except TimeoutError:
+            self.cut_short = True
+            return False
+
+        self._track(future)
+        return True
+
+    def _track(self, future: Future) -> None:
+        self.in_flight.add(future)
+        future.add_done_callback(self._finish)
+
+    def _finish(self, future: Future) -> None:
+        self.in_flight.discard(future)
+        if future.cancelled() or future.exception() is None:
+            return
+        if isinstance(future.exception(), DeadlineExceeded):
+            # The request policy refused to start a request after the deadline
+            self.cut_short = True
+        elif self.error is None:
+            self.error = future.exception()
+
+    def _count_local(self, record: RepoRecord, path: Path) -> None:
+        """Count one repository from its local clone, or the API if git fails."""
+        count = count_commits(path, self.authors, self.since, self.until)
+        if count is None:
+            self._count_repo(record)
+        else:
+            self._record(record, count)
+
+    def _count_repo(self, record: RepoRecord) -> None:
+        """Count one repository with the configured strategy."""
+        repo = self._repo_handle(record)
+        if self.strategy == STRATEGY_STATS:
+            stats = self._get_contributor_stats(repo)
+            if stats is None:
+                # Statistics are being computed; revisit after the scan
+                self.pending.append(record)
+                return
+            count = self._count_from_stats(repo, stats)
+        else:
+            count = self._count_by_listing(repo)
+
+        self._record(record, count)
+
+    def _resolve_pending(self, pending: List[RepoRecord]) -> None:
+        """
+        Poll repos whose statistics were still being computed.
+
+        The first request already started the computation on GitHub's side,
+        so the rest of the scan overlapped with it; only what is still
+        pending after that gets a short wait between rounds.
+
+        Raises:
+            DeadlineExceeded: If the deadline passed before all were counted
+        """
+        for delay in self.STATS_POLL_DELAYS:
+            if not pending:
+                return
+            self.deadline.sleep(delay)
+
+            still_pending = []
+            for record in pending:
+                repo = self._repo_handle(record)
+                stats = self.deadline.call(self._get_contributor_stats, repo)
+                if stats is None:
+                    still_pending.append(record)
+                else:
+                    self._record(record, self._count_from_stats(repo, stats))
+            pending = still_pending
+
+        # Give up on statistics for the rest
+        for record in pending:
+            self.deadline.call(self._count_without_stats, record)
+
+    def _count_without_stats(self, record: RepoRecord) -> None:
+        repo = self._repo_handle(record)
+        count = None
+        if not self.since and not self.until:
+            count = self._count_from_contributors(repo)
+        if count is None:
+            count = self._count_by_listing(repo)
+        self._record(record, count)
+
+    def _get_contributor_stats(self, repo) -> Optional[List[Any]]:
+        """
+        Get contributor statistics, or None while GitHub computes them.
+
+        Errors return an empty list so the repo falls back to listing.
+        """
+        try:
+            return repo.get_stats_contributors()
+        except RateLimitExceededException:
+            # Out of quota: fail the metric rather than count zeros
+            raise
+        except GithubException:
+            return []
+
+    def _count_from_stats(self, repo, stats: List[Any]) -> Optional[int]:
+        """Count the user's commits from /stats/contributors."""
+        for contributor in stats:
+            author = contributor.author
+            if author is not None and (author.login or '').lower() == self.username.lower():
+                if self.since or self.until:
+                    return self._count_weeks(repo, contributor.weeks)
+                return contributor.total
+
+        # Only the top contributors are listed, so absence is conclusive
+        # for small repos only
+        if stats and len(stats) < STATS_CONTRIBUTOR_LIMIT:
+            return 0
+        return self._count_by_listing(repo)
+
+    def _count_weeks(self, repo, weeks: List[Any]) -> Optional[int]:
+        """
+        Sum weekly commit buckets inside the time window.
+
+        Weeks fully inside the window are taken as is; the partial weeks at
+        the edges are listed with a narrowed since/until.
+        """
+        total = 0
+        for week in weeks:
+            if not week.c:
+                continue
+
+            start = week.w
+            end = start + timedelta(weeks=1)
+            low = max(start, self.since) if self.since else start
+            high = min(end, self.until) if self.until else end
+            if low >= high:
+                continue
+
+            if low == start and high == end:
+                total += week.c
+            elif self.estimate:
+                # Somewhere between none and all of the week's commits
+                self._add_slack(week.c)
+            else:
+                count = self._count_by_listing(repo, since=low, until=high - timedelta(seconds=1))
+                total += count or 0
+        return total
+
+    def _count_from_contributors(self, repo) -> Optional[int]:
+        """Count the user's commits from /contributors (all-time only)."""
+        seen = 0
+        try:
+            for contributor in repo.get_contributors():
+                seen += 1
+                if (contributor.login or '').lower() == self.username.lower():
+                    return contributor.contributions
+        except RateLimitExceededException:
+            raise
+        except GithubException:
+            return None
+
+        if seen < CONTRIBUTORS_LIMIT:
+            return 0
+        return None
+
+    def _count_by_listing(
+        self,
+        repo,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> Optional[int]:
+        """Count the user's commits by listing them."""
+        # Push the window down to the commit listing
+        window = {}
+        if since or self.since:
+            window['since'] = since or self.since
+        if until or self.until:
+            window['until'] = until or self.until
+
+        if self.estimate:
+            return self._estimate_by_listing(repo, window)
+
+        try:
+            # Only count commits authored by this user
+            commits = repo.get_commits(author=self.username, **window)
+
+            # Count commits (limited to avoid rate limit issues)
+            count = 0
+            # PyGithub's totalCount can be unreliable, so we iterate
+            for _ in commits:
+                count += 1
+                # Limit to avoid excessive API calls per repo
+                if count >= LIST_LIMIT:
+                    break
+            return count
+        except RateLimitExceededException:
+            raise
+        except GithubException:
+            # Skip repos we can't access (private, deleted, empty, etc.)
+            return None
+
+    def _estimate_by_listing(self, repo, window: Dict[str, datetime]) -> Optional[int]:
+        """
+        Bound the user's commits with a few page probes; the lower bound is
+        counted and the rest of the interval is kept as slack.
+        """
+        params = {'author': self.username}
+        params.update((key, value.strftime('%Y-%m-%dT%H:%M:%SZ')) for key, value in window.items())
+        try:
+            estimate = estimate_commits(get_requester(self.github_client), repo.url, params)
+        except RateLimitExceededException:
+            raise
+        except GithubException:
+            return None
+        self._add_slack(estimate.high - estimate.low if estimate.high is not None else None)
+        return estimate.low
+
+    def _add_slack(self, slack: Optional[int]) -> None:
+        # None marks an interval without an upper bound
+        with self.lock:
+            if self.slack is not None:
+                self.slack = self.slack + slack if slack is not None else None
+
+    def _interval(self) -> str:
+        if not self.data or 'commits_high' not in self.data:
+            return ""
+        high = self.data['commits_high']
+        if high is None:
+            return " (estimated, lower bound)"
+        if high > self.total_commits:
+            return f" (estimated, up to {high:,})"
+        return ""
+
+    def _repo_handle(self, record: RepoRecord):
+        """
+        Get a repository object for per-repo API calls.
+
+        The object is lazy: it only knows its URL, so creating it costs no
+        request and nothing on it is ever completed.
+        """
+        return self.github_client.get_repo(record.full_name, lazy=True)
+
+    def _add_upstream(self) -> int:
+        """
+        Add commit search counts to the tally, under owner/name.
+
+        The search already leaves out the user's repositories; any that
+        slip through are skipped so nothing is counted twice. Commits in
+        repositories beyond the breakdown add to the total only.
+        """
+        total = self.upstream_unattributed
+        self.tally.total += total
+        for full_name, count in self.upstream_counts.items():
+            owner = full_name.split('/', 1)[0]
+            if owner.lower() == self.username.lower():
+                continue
+            self.tally.add(full_name, count)
+            total += count
+        return total
+
+    def _skip(self, reason: str, repos: int = 1) -> None:
+        self.skipped[reason] = self.skipped.get(reason, 0) + repos
+
+    def _record(self, record: RepoRecord, count: Optional[int]) -> None:
+        # Repos that could not be counted are not reported, so a resumed
+        # run tries them again
+        if self._add_count(record, count) and count is not None and self.on_count is not None:
+            self.on_count(record, count)
+
+    def _add_count(self, record: RepoRecord, count: Optional[int]) -> bool:
+        # Requests abandoned at the deadline may still finish in the
+        # background; their results arrive too late to be reported
+        with self.lock:
+            if self.deadline.expired():
+                return False
+            self.counted_repos += 1
+            if count:
+                self.tally.add(record.name, count)
+            return True
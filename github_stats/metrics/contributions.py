@@ -0,0 +1,105 @@
+"""Contribution calendar and streak metric."""
+
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Any, List, Tuple
+from github_stats.metrics.base import BaseMetric
+from github_stats.metrics.calendar import (
+    ContributionCalendar, current_streak, longest_streak, weekday_histogram,
+)
+from github_stats.metrics.planner import CALENDAR, Need
+
+# Days shown without --since, like the calendar on a GitHub profile
+DEFAULT_DAYS = 365
+
+WEEKDAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+
+class ContributionMetric(BaseMetric):
+    """Analyze the user's contribution calendar: totals, streaks and weekdays."""
+
+    def __init__(self, github_client, username: str, **kwargs):
+        """Initialize contribution metric."""
+        super().__init__(github_client, username, **kwargs)
+        self.calendar = None
+        self.total = 0
+        self.active_days = 0
+        self.current_streak = 0
+        self.longest_streak = 0
+        self.longest_start = None
+        self.weekdays = [0] * len(WEEKDAYS)
+
+    #---------------------------------------------------------
+    # Main execution
+    #---------------------------------------------------------
+
+    def requires(self) -> List[Need]:
+        """The calendar is one GraphQL query per year of the window."""
+        return [Need(CALENDAR, self.days())]
+
+    def load(self, inputs: Dict[Need, Any]) -> None:
+        """Keep the calendar as its start date and day counts."""
+        self.calendar = inputs[Need(CALENDAR, self.days())]
+        self.data = {
+            'start': self.calendar.start.isoformat(),
+            'counts': list(self.calendar.counts),
+        }
+
+    def restore(self, data: Dict[str, Any]) -> None:
+        """Rebuild the calendar of an earlier run."""
+        self.data = data
+        self.calendar = ContributionCalendar(date.fromisoformat(data['start']), data['counts'])
+
+    def days(self) -> Tuple[date, date]:
+        """
+        Get the first and last day of the window (inclusive).
+        """
+        last = (self.until or datetime.now(timezone.utc)).date()
+        first = self.since.date() if self.since else last - timedelta(days=DEFAULT_DAYS - 1)
+        return first, last
+
+    def process(self) -> None:
+        """Process the calendar into totals, streaks and a weekday histogram."""
+        if self.calendar is None:
+            return
+
+        counts = self.calendar.counts
+        self.total = sum(counts)
+        self.active_days = sum(1 for count in counts if count)
+        self.current_streak = current_streak(counts)
+        self.longest_streak, start = longest_streak(counts)
+        self.longest_start = self.calendar.start + timedelta(days=start) if self.longest_streak else None
+        self.weekdays = weekday_histogram(self.calendar.start, counts)
+
+    def get_summary(self) -> str:
+        """
+        Get brief summary of contribution statistics.
+
+        Returns:
+            Summary string in format "X, Streak: N days (longest M), ..."
+        """
+        if not self.total:
+            return f"{self.total:,}, No contributions"
+
+        busiest = WEEKDAYS[self.weekdays.index(max(self.weekdays))]
+        return (
+            f"{self.total:,}, Streak: {self.current_streak:,} days "
+            f"(longest {self.longest_streak:,}), busiest on {busiest}s"
+        )
+
+    def get_detailed(self) -> Dict[str, Any]:
+        """
+        Get detailed breakdown of contribution statistics.
+
+        Returns:
+            Dictionary with detailed contribution information; 'calendar'
+            holds the day counts the heatmap is drawn from
+        """
+        return {
+            'total_contributions': self.total,
+            'active_days': self.active_days,
+            'current_streak': self.current_streak,
+            'longest_streak': self.longest_streak,
+            'longest_streak_start': self.longest_start.isoformat() if self.longest_start else None,
+            'weekdays': dict(zip(WEEKDAYS, self.weekdays)),
+            'calendar': self.data or {},
+        }
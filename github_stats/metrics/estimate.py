@@ -0,0 +1,109 @@
+"""Commit count estimates with intervals, from a few probes of the commit listing."""
+
+import re
+from typing import Any, Dict, NamedTuple, Optional
+
+# Commits per probed page (the API maximum)
+PAGE_SIZE = 100
+
+# Probes per repository, and the relative interval width that is tight enough
+ESTIMATE_BUDGET = 6
+ESTIMATE_TOLERANCE = 0.05
+
+LAST_PAGE = re.compile(r'[?&]page=(\d+)[^>]*>;\s*rel="last"')
+
+
+class CountEstimate(NamedTuple):
+    """A count known to lie between low and high (None when unbounded)."""
+    low: int
+    high: Optional[int]
+    requests: int
+
+    @property
+    def exact(self) -> bool:
+        return self.high == self.low
+
+    def tight(self, tolerance: float = ESTIMATE_TOLERANCE) -> bool:
+        """
+        Whether the interval is narrow enough relative to its midpoint.
+        """
+        if self.high is None:
+            return False
+        return self.high - self.low <= tolerance * (self.high + self.low) / 2
+
+
+def estimate_commits(
+    requester: Any,
+    url: str,
+    params: Dict[str, Any],
+    budget: int = ESTIMATE_BUDGET,
+    tolerance: float = ESTIMATE_TOLERANCE,
+) -> CountEstimate:
+    """
+    Bound the number of commits a listing returns without paging through it.
+
+    Every probe fetches one page of 100. A short page ends the listing, so
+    the count is exact; a full page raises the lower bound and an empty
+    one lowers the upper bound. The Link header's last page brackets the
+    count within a page, and fetching that page makes it exact. Without
+    one, the probed page doubles until the end is passed and then bisects.
+    Probing stops once the interval is tight enough or the budget is spent.
+
+    Args:
+        requester: PyGithub Requester (see auth.get_requester)
+        url: Repository API URL (e.g. Repository.url)
+        params: Listing filters (author, since, until)
+        budget: Maximum requests
+        tolerance: Interval width, relative to its midpoint, to stop at
+
+    Returns:
+        The interval and the requests it took
+    """
+    low, high = 0, None
+    full, empty = 0, None  # Highest page known full, lowest known empty
+    last = None
+    page = 1
+    requests = 0
+
+    while requests < budget:
+        headers, data = requester.requestJsonAndCheck(
+            "GET", f"{url}/commits", dict(params, per_page=PAGE_SIZE, page=page)
+        )
+        requests += 1
+        items = len(data or [])
+        if 0 < items < PAGE_SIZE or (items == 0 and page == full + 1):
+            count = (page - 1) * PAGE_SIZE + items
+            return CountEstimate(count, count, requests)
+
+        if items == PAGE_SIZE:
+            full = max(full, page)
+            low = max(low, page * PAGE_SIZE)
+        else:
+            empty = page if empty is None else min(empty, page)
+            high = (page - 1) * PAGE_SIZE
+
+        last = last or _last_page((headers or {}).get('link'))
+        if last is not None:
+            low = max(low, (last - 1) * PAGE_SIZE + 1)
+            high = min(high, last * PAGE_SIZE) if high is not None else last * PAGE_SIZE
+
+        if CountEstimate(low, high, requests).tight(tolerance):
+            break
+
+        if last is not None and last > full:
+            page = last
+        elif empty is None:
+            page *= 2
+        else:
+            page = (full + empty) // 2
+
+    return CountEstimate(low, high, requests)
+
+
+#---------------------------------------------------------
+# Helper functions
+#---------------------------------------------------------
+
+def _last_page(link: Optional[str]) -> Optional[int]:
+    match = LAST_PAGE.search(link or '')
+    return int(match.group(1)) if match else None
@@ -0,0 +1,436 @@
+"""Exhaustive issue and commit search beyond the 1000-result cap, with duration statistics."""
+
+import math
+import threading
+import time
+from array import array
+from concurrent.futures import Future
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+from github_stats.deadline import Deadline, DeadlineExceeded
+
+# The search API never returns more results than this for one query
+SEARCH_CAP = 1000
+
+# Largest page the search API serves
+SEARCH_PAGE_SIZE = 100
+
+# Search endpoints
+ISSUES_URL = "/search/issues"
+COMMITS_URL = "/search/commits"
+
+# Searches start here when no --since is given; nothing on GitHub is older
+EARLIEST = datetime(2008, 1, 1, tzinfo=timezone.utc)
+
+# Slices are not split below this width; a second with over 1000 results
+# does not happen in practice
+MIN_SLICE = timedelta(seconds=1)
+
+NAN = float('nan')
+
+# Upstream repositories whose commits are counted one by one; commits to
+# any others count toward the total only
+UPSTREAM_REPO_LIMIT = 10
+
+
+class SearchPacer:
+    """
+    Keep search requests within the search rate limit.
+
+    Searches draw on their own bucket (30 requests a minute when
+    authenticated), separate from the core limit. The remaining count and
+    reset time are taken from each response; once the bucket is empty,
+    further searches wait for the reset instead of failing.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        """
+        Initialize the pacer.
+
+        Args:
+            clock: Returns the current Unix time (for tests)
+        """
+        self.clock = clock
+        self.remaining: Optional[int] = None
+        self.reset = 0.0
+        self.waited = 0.0
+        self.lock = threading.Lock()
+
+    def wait(self, deadline: Deadline) -> None:
+        """
+        Wait until a search may be sent, but never past the deadline.
+
+        Raises:
+            DeadlineExceeded: If the deadline passed while waiting
+        """
+        # Waiting under the lock holds back every other search too
+        with self.lock:
+            if self.remaining is not None and self.remaining <= 0:
+                delay = self.reset - self.clock()
+                if delay > 0:
+                    deadline.sleep(delay)
+                    self.waited += delay
+                    if deadline.expired():
+                        raise DeadlineExceeded()
+                self.remaining = None
+            elif self.remaining is not None:
+                # Reserve a request so concurrent searches do not overshoot
+                self.remaining -= 1
+
+    def observe(self, headers: Dict[str, str]) -> None:
+        """
+        Take the search bucket state from response headers.
+        """
+        remaining = headers.get('x-ratelimit-remaining')
+        reset = headers.get('x-ratelimit-reset')
+        if remaining is None or reset is None:
+            return
+        with self.lock:
+            self.remaining = int(remaining)
+            self.reset = float(reset)
+
+
+class SearchHistory:
+    """
+    Every result of an issue search, as parallel arrays of Unix timestamps.
+
+    Index i of created, closed and merged describes the same item; closed
+    and merged are NaN while the item is open or was never merged. Typed
+    arrays keep 100k results in a few megabytes.
+
+    Open and merged counts are kept as items are added, and sorted
+    durations are computed once per kind until the next addition, so
+    reading the statistics does not walk the arrays again. Items are only
+    added through add() and extend().
+    """
+
+    __slots__ = ('created', 'closed', 'merged', 'open', 'merged_count', '_durations')
+
+    def __init__(self):
+        self.created = array('d')
+        self.closed = array('d')
+        self.merged = array('d')
+        self.open = 0
+        self.merged_count = 0
+        self._durations: Dict[str, array] = {}
+
+    def __len__(self) -> int:
+        return len(self.created)
+
+    def add(self, item: Dict[str, Any]) -> None:
+        """
+        Append one search result item (decoded JSON).
+        """
+        closed = _timestamp(item.get('closed_at'))
+        merged = _timestamp((item.get('pull_request') or {}).get('merged_at'))
+        self.created.append(_timestamp(item.get('created_at')))
+        self.closed.append(closed)
+        self.merged.append(merged)
+        # NaN never equals itself
+        self.open += closed != closed
+        self.merged_count += merged == merged
+        self._durations.clear()
+
+    def extend(self, other: 'SearchHistory') -> None:
+        self.created.extend(other.created)
+        self.closed.extend(other.closed)
+        self.merged.extend(other.merged)
+        self.open += other.open
+        self.merged_count += other.merged_count
+        self._durations.clear()
+
+    def durations(self, ended: str = 'closed') -> array:
+        """
+        Get the hours from creation to closing (or merging), sorted.
+
+        Args:
+            ended: 'closed' or 'merged'
+
+        Returns:
+            Sorted array of hours, for items that have ended (shared
+            between calls; do not modify)
+        """
+        if ended not in self._durations:
+            ends = self.merged if ended == 'merged' else self.closed
+            # NaN never equals itself, which drops items that have not ended
+            self._durations[ended] = array(
+                'd', sorted((end - start) / 3600 for start, end in zip(self.created, ends) if end == end)
+            )
+        return self._durations[ended]
+
+
+class SlicedSearch:
+    """
+    Page through every result of a search by splitting it into date slices.
+    """
+
+    def __init__(
+        self,
+        requester: Any,
+        url: str,
+        qualifier: str,
+        deadline: Optional[Deadline] = None,
+        pacer: Optional[SearchPacer] = None,
+    ):
+        """
+        Initialize the search.
+
+        Args:
+            requester: PyGithub Requester
+            url: Search endpoint, e.g. ISSUES_URL
+            qualifier: Date qualifier to slice by, e.g. 'created'
+            deadline: Time by which fetching must stop (optional)
+            pacer: Search rate limit pacer (optional)
+        """
+        self.requester = requester
+        self.url = url
+        self.qualifier = qualifier
+        self.deadline = deadline or Deadline()
+        self.pacer = pacer or SearchPacer()
+
+    def run(
+        self,
+        query: str,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        submit: Optional[Callable[..., Future]] = None,
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Fetch every result, one slice at a time in time order.
+
+        Args:
+            query: Search query without the date qualifier
+            since: Earliest date (default: GitHub's launch)
+            until: Latest date (default: now)
+            submit: Runs a slice fetch in the background and returns its future
+
+        Yields:
+            The result items of each slice
+        """
+        start = since or EARLIEST
+        end = until or datetime.now(timezone.utc)
+        slices = self.split(query, start, end)
+        if submit is None:
+            for bounds in slices:
+                yield self.fetch_slice(query, bounds)
+            return
+
+        futures = [submit(self.fetch_slice, query, bounds) for bounds in slices]
+        for future in futures:
+            yield future.result()
+
+    def split(self, query: str, start: datetime, end: datetime) -> List[Tuple[datetime, datetime, int]]:
+        """
+        Halve the date range until each slice has at most SEARCH_CAP results.
+
+        Returns:
+            (start, end, result count) of each non-empty slice, in time order
+        """
+        # Depth-first so slices come out in time order
+        pending = [(start, end)]
+        slices = []
+        while pending:
+            low, high = pending.pop()
+            total = self.request(query, low, high, {'per_page': 1}).get('total_count', 0)
+            if total == 0:
+                continue
+            if total <= SEARCH_CAP or high - low <= MIN_SLICE:
+                slices.append((low, high, total))
+                continue
+            middle = low + timedelta(seconds=(high - low).total_seconds() // 2)
+            # Qualifier ranges are inclusive, so the halves must not share a second
+            pending.append((middle + MIN_SLICE, high))
+            pending.append((low, middle))
+        return slices
+
+    def fetch_slice(self, query: str, bounds: Tuple[datetime, datetime, int]) -> List[Dict[str, Any]]:
+        """
+        Page through one slice.
+        """
+        low, high, total = bounds
+        results: List[Dict[str, Any]] = []
+        pages = math.ceil(min(total, SEARCH_CAP) / SEARCH_PAGE_SIZE)
+        for page in range(1, pages + 1):
+            data = self.request(query, low, high, {'per_page': SEARCH_PAGE_SIZE, 'page': page})
+            items = data.get('items') or []
+            results.extend(items)
+            if len(items) < SEARCH_PAGE_SIZE:
+                break
+        return results
+
+    def request(self, query: str, low: datetime, high: datetime, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Send one search request for a date range, paced and within the deadline.
+
+        Raises:
+            DeadlineExceeded: If the deadline has passed
+        """
+        if self.deadline.expired():
+            raise DeadlineExceeded()
+        self.pacer.wait(self.deadline)
+        headers, data = self.requester.requestJsonAndCheck(
+            "GET", self.url,
+            dict(parameters, q=f"{query} {self.qualifier}:{_iso(low)}..{_iso(high)}")
+        )
+        self.pacer.observe(headers or {})
+        return data or {}
+
+
+def distribution(hours: array) -> Dict[str, float]:
+    """
+    Summarize a sorted array of durations.
+
+    Returns:
+        Median, 90th percentile and mean in hours (zeros when empty)
+    """
+    if not hours:
+        return {'median': 0.0, 'p90': 0.0, 'mean': 0.0}
+    return {
+        'median': _percentile(hours, 50),
+        'p90': _percentile(hours, 90),
+        'mean': math.fsum(hours) / len(hours),
+    }
+
+
+def format_duration(hours: float) -> str:
+    """
+    Format hours compactly, e.g. "5.2h" or "3.1d".
+    """
+    if hours < 48:
+        return f"{hours:.1f}h"
+    return f"{hours / 24:.1f}d"
+
+
+def search_all(
+    requester: Any,
+    query: str,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    submit: Optional[Callable[..., Future]] = None,
+    deadline: Optional[Deadline] = None,
+    pacer: Optional[SearchPacer] = None,
+) -> SearchHistory:
+    """
+    Fetch every result of an issue search, however many there are.
+
+    The created: range is halved until each slice has at most SEARCH_CAP
+    results; the slices are then paged in full, concurrently when a submit
+    function (e.g. ConcurrencyController.submit) is given. Requests are
+    paced against the search rate limit.
+
+    Args:
+        requester: PyGithub Requester
+        query: Search query without a created: qualifier
+        since: Earliest creation time (default: GitHub's launch)
+        until: Latest creation time (default: now)
+        submit: Runs a slice fetch in the background and returns its future
+        deadline: Time by which fetching must stop (optional)
+        pacer: Search rate limit pacer shared with other searches (optional)
+
+    Raises:
+        DeadlineExceeded: If the deadline passed before every slice was fetched
+    """
+    search = SlicedSearch(requester, ISSUES_URL, 'created', deadline, pacer)
+    history = SearchHistory()
+    for items in search.run(query, since, until, submit):
+        for item in items:
+            history.add(item)
+    return history
+
+
+class CommitBreakdown(NamedTuple):
+    """A user's commits to others' repositories: the total and per-repository counts."""
+    counts: Dict[str, int]
+    total: int
+
+    @property
+    def unattributed(self) -> int:
+        """Commits in repositories beyond the ones broken down."""
+        return max(0, self.total - sum(self.counts.values()))
+
+
+def search_commits(
+    requester: Any,
+    username: str,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    submit: Optional[Callable[..., Future]] = None,
+    deadline: Optional[Deadline] = None,
+    pacer: Optional[SearchPacer] = None,
+    limit: int = UPSTREAM_REPO_LIMIT,
+) -> CommitBreakdown:
+    """
+    Count a user's commits to repositories owned by others, per repository.
+
+    Commit search covers the default branches of all public repositories
+    (forks excluded). The -user: qualifier leaves out the user's own
+    repositories, which the per-repository scan counts, so the two never
+    overlap. One page of 100 gives the total and the candidate
+    repositories. If it holds every commit, it is counted as is;
+    otherwise the most frequent candidates are counted with one total_count
+    probe each (repo: qualifier), so the breakdown costs at most limit + 1
+    search requests however prolific the author is.
+
+    Args:
+        requester: PyGithub Requester
+        username: Commit author
+        since: Earliest committer date (default: GitHub's launch)
+        until: Latest committer date (default: now)
+        submit: Runs a probe in the background and returns its future
+        deadline: Time by which fetching must stop (optional)
+        pacer: Search rate limit pacer shared with other searches (optional)
+        limit: Most repositories to probe
+
+    Returns:
+        The total and the counts of the repositories broken down
+
+    Raises:
+        DeadlineExceeded: If the deadline passed before every probe was sent
+    """
+    search = SlicedSearch(requester, COMMITS_URL, 'committer-date', deadline, pacer)
+    start = since or EARLIEST
+    end = until or datetime.now(timezone.utc)
+
+    data = search.request(f"author:{username} -user:{username}", start, end, {'per_page': SEARCH_PAGE_SIZE})
+    items = data.get('items') or []
+    total = data.get('total_count', 0)
+    counts: Dict[str, int] = {}
+    for item in items:
+        name = (item.get('repository') or {}).get('full_name')
+        if name:
+            counts[name] = counts.get(name, 0) + 1
+    if len(items) >= total:
+        return CommitBreakdown(counts, total)
+
+    def probe(name: str) -> Tuple[str, int]:
+        found = search.request(f"author:{username} repo:{name}", start, end, {'per_page': 1})
+        return name, found.get('total_count', 0)
+
+    candidates = sorted(counts, key=lambda name: -counts[name])[:limit]
+    if submit is None:
+        probed = [probe(name) for name in candidates]
+    else:
+        probed = [future.result() for future in [submit(probe, name) for name in candidates]]
+    return CommitBreakdown(dict(probed), total)
+
+
+#---------------------------------------------------------
+# Helper functions
+#---------------------------------------------------------
+
+def _iso(moment: datetime) -> str:
+    return moment.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def _timestamp(value: Optional[str]) -> float:
+    if not value:
+        return NAN
+    return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+
+
+def _percentile(values: array, percent: float) -> float:
+    # Linear interpolation between closest ranks
+    position = (len(values) - 1) * percent / 100
+    lower = math.floor(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
@@ -0,0 +1,87 @@
+"""Repository filters applied to the listing before any per-repository call."""
+
+from datetime import datetime
+from typing import Any, Dict, Optional
+from github_stats.metrics.records import RepoRecord
+
+# Reasons a repository is skipped
+FORK = 'fork'
+ARCHIVED = 'archived'
+NOT_OWNED = 'not owned'
+DORMANT = 'dormant'
+
+
+class RepoFilter:
+    """
+    Which repositories per-repository counting skips.
+
+    The listing request takes what it can: type=owner, and sorting by push
+    date so dormant repositories come last and the listing can stop at the
+    first one. Forks and archived repositories cannot be left out of a
+    user's listing by the API, so they are skipped on their listing fields,
+    which costs nothing.
+    """
+
+    def __init__(
+        self,
+        exclude_forks: bool = False,
+        exclude_archived: bool = False,
+        min_pushed: Optional[datetime] = None,
+        owner_only: bool = False,
+    ):
+        """
+        Initialize the filter.
+
+        Args:
+            exclude_forks: Skip forks
+            exclude_archived: Skip archived repositories
+            min_pushed: Skip repositories last pushed before this time
+            owner_only: Skip repositories the user does not own
+        """
+        self.exclude_forks = exclude_forks
+        self.exclude_archived = exclude_archived
+        self.min_pushed = min_pushed
+        self.owner_only = owner_only
+
+    def __bool__(self) -> bool:
+        return bool(self.exclude_forks or self.exclude_archived or self.min_pushed or self.owner_only)
+
+    def key(self) -> str:
+        """
+        Describe the filter for cache keys, e.g. "forks-archived-pushed>=2024-01-01".
+        """
+        parts = []
+        if self.exclude_forks:
+            parts.append('forks')
+        if self.exclude_archived:
+            parts.append('archived')
+        if self.owner_only:
+            parts.append('owner')
+        if self.min_pushed:
+            parts.append(f"pushed>={self.min_pushed.date().isoformat()}")
+        return '-'.join(parts)
+
+    def listing(self) -> Dict[str, Any]:
+        """
+        Get the listing parameters that apply the filter server-side.
+        """
+        params: Dict[str, Any] = {}
+        if self.owner_only:
+            params['type'] = 'owner'
+        if self.min_pushed:
+            params.update(sort='pushed', direction='desc')
+        return params
+
+    def reason(self, record: RepoRecord, username: str) -> Optional[str]:
+        """
+        Get why a repository is skipped, or None to count it.
+        """
+        if self.min_pushed and record.pushed_at and record.pushed_at < self.min_pushed:
+            return DORMANT
+        if self.exclude_forks and record.fork:
+            return FORK
+        if self.exclude_archived and record.archived:
+            return ARCHIVED
+        if self.owner_only and record.full_name.split('/', 1)[0].lower() != username.lower():
+            return NOT_OWNED
+        return None
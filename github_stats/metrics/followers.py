@@ -1,15 +1,16 @@
 """Follower statistics metric."""
 
-from typing import Dict, Any
+from typing import Dict, Any, List
 from github_stats.metrics.base import BaseMetric
+from github_stats.metrics.planner import Need, PROFILE
 
 
 class FollowerMetric(BaseMetric):
     """Analyze follower and following statistics."""
 
-    def __init__(self, github_client, username: str):
+    def __init__(self, github_client, username: str, **kwargs):
         """Initialize follower metric."""
-        super().__init__(github_client, username)
+        super().__init__(github_client, username, **kwargs)
         self.followers_count = 0
         self.following_count = 0
 
@@ -17,19 +18,29 @@ class FollowerMetric(BaseMetric):
     # Main execution
     #---------------------------------------------------------
 
-    def fetch(self) -> None:
-        """Fetch follower and following counts."""
-        user = self.github_client.get_user(self.username)
+    def requires(self) -> List[Need]:
+        """Follower counts are part of the user profile."""
+        return [Need(PROFILE)]
+
+    def load(self, inputs: Dict[Need, Any]) -> None:
+        """Read follower and following counts from the profile."""
+        profile = inputs[Need(PROFILE)]
 
         # Get follower and following counts
-        self.followers_count = user.followers
-        self.following_count = user.following
+        self.followers_count = profile.followers
+        self.following_count = profile.following
 
         self.data = {
             'followers': self.followers_count,
             'following': self.following_count
         }
 
+    def restore(self, data: Dict[str, Any]) -> None:
+        """Take over the counts of an earlier run."""
+        self.data = data
+        self.followers_count = data['followers']
+        self.following_count = data['following']
+
     def process(self) -> None:
         """Process follower data to calculate statistics."""
         if not self.data:
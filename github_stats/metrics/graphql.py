@@ -0,0 +1,285 @@
+"""GraphQL batching of planner needs for many users in one request."""
+
+import json
+from typing import Any, Dict, List, Optional, Tuple
+from github import GithubException
+from github_stats.metrics.planner import PROFILE, REPOS, SEARCH, Need
+from github_stats.metrics.records import RepoRecord, SearchSample, UserProfile
+
+# Users whose repositories fit into one page are listed completely in the
+# batch; others keep paging the REST listing
+REPOS_PER_USER = 100
+
+# Batch size: GitHub rejects queries over 500,000 nodes and charges about
+# one rate-limit point per 100 nodes, so documents are kept to a few
+# thousand nodes (tens of points) and a few dozen users each
+MAX_USERS_PER_QUERY = 25
+MAX_NODES_PER_QUERY = 3000
+
+# Byte-accurate language breakdowns list this many languages per
+# repository, largest first; the rest of its bytes count as "Other"
+LANGUAGES_PER_REPO = 20
+REPOS_PER_LANGUAGE_QUERY = min(100, MAX_NODES_PER_QUERY // (LANGUAGES_PER_REPO + 1))
+
+REPOSITORY_FIELDS = (
+    "name nameWithOwner stargazerCount forkCount isFork isArchived pushedAt primaryLanguage { name }"
+)
+
+
+class GraphQLBatcher:
+    """
+    Resolve the profile, listing and search needs of many users at once.
+
+    Every user becomes aliased user(login:) and search(query:) fields of a
+    shared GraphQL document. Users that fail (e.g. do not exist) are
+    reported separately; a document the server rejects as a whole is split
+    in half and retried, down to single users.
+    """
+
+    def __init__(self, requester: Any):
+        """
+        Initialize the batcher.
+
+        Args:
+            requester: PyGithub Requester (see auth.get_requester)
+        """
+        self.requester = requester
+        self.queries = 0
+        self.errors: Dict[str, str] = {}
+
+    def fetch(self, needs: Dict[str, List[Need]]) -> Dict[str, Dict[Need, Any]]:
+        """
+        Fetch the needs of every user.
+
+        Args:
+            needs: Mapping of username to the needs of its metrics
+
+        Returns:
+            Mapping of username to the needs that were resolved, in the
+            form FetchPlanner.seed() takes; unresolved needs are left out
+            so the planner fetches them itself
+        """
+        results: Dict[str, Dict[Need, Any]] = {}
+        for group in self.groups(needs):
+            results.update(self._fetch_group(group))
+        return results
+
+    def groups(self, needs: Dict[str, List[Need]]) -> List[Dict[str, List[Need]]]:
+        """
+        Split users into documents within the user and node limits.
+        """
+        groups: List[Dict[str, List[Need]]] = []
+        current: Dict[str, List[Need]] = {}
+        nodes = 0
+        for username, user_needs in needs.items():
+            cost = _nodes(user_needs)
+            if current and (len(current) >= MAX_USERS_PER_QUERY or nodes + cost > MAX_NODES_PER_QUERY):
+                groups.append(current)
+                current, nodes = {}, 0
+            current[username] = user_needs
+            nodes += cost
+        if current:
+            groups.append(current)
+        return groups
+
+    #---------------------------------------------------------
+    # Helper methods
+    #---------------------------------------------------------
+
+    def _fetch_group(self, group: Dict[str, List[Need]]) -> Dict[str, Dict[Need, Any]]:
+        document, aliases = build_query(group)
+        if not aliases:
+            return {}
+        try:
+            self.queries += 1
+            _, response = self.requester.requestJsonAndCheck("POST", "/graphql", input={'query': document})
+            if response.get('errors') and not response.get('data'):
+                raise GithubException(200, response, None)
+        except GithubException as e:
+            if len(group) == 1:
+                username = next(iter(group))
+                self.errors[username] = _message(e.data) or str(e)
+                return {}
+            # Too large or too slow as a whole; try each half on its own
+            names = list(group)
+            half = len(names) // 2
+            results = self._fetch_group({name: group[name] for name in names[:half]})
+            results.update(self._fetch_group({name: group[name] for name in names[half:]}))
+            return results
+
+        return self._parse(response, aliases)
+
+    def _parse(
+        self,
+        response: Dict[str, Any],
+        aliases: Dict[str, Tuple[str, Optional[Need], bool]],
+    ) -> Dict[str, Dict[Need, Any]]:
+        data = response.get('data') or {}
+        failed = set()
+        for error in response.get('errors') or []:
+            path = error.get('path') or []
+            if path and path[0] in aliases:
+                username, need, _ = aliases[path[0]]
+                failed.add(path[0])
+                if need is None:
+                    self.errors[username] = error.get('message', 'error')
+
+        results: Dict[str, Dict[Need, Any]] = {}
+        counts: Dict[Tuple[str, Need], Dict[bool, int]] = {}
+        for alias, (username, need, is_open) in aliases.items():
+            value = data.get(alias)
+            if alias in failed or value is None:
+                continue
+            if need is None:
+                results.setdefault(username, {}).update(_user_results(value))
+            else:
+                counts.setdefault((username, need), {})[is_open] = value['issueCount']
+
+        # A search is only usable with both its total and its open count
+        for (username, need), count in counts.items():
+            if len(count) == 2:
+                results.setdefault(username, {})[need] = SearchSample(
+                    total=count[False], sampled=count[False], open=count[True]
+                )
+        return results
+
+
+def build_query(needs: Dict[str, List[Need]]) -> Tuple[str, Dict[str, Tuple[str, Optional[Need], bool]]]:
+    """
+    Build one GraphQL document for the needs of several users.
+
+    Args:
+        needs: Mapping of username to its needs
+
+    Returns:
+        The document, and each alias mapped to (username, search need or
+        None for the user field, whether it is the open-count search)
+    """
+    fields: List[str] = []
+    aliases: Dict[str, Tuple[str, Optional[Need], bool]] = {}
+
+    for index, (username, user_needs) in enumerate(needs.items()):
+        kinds = {need.kind for need in user_needs}
+        if kinds & {PROFILE, REPOS}:
+            alias = f"u{index}"
+            aliases[alias] = (username, None, False)
+            fields.append(f"{alias}: user(login: {json.dumps(username)}) {{ {_user_fields(REPOS in kinds)} }}")
+
+        searches = [need for need in user_needs if need.kind == SEARCH]
+        for number, need in enumerate(dict.fromkeys(searches)):
+            for suffix, query, is_open in (('t', need.key, False), ('o', f"{need.key} state:open", True)):
+                alias = f"u{index}s{number}{suffix}"
+                aliases[alias] = (username, need, is_open)
+                fields.append(f"{alias}: search(query: {json.dumps(query)}, type: ISSUE) {{ issueCount }}")
+
+    return "query {\n  " + "\n  ".join(fields) + "\n}", aliases
+
+
+def fetch_languages(requester: Any, full_names: List[str]) -> Dict[str, Dict[str, int]]:
+    """
+    Fetch the language bytes of many repositories in one GraphQL request.
+
+    A document the server rejects is split in half and retried, down to
+    single repositories; repositories that cannot be read are left out.
+
+    Args:
+        requester: PyGithub Requester (see auth.get_requester)
+        full_names: Repository full names, at most REPOS_PER_LANGUAGE_QUERY
+
+    Returns:
+        Mapping of full name to bytes per language
+    """
+    if not full_names:
+        return {}
+    try:
+        _, response = requester.requestJsonAndCheck(
+            "POST", "/graphql", input={'query': build_languages_query(full_names)}
+        )
+    except GithubException:
+        if len(full_names) == 1:
+            return {}
+        half = len(full_names) // 2
+        results = fetch_languages(requester, full_names[:half])
+        results.update(fetch_languages(requester, full_names[half:]))
+        return results
+
+    data = (response or {}).get('data') or {}
+    results: Dict[str, Dict[str, int]] = {}
+    for index, full_name in enumerate(full_names):
+        node = data.get(f"r{index}")
+        if not node:
+            continue
+        languages = node.get('languages') or {}
+        sizes = {edge['node']['name']: edge['size'] for edge in languages.get('edges') or []}
+        other = (languages.get('totalSize') or 0) - sum(sizes.values())
+        if other > 0:
+            sizes['Other'] = sizes.get('Other', 0) + other
+        results[full_name] = sizes
+    return results
+
+
+def build_languages_query(full_names: List[str]) -> str:
+    """
+    Build one GraphQL document asking for the languages of several repositories.
+
+    Each repository gets the alias r{index}.
+    """
+    fields = []
+    for index, full_name in enumerate(full_names):
+        owner, _, name = full_name.partition('/')
+        fields.append(
+            f"r{index}: repository(owner: {json.dumps(owner)}, name: {json.dumps(name)}) {{ "
+            f"languages(first: {LANGUAGES_PER_REPO}, orderBy: {{field: SIZE, direction: DESC}}) "
+            f"{{ totalSize edges {{ size node {{ name }} }} }} }}"
+        )
+    return "query {\n  " + "\n  ".join(fields) + "\n}"
+
+
+#---------------------------------------------------------
+# Helper functions
+#---------------------------------------------------------
+
+def _user_fields(with_repos: bool) -> str:
+    repositories = "repositories(ownerAffiliations: OWNER, privacy: PUBLIC"
+    if with_repos:
+        repositories += f", first: {REPOS_PER_USER}) {{ totalCount nodes {{ {REPOSITORY_FIELDS} }} }}"
+    else:
+        repositories += ") { totalCount }"
+    return f"login email followers {{ totalCount }} following {{ totalCount }} {repositories}"
+
+
+def _user_results(user: Dict[str, Any]) -> Dict[Need, Any]:
+    repositories = user.get('repositories') or {}
+    total = repositories.get('totalCount') or 0
+    results: Dict[Need, Any] = {
+        Need(PROFILE): UserProfile(
+            login=user.get('login'),
+            followers=(user.get('followers') or {}).get('totalCount') or 0,
+            following=(user.get('following') or {}).get('totalCount') or 0,
+            public_repos=total,
+            email=user.get('email') or None,
+        )
+    }
+    nodes = repositories.get('nodes')
+    if nodes is not None and len(nodes) >= total:
+        results[Need(REPOS)] = [RepoRecord.from_graphql(node) for node in nodes]
+    return results
+
+
+def _nodes(needs: List[Need]) -> int:
+    # Nodes one user adds to a document: the user, its repository page and
+    # two counts per search
+    kinds = {need.kind for need in needs}
+    nodes = 1 if kinds & {PROFILE, REPOS} else 0
+    if REPOS in kinds:
+        nodes += REPOS_PER_USER
+    return nodes + 2 * sum(1 for need in needs if need.kind == SEARCH)
+
+
+def _message(data: Any) -> Optional[str]:
+    if isinstance(data, dict):
+        errors = data.get('errors') or []
+        if errors:
+            return errors[0].get('message')
+        return data.get('message')
+    return None
@@ -1,68 +1,90 @@
 """Issue statistics metric."""
 
-from typing import Dict, Any
-from github import GithubException
+from typing import Dict, Any, List, Optional
 from github_stats.metrics.base import BaseMetric
+from github_stats.metrics.exhaustive import SearchHistory, distribution, format_duration
+from github_stats.metrics.planner import Need, SEARCH, SEARCH_ALL
 
 
 class IssueMetric(BaseMetric):
     """Analyze issue creation and management activity."""
 
-    def __init__(self, github_client, username: str):
-        """Initialize issue metric."""
-        super().__init__(github_client, username)
+    def __init__(self, github_client, username: str, exhaustive: bool = False, **kwargs):
+        """
+        Initialize issue metric.
+
+        Args:
+            exhaustive: Fetch every issue, beyond the search cap, for exact
+                counts and time-to-close statistics
+        """
+        super().__init__(github_client, username, **kwargs)
+        self.exhaustive = exhaustive
         self.total_issues = 0
         self.open_issues = 0
         self.closed_issues = 0
+        self.time_to_close: Optional[Dict[str, float]] = None
 
     #---------------------------------------------------------
     # Main execution
     #---------------------------------------------------------
 
-    def fetch(self) -> None:
-        """Fetch issue data using GitHub search API."""
-        try:
-            # Search for issues created by user (excluding PRs)
-            query = f"type:issue author:{self.username}"
-            issues = self.github_client.search_issues(query)
-
-            # Count total issues
-            self.total_issues = issues.totalCount
-
-            # Sample to categorize by state
-            open_count = 0
-            closed_count = 0
-
-            count = 0
-            for issue in issues:
-                # Limit sampling to avoid rate limits
-                if count >= 100:
-                    break
-                count += 1
-
-                if issue.state == 'open':
-                    open_count += 1
-                else:
-                    closed_count += 1
-
-            # Calculate estimates based on sample
-            if count > 0:
-                open_ratio = open_count / count
-                self.open_issues = int(self.total_issues * open_ratio)
-                self.closed_issues = self.total_issues - self.open_issues
-            else:
-                self.open_issues = 0
-                self.closed_issues = 0
-
-            self.data = {
-                'total': self.total_issues,
-                'open': self.open_issues,
-                'closed': self.closed_issues
-            }
-
-        except GithubException:
-            # If search fails, return empty data
-            self.data = {'total': 0, 'open': 0, 'closed': 0}
+    def requires(self) -> List[Need]:
+        """Issue counts come from one issue search, or all of its results."""
+        if self.exhaustive:
+            return [Need(SEARCH_ALL, (f"type:issue author:{self.username}", self.since, self.until))]
+        return [Need(SEARCH, self._query())]
+
+    def load(self, inputs: Dict[Need, Any]) -> None:
+        """Categorize issues from the search total and state sample."""
+        if self.exhaustive:
+            self._load_history(inputs[self.requires()[0]])
+            return
+
+        sample = inputs[Need(SEARCH, self._query())]
+
+        # Count total issues
+        self.total_issues = sample.total
+
+        # Calculate estimates based on sample
+        if sample.sampled > 0:
+            open_ratio = sample.open / sample.sampled
+            self.open_issues = int(self.total_issues * open_ratio)
+            self.closed_issues = self.total_issues - self.open_issues
+        else:
+            self.open_issues = 0
+            self.closed_issues = 0
+
+        self.data = {
+            'total': self.total_issues,
+            'open': self.open_issues,
+            'closed': self.closed_issues
+        }
+
+    def restore(self, data: Dict[str, Any]) -> None:
+        """Take over the counts of an earlier run."""
+        self.data = data
+        self.total_issues = data['total']
+        self.open_issues = data['open']
+        self.closed_issues = data['closed']
+        self.time_to_close = data.get('time_to_close')
+
+    def _load_history(self, history: SearchHistory) -> None:
+        # Every issue is known, so the split is exact
+        self.total_issues = len(history)
+        self.open_issues = history.open
+        self.closed_issues = self.total_issues - self.open_issues
+        self.time_to_close = distribution(history.durations('closed'))
+
+        self.data = {
+            'total': self.total_issues,
+            'open': self.open_issues,
+            'closed': self.closed_issues,
+            'time_to_close': self.time_to_close
+        }
+
+    def _query(self) -> str:
+        # Search for issues created by user (excluding PRs)
+        return f"type:issue author:{self.username}{self._created_qualifier()}"
 
     def process(self) -> None:
         """Process issue data to calculate statistics."""
@@ -86,7 +108,10 @@ class IssueMetric(BaseMetric):
         if self.total_issues == 0:
             return "0, No issues"
 
-        return f"{self.total_issues:,}, {int(self.close_rate)}% closed"
+        summary = f"{self.total_issues:,}, {int(self.close_rate)}% closed"
+        if self.time_to_close and self.closed_issues:
+            summary += f", median {format_duration(self.time_to_close['median'])} to close"
+        return summary
 
     def get_detailed(self) -> Dict[str, Any]:
         """
@@ -95,9 +120,13 @@ class IssueMetric(BaseMetric):
         Returns:
             Dictionary with detailed issue information
         """
-        return {
+        detailed = {
             'total_issues': self.total_issues,
             'open': self.open_issues,
             'closed': self.closed_issues,
             'close_rate': self.close_rate
         }
+        if self.time_to_close:
+            for statistic, hours in self.time_to_close.items():
+                detailed[f'{statistic}_hours_to_close'] = hours
+        return detailed
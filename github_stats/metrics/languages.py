@@ -0,0 +1,153 @@
+"""Language statistics metric."""
+
+import math
+from typing import Dict, Any, List, Optional
+from github_stats.auth import get_requester
+from github_stats.deadline import DeadlineExceeded
+from github_stats.metrics.base import BaseMetric
+from github_stats.metrics.graphql import REPOS_PER_LANGUAGE_QUERY, fetch_languages
+from github_stats.metrics.planner import Need, REPOS
+from github_stats.metrics.records import RepoRecord, UserProfile
+
+# Languages kept in the detailed breakdown
+BREAKDOWN_LIMIT = 10
+
+
+class LanguageMetric(BaseMetric):
+    """Analyze the languages of the user's repositories."""
+
+    def __init__(self, github_client, username: str, language_bytes: bool = False, **kwargs):
+        """
+        Initialize language metric.
+
+        Args:
+            language_bytes: Weigh languages by bytes of code, fetched through
+                batched GraphQL queries, instead of counting each
+                repository's primary language from the listing
+        """
+        super().__init__(github_client, username, **kwargs)
+        self.language_bytes = language_bytes
+        self.totals: Dict[str, int] = {}
+        self.repo_names: List[str] = []
+        self.expected_repos = 0
+        self.seen_repos = 0
+        self.counted_repos = 0
+        self.top_language: Optional[str] = None
+        self.share = 0.0
+
+    #---------------------------------------------------------
+    # Main execution
+    #---------------------------------------------------------
+
+    def requires(self) -> List[Need]:
+        """Primary languages are part of the repository listing."""
+        return [Need(REPOS)]
+
+    def estimate_calls(self, profile: UserProfile) -> int:
+        """Byte counts take one GraphQL request per batch of repositories."""
+        if not self.language_bytes:
+            return 0
+        return math.ceil(profile.public_repos / REPOS_PER_LANGUAGE_QUERY)
+
+    def begin_repos(self, expected: int = 0) -> None:
+        """Start a fresh tally."""
+        self.totals = {}
+        self.repo_names = []
+        self.expected_repos = expected
+        self.seen_repos = 0
+        self.counted_repos = 0
+
+    def consume_repo(self, record: RepoRecord) -> bool:
+        """Count one repository's primary language; no per-repo calls are needed."""
+        self.seen_repos += 1
+        # Forks mostly hold other people's code
+        if record.fork:
+            return True
+
+        self.counted_repos += 1
+        if self.language_bytes:
+            self.repo_names.append(record.full_name)
+        elif record.language:
+            self.totals[record.language] = self.totals.get(record.language, 0) + 1
+        return True
+
+    def end_repos(self, complete: bool = True) -> None:
+        """Fetch byte counts if asked to, and store the breakdown."""
+        if not complete:
+            total = max(self.expected_repos, self.seen_repos)
+            self.mark_partial(f"listed {self.seen_repos:,}/{total:,} repos")
+        elif self.language_bytes:
+            self._add_bytes()
+        self.repo_names = []
+
+        # Shares are of all bytes, or of all repositories including those
+        # without a detected language
+        breakdown = sorted(self.totals.items(), key=lambda item: (-item[1], item[0]))
+        self.data = {
+            'unit': 'bytes' if self.language_bytes else 'repos',
+            'total': sum(self.totals.values()) if self.language_bytes else self.counted_repos,
+            'repositories': self.counted_repos,
+            'languages': [list(item) for item in breakdown],
+        }
+
+    def process(self) -> None:
+        """Process language data to calculate statistics."""
+        if not self.data or not self.data['languages']:
+            self.top_language = None
+            self.share = 0.0
+            return
+
+        name, value = self.data['languages'][0]
+        self.top_language = name
+        self.share = value / self.data['total']
+
+    def get_summary(self) -> str:
+        """
+        Get brief summary of language statistics.
+
+        Returns:
+            Summary string in format "Language, X% of N repos, ..."
+        """
+        if self.top_language is None:
+            return "N/A, No languages detected"
+
+        total = self.data['total']
+        scope = "code" if self.data['unit'] == 'bytes' else f"{self.data['repositories']:,} repos"
+        runners_up = "".join(
+            f", {name} {value / total:.0%}" for name, value in self.data['languages'][1:3]
+        )
+        return f"{self.top_language}, {self.share:.0%} of {scope}{runners_up}"
+
+    def get_detailed(self) -> Dict[str, Any]:
+        """
+        Get detailed breakdown of language statistics.
+
+        Returns:
+            Dictionary with detailed language information
+        """
+        languages = self.data['languages'] if self.data else []
+
+        return {
+            'languages': len(languages),
+            'repositories': self.data['repositories'] if self.data else 0,
+            'top_language_share': round(self.share * 100, 1),
+            'breakdown': languages[:BREAKDOWN_LIMIT]  # Top 10 languages
+        }
+
+    #---------------------------------------------------------
+    # Helper methods
+    #---------------------------------------------------------
+
+    def _add_bytes(self) -> None:
+        """Sum language bytes over the repositories, a batch per request."""
+        requester = get_requester(self.github_client)
+        names = self.repo_names
+        for start in range(0, len(names), REPOS_PER_LANGUAGE_QUERY):
+            try:
+                sizes = self.deadline.call(fetch_languages, requester, names[start:start + REPOS_PER_LANGUAGE_QUERY])
+            except DeadlineExceeded:
+                self.mark_partial(f"sized {start:,}/{len(names):,} repos")
+                return
+            for languages in sizes.values():
+                for language, size in languages.items():
+                    self.totals[language] = self.totals.get(language, 0) + size
@@ -0,0 +1,146 @@
+"""Commit counting from local git clones and mirrors."""
+
+import os
+import re
+import subprocess
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from github_stats.metrics.records import RepoRecord
+
+# Seconds a single `git rev-list` may take
+GIT_TIMEOUT = 120
+
+
+class LocalRepos:
+    """
+    Index of local clones under a directory, with parallel commit counting.
+
+    Repositories are found as <root>/<owner>/<name> or <root>/<name>, each
+    optionally with a .git suffix (bare mirrors), matched case-insensitively.
+    Every count is a `git rev-list` process, so running them from a thread
+    pool spreads them across all cores.
+    """
+
+    def __init__(self, root: Path, jobs: Optional[int] = None):
+        """
+        Index the clones under root.
+
+        Args:
+            root: Directory holding the clones
+            jobs: Maximum concurrent git processes (default: CPU count)
+        """
+        self.root = Path(root)
+        self.jobs = jobs or os.cpu_count() or 1
+        self.paths: Dict[str, Path] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._index()
+
+    def __len__(self) -> int:
+        return len(set(self.paths.values()))
+
+    def find(self, record: RepoRecord) -> Optional[Path]:
+        """
+        Get the local clone of a repository, if there is one.
+        """
+        return self.paths.get(record.full_name.lower()) or self.paths.get(record.name.lower())
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        """
+        Run fn (typically calling count_commits()) on the git worker pool.
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.jobs, thread_name_prefix='github-stats-git')
+        return self._executor.submit(fn, *args)
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _index(self) -> None:
+        # Clones under <owner>/ are only found by their full name, so another
+        # owner's repository of the same name is never counted from them;
+        # flat clones carry no owner and are found by bare name
+        for entry in _subdirectories(self.root):
+            if _is_git_repository(entry):
+                self.paths.setdefault(_repo_name(entry).lower(), entry)
+                continue
+            for repo in _subdirectories(entry):
+                if _is_git_repository(repo):
+                    self.paths[f"{entry.name}/{_repo_name(repo)}".lower()] = repo
+
+
+def author_patterns(login: str, email: Optional[str] = None) -> List[str]:
+    """
+    Build `git log --author` patterns matching a GitHub user's commits.
+
+    Matches the public email, both forms of the GitHub noreply address, and
+    commits whose author name is the login.
+
+    Args:
+        login: GitHub login
+        email: Public profile email (optional)
+
+    Returns:
+        Extended regular expressions, any of which identifies the user
+    """
+    login_pattern = re.escape(login)
+    patterns = [
+        f"^{login_pattern} <",
+        f"<([0-9]+\\+)?{login_pattern}@users\\.noreply\\.github\\.com>",
+    ]
+    if email:
+        patterns.append(f"<{re.escape(email)}>")
+    return patterns
+
+
+def count_commits(
+    path: Path,
+    authors: List[str],
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> Optional[int]:
+    """
+    Count the commits on HEAD authored by any of the author patterns.
+
+    Args:
+        path: Clone or bare mirror
+        authors: Patterns from author_patterns()
+        since: Only count commits at or after this time (optional)
+        until: Only count commits at or before this time (optional)
+
+    Returns:
+        Number of commits, or None if git failed (e.g. an empty repository)
+    """
+    command = ['git', '-C', str(path), 'rev-list', '--count', '--extended-regexp', '--regexp-ignore-case']
+    command += [f"--author={pattern}" for pattern in authors]
+    if since:
+        command.append(f"--since={since.isoformat()}")
+    if until:
+        command.append(f"--until={until.isoformat()}")
+    command.append('HEAD')
+
+    try:
+        result = subprocess.run(command, capture_output=True, text=True, timeout=GIT_TIMEOUT, check=True)
+        return int(result.stdout.strip())
+    except (OSError, ValueError, subprocess.SubprocessError):
+        return None
+
+
+def _subdirectories(path: Path) -> List[Path]:
+    try:
+        return sorted(entry for entry in path.iterdir() if entry.is_dir() and not entry.name.startswith('.'))
+    except OSError:
+        return []
+
+
+def _is_git_repository(path: Path) -> bool:
+    # Working clones have a .git entry; bare mirrors have HEAD and objects
+    return (path / '.git').exists() or ((path / 'HEAD').is_file() and (path / 'objects').is_dir())
+
+
+def _repo_name(path: Path) -> str:
+    return path.name[:-4] if path.name.endswith('.git') else path.name
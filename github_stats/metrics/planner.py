@@ -0,0 +1,300 @@
+"""Fetch planner resolving the data metrics declare into deduplicated API calls."""
+
+import math
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional
+from github import GithubException
+from github_stats.auth import get_requester
+from github_stats.deadline import Deadline
+from github_stats.metrics.calendar import fetch_calendar, year_windows
+from github_stats.metrics.exhaustive import (
+    SEARCH_CAP, SEARCH_PAGE_SIZE, UPSTREAM_REPO_LIMIT, SearchPacer, search_all, search_commits,
+)
+from github_stats.metrics.records import RepoRecord, SearchSample, UserProfile, list_repo_records
+
+# Data set kinds a metric can declare
+PROFILE = 'profile'   # The user's profile (followers, public repo count, ...)
+REPOS = 'repos'       # The user's repositories, streamed as RepoRecords
+SEARCH = 'search'     # Total count and state sample of an issue search
+SEARCH_ALL = 'search_all'  # Every result of an issue search, as a SearchHistory
+COMMIT_SEARCH = 'commit_search'  # Commits to others' repositories, as a CommitBreakdown
+CALENDAR = 'calendar'  # Contributions per day between two dates, as a ContributionCalendar
+
+# Number of search results sampled for open/closed ratios
+SEARCH_SAMPLE_SIZE = 100
+
+# PyGithub's default number of items per page
+PAGE_SIZE = 30
+
+
+class Need(NamedTuple):
+    """A data set a metric needs; equal needs are fetched once."""
+
+    kind: str
+    key: Any = None
+
+
+class FetchPlanner:
+    """
+    Resolve the needs of a set of metrics into a minimal set of API calls.
+
+    Profile and search needs are fetched once each and handed to every
+    metric that declared them through load(). The repository listing is
+    paged once and streamed record by record to every metric that declared
+    REPOS through consume_repo(), so it is never held in memory.
+    """
+
+    def __init__(
+        self,
+        github_client,
+        username: str,
+        on_step: Optional[Callable[[str], None]] = None,
+        deadline: Optional[Deadline] = None,
+        concurrency: Optional[Any] = None,
+    ):
+        """
+        Initialize the planner.
+
+        Args:
+            github_client: Authenticated PyGithub client
+            username: GitHub username to analyze
+            on_step: Optional callback receiving a description of each fetch step
+            deadline: Time by which fetching must stop (optional)
+            concurrency: ConcurrencyController for fetching search slices
+                in parallel, or None to fetch them one at a time
+        """
+        self.github_client = github_client
+        self.username = username
+        self.on_step = on_step
+        self.deadline = deadline or Deadline()
+        self.concurrency = concurrency
+        self.pacer = SearchPacer()
+        self.results: Dict[Need, Any] = {}
+        self.errors: Dict[Need, Exception] = {}
+        self._user = None
+
+    #---------------------------------------------------------
+    # Main execution
+    #---------------------------------------------------------
+
+    def seed_user(self, user: Any) -> None:
+        """
+        Reuse an already fetched user object instead of requesting it again.
+
+        Args:
+            user: PyGithub NamedUser for the analyzed user
+        """
+        self._user = user
+
+    def seed(self, results: Dict[Need, Any]) -> None:
+        """
+        Reuse data sets fetched elsewhere (e.g. by a GraphQL batch).
+
+        A seeded REPOS entry is the complete list of RepoRecords; it feeds
+        consumers without listing preferences, while the others still page
+        the listing in their preferred order.
+
+        Args:
+            results: Mapping of need to its data, as fetching would produce
+        """
+        self.results.update(results)
+
+    def plan(self, metrics: Iterable[Any]) -> List[Need]:
+        """
+        Collect the distinct needs of the metrics, in first-declared order.
+        """
+        needs: List[Need] = []
+        for metric in metrics:
+            for need in metric.requires():
+                if need not in needs:
+                    needs.append(need)
+        return needs
+
+    def run(self, metrics: List[Any]) -> Dict[Any, Exception]:
+        """
+        Fetch everything the metrics need and hand each its inputs.
+
+        Args:
+            metrics: Metrics to feed
+
+        Returns:
+            Mapping of metric to the error that prevented feeding it
+        """
+        failures: Dict[Any, Exception] = {}
+
+        for need in self.plan(metrics):
+            if need.kind == REPOS or need in self.results:
+                continue
+            try:
+                self.results[need] = self.deadline.call(self._fetch, need)
+            except Exception as e:
+                self.errors[need] = e
+
+        for metric in metrics:
+            needs = [need for need in metric.requires() if need.kind != REPOS]
+            failed = [self.errors[need] for need in needs if need in self.errors]
+            if failed:
+                failures[metric] = failed[0]
+                continue
+            metric.load({need: self.results[need] for need in needs})
+
+        consumers = [m for m in metrics if m not in failures and Need(REPOS) in m.requires()]
+        seeded = self.results.get(Need(REPOS))
+        if seeded is not None:
+            fed = [metric for metric in consumers if not metric.repo_listing()]
+            consumers = [metric for metric in consumers if metric not in fed]
+            if fed:
+                failures.update(self._stream_repos(fed, seeded))
+        if consumers:
+            failures.update(self._stream_repos(consumers))
+
+        return failures
+
+    #---------------------------------------------------------
+    # Cost estimation
+    #---------------------------------------------------------
+
+    def estimate(self, metrics: Iterable[Any], profile: UserProfile) -> int:
+        """
+        Estimate the API calls needed to feed the metrics.
+
+        Shared needs are counted once, as they would be fetched.
+
+        Args:
+            metrics: Metrics to estimate
+            profile: The user's profile, for their repository count
+
+        Returns:
+            Estimated number of API requests
+        """
+        metrics = list(metrics)
+        needs = self.plan(metrics)
+
+        # Profile and listing both start from one user fetch
+        cost = 1 if self._user is None and any(need.kind in (PROFILE, REPOS) for need in needs) else 0
+        cost += sum(self.need_cost(need, profile) for need in needs)
+        return cost + sum(metric.estimate_calls(profile) for metric in metrics)
+
+    def need_cost(self, need: Need, profile: UserProfile) -> int:
+        """
+        Estimate the API calls one need costs, not counting the user fetch.
+        """
+        if need in self.results or need.kind == PROFILE:
+            return 0
+        if need.kind == REPOS:
+            return max(1, math.ceil(profile.public_repos / PAGE_SIZE))
+        if need.kind == SEARCH:
+            return math.ceil(SEARCH_SAMPLE_SIZE / PAGE_SIZE)
+        if need.kind == SEARCH_ALL:
+            # One count and a full slice at least; more for prolific users
+            return 1 + math.ceil(SEARCH_CAP / SEARCH_PAGE_SIZE)
+        if need.kind == COMMIT_SEARCH:
+            # One page, then a count per repository broken down
+            return 1 + UPSTREAM_REPO_LIMIT
+        if need.kind == CALENDAR:
+            # One GraphQL query per year
+            return len(year_windows(*need.key))
+        return 0
+
+    #---------------------------------------------------------
+    # Fetchers
+    #---------------------------------------------------------
+
+    def _fetch(self, need: Need) -> Any:
+        if need.kind == PROFILE:
+            self._step("Fetching profile...")
+            return UserProfile.from_user(self._get_user())
+        if need.kind == SEARCH:
+            self._step(f"Searching {need.key}...")
+            return self._search(need.key)
+        if need.kind == SEARCH_ALL:
+            query, since, until = need.key
+            self._step(f"Searching all of {query}...")
+            return search_all(
+                get_requester(self.github_client), query, since, until,
+                submit=self._submit(), deadline=self.deadline, pacer=self.pacer
+            )
+        if need.kind == COMMIT_SEARCH:
+            username, since, until = need.key
+            self._step(f"Searching commits by {username}...")
+            return search_commits(
+                get_requester(self.github_client), username, since, until,
+                submit=self._submit(), deadline=self.deadline, pacer=self.pacer
+            )
+        if need.kind == CALENDAR:
+            first, last = need.key
+            self._step("Fetching contribution calendar...")
+            return fetch_calendar(
+                get_requester(self.github_client), self.username, first, last,
+                submit=self._submit(), deadline=self.deadline
+            )
+        raise ValueError(f"Unknown data set: {need.kind}")
+
+    def _submit(self) -> Optional[Callable[..., Any]]:
+        return self.concurrency.submit if self.concurrency is not None else None
+
+    def _get_user(self) -> Any:
+        if self._user is None:
+            self._user = self.github_client.get_user(self.username)
+        return self._user
+
+    def _search(self, query: str) -> SearchSample:
+        try:
+            results = self.github_client.search_issues(query)
+            sample = SearchSample(total=results.totalCount)
+
+            # Sample the first results to estimate the open/closed split;
+            # a smaller sample is fine when the deadline is close
+            for item in results:
+                if sample.sampled >= SEARCH_SAMPLE_SIZE or self.deadline.expired():
+                    break
+                sample.sampled += 1
+                if item.state == 'open':
+                    sample.open += 1
+            return sample
+        except GithubException:
+            # If search fails, report empty data
+            return SearchSample()
+
+    def _stream_repos(self, consumers: List[Any], records: Optional[List[RepoRecord]] = None) -> Dict[Any, Exception]:
+        # Listing preferences (e.g. sort by push date) are merged so one
+        # listing serves every consumer
+        listing: Dict[str, Any] = {}
+        for metric in consumers:
+            listing.update(metric.repo_listing())
+
+        self._step("Listing repositories...")
+        active = list(consumers)
+        try:
+            if records is None:
+                user = self._get_user()
+                expected = UserProfile.from_user(user).public_repos
+                records = list_repo_records(user, **listing)
+            else:
+                expected = len(records)
+            for metric in consumers:
+                metric.begin_repos(expected)
+
+            # Pages are fetched lazily, so stopping at the deadline also
+            # stops the listing
+            complete = True
+            for record in records:
+                active = [metric for metric in active if metric.consume_repo(record)]
+                if not active:
+                    break
+                if self.deadline.expired():
+                    complete = False
+                    break
+        except Exception as e:
+            return dict.fromkeys(consumers, e)
+
+        failures: Dict[Any, Exception] = {}
+        for metric in consumers:
+            try:
+                metric.end_repos(complete)
+            except Exception as e:
+                failures[metric] = e
+        return failures
+
+    def _step(self, description: str) -> None:
+        if self.on_step:
+            self.on_step(description)
@@ -1,77 +1,98 @@
 """Pull request statistics metric."""
 
-from typing import Dict, Any
-from github import GithubException
+from typing import Dict, Any, List, Optional
 from github_stats.metrics.base import BaseMetric
+from github_stats.metrics.exhaustive import SearchHistory, distribution, format_duration
+from github_stats.metrics.planner import Need, SEARCH, SEARCH_ALL
 
 
 class PullRequestMetric(BaseMetric):
     """Analyze pull request activity."""
 
-    def __init__(self, github_client, username: str):
-        """Initialize pull request metric."""
-        super().__init__(github_client, username)
+    def __init__(self, github_client, username: str, exhaustive: bool = False, **kwargs):
+        """
+        Initialize pull request metric.
+
+        Args:
+            exhaustive: Fetch every PR, beyond the search cap, for exact
+                counts and time-to-merge statistics
+        """
+        super().__init__(github_client, username, **kwargs)
+        self.exhaustive = exhaustive
         self.total_prs = 0
         self.merged_prs = 0
         self.open_prs = 0
         self.closed_prs = 0
+        self.time_to_merge: Optional[Dict[str, float]] = None
 
     #---------------------------------------------------------
     # Main execution
     #---------------------------------------------------------
 
-    def fetch(self) -> None:
-        """Fetch pull request data using GitHub search API."""
-        try:
-            # Search for PRs authored by user
-            query = f"type:pr author:{self.username}"
-            prs = self.github_client.search_issues(query)
-
-            # Count total and categorize by state
-            self.total_prs = prs.totalCount
-
-            # Sample PRs to categorize (limited to avoid rate limits)
-            merged = 0
-            open_count = 0
-            closed = 0
-
-            count = 0
-            for pr in prs:
-                # Limit sampling to avoid excessive API calls
-                if count >= 100:
-                    break
-                count += 1
-
-                if pr.state == 'open':
-                    open_count += 1
-                elif pr.pull_request and hasattr(pr, 'pull_request'):
-                    # Check if merged (requires additional API call)
-                    # For efficiency, we'll estimate based on closed state
-                    closed += 1
-
-            # Store data
-            self.open_prs = open_count
-            # Estimate merged/closed ratio from sample
-            if count > 0:
-                sample_closed = closed
-                sample_ratio = sample_closed / count if count > 0 else 0
-                estimated_closed = int(self.total_prs * sample_ratio)
-                self.merged_prs = estimated_closed
-                self.closed_prs = self.total_prs - self.open_prs - self.merged_prs
-            else:
-                self.merged_prs = 0
-                self.closed_prs = 0
-
-            self.data = {
-                'total': self.total_prs,
-                'merged': self.merged_prs,
-                'open': self.open_prs,
-                'closed': self.closed_prs
-            }
-
-        except GithubException as e:
-            # If search fails, return empty data
-            self.data = {'total': 0, 'merged': 0, 'open': 0, 'closed': 0}
+    def requires(self) -> List[Need]:
+        """PR counts come from one issue search, or all of its results."""
+        if self.exhaustive:
+            return [Need(SEARCH_ALL, (f"type:pr author:{self.username}", self.since, self.until))]
+        return [Need(SEARCH, self._query())]
+
+    def load(self, inputs: Dict[Need, Any]) -> None:
+        """Categorize pull requests from the search total and state sample."""
+        if self.exhaustive:
+            self._load_history(inputs[self.requires()[0]])
+            return
+
+        sample = inputs[Need(SEARCH, self._query())]
+
+        # Count total and categorize by state
+        self.total_prs = sample.total
+
+        # Store data
+        self.open_prs = sample.open
+        # Estimate merged/closed ratio from sample
+        if sample.sampled > 0:
+            sample_ratio = sample.closed / sample.sampled
+            estimated_closed = int(self.total_prs * sample_ratio)
+            self.merged_prs = estimated_closed
+            self.closed_prs = self.total_prs - self.open_prs - self.merged_prs
+        else:
+            self.merged_prs = 0
+            self.closed_prs = 0
+
+        self.data = {
+            'total': self.total_prs,
+            'merged': self.merged_prs,
+            'open': self.open_prs,
+            'closed': self.closed_prs
+        }
+
+    def restore(self, data: Dict[str, Any]) -> None:
+        """Take over the counts of an earlier run."""
+        self.data = data
+        self.total_prs = data['total']
+        self.open_prs = data['open']
+        self.merged_prs = data['merged']
+        self.closed_prs = data['closed']
+        self.time_to_merge = data.get('time_to_merge')
+
+    def _load_history(self, history: SearchHistory) -> None:
+        # Every PR is known, so the split is exact
+        self.total_prs = len(history)
+        self.open_prs = history.open
+        self.merged_prs = history.merged_count
+        self.closed_prs = self.total_prs - self.open_prs - self.merged_prs
+        self.time_to_merge = distribution(history.durations('merged'))
+
+        self.data = {
+            'total': self.total_prs,
+            'merged': self.merged_prs,
+            'open': self.open_prs,
+            'closed': self.closed_prs,
+            'time_to_merge': self.time_to_merge
+        }
+
+    def _query(self) -> str:
+        # Search for PRs authored by user
+        return f"type:pr author:{self.username}{self._created_qualifier()}"
 
     def process(self) -> None:
         """Process pull request data to calculate statistics."""
@@ -98,7 +119,10 @@ class PullRequestMetric(BaseMetric):
         if self.total_prs == 0:
             return "0, No PRs"
 
-        return f"{self.total_prs:,}, {int(self.merge_rate)}% closed"
+        summary = f"{self.total_prs:,}, {int(self.merge_rate)}% closed"
+        if self.time_to_merge and self.merged_prs:
+            summary += f", median {format_duration(self.time_to_merge['median'])} to merge"
+        return summary
 
     def get_detailed(self) -> Dict[str, Any]:
         """
@@ -107,10 +131,14 @@ class PullRequestMetric(BaseMetric):
         Returns:
             Dictionary with detailed PR information
         """
-        return {
+        detailed = {
             'total_prs': self.total_prs,
             'open': self.open_prs,
             'merged': self.merged_prs,
             'closed': self.closed_prs,
             'merge_rate': self.merge_rate
         }
+        if self.time_to_merge:
+            for statistic, hours in self.time_to_merge.items():
+                detailed[f'{statistic}_hours_to_merge'] = hours
+        return detailed
@@ -0,0 +1,214 @@
+"""Compact records built from GitHub API listing and search responses."""
+
+from datetime import datetime
+from typing import Any, Dict, Iterator, Optional
+from github_stats.metrics.streaming import stream
+
+
+class RepoRecord:
+    """
+    The handful of repository fields the metrics read.
+
+    Records are built from the listing payload alone, so reading them can
+    never trigger PyGithub's lazy completion (an extra GET per repo), and
+    with __slots__ they take a fraction of the memory of a Repository.
+    """
+
+    __slots__ = ('name', 'full_name', 'stars', 'forks', 'language', 'pushed_at', 'fork', 'archived')
+
+    def __init__(
+        self,
+        name: str,
+        full_name: str,
+        stars: int = 0,
+        forks: int = 0,
+        language: Optional[str] = None,
+        pushed_at: Optional[datetime] = None,
+        fork: bool = False,
+        archived: bool = False,
+    ):
+        self.name = name
+        self.full_name = full_name
+        self.stars = stars
+        self.forks = forks
+        self.language = language
+        self.pushed_at = pushed_at
+        self.fork = fork
+        self.archived = archived
+
+    def __repr__(self) -> str:
+        return f"RepoRecord({self.full_name!r}, stars={self.stars})"
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> 'RepoRecord':
+        """
+        Build a record from one element of a repository listing response.
+
+        Args:
+            data: Decoded JSON object for the repository
+        """
+        return cls(
+            name=data['name'],
+            full_name=data['full_name'],
+            stars=data.get('stargazers_count') or 0,
+            forks=data.get('forks_count') or 0,
+            language=data.get('language'),
+            pushed_at=_parse_timestamp(data.get('pushed_at')),
+            fork=bool(data.get('fork')),
+            archived=bool(data.get('archived')),
+        )
+
+    @classmethod
+    def from_graphql(cls, node: Dict[str, Any]) -> 'RepoRecord':
+        """
+        Build a record from a Repository node of a GraphQL response.
+
+        Args:
+            node: Decoded node with the fields GraphQLBatcher requests
+        """
+        return cls(
+            name=node['name'],
+            full_name=node['nameWithOwner'],
+            stars=node.get('stargazerCount') or 0,
+            forks=node.get('forkCount') or 0,
+            language=(node.get('primaryLanguage') or {}).get('name'),
+            pushed_at=_parse_timestamp(node.get('pushedAt')),
+            fork=bool(node.get('isFork')),
+            archived=bool(node.get('isArchived')),
+        )
+
+    @classmethod
+    def from_repository(cls, repo: Any) -> 'RepoRecord':
+        """
+        Build a record from a repository object returned by a listing.
+
+        PyGithub keeps the listing payload in _rawData; reading it directly
+        (rather than raw_data or the attributes) never completes the object.
+        Other repository-like objects are read through their attributes.
+
+        Args:
+            repo: PyGithub Repository or compatible object
+        """
+        raw = getattr(repo, '_rawData', None)
+        if isinstance(raw, dict):
+            return cls.from_json(raw)
+
+        return cls(
+            name=repo.name,
+            full_name=repo.full_name,
+            stars=repo.stargazers_count,
+            forks=getattr(repo, 'forks_count', 0),
+            language=getattr(repo, 'language', None),
+            pushed_at=getattr(repo, 'pushed_at', None),
+            fork=getattr(repo, 'fork', False),
+            archived=getattr(repo, 'archived', False),
+        )
+
+
+class UserProfile:
+    """The user profile fields the metrics read."""
+
+    __slots__ = ('login', 'followers', 'following', 'public_repos', 'email')
+
+    def __init__(
+        self,
+        login: str,
+        followers: int = 0,
+        following: int = 0,
+        public_repos: int = 0,
+        email: Optional[str] = None,
+    ):
+        self.login = login
+        self.followers = followers
+        self.following = following
+        self.public_repos = public_repos
+        self.email = email
+
+    def __repr__(self) -> str:
+        return f"UserProfile({self.login!r})"
+
+    @classmethod
+    def from_user(cls, user: Any) -> 'UserProfile':
+        """
+        Build a profile from a PyGithub NamedUser or compatible object.
+
+        Args:
+            user: User object returned by get_user()
+        """
+        raw = getattr(user, '_rawData', None)
+        if isinstance(raw, dict):
+            return cls(
+                login=raw.get('login'),
+                followers=raw.get('followers') or 0,
+                following=raw.get('following') or 0,
+                public_repos=raw.get('public_repos') or 0,
+                email=raw.get('email'),
+            )
+
+        return cls(
+            login=user.login,
+            followers=user.followers,
+            following=user.following,
+            public_repos=getattr(user, 'public_repos', 0),
+            email=getattr(user, 'email', None),
+        )
+
+
+class SearchSample:
+    """
+    Total count of an issue search plus the states of a sample of results.
+
+    Only the first page of results is sampled; metrics extrapolate the
+    open/closed split from it.
+    """
+
+    __slots__ = ('total', 'sampled', 'open')
+
+    def __init__(self, total: int = 0, sampled: int = 0, open: int = 0):
+        self.total = total
+        self.sampled = sampled
+        self.open = open
+
+    def __repr__(self) -> str:
+        return f"SearchSample(total={self.total}, sampled={self.sampled}, open={self.open})"
+
+    @property
+    def closed(self) -> int:
+        return self.sampled - self.open
+
+
+def iter_repo_records(github_client, username: str, **params: Any) -> Iterator[RepoRecord]:
+    """
+    List a user's repositories as compact records.
+
+    Args:
+        github_client: Authenticated PyGithub client
+        username: GitHub username whose repositories to list
+        **params: Listing parameters passed to get_repos() (type, sort, direction)
+
+    Yields:
+        One RepoRecord per repository, in listing order
+    """
+    yield from list_repo_records(github_client.get_user(username), **params)
+
+
+def list_repo_records(user: Any, **params: Any) -> Iterator[RepoRecord]:
+    """
+    List the repositories of an already fetched user as compact records.
+
+    Args:
+        user: PyGithub NamedUser
+        **params: Listing parameters passed to get_repos()
+
+    Yields:
+        One RepoRecord per repository, in listing order
+    """
+    for repo in stream(user.get_repos(**params)):
+        yield RepoRecord.from_repository(repo)
+
+
+def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    # GitHub timestamps are ISO 8601 in UTC, e.g. 2024-01-01T12:00:00Z
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
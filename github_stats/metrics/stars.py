@@ -1,55 +1,67 @@
 """Star statistics metric."""
 
-from typing import Dict, Any
-from github import GithubException
+from typing import Dict, Any, List
 from github_stats.metrics.base import BaseMetric
+from github_stats.metrics.planner import Need, REPOS
+from github_stats.metrics.records import RepoRecord
+from github_stats.metrics.streaming import RepoTally
 
 
 class StarMetric(BaseMetric):
     """Analyze repository star statistics."""
 
-    def __init__(self, github_client, username: str):
+    def __init__(self, github_client, username: str, **kwargs):
         """Initialize star metric."""
-        super().__init__(github_client, username)
+        super().__init__(github_client, username, **kwargs)
         self.total_stars = 0
         self.top_repo = None
-        self.repo_stars = {}
+        self.tally = RepoTally()
+        self.expected_repos = 0
+        self.seen_repos = 0
 
     #---------------------------------------------------------
     # Main execution
     #---------------------------------------------------------
 
-    def fetch(self) -> None:
-        """Fetch star data from all user repositories."""
-        user = self.github_client.get_user(self.username)
-        repos = user.get_repos()
-
-        self.repo_stars = {}
-
-        for repo in repos:
-            try:
-                stars = repo.stargazers_count
-                if stars > 0:
-                    self.repo_stars[repo.name] = stars
-            except GithubException:
-                # Skip repos we can't access
-                continue
-
-        self.data = self.repo_stars
+    def requires(self) -> List[Need]:
+        """Star counts are part of the repository listing."""
+        return [Need(REPOS)]
+
+    def begin_repos(self, expected: int = 0) -> None:
+        """Start a fresh tally."""
+        self.tally = RepoTally()
+        self.expected_repos = expected
+        self.seen_repos = 0
+
+    def consume_repo(self, record: RepoRecord) -> bool:
+        """Count the stars of one repository; no per-repo calls are needed."""
+        self.seen_repos += 1
+        if record.stars > 0:
+            self.tally.add(record.name, record.stars)
+        return True
+
+    def end_repos(self, complete: bool = True) -> None:
+        """Store the streamed aggregates."""
+        if not complete:
+            total = max(self.expected_repos, self.seen_repos)
+            self.mark_partial(f"listed {self.seen_repos:,}/{total:,} repos")
+
+        self.data = {
+            'total_stars': self.tally.total,
+            'repositories_with_stars': self.tally.count,
+            'top_repositories': self.tally.top(),
+        }
 
     def process(self) -> None:
         """Process star data to calculate statistics."""
-        if not self.data:
+        if not self.data or not self.data['repositories_with_stars']:
             self.total_stars = 0
             self.top_repo = None
             return
 
-        # Calculate total stars received
-        self.total_stars = sum(self.data.values())
-
-        # Find most starred repository
-        if self.data:
-            self.top_repo = max(self.data.items(), key=lambda x: x[1])
+        # Totals and the top repos were aggregated while streaming
+        self.total_stars = self.data['total_stars']
+        self.top_repo = self.data['top_repositories'][0]
 
     def get_summary(self) -> str:
         """
@@ -74,16 +86,11 @@ class StarMetric(BaseMetric):
         Returns:
             Dictionary with detailed star information
         """
-        # Sort repos by star count
-        sorted_repos = sorted(
-            self.data.items(),
-            key=lambda x: x[1],
-            reverse=True
-        )
+        repositories = self.data['repositories_with_stars'] if self.data else 0
 
         return {
             'total_stars': self.total_stars,
-            'repositories_with_stars': len(self.data),
-            'top_repositories': sorted_repos[:10],  # Top 10 starred repos
-            'average_per_repo': self.total_stars // len(self.data) if self.data else 0
+            'repositories_with_stars': repositories,
+            'top_repositories': self.data['top_repositories'] if self.data else [],  # Top 10 starred repos
+            'average_per_repo': self.total_stars // repositories if repositories else 0
         }
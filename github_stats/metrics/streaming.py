@@ -0,0 +1,95 @@
+"""Streaming helpers for aggregating per-repository metrics in bounded memory."""
+
+import heapq
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+from github.PaginatedList import PaginatedList
+
+# Number of repositories kept for the top-N breakdowns
+TOP_LIMIT = 10
+
+
+def stream(items: Iterable[Any]) -> Iterator[Any]:
+    """
+    Iterate over API results without retaining the ones already seen.
+
+    Iterating a PaginatedList directly appends every page to an internal
+    list, so a 50k-repo listing keeps 50k objects alive until the loop ends.
+    Pages are fetched here one at a time and dropped once consumed.
+
+    Args:
+        items: PaginatedList or any other iterable
+
+    Yields:
+        The items, in order
+    """
+    if not isinstance(items, PaginatedList):
+        yield from items
+        return
+
+    while items._couldGrow():
+        yield from items._fetchNextPage()
+
+
+class RepoTally:
+    """
+    Running total, count and top-N of per-repository values.
+
+    Only the N largest values are kept, in a bounded min-heap, so memory
+    does not grow with the number of repositories.
+    """
+
+    __slots__ = ('limit', 'total', 'count', '_heap', '_seen')
+
+    def __init__(self, limit: int = TOP_LIMIT):
+        """
+        Initialize an empty tally.
+
+        Args:
+            limit: Number of top entries to keep
+        """
+        self.limit = limit
+        self.total = 0
+        self.count = 0
+        self._heap: List[Tuple[int, int, str]] = []
+        self._seen = 0
+
+    def add(self, name: str, value: int) -> None:
+        """
+        Add one repository's value.
+
+        Args:
+            name: Repository name
+            value: Value to count for it
+        """
+        self.total += value
+        self.count += 1
+        self._seen += 1
+
+        # Ties keep the repository seen first, like max() and sorted() did
+        entry = (value, -self._seen, name)
+        if len(self._heap) < self.limit:
+            heapq.heappush(self._heap, entry)
+        elif entry > self._heap[0]:
+            heapq.heapreplace(self._heap, entry)
+
+    def top(self) -> List[Tuple[str, int]]:
+        """
+        Get the top entries, largest first.
+
+        Returns:
+            List of (name, value) tuples
+        """
+        return [(name, value) for value, _, name in sorted(self._heap, reverse=True)]
+
+    def best(self) -> Optional[Tuple[str, int]]:
+        """
+        Get the entry with the largest value.
+
+        Returns:
+            (name, value) tuple, or None when nothing was added
+        """
+        top = self.top()
+        return top[0] if top else None
+
+    def average(self) -> int:
+        return self.total // self.count if self.count else 0
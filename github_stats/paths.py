@@ -0,0 +1,21 @@
+#---------------------------------------------------------
+# Local data directory for github-stats
+#---------------------------------------------------------
+
+import os
+from pathlib import Path
+
+
+#---------------------------------------------------------
+# Main path functions
+#---------------------------------------------------------
+
+def get_data_dir() -> Path:
+    # Priority: GITHUB_STATS_HOME env var > ~/.github-stats
+    data_dir = Path(os.getenv('GITHUB_STATS_HOME') or Path.home() / '.github-stats')
+    data_dir.mkdir(parents=True, exist_ok=True)
+    return data_dir
+
+
+def get_data_file(name: str) -> Path:
+    return get_data_dir() / name
@@ -0,0 +1,368 @@
+#---------------------------------------------------------
+# Request policy: timeouts, retries and hedged GETs
+#---------------------------------------------------------
+
+import contextvars
+import random
+import threading
+import time
+import urllib.parse
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import requests
+from github import GithubException
+from github.Requester import Requester
+from github_stats.auth import get_requester
+from github_stats.concurrency import ConcurrencyController
+from github_stats.deadline import Deadline, DeadlineExceeded
+
+# Seconds a single request may wait for the server before it is retried
+REQUEST_TIMEOUT = 15
+
+# Retries for 5xx responses and connection errors, with full-jitter
+# exponential backoff starting at BACKOFF_BASE seconds
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 8.0
+
+# Hedging: once enough GET latencies are known, a duplicate is sent when the
+# first request is still running after the p95 latency. At most HEDGE_RATIO of
+# requests are hedged so duplicates never cost much rate limit.
+HEDGE_MIN_SAMPLES = 20
+HEDGE_MIN_DELAY = 0.1
+HEDGE_RATIO = 0.1
+LATENCY_WINDOW = 200
+
+# Send function: (verb, url, parameters, headers, input) -> (headers, data)
+Send = Callable[[str, str, Optional[Dict[str, Any]], Optional[Dict[str, str]], Optional[Any]], Tuple[Dict[str, Any], Any]]
+
+# Check function: (status, headers, body) -> (headers, data)
+Check = Callable[[int, Dict[str, Any], str], Tuple[Dict[str, Any], Any]]
+
+
+class RequestStats:
+    """Counters describing what the request policy did."""
+
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.timeouts = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.latencies: deque = deque(maxlen=LATENCY_WINDOW)
+        self.lock = threading.Lock()
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """
+        Get a latency percentile over the recent window, in seconds.
+
+        Returns:
+            The percentile, or None before any request finished
+        """
+        with self.lock:
+            samples = sorted(self.latencies)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(fraction * len(samples)))]
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'requests': self.requests,
+            'retries': self.retries,
+            'timeouts': self.timeouts,
+            'hedges': self.hedges,
+            'hedge_wins': self.hedge_wins,
+            'p50': self.percentile(0.5),
+            'p95': self.percentile(0.95),
+        }
+
+
+class RequestPolicy:
+    """
+    Wrap every API request of a PyGithub client in a retry and hedging policy.
+
+    Requests that fail with a 5xx status, a connection error or a timeout are
+    retried with full-jitter exponential backoff. Idempotent GETs that are
+    still running after the recent p95 latency get a duplicate request, and
+    whichever answers first wins.
+    """
+
+    def __init__(
+        self,
+        timeout: float = REQUEST_TIMEOUT,
+        retries: int = MAX_RETRIES,
+        hedge: bool = True,
+        controller: Optional[ConcurrencyController] = None,
+        deadline: Optional[Deadline] = None,
+    ):
+        """
+        Initialize the policy.
+
+        Args:
+            timeout: Seconds a single request may wait for the server
+            retries: Retries after the first attempt for transient failures
+            hedge: Whether to send hedged duplicates of slow GETs
+            controller: Concurrency controller to report latency and
+                throttling to (optional)
+            deadline: Run deadline after which no request or retry starts
+                (optional; bind() sets one for a single collection)
+        """
+        self.timeout = timeout
+        self.retries = retries
+        self.hedge = hedge
+        self.controller = controller
+        self.deadline = deadline
+        self.stats = RequestStats()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._idle: List[Any] = []
+        self._idle_lock = threading.Lock()
+        self._bound: contextvars.ContextVar[Optional[Deadline]] = contextvars.ContextVar('deadline', default=None)
+
+    #---------------------------------------------------------
+    # Installation
+    #---------------------------------------------------------
+
+    def install(self, github_client) -> bool:
+        """
+        Route all requests of a client through this policy.
+
+        Every PyGithub object made by the client (users, lazy repos,
+        paginated lists) shares its requester, so patching the requester
+        covers them all.
+
+        Returns:
+            False if the client has no PyGithub requester (e.g. a test double)
+        """
+        requester = get_requester(github_client)
+        if not isinstance(requester, Requester):
+            return False
+
+        original = requester.requestJsonAndCheck
+
+        def request_json_and_check(verb, url, parameters=None, headers=None, input=None):
+            if not self._same_host(requester, url):
+                return original(verb, url, parameters, headers, input)
+            return self.request(self.sender(requester), verb, url, parameters, headers, input)
+
+        requester.requestJsonAndCheck = request_json_and_check
+        return True
+
+    #---------------------------------------------------------
+    # Main execution
+    #---------------------------------------------------------
+
+    def request(
+        self,
+        send: Send,
+        verb: str,
+        url: str,
+        parameters: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        input: Optional[Any] = None,
+    ) -> Tuple[Dict[str, Any], Any]:
+        """
+        Send a request under the policy.
+
+        Args:
+            send: Function sending one attempt and returning (headers, data)
+
+        Raises:
+            GithubException: For non-retryable errors, or after the last retry
+            DeadlineExceeded: If the deadline passed before an attempt started
+        """
+        args = (verb, url, parameters, headers, input)
+        attempt = 0
+        while True:
+            # Calls abandoned at the deadline keep running in the background;
+            # this stops them at their next request
+            deadline = self._bound.get() or self.deadline
+            if deadline is not None and deadline.expired():
+                raise DeadlineExceeded("deadline reached")
+            try:
+                if verb == 'GET' and self.hedge:
+                    return self._hedged(send, args)
+                return self._timed(send, args)
+            except Exception as e:
+                throttled = _is_throttled(e)
+                if throttled and self.controller is not None:
+                    self.controller.throttle(_retry_after(e))
+                if attempt >= self.retries or not (throttled or _is_transient(e)):
+                    raise
+                if isinstance(e, requests.exceptions.Timeout):
+                    self._count('timeouts')
+                self._count('retries')
+                delay = random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+                if throttled:
+                    # Secondary limits say how long to wait; waiting less
+                    # only gets the request throttled again
+                    delay = max(delay, _retry_after(e) or 0)
+                if deadline is None:
+                    time.sleep(delay)
+                else:
+                    # Never back off past the deadline; the next attempt
+                    # then stops at the check above
+                    deadline.sleep(delay)
+                attempt += 1
+
+    @contextmanager
+    def bind(self, deadline: Deadline) -> Iterator[None]:
+        """
+        Stop requests of one collection at its deadline.
+
+        The deadline holds for requests made in this context and in work it
+        hands to Deadline.call or the concurrency controller, which copy the
+        context. Work abandoned at the deadline thus stays stopped after the
+        block ends, while later requests (e.g. watch refreshes) are not.
+        """
+        token = self._bound.set(deadline)
+        try:
+            yield
+        finally:
+            self._bound.reset(token)
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def sender(self, requester: Requester, check: Optional[Check] = None) -> Send:
+        """
+        Get a function sending one attempt through a requester.
+
+        PyGithub shares one connection object per requester, which is not
+        safe to use from several threads at once, so each request checks
+        out a connection of its own and returns it for reuse.
+
+        Args:
+            requester: PyGithub Requester
+            check: Decodes (status, headers, body) into (headers, data) and
+                raises for errors; defaults to PyGithub's
+        """
+        check = check or requester._Requester__check
+
+        def send(verb, url, parameters, headers, input):
+            connection = self._acquire(requester)
+            try:
+                status, response_headers, output = requester.requestJson(
+                    verb, url, parameters, headers, input, connection
+                )
+            finally:
+                self._release(connection)
+            return check(status, response_headers, output)
+
+        return send
+
+    #---------------------------------------------------------
+    # Hedging
+    #---------------------------------------------------------
+
+    def _hedged(self, send: Send, args: Tuple) -> Tuple[Dict[str, Any], Any]:
+        delay = self._hedge_delay()
+        if delay is None:
+            return self._timed(send, args)
+
+        executor = self._get_executor()
+        primary = executor.submit(self._timed, send, args)
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+
+        self._count('hedges')
+        hedge = executor.submit(self._timed, send, args)
+        pending = {primary, hedge}
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        self._count('hedge_wins')
+                    return future.result()
+                error = future.exception()
+
+        # Both attempts failed; let the retry loop decide
+        raise error
+
+    def _hedge_delay(self) -> Optional[float]:
+        stats = self.stats
+        if len(stats.latencies) < HEDGE_MIN_SAMPLES or stats.hedges >= HEDGE_RATIO * stats.requests:
+            return None
+        return max(HEDGE_MIN_DELAY, stats.percentile(0.95))
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            # Every GET runs here once hedging starts: room for the most
+            # concurrent requests the controller allows, plus their hedges
+            concurrency = self.controller.maximum if self.controller is not None else 1
+            self._executor = ThreadPoolExecutor(max_workers=2 * concurrency, thread_name_prefix='github-stats-hedge')
+        return self._executor
+
+    #---------------------------------------------------------
+    # Helper functions
+    #---------------------------------------------------------
+
+    def _timed(self, send: Send, args: Tuple) -> Tuple[Dict[str, Any], Any]:
+        self._count('requests')
+        start = time.monotonic()
+        result = send(*args)
+        latency = time.monotonic() - start
+        with self.stats.lock:
+            self.stats.latencies.append(latency)
+        if self.controller is not None:
+            self.controller.observe(latency)
+        return result
+
+    def _count(self, counter: str) -> None:
+        with self.stats.lock:
+            setattr(self.stats, counter, getattr(self.stats, counter) + 1)
+
+    def _acquire(self, requester: Requester) -> Any:
+        with self._idle_lock:
+            if self._idle:
+                return self._idle.pop()
+        return requester._Requester__connectionClass(
+            requester._Requester__hostname,
+            requester._Requester__port,
+            retry=requester._Requester__retry,
+            pool_size=requester._Requester__pool_size,
+            timeout=self.timeout,
+            verify=requester._Requester__verify,
+        )
+
+    def _release(self, connection: Any) -> None:
+        with self._idle_lock:
+            self._idle.append(connection)
+
+    @staticmethod
+    def _same_host(requester: Requester, url: str) -> bool:
+        if url.startswith('/'):
+            return True
+        return urllib.parse.urlparse(url).hostname == requester._Requester__hostname
+
+
+def _is_transient(error: Exception) -> bool:
+    if isinstance(error, GithubException):
+        return error.status >= 500
+    return isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+
+
+def _is_throttled(error: Exception) -> bool:
+    # 429s and secondary (abuse) limits ease off; an exhausted primary rate
+    # limit does not, so it is never retried
+    if not isinstance(error, GithubException):
+        return False
+    if error.status == 429:
+        return True
+    message = error.data.get('message', '') if isinstance(error.data, dict) else ''
+    return error.status == 403 and Requester.isSecondaryRateLimitError(message)
+
+
+def _retry_after(error: GithubException) -> Optional[float]:
+    value = (error.headers or {}).get('retry-after')
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
@@ -0,0 +1,262 @@
+#---------------------------------------------------------
+# Raw REST backend: JSON in, the fields the metrics read out
+#---------------------------------------------------------
+
+import json
+import re
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from github_stats.auth import get_requester
+from github_stats.policy import RequestPolicy
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Backends selectable with --backend
+PYGITHUB = 'pygithub'
+REST = 'rest'
+BACKENDS = (PYGITHUB, REST)
+
+# Items per page (the API maximum; PyGithub defaults to 30)
+PAGE_SIZE = 100
+
+NEXT_PAGE = re.compile(r'<([^>]+)>;\s*rel="next"')
+
+
+def loads(body: Any) -> Any:
+    """
+    Decode a JSON response body, with orjson when it is installed.
+    """
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+class Raw:
+    """
+    Read-only attribute view of one decoded JSON object.
+
+    Stands in for PyGithub objects where only a few fields are read:
+    attribute access is a dict lookup and nothing is ever completed.
+    _rawData is the name PyGithub uses, so records read it the same way.
+    """
+
+    __slots__ = ('_rawData',)
+
+    def __init__(self, data: Dict[str, Any]):
+        self._rawData = data
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            return self._rawData[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __repr__(self) -> str:
+        return f"Raw({self._rawData!r})"
+
+
+class RestClient:
+    """
+    PyGithub client stand-in that decodes REST responses directly.
+
+    Covers the calls metrics and the fetch planner make per item (user,
+    repository listing, issue search, commit listing, contributors and
+    contributor statistics) without building PyGithub objects, and pages
+    by 100. Everything else is passed through to the wrapped client, so
+    authentication, rate limit checks and GraphQL keep working.
+    """
+
+    def __init__(self, github_client, policy: Optional[RequestPolicy] = None):
+        """
+        Initialize the backend.
+
+        Args:
+            github_client: Authenticated PyGithub client whose requester
+                sends the requests
+            policy: Request policy to time out, retry and hedge requests
+                with (optional)
+        """
+        self.github_client = github_client
+        self.requester = get_requester(github_client)
+        self.policy = policy
+        self._send = policy.sender(self.requester, self._check) if policy is not None else None
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.github_client, name)
+
+    #---------------------------------------------------------
+    # Client calls
+    #---------------------------------------------------------
+
+    def get_user(self, login: Optional[str] = None) -> Any:
+        if login is None:
+            # The authenticated user
+            return self.github_client.get_user()
+        _, data = self.get(f"/users/{login}")
+        return RestUser(self, data)
+
+    def get_repo(self, full_name: str, lazy: bool = False) -> 'RestRepo':
+        # Repositories are only used for per-repository calls, so even a
+        # non-lazy one is not fetched
+        return RestRepo(self, full_name)
+
+    def search_issues(self, query: str) -> 'RestSearch':
+        return RestSearch(self, "/search/issues", {'q': query})
+
+    #---------------------------------------------------------
+    # Requests
+    #---------------------------------------------------------
+
+    def get(self, url: str, parameters: Optional[Dict[str, Any]] = None) -> Tuple[Dict[str, Any], Any]:
+        """
+        Send a GET and decode the response.
+
+        Raises:
+            GithubException: For error responses, as PyGithub raises them
+        """
+        if self.policy is not None:
+            return self.policy.request(self._send, "GET", url, parameters)
+        return self._check(*self.requester.requestJson("GET", url, parameters))
+
+    def pages(self, url: str, parameters: Optional[Dict[str, Any]] = None) -> Iterator[Tuple[Dict[str, Any], Any]]:
+        """
+        Get every page of a listing, following the Link header.
+        """
+        parameters = dict(parameters or {}, per_page=PAGE_SIZE)
+        next_url: Optional[str] = url
+        while next_url:
+            headers, data = self.get(next_url, parameters)
+            yield headers, data
+            next_url = _next_page(headers.get('link'))
+            # The next link carries the parameters
+            parameters = None
+
+    def items(self, url: str, parameters: Optional[Dict[str, Any]] = None) -> Iterator[Raw]:
+        for _, data in self.pages(url, parameters):
+            for item in data or []:
+                yield Raw(item)
+
+    def _check(self, status: int, headers: Dict[str, Any], body: Any) -> Tuple[Dict[str, Any], Any]:
+        data = loads(body) if body else None
+        if status >= 400:
+            raise self.requester.createException(status, headers, data)
+        return headers, data
+
+
+class RestUser(Raw):
+    """A user profile with the repository listing."""
+
+    __slots__ = ('_client',)
+
+    def __init__(self, client: RestClient, data: Dict[str, Any]):
+        super().__init__(data)
+        self._client = client
+
+    def get_repos(self, **params: Any) -> Iterator[Raw]:
+        """
+        List the user's repositories (type, sort and direction as in the API).
+        """
+        return self._client.items(f"/users/{self.login}/repos", params)
+
+
+class RestRepo:
+    """A repository known by name only, for per-repository calls."""
+
+    __slots__ = ('_client', 'full_name', 'url')
+
+    def __init__(self, client: RestClient, full_name: str):
+        self._client = client
+        self.full_name = full_name
+        self.url = f"/repos/{full_name}"
+
+    def get_commits(
+        self,
+        author: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> Iterator[Raw]:
+        params: Dict[str, Any] = {}
+        if author:
+            params['author'] = author
+        if since:
+            params['since'] = _timestamp(since)
+        if until:
+            params['until'] = _timestamp(until)
+        return self._client.items(f"{self.url}/commits", params)
+
+    def get_contributors(self) -> Iterator[Raw]:
+        return self._client.items(f"{self.url}/contributors")
+
+    def get_stats_contributors(self) -> Optional[List['ContributorStats']]:
+        """
+        Get contributor statistics, or None while GitHub computes them.
+        """
+        _, data = self._client.get(f"{self.url}/stats/contributors")
+        if not data:
+            return None
+        return [ContributorStats(entry) for entry in data]
+
+
+class ContributorStats:
+    """One contributor's total and weekly commit counts."""
+
+    __slots__ = ('author', 'total', 'weeks')
+
+    def __init__(self, data: Dict[str, Any]):
+        author = data.get('author')
+        self.author = Raw(author) if author else None
+        self.total = data.get('total', 0)
+        self.weeks = [Week(week) for week in data.get('weeks') or []]
+
+
+class Week:
+    """Commits in the week starting at w."""
+
+    __slots__ = ('w', 'c')
+
+    def __init__(self, data: Dict[str, Any]):
+        self.w = datetime.fromtimestamp(data['w'], tz=timezone.utc)
+        self.c = data.get('c', 0)
+
+
+class RestSearch:
+    """Issue search results: the total count and the items, paged by 100."""
+
+    def __init__(self, client: RestClient, url: str, parameters: Dict[str, Any]):
+        self._client = client
+        self._pages = client.pages(url, parameters)
+        self._first: Optional[Dict[str, Any]] = None
+
+    @property
+    def totalCount(self) -> int:
+        return self._first_page().get('total_count', 0)
+
+    def __iter__(self) -> Iterator[Raw]:
+        for item in self._first_page().get('items') or []:
+            yield Raw(item)
+        for _, data in self._pages:
+            for item in (data or {}).get('items') or []:
+                yield Raw(item)
+
+    def _first_page(self) -> Dict[str, Any]:
+        if self._first is None:
+            _, self._first = next(self._pages)
+            self._first = self._first or {}
+        return self._first
+
+
+#---------------------------------------------------------
+# Helper functions
+#---------------------------------------------------------
+
+def _next_page(link: Optional[str]) -> Optional[str]:
+    match = NEXT_PAGE.search(link or '')
+    return match.group(1) if match else None
+
+
+def _timestamp(value: datetime) -> str:
+    return value.strftime('%Y-%m-%dT%H:%M:%SZ')
@@ -0,0 +1,266 @@
+#---------------------------------------------------------
+# Incremental stargazer history per repository
+#---------------------------------------------------------
+
+import json
+import math
+import sqlite3
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from github_stats.deadline import Deadline, DeadlineExceeded
+from github_stats.paths import get_data_file
+
+STARS_DB = 'stars.db'
+
+# Stargazers per page (the API maximum)
+PAGE_SIZE = 100
+
+# The stargazer listing refuses pages past this many stargazers, so the
+# newest stars of larger repositories cannot be listed
+STARGAZER_LIMIT = 40000
+
+# Media type that adds starred_at to each stargazer
+STARRING_MEDIA_TYPE = "application/vnd.github.star+json"
+
+SECONDS_PER_DAY = 86400
+
+# Each repository keeps a cursor: the newest starred_at seen and the
+# logins starred at that second. The series is one cumulative total per
+# day, clustered on (repo_id, day), so a repository's history is one
+# primary-key range scan.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS repos (
+    id INTEGER PRIMARY KEY,
+    full_name TEXT NOT NULL UNIQUE,
+    cursor_at INTEGER,
+    cursor_logins TEXT
+);
+CREATE TABLE IF NOT EXISTS star_points (
+    repo_id INTEGER NOT NULL,
+    day INTEGER NOT NULL,
+    total INTEGER NOT NULL,
+    PRIMARY KEY (repo_id, day)
+) WITHOUT ROWID;
+"""
+
+
+class StarHistoryStore:
+    """Cumulative star counts per repository and day, backed by SQLite."""
+
+    def __init__(self, path: Optional[Union[str, Path]] = None):
+        """
+        Open (and create if needed) the star history database.
+
+        Args:
+            path: Database file, defaults to stars.db in the data directory
+        """
+        self.path = Path(path) if path else get_data_file(STARS_DB)
+        self.connection = sqlite3.connect(str(self.path))
+        self.connection.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> 'StarHistoryStore':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    #---------------------------------------------------------
+    # Cursor and series
+    #---------------------------------------------------------
+
+    def cursor(self, full_name: str) -> Optional[Tuple[int, List[str]]]:
+        """
+        Get the newest star seen for a repository.
+
+        Returns:
+            (starred_at, logins starred at that second), or None before
+            the first refresh
+        """
+        row = self.connection.execute(
+            "SELECT cursor_at, cursor_logins FROM repos WHERE full_name = ?", (full_name,)
+        ).fetchone()
+        if row is None or row[0] is None:
+            return None
+        return row[0], json.loads(row[1])
+
+    def advance(
+        self,
+        full_name: str,
+        stars: List[Tuple[int, str]],
+        total: int,
+        now: Optional[int] = None,
+    ) -> None:
+        """
+        Add newly seen stars to the series and move the cursor past them.
+
+        The day of the refresh is set to the repository's actual count, so
+        stars removed since the last refresh show up as a drop there.
+
+        Args:
+            full_name: Repository full name (owner/name)
+            stars: New (starred_at, login) pairs, in any order
+            total: The repository's current stargazer count
+            now: Unix time of the refresh, defaults to now
+        """
+        now = int(time.time()) if now is None else int(now)
+        repo_id = self._repo_id(full_name)
+        previous = self.cursor(full_name)
+
+        per_day: Dict[int, int] = {}
+        for starred_at, _ in stars:
+            day = starred_at // SECONDS_PER_DAY
+            per_day[day] = per_day.get(day, 0) + 1
+
+        with self.connection:
+            running = self._latest_total(repo_id)
+            for day in sorted(per_day):
+                running += per_day[day]
+                self._put_point(repo_id, day, running)
+            self._put_point(repo_id, now // SECONDS_PER_DAY, total)
+
+            if stars:
+                newest = max(starred_at for starred_at, _ in stars)
+                logins = sorted({login for starred_at, login in stars if starred_at == newest})
+                if previous is not None and previous[0] == newest:
+                    logins = sorted(set(logins) | set(previous[1]))
+                self.connection.execute(
+                    "UPDATE repos SET cursor_at = ?, cursor_logins = ? WHERE id = ?",
+                    (newest, json.dumps(logins), repo_id)
+                )
+
+    def series(self, full_name: str, since: Optional[int] = None) -> List[Tuple[int, int]]:
+        """
+        Get the (day start as Unix time, cumulative stars) points of a repository.
+        """
+        first_day = since // SECONDS_PER_DAY if since is not None else 0
+        cursor = self.connection.execute(
+            "SELECT p.day, p.total FROM star_points p JOIN repos r ON r.id = p.repo_id "
+            "WHERE r.full_name = ? AND p.day >= ? ORDER BY p.day",
+            (full_name, first_day)
+        )
+        return [(day * SECONDS_PER_DAY, total) for day, total in cursor.fetchall()]
+
+    def total_at(self, full_name: str, at: int) -> Optional[int]:
+        """
+        Get the cumulative stars at the end of the day containing a Unix time.
+        """
+        row = self.connection.execute(
+            "SELECT p.total FROM star_points p JOIN repos r ON r.id = p.repo_id "
+            "WHERE r.full_name = ? AND p.day <= ? ORDER BY p.day DESC LIMIT 1",
+            (full_name, at // SECONDS_PER_DAY)
+        ).fetchone()
+        return row[0] if row else None
+
+    #---------------------------------------------------------
+    # Helper methods
+    #---------------------------------------------------------
+
+    def _repo_id(self, full_name: str) -> int:
+        with self.connection:
+            self.connection.execute("INSERT OR IGNORE INTO repos (full_name) VALUES (?)", (full_name,))
+        return self.connection.execute("SELECT id FROM repos WHERE full_name = ?", (full_name,)).fetchone()[0]
+
+    def _latest_total(self, repo_id: int) -> int:
+        row = self.connection.execute(
+            "SELECT total FROM star_points WHERE repo_id = ? ORDER BY day DESC LIMIT 1", (repo_id,)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def _put_point(self, repo_id: int, day: int, total: int) -> None:
+        self.connection.execute(
+            "INSERT OR REPLACE INTO star_points (repo_id, day, total) VALUES (?, ?, ?)",
+            (repo_id, day, total)
+        )
+
+
+#---------------------------------------------------------
+# Refreshing from the API
+#---------------------------------------------------------
+
+def refresh_repo(
+    requester: Any,
+    store: StarHistoryStore,
+    full_name: str,
+    stars: int,
+    deadline: Optional[Deadline] = None,
+) -> int:
+    """
+    Fetch the stars added since the last refresh, newest first.
+
+    Stargazers are listed oldest first, so paging starts at the last page,
+    computed from the known star count, and walks backwards until it
+    reaches the stored cursor. A daily refresh of an active repository
+    costs a page or two; the first one lists every stargazer. Nothing is
+    stored unless the refresh completes.
+
+    Args:
+        requester: PyGithub Requester (see auth.get_requester)
+        store: Star history store
+        full_name: Repository full name (owner/name)
+        stars: The repository's current stargazer count
+        deadline: Time by which fetching must stop (optional)
+
+    Returns:
+        Number of pages fetched
+
+    Raises:
+        DeadlineExceeded: If the deadline passed before the cursor was reached
+    """
+    deadline = deadline or Deadline()
+    if stars > STARGAZER_LIMIT:
+        # The newest stars are out of reach; only the count is recorded
+        store.advance(full_name, [], stars)
+        return 0
+
+    cursor = store.cursor(full_name)
+    new: List[Tuple[int, str]] = []
+    pages = 0
+    for page in range(math.ceil(stars / PAGE_SIZE), 0, -1):
+        if deadline.expired():
+            raise DeadlineExceeded()
+        _, data = requester.requestJsonAndCheck(
+            "GET", f"/repos/{full_name}/stargazers",
+            {'per_page': PAGE_SIZE, 'page': page},
+            {'Accept': STARRING_MEDIA_TYPE}
+        )
+        pages += 1
+        if _collect(data or [], cursor, new):
+            break
+
+    store.advance(full_name, new, stars)
+    return pages
+
+
+#---------------------------------------------------------
+# Helper functions
+#---------------------------------------------------------
+
+def _collect(
+    page: List[Dict[str, Any]],
+    cursor: Optional[Tuple[int, List[str]]],
+    new: List[Tuple[int, str]],
+) -> bool:
+    # Walk one page newest first; True once the cursor is reached. A star
+    # older than the cursor also stops the walk, in case the cursor's
+    # stargazer has since unstarred.
+    for entry in reversed(page):
+        starred_at = _timestamp(entry.get('starred_at'))
+        login = (entry.get('user') or {}).get('login', '')
+        if cursor is not None:
+            cursor_at, cursor_logins = cursor
+            if starred_at < cursor_at or (starred_at == cursor_at and login in cursor_logins):
+                return True
+        new.append((starred_at, login))
+    return False
+
+
+def _timestamp(value: Optional[str]) -> int:
+    if not value:
+        return 0
+    return int(datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp())
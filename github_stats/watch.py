@@ -0,0 +1,130 @@
+#---------------------------------------------------------
+# Event polling for incremental refresh in --watch mode
+#---------------------------------------------------------
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+# Seconds between polls when the API does not send X-Poll-Interval
+DEFAULT_POLL_INTERVAL = 60
+
+# Event types and the metrics they can change
+EVENT_METRICS = {
+    'PushEvent': 'Commits',
+    'WatchEvent': 'Stars',
+    'PullRequestEvent': 'Pull Requests',
+    'IssuesEvent': 'Issues',
+}
+
+# Fetches a URL with extra headers and returns (response headers, data)
+Fetch = Callable[[str, Dict[str, str]], Tuple[Dict[str, Any], Any]]
+
+
+class EventFeed:
+    """
+    Conditional poller for one GitHub events feed.
+
+    Every poll sends the last ETag; an unchanged feed answers 304, which
+    does not count against the rate limit. The first poll only records
+    where the feed stands, so events from before watching started are
+    not reported.
+    """
+
+    def __init__(self, fetch: Fetch, url: str):
+        """
+        Initialize the feed.
+
+        Args:
+            fetch: Function performing the GET (e.g. through the PyGithub requester)
+            url: Feed path, e.g. /users/octocat/events
+        """
+        self.fetch = fetch
+        self.url = url
+        self.etag: Optional[str] = None
+        self.last_id: Optional[int] = None
+        self.interval = DEFAULT_POLL_INTERVAL
+
+    def poll(self) -> List[Dict[str, Any]]:
+        """
+        Get the events added since the previous poll, oldest first.
+        """
+        headers = {'If-None-Match': self.etag} if self.etag else {}
+        response_headers, events = self.fetch(self.url, headers)
+
+        interval = response_headers.get('x-poll-interval')
+        if interval and str(interval).isdigit():
+            self.interval = int(interval)
+        self.etag = response_headers.get('etag') or self.etag
+
+        # 304 Not Modified has no body
+        if not events:
+            return []
+
+        newest = max(int(event['id']) for event in events)
+        if self.last_id is None:
+            self.last_id = newest
+            return []
+
+        fresh = [event for event in events if int(event['id']) > self.last_id]
+        self.last_id = max(self.last_id, newest)
+        return sorted(fresh, key=lambda event: int(event['id']))
+
+
+class EventWatcher:
+    """
+    Polls a user's activity and works out which metrics it affects.
+
+    The user's own feed carries their pushes, pull requests and issues;
+    stars on their repositories arrive as WatchEvents in the feed of
+    repositories they watch (owners watch their own by default).
+    """
+
+    def __init__(self, fetch: Fetch, username: str):
+        self.username = username
+        self.feeds = [
+            EventFeed(fetch, f"/users/{username}/events"),
+            EventFeed(fetch, f"/users/{username}/received_events"),
+        ]
+
+    @property
+    def interval(self) -> int:
+        # Honour the slowest rate any feed asked for
+        return max(feed.interval for feed in self.feeds)
+
+    def poll(self) -> Set[str]:
+        """
+        Poll every feed.
+
+        Returns:
+            Names of the metrics new events affect
+        """
+        affected = set()
+        for feed in self.feeds:
+            affected |= affected_metrics(feed.poll(), self.username)
+        return affected
+
+
+def affected_metrics(events: Iterable[Dict[str, Any]], username: str) -> Set[str]:
+    """
+    Map events to the metrics they change for a user.
+
+    Args:
+        events: Events API payloads
+        username: User whose metrics are shown
+
+    Returns:
+        Metric names, e.g. {'Commits', 'Stars'}
+    """
+    login = username.lower()
+    affected = set()
+    for event in events:
+        metric = EVENT_METRICS.get(event.get('type'))
+        if metric is None:
+            continue
+        actor = ((event.get('actor') or {}).get('login') or '').lower()
+        owner = ((event.get('repo') or {}).get('name') or '').split('/', 1)[0].lower()
+        if metric == 'Stars':
+            if owner == login:
+                affected.add(metric)
+        elif actor == login:
+            affected.add(metric)
+    return affected
@@ -0,0 +1,269 @@
+#---------------------------------------------------------
+# Webhook receiver keeping the metrics cache current
+#---------------------------------------------------------
+
+import hashlib
+import hmac
+import json
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from github_stats.cache import MetricsCache
+
+# Top repositories kept in StarMetric data
+TOP_REPOSITORIES = 10
+
+
+def verify_signature(secret: str, body: bytes, signature: Optional[str]) -> bool:
+    """
+    Check a delivery's X-Hub-Signature-256 header.
+
+    Args:
+        secret: Webhook secret configured on GitHub
+        body: Raw request body
+        signature: Header value, "sha256=<hex digest>"
+
+    Returns:
+        True if the body was signed with the secret
+    """
+    if not signature or not signature.startswith('sha256='):
+        return False
+    expected = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature[len('sha256='):])
+
+
+def apply_delivery(cache: MetricsCache, event: str, payload: Dict[str, Any]) -> List[str]:
+    """
+    Update the cache for one webhook delivery.
+
+    Pushes to a default branch drop the cached Commits and Contributions
+    of the pusher and commit authors, and opening a pull request or issue
+    drops the author's Contributions. Stars, and pull requests and issues
+    being opened or closed, adjust the cached counts; changes a count
+    cannot express (e.g. reopening) drop the entry instead.
+
+    Args:
+        cache: Metrics cache
+        event: X-GitHub-Event header (push, star, pull_request, issues, ...)
+        payload: Decoded delivery body
+
+    Returns:
+        Descriptions of the changes, for logging
+    """
+    handler = HANDLERS.get(event)
+    return handler(cache, payload) if handler else []
+
+
+#---------------------------------------------------------
+# Event handlers
+#---------------------------------------------------------
+
+def _on_push(cache: MetricsCache, payload: Dict[str, Any]) -> List[str]:
+    repository = payload.get('repository') or {}
+    if payload.get('ref') != f"refs/heads/{repository.get('default_branch')}":
+        # Only the default branch is counted
+        return []
+
+    logins = {(payload.get('sender') or {}).get('login')}
+    logins.update((commit.get('author') or {}).get('username') for commit in payload.get('commits') or [])
+
+    changes = []
+    for login in sorted(login for login in logins if login):
+        for metric in ('Commits', 'Contributions'):
+            if cache.invalidate(login, metric):
+                changes.append(f"dropped {metric} of {login}")
+    return changes
+
+
+def _on_star(cache: MetricsCache, payload: Dict[str, Any]) -> List[str]:
+    repository = payload.get('repository') or {}
+    owner = (repository.get('owner') or {}).get('login')
+    delta = {'created': 1, 'deleted': -1}.get(payload.get('action'))
+    if not owner or delta is None:
+        return []
+
+    name = repository.get('name')
+    count = repository.get('stargazers_count', 0)
+
+    def change(data: Dict[str, Any]) -> bool:
+        top = [list(row) for row in data['top_repositories'] if row[0] != name]
+        previous = count - delta
+        if delta < 0 and len(data['top_repositories']) >= TOP_REPOSITORIES and len(top) < TOP_REPOSITORIES:
+            # A repository outside the list may now belong in it
+            return False
+        data['total_stars'] += delta
+        if previous == 0:
+            data['repositories_with_stars'] += 1
+        elif count == 0:
+            data['repositories_with_stars'] -= 1
+        if count > 0:
+            top.append([name, count])
+        data['top_repositories'] = sorted(top, key=lambda row: -row[1])[:TOP_REPOSITORIES]
+        return True
+
+    if cache.update(owner, 'Stars', change):
+        return [f"{'added' if delta > 0 else 'removed'} a star of {owner}/{name}"]
+    return []
+
+
+def _on_pull_request(cache: MetricsCache, payload: Dict[str, Any]) -> List[str]:
+    pull = payload.get('pull_request') or {}
+
+    def closed(data: Dict[str, Any]) -> None:
+        data['merged' if pull.get('merged') else 'closed'] += 1
+
+    changes = _adjust_item(cache, 'Pull Requests', payload.get('action'), pull, closed)
+    return changes + _drop_contributions(cache, payload.get('action'), pull)
+
+
+def _on_issues(cache: MetricsCache, payload: Dict[str, Any]) -> List[str]:
+    def closed(data: Dict[str, Any]) -> None:
+        data['closed'] += 1
+
+    issue = payload.get('issue') or {}
+    changes = _adjust_item(cache, 'Issues', payload.get('action'), issue, closed)
+    return changes + _drop_contributions(cache, payload.get('action'), issue)
+
+
+HANDLERS: Dict[str, Callable[[MetricsCache, Dict[str, Any]], List[str]]] = {
+    'push': _on_push,
+    'star': _on_star,
+    'pull_request': _on_pull_request,
+    'issues': _on_issues,
+}
+
+# Metrics the handlers keep current; cached entries of others expire
+MAINTAINED_METRICS = frozenset({'Commits', 'Contributions', 'Stars', 'Pull Requests', 'Issues'})
+
+
+#---------------------------------------------------------
+# Listener
+#---------------------------------------------------------
+
+class WebhookHandler(BaseHTTPRequestHandler):
+    """Accepts signed deliveries and applies them to the cache."""
+
+    secret = ''
+    cache_path: Optional[Path] = None
+    log: Callable[[str], None] = print
+
+    def do_POST(self) -> None:
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        if not verify_signature(self.secret, body, self.headers.get('X-Hub-Signature-256')):
+            self._respond(401, 'invalid signature')
+            return
+
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            self._respond(400, 'invalid JSON')
+            return
+
+        event = self.headers.get('X-GitHub-Event', '')
+        # SQLite connections belong to one thread, so every delivery
+        # opens its own
+        with MetricsCache(self.cache_path) as cache:
+            changes = apply_delivery(cache, event, payload)
+        for change in changes:
+            type(self).log(f"{event}: {change}")
+        self._respond(200, 'ok')
+
+    def log_message(self, format: str, *args: Any) -> None:
+        # Deliveries are reported through log() instead
+        pass
+
+    def _respond(self, status: int, message: str) -> None:
+        body = message.encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/plain')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def create_server(
+    host: str,
+    port: int,
+    secret: str,
+    cache_path: Optional[Path] = None,
+    log: Callable[[str], None] = print,
+) -> ThreadingHTTPServer:
+    """
+    Create the webhook listener; call serve_forever() to run it.
+
+    Args:
+        host: Interface to bind
+        port: Port to listen on (0 picks a free one)
+        secret: Webhook secret deliveries must be signed with
+        cache_path: Cache database, defaults to cache.db in the data directory
+        log: Called with a description of every cache change
+    """
+    handler = type('BoundWebhookHandler', (WebhookHandler,), {
+        'secret': secret,
+        'cache_path': cache_path,
+        'log': staticmethod(log),
+    })
+    return ThreadingHTTPServer((host, port), handler)
+
+
+#---------------------------------------------------------
+# Helper functions
+#---------------------------------------------------------
+
+def _adjust_item(
+    cache: MetricsCache,
+    metric: str,
+    action: Optional[str],
+    item: Dict[str, Any],
+    closed: Callable[[Dict[str, Any]], None],
+) -> List[str]:
+    # Counts are per author, within the window the item was created in
+    author = (item.get('user') or {}).get('login')
+    created = _parse_time(item.get('created_at'))
+    if not author:
+        return []
+
+    if action == 'opened':
+        def change(data: Dict[str, Any]) -> bool:
+            data['total'] += 1
+            data['open'] += 1
+            return True
+    elif action == 'closed':
+        def change(data: Dict[str, Any]) -> bool:
+            # Exhaustive entries also hold duration statistics, which a
+            # delta cannot update
+            if data['open'] <= 0 or 'time_to_merge' in data or 'time_to_close' in data:
+                return False
+            data['open'] -= 1
+            closed(data)
+            return True
+    elif action in ('reopened', 'deleted', 'transferred'):
+        def change(data: Dict[str, Any]) -> bool:
+            return False
+    else:
+        return []
+
+    if cache.update(author, metric, change, at=created):
+        return [f"{action} {metric.lower()} of {author}"]
+    return []
+
+
+def _drop_contributions(cache: MetricsCache, action: Optional[str], item: Dict[str, Any]) -> List[str]:
+    # Opening a pull request or issue adds to the author's calendar
+    author = (item.get('user') or {}).get('login')
+    if action != 'opened' or not author:
+        return []
+    if cache.invalidate(author, 'Contributions'):
+        return [f"dropped Contributions of {author}"]
+    return []
+
+
+def _parse_time(value: Optional[str]) -> Optional[int]:
+    if not value:
+        return None
+    try:
+        return int(datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp())
+    except ValueError:
+        return None
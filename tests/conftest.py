@@ -5,6 +5,14 @@ from unittest.mock import Mock, MagicMock, patch
 from datetime import datetime
 
 
+@pytest.fixture(autouse=True)
+def isolated_data_dir(tmp_path, monkeypatch):
+    """Keep snapshot history and other local state out of the real home directory."""
+    data_dir = tmp_path / "github-stats-home"
+    monkeypatch.setenv("GITHUB_STATS_HOME", str(data_dir))
+    return data_dir
+
+
 @pytest.fixture
 def mock_user():
     """Create a mock GitHub user."""
@@ -12,6 +20,8 @@ def mock_user():
     user.login = "testuser"
     user.followers = 100
     user.following = 50
+    user.public_repos = 3
+    user.email = None
     return user
 
 
@@ -36,9 +46,19 @@ def mock_repos(mock_repo):
     for i, name in enumerate(["repo-1", "repo-2", "repo-3"]):
         repo = Mock()
         repo.name = name
+        repo.full_name = f"testuser/{name}"
         repo.stargazers_count = (i + 1) * 10
+        repo.forks_count = 0
+        repo.language = "Python"
+        repo.pushed_at = None
+        repo.fork = False
+        repo.archived = False
         commits = [Mock() for _ in range(i + 1)]
         repo.get_commits = Mock(return_value=iter(commits))
+        repo.get_stats_contributors = Mock(return_value=[
+            Mock(author=Mock(login="testuser"), total=i + 1, weeks=[]),
+            Mock(author=Mock(login="someone-else"), total=7, weeks=[]),
+        ])
         repos.append(repo)
     return repos
 
@@ -52,6 +72,10 @@ def mock_github_client(mock_user, mock_repos):
     client.get_user = Mock(return_value=mock_user)
     mock_user.get_repos = Mock(return_value=iter(mock_repos))
 
+    # Lazy repository handles used for per-repo calls
+    repos_by_name = {repo.full_name: repo for repo in mock_repos}
+    client.get_repo = Mock(side_effect=lambda full_name, lazy=False: repos_by_name[full_name])
+
     # Mock rate limit
     rate_limit = Mock()
     rate_limit.core = Mock()
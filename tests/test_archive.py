@@ -0,0 +1,173 @@
+"""Tests for the offline GH Archive engine."""
+
+import gzip
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from github_stats.archive import ArchiveTable, archive_metrics, scan, scan_file
+from github_stats.cli import metric_result
+
+
+def _event(kind, actor, repo, created='2024-01-01T10:00:00Z', **payload):
+    return {
+        'type': kind,
+        'actor': {'login': actor},
+        'repo': {'name': repo},
+        'payload': payload,
+        'created_at': created,
+    }
+
+
+def _write(path, events):
+    with gzip.open(path, 'wt', encoding='utf-8') as dump:
+        for event in events:
+            dump.write(json.dumps(event) + '\n')
+    return path
+
+
+@pytest.fixture
+def dumps(tmp_path):
+    """Two hourly dumps with activity by octocat and others."""
+    _write(tmp_path / '2024-01-01-10.json.gz', [
+        _event('PushEvent', 'octocat', 'octocat/hello', distinct_size=3, size=4),
+        _event('PushEvent', 'someone', 'someone/else', distinct_size=9),
+        _event('WatchEvent', 'fan', 'octocat/hello', action='started'),
+        _event('PullRequestEvent', 'octocat', 'other/repo', action='opened',
+               pull_request={'user': {'login': 'octocat'}}),
+        _event('ForkEvent', 'fan', 'octocat/hello'),
+    ])
+    _write(tmp_path / '2024-01-01-11.json.gz', [
+        _event('PushEvent', 'Octocat', 'octocat/world', '2024-01-01T11:00:00Z', distinct_size=1),
+        _event('PushEvent', 'octocat', 'octocat/hello', '2024-01-01T11:05:00Z', distinct_size=2),
+        _event('WatchEvent', 'fan2', 'octocat/world', '2024-01-01T11:10:00Z', action='started'),
+        _event('WatchEvent', 'fan3', 'octocat/hello', '2024-01-01T11:20:00Z', action='started'),
+        # Closed by a maintainer, authored by octocat
+        _event('PullRequestEvent', 'maintainer', 'other/repo', '2024-01-01T11:30:00Z', action='closed',
+               pull_request={'user': {'login': 'octocat'}, 'merged': True}),
+        _event('IssuesEvent', 'octocat', 'other/repo', '2024-01-01T11:40:00Z', action='opened',
+               issue={'user': {'login': 'octocat'}}),
+    ])
+    return tmp_path
+
+
+class TestScan:
+    """Tests for aggregating event dumps."""
+
+    def test_counts_user_activity(self, dumps):
+        """Should count commits, stars, PRs and issues case-insensitively."""
+        table = scan([dumps], ['OctoCat'], processes=1)
+
+        assert table.get('commits', 'octocat') == 6
+        assert table.get('stars', 'octocat') == 3
+        assert table.get('prs_opened', 'octocat') == 1
+        assert table.get('prs_closed', 'octocat') == 1
+        assert table.get('issues_opened', 'octocat') == 1
+        assert table.top_repos('commits', 'octocat') == [('hello', 5), ('world', 1)]
+        assert 'someone' not in table.user_ids
+
+    def test_parallel_matches_serial(self, dumps):
+        """Should merge per-file tables from worker processes into the same counts."""
+        serial = scan([dumps], processes=1)
+        parallel = scan([dumps], processes=2)
+
+        for field in ('commits', 'stars', 'prs_opened'):
+            for login in ('octocat', 'someone'):
+                assert parallel.get(field, login) == serial.get(field, login)
+        assert parallel.top_repos('stars', 'octocat') == serial.top_repos('stars', 'octocat')
+
+    def test_filters_by_time_window(self, dumps):
+        """Should only count events inside --since/--until."""
+        since = datetime(2024, 1, 1, 11, tzinfo=timezone.utc)
+        table = scan([dumps], ['octocat'], since=since, processes=1)
+
+        assert table.get('commits', 'octocat') == 3
+        assert table.get('prs_opened', 'octocat') == 0
+
+    def test_skips_torn_lines(self, tmp_path):
+        """Should ignore undecodable lines, e.g. from a truncated download."""
+        path = tmp_path / 'dump.json.gz'
+        with gzip.open(path, 'wb') as dump:
+            dump.write(b'{"type":"PushEvent", "actor": \n')
+            dump.write(json.dumps(_event('PushEvent', 'octocat', 'octocat/a', distinct_size=2)).encode() + b'\n')
+
+        assert scan_file(path).get('commits', 'octocat') == 2
+
+
+class TestArchiveTable:
+    """Tests for the integer-keyed counter tables."""
+
+    def test_merge_translates_ids(self):
+        """Should combine tables whose workers interned names in different orders."""
+        first, second = ArchiveTable(), ArchiveTable()
+        first.add('commits', 'alice', 2, 'alice/a')
+        second.add('commits', 'bob', 5, 'bob/b')
+        second.add('commits', 'alice', 1, 'alice/a')
+
+        first.merge(second)
+
+        assert first.get('commits', 'alice') == 3
+        assert first.get('commits', 'bob') == 5
+        assert first.top_repos('commits', 'alice') == [('a', 3)]
+
+    def test_user_lookups_do_not_scan_the_table(self):
+        """Should read one user's repositories without visiting anyone else's."""
+
+        class NoScan(dict):
+            def _scan(self, *args):
+                raise AssertionError("walked the whole table")
+
+            __iter__ = items = keys = values = _scan
+
+        table = ArchiveTable()
+        for n in range(1000):
+            table.add('commits', f"user{n}", n % 7 + 1, f"user{n}/repo")
+        table.add('commits', 'alice', 4, 'alice/a')
+        table.add('commits', 'alice', 9, 'alice/b')
+        table.repo_commits = NoScan(table.repo_commits)
+
+        assert table.top_repos('commits', 'alice') == [('b', 9), ('a', 4)]
+        assert table.repo_count('commits', 'alice') == 2
+        assert table.repo_count('commits', 'nobody') == 0
+
+
+class TestArchiveMetrics:
+    """Tests for formatting archive counts like API results."""
+
+    def test_results_use_metric_formats(self, dumps):
+        """Should produce the same value/details rows as the API metrics."""
+        table = scan([dumps], ['octocat'], processes=1)
+        results = {
+            name: metric_result(metric)
+            for name, metric in archive_metrics(table, 'octocat', ['Commits', 'Stars', 'Pull Requests', 'Issues']).items()
+        }
+
+        assert results['Commits']['value'] == '6'
+        assert results['Commits']['details'] == 'Most: hello (5)'
+        assert results['Stars']['value'] == '3'
+        assert results['Pull Requests']['detailed']['total_prs'] == 1
+        assert results['Issues']['detailed']['total_issues'] == 1
+
+    def test_unknown_user_has_no_activity(self, dumps):
+        """Should report zeros for users absent from the dumps."""
+        table = scan([dumps], ['nobody'], processes=1)
+
+        results = {name: metric_result(metric) for name, metric in archive_metrics(table, 'nobody', ['Commits']).items()}
+
+        assert results['Commits']['value'] == '0'
+
+
+class TestArchiveCommand:
+    """Integration tests for `github-stats archive`."""
+
+    def test_prints_summary(self, dumps, monkeypatch, capsys):
+        """Should scan the dumps and print the summary table without a token."""
+        from github_stats.cli import main
+        monkeypatch.setattr('sys.argv', ['github-stats', 'archive', 'octocat', '--data', str(dumps), '--processes', '1'])
+
+        main()
+
+        output = capsys.readouterr().out
+        assert 'Commits' in output
+        assert 'hello' in output
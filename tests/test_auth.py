@@ -2,9 +2,11 @@
 
 import pytest
 from unittest.mock import Mock, patch
-from github import GithubException
+from github import Github, GithubException
+from github.Requester import Requester
 
-from github_stats.auth import get_github_client, check_rate_limit, _load_token_from_env
+from github_stats.auth import get_github_client, get_requester, check_rate_limit, _load_token_from_env
+from github_stats.rest import RestClient
 
 
 class TestLoadTokenFromEnv:
@@ -125,3 +127,20 @@ class TestCheckRateLimit:
         assert result['remaining'] == 0
         assert result['limit'] == 0
         assert result['percentage'] == 0
+
+
+class TestGetRequester:
+    """Tests for reaching the client's requester."""
+
+    def test_returns_shared_requester(self):
+        """Should return the requester of a client and of a RestClient wrapping it."""
+        client = Github()
+
+        requester = get_requester(client)
+
+        assert isinstance(requester, Requester)
+        assert get_requester(RestClient(client)) is requester
+
+    def test_returns_none_without_requester(self):
+        """Should return None for objects that are not PyGithub clients."""
+        assert get_requester(object()) is None
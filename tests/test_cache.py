@@ -0,0 +1,70 @@
+"""Tests for the local metrics cache."""
+
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from github_stats import cache as cache_module
+from github_stats.cache import MetricsCache
+
+SINCE = datetime(2024, 1, 1, tzinfo=timezone.utc)
+REAL_TIME = time.time
+
+
+@pytest.fixture
+def cache(tmp_path):
+    with MetricsCache(tmp_path / "cache.db") as cache:
+        yield cache
+
+
+class TestMetricsCache:
+    """Tests for storing, invalidating and adjusting cached metric data."""
+
+    def test_round_trips_data_per_scope(self, cache):
+        """Should keep entries for different windows and strategies apart."""
+        cache.put("octocat", "Commits", {'total_commits': 5}, strategy='stats')
+        cache.put("octocat", "Commits", {'total_commits': 2}, since=SINCE, strategy='stats')
+
+        assert cache.get("octocat", "Commits", strategy='stats') == {'total_commits': 5}
+        assert cache.get("OctoCat", "Commits", since=SINCE, strategy='stats') == {'total_commits': 2}
+        assert cache.get("octocat", "Commits", strategy='list') is None
+
+    def test_max_age_expires_old_entries(self, cache, monkeypatch):
+        """Should treat entries older than max_age as misses."""
+        cache.put("octocat", "Followers", {'followers': 5})
+        monkeypatch.setattr(cache_module.time, 'time', lambda: REAL_TIME() + 7200)
+
+        assert cache.get("octocat", "Followers", max_age=3600) is None
+        assert cache.get("octocat", "Followers") == {'followers': 5}
+
+    def test_invalidates_one_metric(self, cache):
+        """Should drop only the given user's entries of the given metric."""
+        cache.put("octocat", "Commits", {})
+        cache.put("octocat", "Stars", {})
+        cache.put("torvalds", "Commits", {})
+
+        assert cache.invalidate("octocat", "Commits") == 1
+        assert cache.get("octocat", "Stars") == {}
+        assert cache.get("torvalds", "Commits") == {}
+
+    def test_update_respects_windows(self, cache):
+        """Should only adjust entries whose window contains the activity."""
+        cache.put("octocat", "Issues", {'total': 1})
+        cache.put("octocat", "Issues", {'total': 1}, since=SINCE)
+
+        def bump(data):
+            data['total'] += 1
+            return True
+
+        assert cache.update("octocat", "Issues", bump, at=int(SINCE.timestamp()) - 60) == 1
+        assert cache.get("octocat", "Issues") == {'total': 2}
+        assert cache.get("octocat", "Issues", since=SINCE) == {'total': 1}
+
+    def test_update_drops_entries_it_cannot_adjust(self, cache):
+        """Should drop an entry when the change reports it cannot apply."""
+        cache.put("octocat", "Issues", {'total': 1})
+
+        cache.update("octocat", "Issues", lambda data: False)
+
+        assert cache.get("octocat", "Issues") is None
@@ -0,0 +1,134 @@
+"""Tests for contribution calendars."""
+
+import re
+import threading
+from array import array
+from datetime import date, timedelta
+
+import pytest
+
+from github_stats.concurrency import ConcurrencyController
+from github_stats.deadline import Deadline, DeadlineExceeded
+from github_stats.display import create_contribution_heatmap
+from github_stats.metrics.calendar import (
+    ContributionCalendar, current_streak, fetch_calendar, longest_streak, weekday_histogram, year_windows,
+)
+
+
+class FakeCalendar:
+    """Answers calendar queries from a table of per-day counts, in padded weeks."""
+
+    def __init__(self, days):
+        self.days = days
+        self.windows = []
+        self.lock = threading.Lock()
+
+    def requestJsonAndCheck(self, verb, url, parameters=None, headers=None, input=None):
+        assert (verb, url) == ("POST", "/graphql")
+        first, last = (date.fromisoformat(value) for value in re.findall(r'"(\d{4}-\d\d-\d\d)T', input['query']))
+        with self.lock:
+            self.windows.append((first, last))
+
+        # Whole weeks, starting on the Sunday before the window
+        day = first - timedelta(days=(first.weekday() + 1) % 7)
+        weeks = []
+        while day <= last:
+            week = [day + timedelta(days=n) for n in range(7)]
+            weeks.append({'contributionDays': [
+                {'date': d.isoformat(), 'contributionCount': self.days.get(d, 0)} for d in week
+            ]})
+            day += timedelta(days=7)
+        return {}, {'data': {'user': {'contributionsCollection': {'contributionCalendar': {'weeks': weeks}}}}}
+
+
+class TestDayArrays:
+    """Tests for streaks and histograms over day counts."""
+
+    def test_longest_streak(self):
+        """Should find the longest run and where it starts."""
+        assert longest_streak(array('I', [1, 0, 2, 3, 1, 0, 5])) == (3, 2)
+        assert longest_streak(array('I', [0, 0])) == (0, 0)
+
+    def test_current_streak_forgives_today(self):
+        """Should not break the streak on a last day without contributions."""
+        assert current_streak(array('I', [0, 1, 1, 0])) == 2
+        assert current_streak(array('I', [1, 1, 1])) == 3
+        assert current_streak(array('I', [1, 0, 0])) == 0
+
+    def test_weekday_histogram(self):
+        """Should sum counts by weekday, Monday first."""
+        # 2024-01-03 is a Wednesday
+        totals = weekday_histogram(date(2024, 1, 3), array('I', range(1, 9)))
+
+        assert totals == [6, 7, 1 + 8, 2, 3, 4, 5]
+
+    def test_from_days_fills_gaps(self):
+        """Should lay counts out by date and leave other days at zero."""
+        calendar = ContributionCalendar.from_days(
+            date(2024, 1, 1), date(2024, 1, 5), {date(2024, 1, 2): 4, date(2024, 2, 1): 9}
+        )
+
+        assert list(calendar.counts) == [0, 4, 0, 0, 0]
+        assert calendar.end == date(2024, 1, 5)
+
+
+class TestFetchCalendar:
+    """Tests for fetching calendars a year per query."""
+
+    def test_year_windows(self):
+        """Should cover the range with windows of at most a year."""
+        windows = year_windows(date(2020, 1, 1), date(2022, 6, 30))
+
+        assert len(windows) == 3
+        assert windows[0] == (date(2020, 1, 1), date(2020, 12, 31))
+        assert windows[-1] == (date(2022, 1, 1), date(2022, 6, 30))
+        assert year_windows(date(2020, 2, 29), date(2021, 3, 1))[0] == (date(2020, 2, 29), date(2021, 2, 27))
+
+    def test_multi_year_range_queries_concurrently(self):
+        """Should issue one query per year in parallel and merge the days."""
+        days = {date(2021, 3, 1): 2, date(2022, 12, 31): 5}
+        requester = FakeCalendar(days)
+        controller = ConcurrencyController(maximum=4)
+        try:
+            calendar = fetch_calendar(
+                requester, 'octocat', date(2020, 1, 1), date(2022, 12, 31), submit=controller.submit
+            )
+        finally:
+            controller.close()
+
+        assert len(requester.windows) == 3
+        assert calendar.start == date(2020, 1, 1)
+        assert len(calendar.counts) == (date(2022, 12, 31) - date(2020, 1, 1)).days + 1
+        assert sum(calendar.counts) == 7
+
+    def test_days_outside_the_window_are_dropped(self):
+        """Should ignore the padding days of the first and last week."""
+        requester = FakeCalendar({date(2024, 1, 1): 3, date(2024, 1, 10): 1})
+
+        calendar = fetch_calendar(requester, 'octocat', date(2024, 1, 2), date(2024, 1, 9))
+
+        assert sum(calendar.counts) == 0
+
+    def test_deadline(self):
+        """Should raise DeadlineExceeded once the deadline passed."""
+        with pytest.raises(DeadlineExceeded):
+            fetch_calendar(FakeCalendar({}), 'octocat', date(2024, 1, 1), date(2024, 1, 2), deadline=Deadline(0))
+
+
+class TestHeatmap:
+    """Tests for the terminal heatmap."""
+
+    def test_one_column_per_week(self):
+        """Should draw seven weekday rows with a cell per day."""
+        # 2024-01-01 is a Monday; 14 days make two full weeks
+        heatmap = create_contribution_heatmap(date(2024, 1, 1), [1] * 14).plain.split("\n")
+
+        assert heatmap[0].strip() == "Jan"
+        assert heatmap[1] == "Mon ■■"
+        assert len(heatmap) == 9
+
+    def test_shows_only_recent_weeks(self):
+        """Should keep wide calendars to the last weeks."""
+        heatmap = create_contribution_heatmap(date(2020, 1, 1), [0] * 1000, weeks=10).plain.split("\n")
+
+        assert max(len(line) for line in heatmap[1:8]) == 4 + 10
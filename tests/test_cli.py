@@ -1,10 +1,16 @@
 """Integration tests for CLI entry point."""
 
 import pytest
+from datetime import datetime, timezone
 from unittest.mock import Mock, patch, MagicMock
 from io import StringIO
 
-from github_stats.cli import main, parse_arguments, collect_metrics
+from github_stats.cli import main, parse_arguments, collect_metrics, _repo_filter, _select_backend
+from github_stats.history import HistoryStore
+from github_stats.journal import Journal
+from github_stats.policy import RequestPolicy
+from github_stats.rest import RestClient
+from github_stats.stargazers import StarHistoryStore
 
 
 class TestParseArguments:
@@ -35,6 +41,83 @@ class TestParseArguments:
         with pytest.raises(SystemExit):
             parse_arguments()
 
+    def test_parses_time_window(self, monkeypatch):
+        """Should parse --since/--until as an inclusive UTC date range."""
+        monkeypatch.setattr('sys.argv', ['github-stats', 'octocat', '--since', '2024-01-01', '--until', '2024-03-31'])
+
+        args = parse_arguments()
+
+        assert args.since == datetime(2024, 1, 1, tzinfo=timezone.utc)
+        assert args.until == datetime(2024, 3, 31, 23, 59, 59, tzinfo=timezone.utc)
+
+    def test_parses_commit_strategy(self, monkeypatch):
+        """Should default to contributor statistics and accept 'list'."""
+        monkeypatch.setattr('sys.argv', ['github-stats', 'octocat'])
+        assert parse_arguments().commit_strategy == 'stats'
+
+        monkeypatch.setattr('sys.argv', ['github-stats', 'octocat', '--commit-strategy', 'list'])
+        assert parse_arguments().commit_strategy == 'list'
+
+    def test_parses_metric_selection(self, monkeypatch):
+        """Should map --metrics keys to metric names."""
+        monkeypatch.setattr('sys.argv', ['github-stats', 'octocat', '--metrics', 'stars, prs'])
+
+        args = parse_arguments()
+
+        assert args.metrics == ['Stars', 'Pull Requests']
+
+    def test_rejects_unknown_metric(self, monkeypatch):
+        """Should reject unknown --metrics keys."""
+        monkeypatch.setattr('sys.argv', ['github-stats', 'octocat', '--metrics', 'stars,karma'])
+
+        with pytest.raises(SystemExit):
+            parse_arguments()
+
+    def test_rejects_invalid_date(self, monkeypatch):
+        """Should reject dates not in YYYY-MM-DD format."""
+        monkeypatch.setattr('sys.argv', ['github-stats', 'octocat', '--since', 'last-quarter'])
+
+        with pytest.raises(SystemExit):
+            parse_arguments()
+
+    def test_rejects_inverted_window(self, monkeypatch):
+        """Should reject --since later than --until."""
+        monkeypatch.setattr('sys.argv', ['github-stats', 'octocat', '--since', '2024-04-01', '--until', '2024-03-31'])
+
+        with pytest.raises(SystemExit):
+            parse_arguments()
+
+    def test_parses_deadline(self, monkeypatch):
+        """Should accept a positive --deadline in seconds."""
+        monkeypatch.setattr('sys.argv', ['github-stats', 'octocat', '--deadline', '2.5'])
+        assert parse_arguments().deadline == 2.5
+
+        monkeypatch.setattr('sys.argv', ['github-stats', 'octocat', '--deadline', '0'])
+        with pytest.raises(SystemExit):
+            parse_arguments()
+
+    def test_parses_repository_filters(self, monkeypatch):
+        """Should build a repository filter only when one is asked for."""
+        monkeypatch.setattr('sys.argv', ['github-stats', 'octocat'])
+        assert _repo_filter(parse_arguments()) is None
+
+        monkeypatch.setattr('sys.argv', [
+            'github-stats', 'octocat', '--exclude-forks', '--owner-only', '--min-pushed', '2024-01-01'
+        ])
+        repo_filter = _repo_filter(parse_arguments())
+        assert repo_filter.key() == "forks-owner-pushed>=2024-01-01"
+        assert repo_filter.listing() == {'type': 'owner', 'sort': 'pushed', 'direction': 'desc'}
+
+    def test_selects_backend(self, monkeypatch):
+        """Should keep PyGithub by default and wrap the client for --backend rest."""
+        client, policy = Mock(), RequestPolicy()
+        monkeypatch.setattr('sys.argv', ['github-stats', 'octocat'])
+        assert _select_backend(client, parse_arguments(), policy) is client
+
+        monkeypatch.setattr('sys.argv', ['github-stats', 'octocat', '--backend', 'rest'])
+        backend = _select_backend(client, parse_arguments(), policy)
+        assert isinstance(backend, RestClient) and backend.policy is policy
+
 
 class TestCollectMetrics:
     """Tests for metrics collection."""
@@ -56,6 +139,27 @@ class TestCollectMetrics:
         for metric_name, data in results.items():
             assert 'value' in data
             assert 'details' in data
+            assert 'detailed' in data
+
+    def test_passes_time_window_to_searches(self, mock_github_client):
+        """Should push the time window down into search queries."""
+        since = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+        collect_metrics(mock_github_client, "testuser", since=since)
+
+        queries = [c.args[0] for c in mock_github_client.search_issues.call_args_list]
+        assert queries
+        assert all("created:>=2024-01-01" in q for q in queries)
+
+    def test_collects_only_selected_metrics(self, mock_github_client):
+        """Should neither build nor fetch unselected metrics."""
+        with patch('github_stats.metrics.commits.CommitMetric.__init__') as commit_init:
+            results = collect_metrics(mock_github_client, "testuser", selected=['Stars'])
+
+        assert list(results) == ['Stars']
+        commit_init.assert_not_called()
+        mock_github_client.search_issues.assert_not_called()
+        mock_github_client.get_repo.assert_not_called()
 
     def test_handles_metric_failure_gracefully(self, mock_github_client):
         """Should continue collecting other metrics if one fails."""
@@ -136,3 +240,382 @@ class TestMainIntegration:
         with patch('github_stats.cli.get_github_client', side_effect=SystemExit(1)):
             # The function catches SystemExit and returns
             main()  # Should not raise
+
+    def test_main_records_snapshot(self, mock_env_token, mock_github_client, monkeypatch):
+        """Should append the run to the local snapshot history."""
+        monkeypatch.setattr('sys.argv', ['github-stats', 'testuser'])
+
+        with patch('github_stats.cli.get_github_client', return_value=mock_github_client):
+            main()
+
+        with HistoryStore() as store:
+            assert store.trend("testuser", "Followers", "followers")[0][1] == 100
+
+    def test_main_skips_snapshot_with_no_history(self, mock_env_token, mock_github_client, monkeypatch):
+        """Should not record anything with --no-history."""
+        monkeypatch.setattr('sys.argv', ['github-stats', 'testuser', '--no-history'])
+
+        with patch('github_stats.cli.get_github_client', return_value=mock_github_client):
+            main()
+
+        with HistoryStore() as store:
+            assert store.series("testuser") == []
+
+
+class TestCache:
+    """Integration tests for --use-cache."""
+
+    def test_serves_cached_metrics(self, mock_env_token, mock_github_client, monkeypatch):
+        """Should serve a second --use-cache run from the cache without searching."""
+        results = []
+        for _ in range(2):
+            results.append(collect_metrics(mock_github_client, 'testuser', selected=['Pull Requests', 'Stars'], use_cache=True))
+
+        assert mock_github_client.search_issues.call_count == 1
+        assert mock_github_client.get_user.return_value.get_repos.call_count == 1
+        for name in ('Pull Requests', 'Stars'):
+            assert results[1][name]['value'] == results[0][name]['value']
+            assert results[1][name]['details'] == results[0][name]['details']
+
+    def test_fetches_invalidated_metrics(self, mock_env_token, mock_github_client):
+        """Should refetch a metric the webhook dropped from the cache."""
+        from github_stats.cache import MetricsCache
+        collect_metrics(mock_github_client, 'testuser', selected=['Pull Requests'], use_cache=True)
+        with MetricsCache() as cache:
+            cache.invalidate('testuser', 'Pull Requests')
+
+        collect_metrics(mock_github_client, 'testuser', selected=['Pull Requests'], use_cache=True)
+
+        assert mock_github_client.search_issues.call_count == 2
+
+    def test_expires_metrics_no_webhook_maintains(self, mock_env_token, mock_github_client, monkeypatch):
+        """Should refetch Followers once its entry is older than the TTL, but keep Stars."""
+        from github_stats import cache as cache_module
+        from github_stats.cache import CACHE_TTL
+        collect_metrics(mock_github_client, 'testuser', selected=['Followers', 'Stars'], use_cache=True)
+        now = cache_module.time.time()
+        monkeypatch.setattr(cache_module.time, 'time', lambda: now + CACHE_TTL + 60)
+
+        collect_metrics(mock_github_client, 'testuser', selected=['Followers', 'Stars'], use_cache=True)
+
+        assert mock_github_client.get_user.call_count == 2
+        assert mock_github_client.get_user.return_value.get_repos.call_count == 1
+
+    def test_rolling_calendar_window_is_scoped_by_date(self, monkeypatch):
+        """Should scope the default Contributions window by its resolved days."""
+        from github_stats.cli import _cache_strategy
+        from github_stats.metrics import contributions
+        from github_stats.metrics.contributions import ContributionMetric
+
+        class Today(datetime):
+            now_value = datetime(2024, 6, 1, tzinfo=timezone.utc)
+
+            @classmethod
+            def now(cls, tz=None):
+                return cls.now_value
+
+        monkeypatch.setattr(contributions, 'datetime', Today)
+        metric = ContributionMetric(Mock(), 'testuser')
+        first = _cache_strategy(metric)
+        Today.now_value = datetime(2024, 6, 2, tzinfo=timezone.utc)
+
+        assert first == '2023-06-03..2024-06-01'
+        assert _cache_strategy(metric) == '2023-06-04..2024-06-02'
+
+
+class TestWatch:
+    """Integration tests for --watch."""
+
+    def test_refreshes_only_affected_metrics(self, mock_env_token, mock_github_client, monkeypatch):
+        """Should recompute just the metrics new events touch, then stop on Ctrl-C."""
+        from github_stats import cli
+        feeds = {
+            '/users/testuser/events': [
+                ({'etag': '"a"'}, [{'id': '1', 'type': 'PushEvent', 'actor': {'login': 'testuser'}}]),
+                ({'etag': '"b"'}, [{'id': '2', 'type': 'PullRequestEvent', 'actor': {'login': 'testuser'}}]),
+            ],
+            '/users/testuser/received_events': [({}, None), ({}, None)],
+        }
+        mock_github_client._Github__requester.requestJsonAndCheck = Mock(
+            side_effect=lambda verb, url, parameters, headers: feeds[url].pop(0)
+        )
+
+        refreshed = []
+        original = cli.collect_metrics
+
+        def record(client, username, **kwargs):
+            refreshed.append(kwargs.get('selected'))
+            return original(client, username, **kwargs)
+
+        sleeps = []
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            if len(sleeps) == 2:
+                raise KeyboardInterrupt
+
+        monkeypatch.setattr(cli, 'collect_metrics', record)
+        monkeypatch.setattr(cli.time, 'sleep', sleep)
+        monkeypatch.setattr('sys.argv', ['github-stats', 'testuser', '--watch', '--metrics', 'prs,stars', '--no-history'])
+
+        with patch('github_stats.cli.get_github_client', return_value=mock_github_client):
+            main()
+
+        assert refreshed == [['Pull Requests', 'Stars'], ['Pull Requests']]
+
+
+class TestCostEstimate:
+    """Integration tests for --dry-run and --budget."""
+
+    def test_dry_run_estimates_without_fetching(self, mock_env_token, mock_github_client, monkeypatch, capsys):
+        """Should print per-metric estimates and make no metric calls."""
+        monkeypatch.setattr('sys.argv', ['github-stats', 'testuser', '--dry-run'])
+
+        with patch('github_stats.cli.get_github_client', return_value=mock_github_client):
+            main()
+
+        captured = capsys.readouterr()
+        assert 'Estimated API calls' in captured.out
+        assert 'Commits' in captured.out
+        mock_github_client.get_user().get_repos.assert_not_called()
+        mock_github_client.search_issues.assert_not_called()
+
+    def test_budget_skips_most_expensive_metric(self, mock_env_token, mock_github_client, mock_user, monkeypatch, capsys):
+        """Should drop the costliest metric when the estimate exceeds the budget."""
+        mock_user.public_repos = 60
+        monkeypatch.setattr('sys.argv', ['github-stats', 'testuser', '--budget', '20', '--no-history'])
+
+        with patch('github_stats.cli.get_github_client', return_value=mock_github_client):
+            main()
+
+        captured = capsys.readouterr()
+        assert 'skipping: Commits' in captured.out
+        mock_github_client.get_repo.assert_not_called()
+        assert 'Stars' in captured.out
+
+    def test_budget_refuses_when_nothing_fits(self, mock_env_token, mock_github_client, monkeypatch):
+        """Should exit without fetching when even one metric is too expensive."""
+        monkeypatch.setattr('sys.argv', ['github-stats', 'testuser', '--metrics', 'stars,issues', '--budget', '0'])
+
+        with patch('github_stats.cli.get_github_client', return_value=mock_github_client):
+            with pytest.raises(SystemExit) as exc_info:
+                main()
+
+        assert exc_info.value.code == 1
+        mock_github_client.search_issues.assert_not_called()
+        mock_github_client.get_user().get_repos.assert_not_called()
+
+    def test_budget_is_capped_by_remaining_quota(self, mock_env_token, mock_github_client, monkeypatch, capsys):
+        """Should compare against the remaining quota when it is lower than the budget."""
+        mock_github_client.get_rate_limit().core.remaining = 5
+        monkeypatch.setattr('sys.argv', ['github-stats', 'testuser', '--budget', '1000', '--no-history'])
+
+        with patch('github_stats.cli.get_github_client', return_value=mock_github_client):
+            main()
+
+        captured = capsys.readouterr()
+        assert 'budget of 5' in captured.out
+
+
+class TestHistoryCommand:
+    """Integration tests for the history subcommand."""
+
+    def test_shows_changes_without_api_calls(self, monkeypatch, capsys):
+        """Should answer from local data without creating a client."""
+        with HistoryStore() as store:
+            store.record("octocat", {'Stars': {'total_stars': 10}}, taken_at=1_700_000_000)
+            store.record("octocat", {'Stars': {'total_stars': 14}}, taken_at=1_700_086_400)
+        monkeypatch.setattr('sys.argv', ['github-stats', 'history', 'octocat'])
+
+        with patch('github_stats.cli.get_github_client') as get_client:
+            main()
+
+        get_client.assert_not_called()
+        captured = capsys.readouterr()
+        assert 'total_stars' in captured.out
+        assert '+4' in captured.out
+
+    def test_shows_trend(self, monkeypatch, capsys):
+        """Should list the points of one series with --trend."""
+        with HistoryStore() as store:
+            store.record("octocat", {'Followers': {'followers': 5}}, taken_at=1_700_000_000)
+            store.record("octocat", {'Followers': {'followers': 8}}, taken_at=1_700_086_400)
+        monkeypatch.setattr('sys.argv', ['github-stats', 'history', 'octocat', '--trend', 'Followers.followers'])
+
+        main()
+
+        captured = capsys.readouterr()
+        assert '2023-11-14' in captured.out
+        assert '+3' in captured.out
+
+    def test_exits_without_history(self, monkeypatch):
+        """Should exit with an error when nothing was recorded."""
+        monkeypatch.setattr('sys.argv', ['github-stats', 'history', 'octocat'])
+
+        with pytest.raises(SystemExit) as exc_info:
+            main()
+        assert exc_info.value.code == 1
+
+
+class TestBatchCommand:
+    """Integration tests for resumable batch runs."""
+
+    @pytest.fixture
+    def batch_client(self, mock_github_client, mock_user, mock_repos):
+        """Client whose repository listing can be paged once per user."""
+        mock_user.get_repos = Mock(side_effect=lambda **kwargs: iter(mock_repos))
+        return mock_github_client
+
+    def _run(self, monkeypatch, client, *argv):
+        monkeypatch.setattr('sys.argv', ['github-stats', 'batch', *argv])
+        with patch('github_stats.cli.get_github_client', return_value=client):
+            main()
+
+    def test_collects_every_user(self, mock_env_token, batch_client, monkeypatch, capsys):
+        """Should collect each user and journal them as finished."""
+        self._run(monkeypatch, batch_client, 'alice', 'bob', '--metrics', 'stars,followers')
+
+        params = {'since': None, 'until': None, 'commit_strategy': 'stats', 'metrics': ['Stars', 'Followers']}
+        with Journal() as journal:
+            state = journal.resume(params)
+        assert state.done == {'alice', 'bob'}
+        assert state.results['bob']['Stars']['value'] == '60'
+        assert 'alice' in capsys.readouterr().out
+
+    def test_resume_skips_finished_users(self, mock_env_token, batch_client, monkeypatch):
+        """Should not fetch users an earlier run finished."""
+        self._run(monkeypatch, batch_client, 'alice', '--metrics', 'stars')
+        batch_client.get_user.reset_mock()
+
+        self._run(monkeypatch, batch_client, 'alice', 'bob', '--metrics', 'stars', '--resume')
+
+        assert [c.args[0] for c in batch_client.get_user.call_args_list] == ['bob']
+
+    @pytest.mark.parametrize('option', ['--upstream', '--exhaustive', '--language-bytes'])
+    def test_resume_rejects_other_result_options(self, mock_env_token, batch_client, monkeypatch, option):
+        """Should refuse to resume a journal written without an option that changes results."""
+        self._run(monkeypatch, batch_client, 'alice', '--metrics', 'stars')
+
+        with pytest.raises(SystemExit) as exc_info:
+            self._run(monkeypatch, batch_client, 'alice', 'bob', '--metrics', 'stars', option, '--resume')
+        assert exc_info.value.code == 1
+
+    def test_interrupt_keeps_finished_work(self, mock_env_token, batch_client, monkeypatch):
+        """Should flush the journal on Ctrl-C so --resume continues after it."""
+        from github_stats import cli
+        original = cli.collect_metrics
+
+        def interrupt_on_bob(client, username, **kwargs):
+            if username == 'bob':
+                raise KeyboardInterrupt
+            return original(client, username, **kwargs)
+
+        monkeypatch.setattr(cli, 'collect_metrics', interrupt_on_bob)
+        with pytest.raises(SystemExit) as exc_info:
+            self._run(monkeypatch, batch_client, 'alice', 'bob', '--metrics', 'stars')
+        assert exc_info.value.code == 130
+
+        monkeypatch.setattr(cli, 'collect_metrics', original)
+        batch_client.get_user.reset_mock()
+        self._run(monkeypatch, batch_client, 'alice', 'bob', '--metrics', 'stars', '--resume')
+
+        assert [c.args[0] for c in batch_client.get_user.call_args_list] == ['bob']
+
+    def test_graphql_batches_users(self, mock_env_token, batch_client, monkeypatch):
+        """Should resolve every user's profile and searches in one GraphQL request."""
+        from tests.test_graphql import FakeRequester, _user
+        requester = FakeRequester({'alice': _user('alice', [('x', 4)]), 'bob': _user('bob', [])})
+        batch_client._Github__requester = requester
+
+        self._run(monkeypatch, batch_client, 'alice', 'bob', '--graphql', '--metrics', 'stars,followers,prs')
+
+        assert len(requester.documents) == 1
+        batch_client.get_user.assert_not_called()
+        batch_client.search_issues.assert_not_called()
+        with Journal() as journal:
+            state = journal.resume({
+                'since': None, 'until': None, 'commit_strategy': 'stats',
+                'metrics': ['Stars', 'Followers', 'Pull Requests'],
+            })
+        assert state.results['alice']['Stars']['value'] == '4'
+        assert state.results['bob']['Pull Requests']['value'] == '10'
+
+
+class TestStarsCommand:
+    """Integration tests for the stars subcommand."""
+
+    class Stargazers:
+        """Answers every stargazer page with stars from one day."""
+
+        def __init__(self):
+            self.urls = []
+
+        def requestJsonAndCheck(self, verb, url, parameters=None, headers=None, input=None):
+            self.urls.append(url)
+            return {}, [
+                {'starred_at': '2024-05-01T10:00:00Z', 'user': {'login': f"fan{n}"}}
+                for n in range(parameters['per_page'])
+            ][:10]
+
+    def test_refreshes_most_starred_repositories(self, monkeypatch, capsys, mock_github_client):
+        """Should list stargazers of the top repositories and show their gains."""
+        requester = self.Stargazers()
+        mock_github_client._Github__requester = requester
+        monkeypatch.setattr('sys.argv', ['github-stats', 'stars', 'testuser', '--top', '2'])
+
+        with patch('github_stats.cli.get_github_client', return_value=mock_github_client):
+            main()
+
+        assert requester.urls == ['/repos/testuser/repo-3/stargazers', '/repos/testuser/repo-2/stargazers']
+        captured = capsys.readouterr()
+        assert 'testuser/repo-3' in captured.out
+        assert 'repo-1' not in captured.out
+
+    def test_shows_trend_without_api_calls(self, monkeypatch, capsys):
+        """Should show a recorded series with --trend."""
+        with StarHistoryStore() as store:
+            store.advance("octocat/hello", [(1_700_000_000, 'a')], 1, now=1_700_086_400)
+        monkeypatch.setattr('sys.argv', ['github-stats', 'stars', 'octocat', '--trend', 'hello'])
+
+        with patch('github_stats.cli.get_github_client') as get_client:
+            main()
+
+        get_client.assert_not_called()
+        assert '2023-11-14' in capsys.readouterr().out
+
+
+class TestFollowersCommand:
+    """Integration tests for the followers subcommand."""
+
+    class Lists:
+        """Serves follower and following lists from a table of IDs."""
+
+        LISTS = {
+            '/users/alice/followers': [1, 2, 3, 4],
+            '/users/alice/following': [2, 3],
+            '/users/bob/followers': [3, 4, 5],
+            '/users/bob/following': [],
+        }
+
+        def requestJsonAndCheck(self, verb, url, parameters=None, headers=None, input=None):
+            ids = self.LISTS[url] if parameters['page'] == 1 else []
+            return {}, [{'id': user_id} for user_id in ids]
+
+    def test_shows_mutual_follows_and_overlap(self, monkeypatch, capsys):
+        """Should report mutual follows per user and shared followers per pair."""
+        client = Mock()
+        client._Github__requester = self.Lists()
+        client.get_user = Mock(side_effect=lambda login: Mock(
+            login=login,
+            followers=len(self.Lists.LISTS[f'/users/{login}/followers']),
+            following=len(self.Lists.LISTS[f'/users/{login}/following']),
+        ))
+        monkeypatch.setattr('sys.argv', ['github-stats', 'followers', 'alice', 'bob', '--max-concurrency', '1'])
+
+        with patch('github_stats.cli.get_github_client', return_value=client):
+            main()
+
+        output = capsys.readouterr().out
+        assert 'Shared followers' in output
+        assert 'alice & bob' in output
+        assert '40.0%' in output
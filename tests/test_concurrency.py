@@ -0,0 +1,106 @@
+"""Tests for the adaptive concurrency controller."""
+
+import threading
+
+import pytest
+
+from github_stats import concurrency as concurrency_module
+from github_stats.concurrency import ConcurrencyController
+
+
+@pytest.fixture(autouse=True)
+def no_cooldown(monkeypatch):
+    """Allow back-to-back decreases."""
+    monkeypatch.setattr(concurrency_module, 'DECREASE_COOLDOWN', 0)
+
+
+class TestLimit:
+    """Tests for additive increase and multiplicative decrease."""
+
+    def test_grows_while_latency_is_healthy(self):
+        """Should add about one slot per round of healthy requests."""
+        controller = ConcurrencyController(initial=2, maximum=8)
+
+        for _ in range(10):
+            controller.observe(0.1)
+
+        # Rounds of 2, 3 and 4 requests
+        assert 4 < controller.limit < 6
+
+    def test_never_exceeds_maximum(self):
+        """Should cap the limit at the maximum."""
+        controller = ConcurrencyController(initial=2, maximum=3)
+
+        for _ in range(100):
+            controller.observe(0.1)
+
+        assert controller.limit == 3
+        assert controller.summary()['peak_concurrency'] == 3
+
+    def test_halves_on_throttling(self):
+        """Should back off multiplicatively on a secondary rate limit."""
+        controller = ConcurrencyController(initial=8, maximum=16)
+
+        controller.throttle(retry_after=0)
+
+        assert controller.limit == 4
+        assert controller.summary()['throttles'] == 1
+
+    def test_halves_when_latency_rises(self):
+        """Should back off once latency rises well above its baseline."""
+        controller = ConcurrencyController(initial=8, maximum=8)
+        for _ in range(10):
+            controller.observe(0.1)
+
+        for _ in range(10):
+            controller.observe(1.0)
+
+        assert controller.limit < 8
+        assert controller.decreases >= 1
+
+    def test_never_drops_below_minimum(self):
+        """Should keep at least one slot."""
+        controller = ConcurrencyController(initial=2)
+
+        for _ in range(5):
+            controller.throttle(retry_after=0)
+
+        assert controller.limit == 1
+
+
+class TestSubmit:
+    """Tests for running work under the limit."""
+
+    def test_runs_at_most_limit_tasks(self):
+        """Should not start more tasks than the limit allows."""
+        controller = ConcurrencyController(initial=2, maximum=2)
+        release = threading.Event()
+        running = []
+        lock = threading.Lock()
+        peak = [0]
+
+        def task():
+            with lock:
+                running.append(1)
+                peak[0] = max(peak[0], len(running))
+            release.wait(5)
+            with lock:
+                running.pop()
+
+        futures = [controller.submit(task) for _ in range(2)]
+        with pytest.raises(TimeoutError):
+            controller.submit(task, timeout=0.05)
+        release.set()
+        for future in futures:
+            future.result()
+        controller.close()
+
+        assert peak[0] == 2
+
+    def test_pauses_after_throttling(self):
+        """Should hold new work back for the Retry-After period."""
+        controller = ConcurrencyController(initial=4)
+        controller.throttle(retry_after=60)
+
+        with pytest.raises(TimeoutError):
+            controller.submit(lambda: None, timeout=0.05)
@@ -0,0 +1,65 @@
+"""Tests for deadline-bounded calls."""
+
+import threading
+import time
+
+import pytest
+
+from github_stats.deadline import Deadline, DeadlineExceeded
+
+
+class TestDeadline:
+    """Tests for the Deadline clock."""
+
+    def test_no_deadline_never_expires(self):
+        """Should run calls directly and never expire without seconds."""
+        deadline = Deadline()
+
+        assert deadline.remaining() is None
+        assert not deadline.expired()
+        assert deadline.call(threading.get_ident) == threading.get_ident()
+
+    def test_returns_result_in_time(self):
+        """Should return the result of calls that finish before the deadline."""
+        deadline = Deadline(5)
+
+        assert deadline.call(lambda a, b=0: a + b, 2, b=3) == 5
+
+    def test_reraises_errors(self):
+        """Should raise the call's own error."""
+        def fail():
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError):
+            Deadline(5).call(fail)
+
+    def test_gives_up_at_the_deadline(self):
+        """Should stop waiting for a slow call when the deadline passes."""
+        deadline = Deadline(0.05)
+        release = threading.Event()
+
+        start = time.monotonic()
+        with pytest.raises(DeadlineExceeded):
+            deadline.call(release.wait, 5)
+        release.set()
+
+        assert time.monotonic() - start < 1
+        assert deadline.expired()
+
+    def test_refuses_calls_after_expiry(self):
+        """Should not start calls once expired."""
+        deadline = Deadline(0)
+        called = []
+
+        with pytest.raises(DeadlineExceeded):
+            deadline.call(called.append, 1)
+        assert called == []
+
+    def test_sleep_is_capped(self):
+        """Should never sleep past the deadline."""
+        deadline = Deadline(0.05)
+
+        start = time.monotonic()
+        deadline.sleep(5)
+
+        assert time.monotonic() - start < 1
@@ -0,0 +1,74 @@
+"""Tests for commit count estimates."""
+
+from github_stats.metrics.estimate import PAGE_SIZE, CountEstimate, estimate_commits
+
+URL = "https://api.github.com/repos/octocat/huge"
+
+
+class FakeCommits:
+    """Serves a commit listing of a given length, with or without a last-page link."""
+
+    def __init__(self, count, link_last=True):
+        self.count = count
+        self.link_last = link_last
+        self.pages = []
+
+    def requestJsonAndCheck(self, verb, url, parameters=None, headers=None, input=None):
+        assert (verb, url) == ("GET", f"{URL}/commits")
+        page, per_page = parameters['page'], parameters['per_page']
+        self.pages.append(page)
+        items = max(0, min(per_page, self.count - (page - 1) * per_page))
+        last = -(-self.count // per_page)
+        link = ''
+        if page < last:
+            link = f'<{URL}/commits?per_page={per_page}&page={page + 1}>; rel="next"'
+            if self.link_last:
+                link += f', <{URL}/commits?per_page={per_page}&page={last}>; rel="last"'
+        return {'link': link} if link else {}, [{'sha': str(n)} for n in range(items)]
+
+
+class TestEstimateCommits:
+    """Tests for bounding commit counts with page probes."""
+
+    def test_short_listing_is_exact(self):
+        """Should count a listing that fits on one page exactly."""
+        requester = FakeCommits(42)
+
+        assert estimate_commits(requester, URL, {}) == CountEstimate(42, 42, 1)
+
+    def test_large_listing_is_bracketed_by_last_page(self):
+        """Should stop after one probe once the last page bounds it tightly."""
+        requester = FakeCommits(123456)
+
+        estimate = estimate_commits(requester, URL, {'author': 'octocat'})
+
+        assert requester.pages == [1]
+        assert estimate.low <= 123456 <= estimate.high
+        assert estimate.tight()
+
+    def test_loose_bracket_fetches_last_page(self):
+        """Should fetch the last page when the bracket is too wide."""
+        requester = FakeCommits(250)
+
+        estimate = estimate_commits(requester, URL, {})
+
+        assert requester.pages == [1, 3]
+        assert estimate.exact and estimate.low == 250
+
+    def test_bisects_without_last_page(self):
+        """Should double the page until past the end, then bisect."""
+        requester = FakeCommits(5 * PAGE_SIZE, link_last=False)
+
+        estimate = estimate_commits(requester, URL, {}, budget=10)
+
+        assert requester.pages[:4] == [1, 2, 4, 8]
+        assert estimate.exact and estimate.low == 500
+
+    def test_budget_leaves_an_interval(self):
+        """Should report the interval reached when the budget runs out."""
+        requester = FakeCommits(100000, link_last=False)
+
+        estimate = estimate_commits(requester, URL, {}, budget=3)
+
+        assert estimate == CountEstimate(400, None, 3)
+        assert not estimate.tight()
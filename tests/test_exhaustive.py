@@ -0,0 +1,275 @@
+"""Tests for exhaustive issue and commit search beyond the 1000-result cap."""
+
+import re
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from github_stats.concurrency import ConcurrencyController
+from github_stats.deadline import Deadline, DeadlineExceeded
+from github_stats.metrics.commits import CommitMetric
+from github_stats.metrics.exhaustive import (
+    CommitBreakdown, SearchHistory, SearchPacer, distribution, format_duration, search_all, search_commits,
+)
+from github_stats.metrics.issues import IssueMetric
+from github_stats.metrics.planner import COMMIT_SEARCH, SEARCH_ALL, FetchPlanner, Need
+from github_stats.metrics.pull_requests import PullRequestMetric
+
+START = datetime(2020, 1, 1, tzinfo=timezone.utc)
+END = datetime(2020, 12, 31, tzinfo=timezone.utc)
+
+
+def _iso(moment):
+    return moment.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def _item(created, closed=None, merged=None):
+    item = {'created_at': _iso(created), 'closed_at': _iso(closed) if closed else None}
+    if merged is not None or closed is not None:
+        item['pull_request'] = {'merged_at': _iso(merged) if merged else None}
+    return item
+
+
+class FakeSearch:
+    """Serves searches from a list of items, capped like the real API."""
+
+    def __init__(self, items, url="/search/issues", field='created_at'):
+        self.items = items
+        self.url = url
+        self.field = field
+        self.queries = []
+        self.lock = threading.Lock()
+
+    def requestJsonAndCheck(self, verb, url, parameters=None, headers=None, input=None):
+        assert (verb, url) == ("GET", self.url)
+        with self.lock:
+            self.queries.append(parameters)
+        low, high = re.search(r'(?:created|committer-date):(\S+)\.\.(\S+)', parameters['q']).groups()
+        matching = [item for item in self.items if low <= item[self.field] <= high]
+        repo = re.search(r'\brepo:(\S+)', parameters['q'])
+        if repo:
+            matching = [item for item in matching if item['repository']['full_name'] == repo.group(1)]
+        per_page, page = parameters['per_page'], parameters.get('page', 1)
+        if page * per_page > 1000:
+            raise AssertionError("paged beyond the search cap")
+        return {}, {
+            'total_count': len(matching),
+            'items': matching[(page - 1) * per_page:page * per_page],
+        }
+
+
+def _spread(count, **durations):
+    # count items, one every 2 hours from START, each ending after the
+    # given durations
+    items = []
+    for n in range(count):
+        created = START + timedelta(hours=2 * n)
+        ends = {key: created + timedelta(hours=hours) for key, hours in durations.items()}
+        items.append(_item(created, **ends))
+    return items
+
+
+def _commit(repo, day):
+    return {'committed_at': _iso(START + timedelta(days=day)), 'repository': {'full_name': repo}}
+
+
+class TestSearchAll:
+    """Tests for splitting searches into slices under the cap."""
+
+    def test_fetches_everything_past_the_cap(self):
+        """Should split the range until every result can be paged."""
+        requester = FakeSearch(_spread(2500, closed=3))
+
+        history = search_all(requester, "type:issue author:octocat", START, END)
+
+        assert len(history) == 2500
+        counts = [query for query in requester.queries if query['per_page'] == 1]
+        assert len(counts) > 1
+
+    def test_slices_do_not_overlap(self):
+        """Should count items on a slice boundary exactly once."""
+        items = [_item(START + timedelta(days=day // 300)) for day in range(1800)]
+        history = search_all(FakeSearch(items), "type:issue", START, END)
+
+        assert len(history) == 1800
+
+    def test_fetches_slices_concurrently(self):
+        """Should give the same history when slices are fetched in parallel."""
+        requester = FakeSearch(_spread(2100, closed=1))
+        controller = ConcurrencyController(maximum=4)
+        try:
+            history = search_all(requester, "type:issue", START, END, submit=controller.submit)
+        finally:
+            controller.close()
+
+        assert len(history) == 2100
+        assert sorted(history.created) == list(history.created)
+
+    def test_stops_at_deadline(self):
+        """Should raise DeadlineExceeded rather than fetch past the deadline."""
+        with pytest.raises(DeadlineExceeded):
+            search_all(FakeSearch(_spread(10)), "type:issue", START, END, deadline=Deadline(0))
+
+
+class TestSearchHistory:
+    """Tests for counts and duration statistics."""
+
+    def test_counts_states(self):
+        """Should count open and merged items from the arrays."""
+        history = SearchHistory()
+        history.add(_item(START))
+        history.add(_item(START, closed=START + timedelta(hours=1), merged=START + timedelta(hours=1)))
+        history.add(_item(START, closed=START + timedelta(hours=5)))
+
+        assert (len(history), history.open, history.merged_count) == (3, 1, 1)
+        assert list(history.durations('closed')) == [1.0, 5.0]
+        assert list(history.durations('merged')) == [1.0]
+
+    def test_statistics_do_not_rescan(self):
+        """Should keep counts as items arrive and sort durations once per addition."""
+        history, other = SearchHistory(), SearchHistory()
+        history.add(_item(START, closed=START + timedelta(hours=2)))
+        other.add(_item(START))
+        other.add(_item(START, closed=START + timedelta(hours=1), merged=START + timedelta(hours=1)))
+
+        first = history.durations()
+        assert history.durations() is first
+        history.extend(other)
+
+        assert (history.open, history.merged_count) == (1, 1)
+        assert list(history.durations()) == [1.0, 2.0]
+
+    def test_distribution(self):
+        """Should interpolate the median and 90th percentile."""
+        stats = distribution(SearchHistory().durations())
+        assert stats == {'median': 0.0, 'p90': 0.0, 'mean': 0.0}
+
+        hours = [float(n) for n in range(1, 11)]
+        stats = distribution(hours)
+        assert stats['median'] == 5.5
+        assert stats['p90'] == pytest.approx(9.1)
+        assert stats['mean'] == 5.5
+
+    def test_format_duration(self):
+        """Should show hours for short durations and days for long ones."""
+        assert format_duration(5.25) == "5.2h"
+        assert format_duration(72) == "3.0d"
+
+
+class TestExhaustiveMetrics:
+    """Tests for PR and issue metrics fed by exhaustive searches."""
+
+    def _planner(self, mock_github_client, items):
+        mock_github_client._Github__requester = FakeSearch(items)
+        return FetchPlanner(mock_github_client, 'octocat')
+
+    def test_pull_requests_are_exact(self, mock_github_client):
+        """Should count every PR and report time-to-merge statistics."""
+        items = _spread(1200, closed=4, merged=4) + [_item(END - timedelta(days=1))]
+        planner = self._planner(mock_github_client, items)
+        metric = PullRequestMetric(mock_github_client, 'octocat', since=START, until=END, exhaustive=True)
+
+        assert metric.requires()[0].kind == SEARCH_ALL
+        assert planner.run([metric]) == {}
+        metric.process()
+
+        assert (metric.total_prs, metric.merged_prs, metric.open_prs, metric.closed_prs) == (1201, 1200, 1, 0)
+        assert metric.get_detailed()['median_hours_to_merge'] == 4.0
+        assert metric.get_summary().endswith("median 4.0h to merge")
+        mock_github_client.search_issues.assert_not_called()
+
+    def test_issues_report_time_to_close(self, mock_github_client):
+        """Should report time-to-close statistics for issues."""
+        planner = self._planner(mock_github_client, _spread(10, closed=72))
+        metric = IssueMetric(mock_github_client, 'octocat', since=START, until=END, exhaustive=True)
+
+        planner.run([metric])
+        metric.process()
+
+        assert (metric.total_issues, metric.closed_issues) == (10, 10)
+        assert metric.get_detailed()['p90_hours_to_close'] == 72.0
+        assert "median 3.0d to close" in metric.get_summary()
+
+
+class TestSearchPacer:
+    """Tests for pacing against the search rate limit."""
+
+    def test_waits_for_reset_once_exhausted(self, monkeypatch):
+        """Should sleep until the reset once no searches remain."""
+        slept = []
+        monkeypatch.setattr(Deadline, 'sleep', lambda self, seconds: slept.append(seconds))
+        pacer = SearchPacer(clock=lambda: 1000.0)
+
+        pacer.observe({'x-ratelimit-remaining': '1', 'x-ratelimit-reset': '1030'})
+        pacer.wait(Deadline())
+        pacer.wait(Deadline())
+
+        assert slept == [30.0]
+        assert pacer.waited == 30.0
+
+    def test_ignores_responses_without_limits(self):
+        """Should not wait without rate limit headers."""
+        pacer = SearchPacer()
+        pacer.observe({})
+        pacer.wait(Deadline())
+
+        assert pacer.remaining is None
+
+
+class TestSearchCommits:
+    """Tests for commits to other people's repositories."""
+
+    def test_counts_one_page_as_is(self):
+        """Should count a page holding every commit without probing."""
+        items = [_commit('torvalds/linux', day) for day in range(40)] + [_commit('python/cpython', 5)]
+        requester = FakeSearch(items, url="/search/commits", field='committed_at')
+
+        breakdown = search_commits(requester, 'octocat', START, END)
+
+        assert breakdown == CommitBreakdown({'torvalds/linux': 40, 'python/cpython': 1}, 41)
+        assert len(requester.queries) == 1
+        assert 'author:octocat -user:octocat' in requester.queries[0]['q']
+
+    def test_probes_top_repositories_of_prolific_authors(self):
+        """Should count the most frequent repositories with one probe each, whatever the volume."""
+        items = [
+            _commit('torvalds/linux' if n % 3 else 'python/cpython', n % 300) for n in range(3000)
+        ] + [_commit('rare/repo', 299)]
+        requester = FakeSearch(items, url="/search/commits", field='committed_at')
+
+        breakdown = search_commits(requester, 'octocat', START, END, limit=2)
+
+        assert breakdown.counts == {'torvalds/linux': 2000, 'python/cpython': 1000}
+        assert breakdown.total == 3001
+        assert breakdown.unattributed == 1
+        assert len(requester.queries) == 3
+        assert 'author:octocat repo:torvalds/linux' in requester.queries[1]['q']
+
+    def test_merged_into_commit_metric(self, mock_github_client):
+        """Should add upstream commits to the owned counts without double counting."""
+        planner = FetchPlanner(mock_github_client, 'testuser')
+        planner.seed({Need(COMMIT_SEARCH, ('testuser', None, None)): CommitBreakdown(
+            {'torvalds/linux': 4, 'testuser/repo-1': 1}, 5,
+        )})
+        metric = CommitMetric(mock_github_client, 'testuser', upstream=True)
+
+        assert planner.run([metric]) == {}
+        metric.process()
+
+        # Owned repos count 1 + 2 + 3; the user's own repo from search is skipped
+        assert metric.total_commits == 10
+        assert metric.top_repo == ('torvalds/linux', 4)
+        assert metric.get_detailed()['upstream_commits'] == 4
+
+    def test_unattributed_commits_count_toward_total(self, mock_github_client):
+        """Should add commits beyond the breakdown to the total and report them."""
+        planner = FetchPlanner(mock_github_client, 'testuser')
+        planner.seed({Need(COMMIT_SEARCH, ('testuser', None, None)): CommitBreakdown({'torvalds/linux': 4}, 7)})
+        metric = CommitMetric(mock_github_client, 'testuser', upstream=True)
+
+        assert planner.run([metric]) == {}
+        metric.process()
+
+        assert metric.total_commits == 6 + 7
+        assert metric.get_detailed()['upstream_unattributed'] == 3
@@ -0,0 +1,114 @@
+"""Tests for the follower graph."""
+
+import threading
+
+import pytest
+
+from github_stats.concurrency import ConcurrencyController
+from github_stats.deadline import Deadline, DeadlineExceeded
+from github_stats.graph import FOLLOWERS, GraphStore, IdSet, refresh_list
+
+
+class FakeFollowers:
+    """Serves a follower list with per-page ETags, answering 304 when unchanged."""
+
+    def __init__(self, ids):
+        self.ids = list(ids)
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def requestJsonAndCheck(self, verb, url, parameters=None, headers=None, input=None):
+        assert (verb, url) == ("GET", "/users/octocat/followers")
+        page, per_page = parameters['page'], parameters['per_page']
+        chunk = self.ids[(page - 1) * per_page:page * per_page]
+        etag = f'"{hash(tuple(chunk))}"'
+        with self.lock:
+            self.requests.append(page)
+        if headers and headers.get('If-None-Match') == etag:
+            return {'etag': etag}, None
+        return {'etag': etag}, [{'id': user_id, 'login': f"user{user_id}"} for user_id in chunk]
+
+
+@pytest.fixture
+def store(tmp_path):
+    with GraphStore(tmp_path / "graph.db") as store:
+        yield store
+
+
+class TestIdSet:
+    """Tests for set operations on sorted ID arrays."""
+
+    def test_set_operations(self):
+        """Should match Python set semantics."""
+        a, b = IdSet([5, 1, 3, 3, 9]), IdSet([3, 4, 9, 10])
+
+        assert list(a) == [1, 3, 5, 9]
+        assert list(a & b) == [3, 9]
+        assert list(a | b) == [1, 3, 4, 5, 9, 10]
+        assert list(a - b) == [1, 5]
+        assert 5 in a and 4 not in a
+        assert a.jaccard(b) == pytest.approx(2 / 6)
+        assert IdSet().jaccard(IdSet()) == 0.0
+
+    def test_round_trips_bytes(self):
+        """Should store eight bytes per ID."""
+        ids = IdSet(range(1000))
+
+        assert len(ids.to_bytes()) == 8000
+        assert IdSet.from_bytes(ids.to_bytes()) == ids
+
+
+class TestRefreshList:
+    """Tests for fetching and diffing follower lists."""
+
+    def test_fetches_every_page_concurrently(self, store):
+        """Should request all pages at once and store the full set."""
+        requester = FakeFollowers(range(1, 251))
+        controller = ConcurrencyController(maximum=4)
+        try:
+            refresh = refresh_list(requester, store, 'octocat', FOLLOWERS, 250, submit=controller.submit)
+        finally:
+            controller.close()
+
+        assert len(refresh.ids) == 250
+        assert sorted(requester.requests) == [1, 2, 3]
+        assert store.current('octocat', FOLLOWERS) == refresh.ids
+
+    def test_unchanged_pages_are_not_modified(self, store):
+        """Should send stored ETags and reuse pages answered with 304."""
+        requester = FakeFollowers(range(1, 251))
+        refresh_list(requester, store, 'octocat', FOLLOWERS, 250)
+        requester.ids[-1] = 999
+        requester.ids.append(1000)
+
+        refresh = refresh_list(requester, store, 'octocat', FOLLOWERS, 250)
+
+        assert refresh.not_modified == 2
+        assert (refresh.added, refresh.removed) == (2, 1)
+        assert 1000 in refresh.ids and 250 not in refresh.ids
+
+    def test_follows_growth_past_profile_count(self, store):
+        """Should keep paging while the last page is full."""
+        requester = FakeFollowers(range(1, 201))
+
+        refresh = refresh_list(requester, store, 'octocat', FOLLOWERS, 150)
+
+        assert len(refresh.ids) == 200
+        assert requester.requests == [1, 2, 3]
+
+    def test_records_growth(self, store):
+        """Should record added, removed and total per refresh."""
+        requester = FakeFollowers([1, 2, 3])
+        refresh_list(requester, store, 'octocat', FOLLOWERS, 3)
+        requester.ids = [2, 3, 4, 5]
+        refresh_list(requester, store, 'octocat', FOLLOWERS, 4)
+
+        growth = store.growth('octocat', FOLLOWERS)
+        assert [row[1:] for row in growth][-1] == (2, 1, 4)
+
+    def test_deadline_stores_nothing(self, store):
+        """Should raise DeadlineExceeded and keep the previous list."""
+        with pytest.raises(DeadlineExceeded):
+            refresh_list(FakeFollowers([1]), store, 'octocat', FOLLOWERS, 1, deadline=Deadline(0))
+
+        assert len(store.current('octocat', FOLLOWERS)) == 0
@@ -0,0 +1,174 @@
+"""Tests for GraphQL batching of planner needs."""
+
+import re
+
+from github import GithubException
+
+from github_stats.metrics import graphql as graphql_module
+from github_stats.metrics.graphql import GraphQLBatcher, build_languages_query, build_query, fetch_languages
+from github_stats.metrics.planner import PROFILE, REPOS, SEARCH, FetchPlanner, Need
+from github_stats.metrics.pull_requests import PullRequestMetric
+from github_stats.metrics.stars import StarMetric
+
+PR_QUERY = "type:pr author:{}"
+
+
+def _needs(username):
+    return [Need(PROFILE), Need(REPOS), Need(SEARCH, PR_QUERY.format(username))]
+
+
+def _user(login, repos):
+    return {
+        'login': login,
+        'email': '',
+        'followers': {'totalCount': 7},
+        'following': {'totalCount': 3},
+        'repositories': {
+            'totalCount': len(repos),
+            'nodes': [
+                {'name': name, 'nameWithOwner': f"{login}/{name}", 'stargazerCount': stars, 'isFork': False}
+                for name, stars in repos
+            ],
+        },
+    }
+
+
+class FakeRequester:
+    """Answers aliased documents from a table of users; unknown logins fail."""
+
+    def __init__(self, users, fail_over=None):
+        self.users = users
+        self.fail_over = fail_over
+        self.documents = []
+
+    def requestJsonAndCheck(self, verb, url, parameters=None, headers=None, input=None):
+        assert (verb, url) == ("POST", "/graphql")
+        document = input['query']
+        self.documents.append(document)
+        if self.fail_over and document.count(': user(') > self.fail_over:
+            raise GithubException(502, {'message': 'Something went wrong'}, None)
+
+        data, errors = {}, []
+        for alias, login in re.findall(r'(u\d+): user\(login: "([^"]+)"\)', document):
+            if login in self.users:
+                data[alias] = self.users[login]
+            else:
+                data[alias] = None
+                errors.append({'type': 'NOT_FOUND', 'path': [alias], 'message': f"Could not resolve to a User with the login of '{login}'."})
+        for alias, query in re.findall(r'(u\d+s\d+[to]): search\(query: "([^"]+)"', document):
+            data[alias] = {'issueCount': 2 if 'state:open' in query else 10}
+        return {}, {'data': data, 'errors': errors} if errors else {'data': data}
+
+
+class TestBuildQuery:
+    """Tests for aliased GraphQL documents."""
+
+    def test_aliases_every_user_and_search(self):
+        """Should give each user field and search count its own alias."""
+        document, aliases = build_query({'octocat': _needs('octocat'), 'hubot': [Need(PROFILE)]})
+
+        assert 'u0: user(login: "octocat")' in document
+        assert 'u1: user(login: "hubot")' in document
+        assert 'first: 100' in document.splitlines()[1]
+        assert 'first:' not in document.splitlines()[-2]
+        assert aliases['u0s0o'] == ('octocat', Need(SEARCH, PR_QUERY.format('octocat')), True)
+
+
+class TestGraphQLBatcher:
+    """Tests for resolving needs of many users at once."""
+
+    def test_resolves_needs_for_many_users_in_one_request(self):
+        """Should resolve profiles, listings and search counts with one query."""
+        requester = FakeRequester({'a': _user('a', [('x', 5)]), 'b': _user('b', [])})
+        batcher = GraphQLBatcher(requester)
+
+        results = batcher.fetch({'a': _needs('a'), 'b': _needs('b')})
+
+        assert len(requester.documents) == 1
+        assert results['a'][Need(PROFILE)].followers == 7
+        assert [record.full_name for record in results['a'][Need(REPOS)]] == ['a/x']
+        sample = results['b'][Need(SEARCH, PR_QUERY.format('b'))]
+        assert (sample.total, sample.open) == (10, 2)
+
+    def test_splits_out_per_user_errors(self):
+        """Should report a missing user without failing the others."""
+        batcher = GraphQLBatcher(FakeRequester({'a': _user('a', [])}))
+
+        results = batcher.fetch({'a': [Need(PROFILE)], 'ghost': [Need(PROFILE)]})
+
+        assert set(results) == {'a'}
+        assert 'ghost' in batcher.errors['ghost']
+
+    def test_bisects_rejected_documents(self):
+        """Should split a document the server rejects and retry the halves."""
+        users = {name: _user(name, []) for name in 'abcd'}
+        requester = FakeRequester(users, fail_over=1)
+        batcher = GraphQLBatcher(requester)
+
+        results = batcher.fetch({name: [Need(PROFILE)] for name in users})
+
+        assert set(results) == set(users)
+        assert batcher.errors == {}
+
+    def test_large_listings_are_left_to_rest(self):
+        """Should not seed a listing that does not fit into one page."""
+        user = _user('a', [('x', 1)])
+        user['repositories']['totalCount'] = 250
+        results = GraphQLBatcher(FakeRequester({'a': user})).fetch({'a': _needs('a')})
+
+        assert Need(REPOS) not in results['a']
+        assert results['a'][Need(PROFILE)].public_repos == 250
+
+    def test_groups_respect_limits(self, monkeypatch):
+        """Should start a new document once the user or node limit is reached."""
+        monkeypatch.setattr(graphql_module, 'MAX_USERS_PER_QUERY', 2)
+        batcher = GraphQLBatcher(FakeRequester({}))
+
+        groups = batcher.groups({name: [Need(PROFILE)] for name in 'abcde'})
+
+        assert [list(group) for group in groups] == [['a', 'b'], ['c', 'd'], ['e']]
+
+
+class TestFetchLanguages:
+    """Tests for batched language byte counts."""
+
+    def test_one_alias_per_repository(self):
+        """Should ask for each repository's languages under its own alias."""
+        document = build_languages_query(['a/x', 'b/y'])
+
+        assert 'r0: repository(owner: "a", name: "x")' in document
+        assert 'r1: repository(owner: "b", name: "y")' in document
+
+    def test_bisects_rejected_documents(self):
+        """Should split a rejected document and drop repositories that still fail."""
+        class Requester:
+            def requestJsonAndCheck(self, verb, url, parameters=None, headers=None, input=None):
+                names = re.findall(r'name: "([^"]+)"', input['query'])
+                if 'broken' in names:
+                    raise GithubException(502, {'message': 'Something went wrong'}, None)
+                edges = [{'size': 5, 'node': {'name': 'Go'}}]
+                return {}, {'data': {
+                    f"r{index}": {'languages': {'totalSize': 5, 'edges': edges}} for index in range(len(names))
+                }}
+
+        results = fetch_languages(Requester(), ['a/x', 'a/broken', 'a/y'])
+
+        assert results == {'a/x': {'Go': 5}, 'a/y': {'Go': 5}}
+
+
+class TestSeededPlanner:
+    """Tests for feeding metrics from batched results."""
+
+    def test_seeded_needs_are_not_fetched(self, mock_github_client):
+        """Should feed metrics from seeded data without any API calls."""
+        results = GraphQLBatcher(FakeRequester({'a': _user('a', [('x', 5), ('y', 1)])})).fetch({'a': _needs('a')})
+        planner = FetchPlanner(mock_github_client, 'a')
+        planner.seed(results['a'])
+        stars, prs = StarMetric(mock_github_client, 'a'), PullRequestMetric(mock_github_client, 'a')
+
+        assert planner.run([stars, prs]) == {}
+
+        mock_github_client.get_user.assert_not_called()
+        mock_github_client.search_issues.assert_not_called()
+        assert stars.data['total_stars'] == 6
+        assert prs.data['total'] == 10
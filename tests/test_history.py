@@ -0,0 +1,86 @@
+"""Integration tests for the local snapshot history store."""
+
+import pytest
+
+from github_stats.history import HistoryStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Create a history store in a temporary directory."""
+    with HistoryStore(tmp_path / "history.db") as history:
+        yield history
+
+
+class TestRecord:
+    """Tests for appending snapshots."""
+
+    def test_stores_numeric_fields_only(self, store):
+        """Should keep numbers and drop lists, strings and non-finite values."""
+        stored = store.record("octocat", {
+            'Stars': {'total_stars': 10, 'top_repositories': [('a', 10)]},
+            'Followers': {'followers': 5, 'ratio': float('inf')},
+            'Pull Requests': {'merge_rate': 37.5, 'label': 'x'},
+        }, taken_at=100)
+
+        assert stored == 3
+        assert store.series("octocat") == [
+            ('Followers', 'followers'),
+            ('Pull Requests', 'merge_rate'),
+            ('Stars', 'total_stars'),
+        ]
+
+    def test_uses_default_data_dir(self, isolated_data_dir):
+        """Should create the database in GITHUB_STATS_HOME by default."""
+        with HistoryStore() as history:
+            history.record("octocat", {'Stars': {'total_stars': 1}})
+
+        assert (isolated_data_dir / "history.db").exists()
+
+
+class TestQueries:
+    """Tests for trend and diff queries."""
+
+    def test_trend_returns_points_in_order(self, store):
+        """Should return a series' points ordered by time within the range."""
+        for taken_at, stars in [(300, 12), (100, 10), (200, 11)]:
+            store.record("octocat", {'Stars': {'total_stars': stars}}, taken_at=taken_at)
+
+        assert store.trend("octocat", "Stars", "total_stars") == [(100, 10.0), (200, 11.0), (300, 12.0)]
+        assert store.trend("octocat", "Stars", "total_stars", since=150) == [(200, 11.0), (300, 12.0)]
+
+    def test_trend_is_scoped_to_user(self, store):
+        """Should not mix snapshots of different users."""
+        store.record("octocat", {'Stars': {'total_stars': 10}}, taken_at=100)
+        store.record("hubot", {'Stars': {'total_stars': 99}}, taken_at=100)
+
+        assert store.trend("octocat", "Stars", "total_stars") == [(100, 10.0)]
+        assert store.trend("nobody", "Stars", "total_stars") == []
+
+    def test_diff_compares_first_and_last(self, store):
+        """Should report first and last values of each series in the range."""
+        store.record("octocat", {'Stars': {'total_stars': 10}, 'Followers': {'followers': 3}}, taken_at=100)
+        store.record("octocat", {'Stars': {'total_stars': 15}, 'Followers': {'followers': 4}}, taken_at=200)
+        store.record("octocat", {'Stars': {'total_stars': 20}}, taken_at=300)
+
+        assert store.diff("octocat") == [
+            ('Followers', 'followers', 3.0, 4.0),
+            ('Stars', 'total_stars', 10.0, 20.0),
+        ]
+        assert store.diff("octocat", until=250) == [
+            ('Followers', 'followers', 3.0, 4.0),
+            ('Stars', 'total_stars', 10.0, 15.0),
+        ]
+
+    def test_trend_query_uses_primary_key(self, store):
+        """Trend lookups should be index range scans, not table scans."""
+        store.record("octocat", {'Stars': {'total_stars': 1}}, taken_at=100)
+
+        plan = store.connection.execute(
+            "EXPLAIN QUERY PLAN SELECT taken_at, value FROM points "
+            "WHERE series_id = 1 AND taken_at BETWEEN 0 AND 1000 ORDER BY taken_at"
+        ).fetchall()
+
+        details = " ".join(row[-1] for row in plan)
+        assert "SEARCH" in details
+        assert "SCAN" not in details
@@ -0,0 +1,80 @@
+"""Tests for the batch checkpoint journal."""
+
+import json
+
+import pytest
+
+from github_stats.journal import Journal, JournalMismatch
+
+PARAMS = {'since': None, 'until': None, 'commit_strategy': 'stats', 'metrics': ['Stars']}
+
+
+@pytest.fixture
+def path(tmp_path):
+    return tmp_path / "journal.jsonl"
+
+
+class TestJournal:
+    """Tests for recording and resuming batch progress."""
+
+    def test_resume_restores_finished_work(self, path):
+        """Should restore results, per-repo counts and finished users."""
+        with Journal(path) as journal:
+            journal.start(PARAMS)
+            journal.record_result("octocat", "Stars", {'value': '10'})
+            journal.finish_user("octocat")
+            journal.record_repo("torvalds", "torvalds/linux", 1200)
+
+        with Journal(path) as journal:
+            state = journal.resume(PARAMS)
+
+        assert state.done == {"octocat"}
+        assert state.results["octocat"]["Stars"] == {'value': '10'}
+        assert state.repo_counts == {"torvalds": {"torvalds/linux": 1200}}
+
+    def test_close_flushes_buffered_entries(self, path):
+        """Should write buffered entries when closed (e.g. on Ctrl-C)."""
+        journal = Journal(path)
+        journal.start(PARAMS)
+        journal.record_repo("torvalds", "torvalds/linux", 5)
+        assert len(path.read_text().splitlines()) == 1
+
+        journal.close()
+
+        assert len(path.read_text().splitlines()) == 2
+
+    def test_ignores_torn_last_line(self, path):
+        """Should skip a partially written entry and keep appending cleanly."""
+        with Journal(path) as journal:
+            journal.start(PARAMS)
+            journal.finish_user("octocat")
+        with open(path, 'a') as f:
+            f.write('{"kind": "done", "us')
+
+        with Journal(path) as journal:
+            journal.resume(PARAMS)
+            journal.finish_user("torvalds")
+
+        with Journal(path) as journal:
+            assert journal.resume(PARAMS).done == {"octocat", "torvalds"}
+        assert json.loads(path.read_text().splitlines()[-1]) == {'kind': 'done', 'user': 'torvalds'}
+
+    def test_refuses_other_settings(self, path):
+        """Should not mix results collected with different settings."""
+        with Journal(path) as journal:
+            journal.start(PARAMS)
+
+        with pytest.raises(JournalMismatch):
+            Journal(path).resume(dict(PARAMS, commit_strategy='list'))
+
+    def test_start_discards_previous_run(self, path):
+        """Should begin from scratch without --resume."""
+        with Journal(path) as journal:
+            journal.start(PARAMS)
+            journal.finish_user("octocat")
+
+        with Journal(path) as journal:
+            journal.start(PARAMS)
+
+        with Journal(path) as journal:
+            assert journal.resume(PARAMS).done == set()
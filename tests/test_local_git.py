@@ -0,0 +1,107 @@
+"""Tests for counting commits from local git clones."""
+
+import subprocess
+from datetime import datetime, timezone
+from unittest.mock import Mock
+
+import pytest
+
+from github_stats.metrics.commits import CommitMetric
+from github_stats.metrics.local_git import LocalRepos, author_patterns, count_commits
+from github_stats.metrics.records import RepoRecord
+
+
+def _git(path, *args, author="someone <someone@example.com>", date="2024-01-15T12:00:00+00:00"):
+    name, email = author[:-1].split(" <")
+    env = {
+        "GIT_AUTHOR_NAME": name, "GIT_AUTHOR_EMAIL": email, "GIT_AUTHOR_DATE": date,
+        "GIT_COMMITTER_NAME": name, "GIT_COMMITTER_EMAIL": email, "GIT_COMMITTER_DATE": date,
+        "HOME": str(path), "PATH": "/usr/bin:/bin:/usr/local/bin",
+    }
+    subprocess.run(["git", "-C", str(path), *args], check=True, capture_output=True, env=env)
+
+
+def _clone(path, commits):
+    """Create a repository with one empty commit per (author, date)."""
+    path.mkdir(parents=True)
+    _git(path, "init", "-q")
+    for author, date in commits:
+        _git(path, "commit", "-q", "--allow-empty", "-m", "change", author=author, date=date)
+    return path
+
+
+@pytest.fixture
+def clones(tmp_path):
+    root = tmp_path / "mirrors"
+    _clone(root / "testuser" / "tool", [
+        ("TestUser <work@example.org>", "2023-06-01T00:00:00+00:00"),
+        ("testuser <1234+testuser@users.noreply.github.com>", "2024-01-10T00:00:00+00:00"),
+        ("other <other@example.com>", "2024-01-11T00:00:00+00:00"),
+        ("Test User <test@example.com>", "2024-02-10T00:00:00+00:00"),
+    ])
+    _clone(root / "notes", [("testuser <testuser@users.noreply.github.com>", "2024-01-12T00:00:00+00:00")])
+    return root
+
+
+class TestCountCommits:
+    """Tests for git-based counting."""
+
+    def test_matches_login_noreply_and_email(self, clones):
+        """Should count commits by login name, noreply address or profile email."""
+        authors = author_patterns("testuser", "test@example.com")
+
+        assert count_commits(clones / "testuser" / "tool", authors) == 3
+
+    def test_applies_time_window(self, clones):
+        """Should only count commits inside since/until."""
+        authors = author_patterns("testuser", "test@example.com")
+        since = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        until = datetime(2024, 1, 31, tzinfo=timezone.utc)
+
+        assert count_commits(clones / "testuser" / "tool", authors, since, until) == 1
+
+    def test_reports_git_failures(self, tmp_path):
+        """Should return None for directories git cannot read."""
+        assert count_commits(tmp_path, author_patterns("testuser")) is None
+
+
+class TestLocalRepos:
+    """Tests for mapping repositories to clones."""
+
+    def test_finds_owner_and_flat_layouts(self, clones):
+        """Should find <owner>/<name> and <name> clones, case-insensitively."""
+        local = LocalRepos(clones)
+
+        assert local.find(RepoRecord("Tool", "TestUser/Tool")) == clones / "testuser" / "tool"
+        assert local.find(RepoRecord("notes", "testuser/notes")) == clones / "notes"
+        assert local.find(RepoRecord("missing", "testuser/missing")) is None
+        assert len(local) == 2
+
+    def test_other_owners_clone_is_not_used(self, clones):
+        """Should not match an <owner>/<name> clone for another owner's repository of that name."""
+        local = LocalRepos(clones)
+
+        assert local.find(RepoRecord("tool", "alice/tool")) is None
+
+    def test_commit_metric_falls_back_to_api(self, clones):
+        """Should count cloned repos with git and the rest through the API."""
+        remote = Mock(full_name="testuser/remote", stargazers_count=0, pushed_at=None)
+        remote.name = "remote"
+        remote.get_stats_contributors.return_value = [Mock(author=Mock(login="testuser"), total=7, weeks=[])]
+        listing = [
+            Mock(full_name="testuser/tool", stargazers_count=0, pushed_at=None),
+            remote,
+        ]
+        listing[0].name = "tool"
+        client = Mock()
+        client.get_user.return_value = Mock(login="testuser", email="test@example.com", public_repos=2)
+        client.get_user.return_value.get_repos.return_value = iter(listing)
+        client.get_repo.side_effect = lambda full_name, lazy=False: remote
+
+        local = LocalRepos(clones, jobs=2)
+        metric = CommitMetric(client, "testuser", local_repos=local)
+        metric.collect()
+        local.close()
+
+        assert dict(metric.get_detailed()['top_repositories']) == {"tool": 3, "remote": 7}
+        client.get_repo.assert_called_once_with("testuser/remote", lazy=True)
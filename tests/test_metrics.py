@@ -1,14 +1,91 @@
 """Integration tests for GitHub metrics modules."""
 
 import pytest
+import threading
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from datetime import datetime, timezone
 from unittest.mock import Mock, MagicMock
 from github import GithubException
 
+from github_stats.concurrency import ConcurrencyController
+from github_stats.deadline import Deadline
 from github_stats.metrics.commits import CommitMetric
 from github_stats.metrics.followers import FollowerMetric
 from github_stats.metrics.stars import StarMetric
 from github_stats.metrics.pull_requests import PullRequestMetric
 from github_stats.metrics.issues import IssueMetric
+from github_stats.metrics.languages import LanguageMetric
+from github_stats.metrics.contributions import ContributionMetric
+from github_stats.metrics.filters import RepoFilter
+from github_stats.metrics.calendar import ContributionCalendar
+from github_stats.metrics.planner import CALENDAR, Need
+from github_stats.metrics.streaming import RepoTally, stream
+from github_stats.metrics.records import RepoRecord, iter_repo_records
+from github.PaginatedList import PaginatedList
+from github.Repository import Repository
+
+
+REPO_LISTING_ITEM = {
+    "name": "Spoon-Knife",
+    "full_name": "octocat/Spoon-Knife",
+    "stargazers_count": 12000,
+    "forks_count": 140000,
+    "language": "HTML",
+    "pushed_at": "2024-02-01T10:30:00Z",
+    "fork": False,
+    "archived": True,
+}
+
+
+class _SyntheticStat:
+    """Minimal /stats/contributors entry."""
+
+    def __init__(self, login, total):
+        self.author = SimpleNamespace(login=login)
+        self.total = total
+        self.weeks = []
+
+
+class _SyntheticRepo:
+    """Minimal repository exposing only what the metrics read."""
+
+    def __init__(self, index):
+        self.name = f"repo-{index:06d}"
+        self.full_name = f"testuser/{self.name}"
+        self.stargazers_count = index % 97
+        self.pushed_at = None
+        self._index = index
+
+    def get_stats_contributors(self):
+        return [_SyntheticStat("testuser", self._index % 53 + 1)]
+
+
+class _SyntheticClient:
+    """Client double for a large account; unlike Mock it keeps no call history."""
+
+    def __init__(self, repo_count):
+        self.repo_count = repo_count
+
+    def get_user(self, login):
+        return SimpleNamespace(
+            login=login, followers=0, following=0, public_repos=self.repo_count,
+            get_repos=lambda **kwargs: (_SyntheticRepo(i) for i in range(self.repo_count)),
+        )
+
+    def get_repo(self, full_name, lazy=False):
+        return _SyntheticRepo(int(full_name.rsplit("-", 1)[1]))
+
+
+def _peak_memory(metric_class, repo_count):
+    metric = metric_class(_SyntheticClient(repo_count), "testuser")
+    tracemalloc.start()
+    try:
+        metric.collect()
+        return tracemalloc.get_traced_memory()[1], metric
+    finally:
+        tracemalloc.stop()
 
 
 class TestCommitMetric:
@@ -82,14 +159,300 @@ class TestCommitMetric:
         mock_repo = Mock()
         mock_repo.name = "test-repo"
         mock_repo.get_commits.side_effect = GithubException(403, {"message": "Forbidden"}, None)
+        mock_repo.get_stats_contributors.side_effect = GithubException(403, {"message": "Forbidden"}, None)
         mock_user.get_repos.return_value = iter([mock_repo])
         mock_client.get_user.return_value = mock_user
+        mock_client.get_repo.return_value = mock_repo
 
         metric = CommitMetric(mock_client, "testuser")
         metric.collect()  # Should not raise
 
         assert metric.total_commits == 0
 
+    def test_pushes_time_window_to_commit_listing(self, mock_github_client, mock_repos):
+        """Should pass since/until to the commit listing."""
+        since = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        until = datetime(2024, 3, 31, tzinfo=timezone.utc)
+        for repo in mock_repos:
+            repo.pushed_at = datetime(2024, 2, 1, tzinfo=timezone.utc)
+
+        metric = CommitMetric(mock_github_client, "testuser", strategy="list", since=since, until=until)
+        metric.collect()
+
+        mock_repos[0].get_commits.assert_called_with(author="testuser", since=since, until=until)
+
+    def test_skips_repos_dormant_before_window(self, mock_github_client, mock_repos):
+        """Should stop at the first repo last pushed before the window."""
+        since = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        mock_repos[0].pushed_at = datetime(2024, 2, 1, tzinfo=timezone.utc)
+        mock_repos[1].pushed_at = datetime(2023, 6, 1, tzinfo=timezone.utc)
+        mock_repos[2].pushed_at = datetime(2023, 1, 1, tzinfo=timezone.utc)
+
+        metric = CommitMetric(mock_github_client, "testuser", strategy="list", since=since)
+        metric.collect()
+
+        mock_github_client.get_user().get_repos.assert_called_with(sort="pushed", direction="desc")
+        mock_repos[1].get_commits.assert_not_called()
+        mock_repos[2].get_commits.assert_not_called()
+        assert metric.total_commits == 1
+
+    def test_filters_skip_repos_before_any_call(self, mock_github_client, mock_repos):
+        """Should skip forks and archived repos on their listing fields and report the savings."""
+        mock_repos[0].fork = True
+        mock_repos[1].archived = True
+        repo_filter = RepoFilter(exclude_forks=True, exclude_archived=True, owner_only=True)
+
+        metric = CommitMetric(mock_github_client, "testuser", repo_filter=repo_filter)
+        metric.collect()
+
+        mock_github_client.get_user().get_repos.assert_called_with(type="owner")
+        mock_repos[0].get_stats_contributors.assert_not_called()
+        mock_repos[1].get_stats_contributors.assert_not_called()
+        assert metric.total_commits == 3
+        assert metric.data['skipped_repos'] == {'fork': 1, 'archived': 1}
+        assert metric.get_detailed()['calls_saved'] == 2
+
+    def test_min_pushed_stops_the_listing(self, mock_github_client, mock_repos):
+        """Should list by push date and count the unlisted rest as skipped."""
+        mock_repos[0].pushed_at = datetime(2024, 2, 1, tzinfo=timezone.utc)
+        mock_repos[1].pushed_at = datetime(2023, 6, 1, tzinfo=timezone.utc)
+        mock_repos[2].pushed_at = datetime(2023, 1, 1, tzinfo=timezone.utc)
+        repo_filter = RepoFilter(min_pushed=datetime(2024, 1, 1, tzinfo=timezone.utc))
+
+        metric = CommitMetric(mock_github_client, "testuser", strategy="list", repo_filter=repo_filter)
+        metric.collect()
+
+        mock_github_client.get_user().get_repos.assert_called_with(sort="pushed", direction="desc")
+        mock_repos[1].get_commits.assert_not_called()
+        assert metric.data['skipped_repos'] == {'dormant': 2}
+        assert metric.get_detailed()['calls_saved'] == 4
+
+    def test_owner_only_skips_other_owners(self):
+        """Should skip repositories listed under another owner."""
+        repo_filter = RepoFilter(owner_only=True)
+
+        assert repo_filter.reason(RepoRecord("a", "TestUser/a"), "testuser") is None
+        assert repo_filter.reason(RepoRecord("b", "some-org/b"), "testuser") == 'not owned'
+        assert not RepoFilter()
+
+
+class TestCommitCountingStrategies:
+    """Tests for counting commits from contributor statistics."""
+
+    @pytest.fixture(autouse=True)
+    def no_poll_delay(self, monkeypatch):
+        """Don't sleep between polling rounds."""
+        monkeypatch.setattr(CommitMetric, 'STATS_POLL_DELAYS', (0, 0))
+
+    def _client_with(self, repos):
+        client = Mock()
+        client.get_user.return_value.get_repos.return_value = iter(repos)
+        repos_by_name = {repo.full_name: repo for repo in repos}
+        client.get_repo.side_effect = lambda full_name, lazy=False: repos_by_name[full_name]
+        return client
+
+    def _repo(self, name, stats):
+        repo = Mock()
+        repo.name = name
+        repo.full_name = f"testuser/{name}"
+        repo.get_stats_contributors = Mock(side_effect=stats)
+        repo.get_commits = Mock(return_value=iter([Mock() for _ in range(3)]))
+        repo.get_contributors = Mock(return_value=iter([]))
+        return repo
+
+    def _stat(self, login, total, weeks=()):
+        return Mock(author=Mock(login=login), total=total, weeks=list(weeks))
+
+    def test_uses_contributor_totals_without_listing(self):
+        """Should take totals from /stats/contributors and never list commits."""
+        repo = self._repo("big-repo", [[self._stat("TestUser", 4200), self._stat("other", 10)]])
+
+        metric = CommitMetric(self._client_with([repo]), "testuser")
+        metric.collect()
+
+        assert metric.total_commits == 4200
+        repo.get_commits.assert_not_called()
+
+    def test_polls_repos_still_computing(self):
+        """Should revisit repos that answered 202 after the first pass."""
+        computing = self._repo("computing", [None, None, [self._stat("testuser", 8)]])
+        ready = self._repo("ready", [[self._stat("testuser", 2)]])
+
+        metric = CommitMetric(self._client_with([computing, ready]), "testuser")
+        metric.collect()
+
+        assert dict(metric.get_detailed()['top_repositories']) == {"computing": 8, "ready": 2}
+        assert computing.get_stats_contributors.call_count == 3
+        computing.get_commits.assert_not_called()
+
+    def test_falls_back_to_contributors_then_listing(self):
+        """Should use /contributors, then listing, for repos that never finish."""
+        contributors = self._repo("contributors", [None, None, None])
+        contributors.get_contributors.return_value = iter([Mock(login="testuser", contributions=11)])
+        listed = self._repo("listed", [None, None, None])
+        listed.get_contributors.side_effect = GithubException(500, {"message": "Error"}, None)
+
+        metric = CommitMetric(self._client_with([contributors, listed]), "testuser")
+        metric.collect()
+
+        assert dict(metric.get_detailed()['top_repositories']) == {"contributors": 11, "listed": 3}
+        contributors.get_commits.assert_not_called()
+
+    def test_lists_when_user_may_be_beyond_top_contributors(self):
+        """Should list commits when the user is absent from a full top-100 list."""
+        stats = [self._stat(f"user{i}", 100) for i in range(100)]
+        repo = self._repo("popular", [stats])
+
+        metric = CommitMetric(self._client_with([repo]), "testuser")
+        metric.collect()
+
+        assert dict(metric.get_detailed()['top_repositories']) == {"popular": 3}
+        repo.get_commits.assert_called_once()
+
+    def test_absent_from_short_list_means_no_commits(self):
+        """Should count zero without listing when the contributor list is complete."""
+        repo = self._repo("small", [[self._stat("other", 5)]])
+
+        metric = CommitMetric(self._client_with([repo]), "testuser")
+        metric.collect()
+
+        assert metric.total_commits == 0
+        repo.get_commits.assert_not_called()
+
+    def test_sums_weeks_inside_window(self):
+        """Should sum whole weeks in the window and list only the partial edge weeks."""
+        week = lambda start, c: Mock(w=start, c=c)  # noqa: E731
+        weeks = [
+            week(datetime(2023, 12, 24, tzinfo=timezone.utc), 50),  # before the window
+            week(datetime(2023, 12, 31, tzinfo=timezone.utc), 9),   # partial, listed
+            week(datetime(2024, 1, 7, tzinfo=timezone.utc), 4),
+            week(datetime(2024, 1, 14, tzinfo=timezone.utc), 0),
+            week(datetime(2024, 1, 21, tzinfo=timezone.utc), 6),
+        ]
+        repo = self._repo("windowed", [[self._stat("testuser", 69, weeks)]])
+        repo.pushed_at = datetime(2024, 2, 1, tzinfo=timezone.utc)
+
+        metric = CommitMetric(self._client_with([repo]), "testuser", since=datetime(2024, 1, 1, tzinfo=timezone.utc))
+        metric.collect()
+
+        assert metric.total_commits == 3 + 4 + 6
+        repo.get_commits.assert_called_once()
+
+    def test_estimate_keeps_edge_weeks_as_slack(self):
+        """Should bound the partial edge weeks instead of listing them."""
+        weeks = [
+            Mock(w=datetime(2023, 12, 31, tzinfo=timezone.utc), c=9),  # partial, bounded
+            Mock(w=datetime(2024, 1, 7, tzinfo=timezone.utc), c=4),
+        ]
+        repo = self._repo("windowed", [[self._stat("testuser", 13, weeks)]])
+        repo.pushed_at = datetime(2024, 2, 1, tzinfo=timezone.utc)
+
+        metric = CommitMetric(
+            self._client_with([repo]), "testuser", since=datetime(2024, 1, 1, tzinfo=timezone.utc), estimate=True
+        )
+        metric.collect()
+
+        repo.get_commits.assert_not_called()
+        assert metric.total_commits == 4
+        assert metric.get_detailed()['commits_high'] == 13
+        assert metric.get_summary().endswith("(estimated, up to 13)")
+
+    def test_estimate_probes_listing_pages(self):
+        """Should bound listed counts from the last-page link instead of paging."""
+        repo = self._repo("huge", [])
+        repo.url = "https://api.github.com/repos/testuser/huge"
+        client = self._client_with([repo])
+        link = f'<{repo.url}/commits?page=2>; rel="next", <{repo.url}/commits?page=500>; rel="last"'
+        client._Github__requester.requestJsonAndCheck.return_value = ({'link': link}, [{}] * 100)
+
+        metric = CommitMetric(client, "testuser", strategy="list", estimate=True)
+        metric.collect()
+
+        repo.get_commits.assert_not_called()
+        assert client._Github__requester.requestJsonAndCheck.call_count == 1
+        assert metric.total_commits == 49901
+        assert metric.get_detailed()['commits_high'] == 50000
+
+    def test_list_strategy_skips_statistics(self):
+        """Should never call the statistics endpoint with strategy='list'."""
+        repo = self._repo("repo", [[self._stat("testuser", 99)]])
+
+        metric = CommitMetric(self._client_with([repo]), "testuser", strategy="list")
+        metric.collect()
+
+        assert metric.total_commits == 3
+        repo.get_stats_contributors.assert_not_called()
+
+    def test_deadline_keeps_partial_counts(self):
+        """Should stop at the deadline and report the repos it counted."""
+        release = threading.Event()
+        fast = self._repo("fast", [[self._stat("testuser", 5)]])
+        slow = self._repo("slow", None)
+        slow.get_stats_contributors.side_effect = lambda: release.wait(5)
+        never = self._repo("never", [[self._stat("testuser", 1)]])
+        client = self._client_with([fast, slow, never])
+        client.get_user.return_value.public_repos = 3
+
+        metric = CommitMetric(client, "testuser", deadline=Deadline(0.2))
+        metric.collect()
+        release.set()
+
+        assert metric.total_commits == 5
+        assert metric.partial
+        assert metric.coverage == "counted 1/3 repos"
+        never.get_stats_contributors.assert_not_called()
+
+    def test_cancels_queued_counts_at_deadline(self):
+        """Should cancel repositories still queued when the deadline passes."""
+        metric = CommitMetric(Mock(), "testuser", deadline=Deadline(0.05))
+        metric.begin_repos()
+        release = threading.Event()
+        started = []
+
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            metric._track(pool.submit(release.wait, 5))
+            queued = pool.submit(started.append, "queued")
+            metric._track(queued)
+            metric.end_repos()
+            release.set()
+
+        assert queued.cancelled()
+        assert started == []
+
+    def test_counts_repos_concurrently(self):
+        """Should give the same totals when repos are counted in parallel."""
+        repos = [self._repo(f"repo-{i}", [[self._stat("testuser", i + 1)]]) for i in range(20)]
+        controller = ConcurrencyController(initial=4, maximum=4)
+
+        metric = CommitMetric(self._client_with(repos), "testuser", concurrency=controller)
+        metric.collect()
+        controller.close()
+
+        assert metric.total_commits == sum(range(1, 21))
+        assert metric.get_detailed()['repositories'] == 20
+
+    def test_resumes_from_checkpointed_counts(self):
+        """Should reuse counts from an interrupted run and report new ones."""
+        done = self._repo("done", [[self._stat("testuser", 40)]])
+        todo = self._repo("todo", [[self._stat("testuser", 2)]])
+        counted = []
+
+        metric = CommitMetric(
+            self._client_with([done, todo]), "testuser",
+            resume_counts={"testuser/done": 40},
+            on_count=lambda record, count: counted.append((record.full_name, count)),
+        )
+        metric.collect()
+
+        assert metric.total_commits == 42
+        done.get_stats_contributors.assert_not_called()
+        assert counted == [("testuser/todo", 2)]
+
+    def test_rejects_unknown_strategy(self, mock_github_client):
+        """Should reject unknown counting strategies."""
+        with pytest.raises(ValueError):
+            CommitMetric(mock_github_client, "testuser", strategy="guess")
+
 
 class TestFollowerMetric:
     """Integration tests for follower statistics."""
@@ -245,6 +608,19 @@ class TestPullRequestMetric:
         assert "%" in summary
         assert "closed" in summary
 
+    def test_search_query_includes_created_range(self, mock_github_client):
+        """Should restrict the search to the requested window."""
+        metric = PullRequestMetric(
+            mock_github_client, "testuser",
+            since=datetime(2024, 1, 1, tzinfo=timezone.utc),
+            until=datetime(2024, 3, 31, 23, 59, 59, tzinfo=timezone.utc),
+        )
+
+        metric.fetch()
+
+        query = mock_github_client.search_issues.call_args.args[0]
+        assert "created:2024-01-01..2024-03-31" in query
+
     def test_handles_no_prs(self):
         """Should handle user with no PRs."""
         mock_client = Mock()
@@ -311,6 +687,15 @@ class TestIssueMetric:
         assert "%" in summary
         assert "closed" in summary
 
+    def test_search_query_includes_open_ended_range(self, mock_github_client):
+        """Should use an open-ended created qualifier when only --until is set."""
+        metric = IssueMetric(mock_github_client, "testuser", until=datetime(2024, 3, 31, tzinfo=timezone.utc))
+
+        metric.fetch()
+
+        query = mock_github_client.search_issues.call_args.args[0]
+        assert "created:<=2024-03-31" in query
+
     def test_handles_no_issues(self):
         """Should handle user with no issues."""
         mock_client = Mock()
@@ -338,6 +723,217 @@ class TestIssueMetric:
         assert 'close_rate' in detailed
 
 
+class TestLanguageMetric:
+    """Integration tests for language statistics."""
+
+    def _record(self, name, language, fork=False):
+        return RepoRecord(name, f"testuser/{name}", language=language, fork=fork)
+
+    def test_counts_primary_languages_from_listing(self, mock_github_client):
+        """Should count primary languages without per-repo calls."""
+        metric = LanguageMetric(mock_github_client, "testuser")
+        metric.collect()
+
+        assert metric.get_summary() == "Python, 100% of 3 repos"
+        mock_github_client.get_repo.assert_not_called()
+
+    def test_skips_forks_and_unknown_languages(self, mock_github_client):
+        """Should leave out forks and rank languages by repository count."""
+        metric = LanguageMetric(mock_github_client, "testuser")
+        metric.begin_repos()
+        for record in [
+            self._record("a", "Go"), self._record("b", "Go"), self._record("c", "Rust"),
+            self._record("d", None), self._record("e", "Java", fork=True),
+        ]:
+            metric.consume_repo(record)
+        metric.end_repos()
+        metric.process()
+
+        assert metric.data['languages'] == [['Go', 2], ['Rust', 1]]
+        assert metric.get_summary() == "Go, 50% of 4 repos, Rust 25%"
+        assert metric.get_detailed()['top_language_share'] == 50.0
+
+    def test_byte_mode_batches_repositories(self, mock_github_client):
+        """Should fetch language bytes for many repositories per GraphQL request."""
+        requester = Mock()
+        requester.requestJsonAndCheck.return_value = ({}, {'data': {
+            'r0': {'languages': {'totalSize': 120, 'edges': [
+                {'size': 100, 'node': {'name': 'Python'}}, {'size': 10, 'node': {'name': 'Shell'}},
+            ]}},
+            'r1': {'languages': {'totalSize': 300, 'edges': [{'size': 300, 'node': {'name': 'C'}}]}},
+            'r2': None,
+        }})
+        mock_github_client._Github__requester = requester
+        metric = LanguageMetric(mock_github_client, "testuser", language_bytes=True)
+
+        metric.collect()
+
+        assert requester.requestJsonAndCheck.call_count == 1
+        assert metric.data['unit'] == 'bytes'
+        assert metric.data['languages'] == [['C', 300], ['Python', 100], ['Other', 10], ['Shell', 10]]
+        assert metric.get_summary().startswith("C, 71% of code")
+
+    def test_handles_no_languages(self):
+        """Should handle users without detectable languages."""
+        metric = LanguageMetric(Mock(), "testuser")
+        metric.begin_repos()
+        metric.end_repos()
+        metric.process()
+
+        assert metric.get_summary() == "N/A, No languages detected"
+        assert metric.get_detailed()['languages'] == 0
+
+
+class TestContributionMetric:
+    """Integration tests for contribution calendar statistics."""
+
+    def _metric(self, counts):
+        since = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        until = datetime(2024, 1, 1 + len(counts) - 1, tzinfo=timezone.utc)
+        metric = ContributionMetric(Mock(), "testuser", since=since, until=until)
+        metric.load({Need(CALENDAR, metric.days()): ContributionCalendar(since.date(), counts)})
+        metric.process()
+        return metric
+
+    def test_window_defaults_to_a_year(self):
+        """Should cover the last 365 days without --since."""
+        metric = ContributionMetric(Mock(), "testuser", until=datetime(2024, 12, 31, tzinfo=timezone.utc))
+
+        first, last = metric.days()
+        assert (last - first).days == 364
+        assert metric.requires() == [Need(CALENDAR, (first, last))]
+
+    def test_streaks_and_weekdays(self):
+        """Should report totals, streaks and the busiest weekday."""
+        # 2024-01-01 is a Monday
+        metric = self._metric([1, 4, 2, 0, 1, 1, 0, 0, 3, 1, 0])
+
+        assert metric.get_summary() == "13, Streak: 2 days (longest 3), busiest on Tuesdays"
+        detailed = metric.get_detailed()
+        assert detailed['active_days'] == 7
+        assert detailed['longest_streak_start'] == "2024-01-01"
+        assert detailed['weekdays']['Tuesday'] == 7
+
+    def test_restores_cached_calendar(self):
+        """Should rebuild the calendar from an earlier run's data."""
+        data = self._metric([1, 1, 0, 2]).data
+        metric = ContributionMetric(Mock(), "testuser")
+
+        metric.restore(data)
+        metric.process()
+
+        assert metric.get_detailed()['total_contributions'] == 4
+        assert metric.get_detailed()['current_streak'] == 1
+
+    def test_handles_no_contributions(self):
+        """Should handle an empty calendar."""
+        metric = self._metric([0, 0, 0])
+
+        assert metric.get_summary() == "0, No contributions"
+        assert metric.get_detailed()['longest_streak_start'] is None
+
+
+class TestStreamingAggregation:
+    """Tests for bounded-memory aggregation over large accounts."""
+
+    @pytest.mark.parametrize("metric_class", [CommitMetric, StarMetric])
+    def test_peak_memory_is_flat_for_50k_repos(self, metric_class):
+        """Peak memory for 50k repos should stay close to that for 5k repos."""
+        small_peak, _ = _peak_memory(metric_class, 5_000)
+        large_peak, metric = _peak_memory(metric_class, 50_000)
+
+        assert metric.get_detailed()['top_repositories']
+        assert len(metric.get_detailed()['top_repositories']) == 10
+        assert large_peak < small_peak * 1.5 + 64 * 1024
+
+    def test_large_account_totals_are_exact(self):
+        """Streaming should not lose anything from totals or top-N."""
+        _, metric = _peak_memory(StarMetric, 50_000)
+
+        expected_total = sum(i % 97 for i in range(50_000))
+        assert metric.total_stars == expected_total
+        assert metric.top_repo == ("repo-000096", 96)
+
+    def test_tally_keeps_largest_values(self):
+        """Should keep the N largest values, ties going to the first seen."""
+        tally = RepoTally(limit=3)
+        for name, value in [("a", 5), ("b", 9), ("c", 1), ("d", 9), ("e", 7), ("f", 2)]:
+            tally.add(name, value)
+
+        assert tally.top() == [("b", 9), ("d", 9), ("e", 7)]
+        assert tally.total == 33
+        assert tally.count == 6
+        assert tally.average() == 5
+
+    def test_stream_pages_without_retaining(self):
+        """Should fetch PaginatedList pages one at a time."""
+        pages = [[1, 2], [3, 4], [5]]
+        paginated = MagicMock(spec=PaginatedList)
+        paginated._couldGrow.side_effect = [True, True, True, False]
+        paginated._fetchNextPage.side_effect = pages
+
+        assert list(stream(paginated)) == [1, 2, 3, 4, 5]
+        paginated.__iter__.assert_not_called()
+
+
+class TestRepoRecord:
+    """Tests for compact repository records."""
+
+    def test_from_json_reads_listing_fields(self):
+        """Should extract only the fields the metrics use."""
+        record = RepoRecord.from_json(REPO_LISTING_ITEM)
+
+        assert record.name == "Spoon-Knife"
+        assert record.full_name == "octocat/Spoon-Knife"
+        assert record.stars == 12000
+        assert record.forks == 140000
+        assert record.language == "HTML"
+        assert record.pushed_at == datetime(2024, 2, 1, 10, 30, tzinfo=timezone.utc)
+        assert record.fork is False
+        assert record.archived is True
+
+    def test_from_json_tolerates_missing_fields(self):
+        """Should default fields absent from the payload."""
+        record = RepoRecord.from_json({"name": "empty", "full_name": "octocat/empty", "pushed_at": None})
+
+        assert record.stars == 0
+        assert record.pushed_at is None
+        assert record.language is None
+
+    def test_records_are_slotted(self):
+        """Records should not carry a per-instance __dict__."""
+        record = RepoRecord.from_json(REPO_LISTING_ITEM)
+
+        assert not hasattr(record, '__dict__')
+
+    def test_from_repository_never_completes(self):
+        """Should read the listing payload without any lazy completion request."""
+        requester = Mock()
+        repo = Repository(requester, {}, dict(REPO_LISTING_ITEM, description=None), completed=False)
+
+        record = RepoRecord.from_repository(repo)
+
+        assert record.stars == 12000
+        requester.requestJsonAndCheck.assert_not_called()
+
+    def test_iter_repo_records_passes_listing_params(self, mock_github_client):
+        """Should forward listing parameters and yield records."""
+        records = list(iter_repo_records(mock_github_client, "testuser", type="owner"))
+
+        mock_github_client.get_user().get_repos.assert_called_with(type="owner")
+        assert [r.name for r in records] == ["repo-1", "repo-2", "repo-3"]
+        assert all(isinstance(r, RepoRecord) for r in records)
+
+    def test_commit_metric_uses_lazy_handles(self, mock_github_client):
+        """Per-repo calls should go through lazy repository handles."""
+        metric = CommitMetric(mock_github_client, "testuser")
+
+        metric.collect()
+
+        mock_github_client.get_repo.assert_any_call("testuser/repo-1", lazy=True)
+        assert metric.total_commits == 6
+
+
 class TestMetricBaseClass:
     """Tests for base metric class behavior."""
 
@@ -0,0 +1,156 @@
+"""Integration tests for the metric fetch planner."""
+
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import Mock
+
+from github_stats.cli import collect_metrics
+from github_stats.metrics.commits import CommitMetric
+from github_stats.metrics.followers import FollowerMetric
+from github_stats.metrics.issues import IssueMetric
+from github_stats.metrics.planner import FetchPlanner, Need, PROFILE, REPOS, SEARCH
+from github_stats.metrics.pull_requests import PullRequestMetric
+from github_stats.metrics.records import UserProfile
+from github_stats.metrics.stars import StarMetric
+
+
+class TestPlan:
+    """Tests for resolving declared needs."""
+
+    def test_metrics_declare_their_needs(self, mock_github_client):
+        """Each metric should declare the data sets it reads."""
+        assert FollowerMetric(mock_github_client, "testuser").requires() == [Need(PROFILE)]
+        assert StarMetric(mock_github_client, "testuser").requires() == [Need(REPOS)]
+        assert CommitMetric(mock_github_client, "testuser").requires() == [Need(REPOS)]
+        assert PullRequestMetric(mock_github_client, "testuser").requires() == [
+            Need(SEARCH, "type:pr author:testuser")
+        ]
+
+    def test_deduplicates_needs(self, mock_github_client):
+        """Should plan each distinct need once."""
+        metrics = [
+            CommitMetric(mock_github_client, "testuser"),
+            StarMetric(mock_github_client, "testuser"),
+            FollowerMetric(mock_github_client, "testuser"),
+            FollowerMetric(mock_github_client, "testuser"),
+        ]
+
+        needs = FetchPlanner(mock_github_client, "testuser").plan(metrics)
+
+        assert needs == [Need(REPOS), Need(PROFILE)]
+
+
+class TestRun:
+    """Tests for fetching and distributing data."""
+
+    def test_shared_data_is_fetched_once(self, mock_github_client):
+        """Profile and repository listing should each cost one fetch."""
+        metrics = [
+            CommitMetric(mock_github_client, "testuser"),
+            StarMetric(mock_github_client, "testuser"),
+            FollowerMetric(mock_github_client, "testuser"),
+        ]
+
+        failures = FetchPlanner(mock_github_client, "testuser").run(metrics)
+
+        assert failures == {}
+        assert mock_github_client.get_user.call_count == 1
+        assert mock_github_client.get_user().get_repos.call_count == 1
+        for metric in metrics:
+            metric.process()
+        assert metrics[0].total_commits == 6
+        assert metrics[1].total_stars == 60
+        assert metrics[2].followers_count == 100
+
+    def test_seeded_user_is_reused(self, mock_github_client, mock_user):
+        """A user fetched beforehand should not be requested again."""
+        planner = FetchPlanner(mock_github_client, "testuser")
+        planner.seed_user(mock_user)
+
+        planner.run([FollowerMetric(mock_github_client, "testuser"), StarMetric(mock_github_client, "testuser")])
+
+        mock_github_client.get_user.assert_not_called()
+
+    def test_identical_searches_run_once(self, mock_github_client):
+        """Two metrics needing the same search should share it."""
+        metrics = [PullRequestMetric(mock_github_client, "testuser"), PullRequestMetric(mock_github_client, "testuser")]
+
+        FetchPlanner(mock_github_client, "testuser").run(metrics)
+
+        assert mock_github_client.search_issues.call_count == 1
+        assert metrics[0].total_prs == metrics[1].total_prs == 10
+
+    def test_failed_need_only_fails_dependents(self, mock_github_client):
+        """A failing listing should fail repo metrics but not the others."""
+        mock_github_client.get_user().get_repos.side_effect = Exception("API Error")
+        stars = StarMetric(mock_github_client, "testuser")
+        followers = FollowerMetric(mock_github_client, "testuser")
+        issues = IssueMetric(mock_github_client, "testuser")
+
+        failures = FetchPlanner(mock_github_client, "testuser").run([stars, followers, issues])
+
+        assert list(failures) == [stars]
+        assert followers.followers_count == 100
+        assert issues.total_issues == 5
+
+    def test_listing_stops_when_no_consumer_needs_more(self, mock_github_client, mock_repos):
+        """Should stop streaming once every consumer is done."""
+        mock_repos[0].pushed_at = datetime(2024, 2, 1, tzinfo=timezone.utc)
+        mock_repos[1].pushed_at = datetime(2023, 1, 1, tzinfo=timezone.utc)
+        consumed = []
+        commits = CommitMetric(mock_github_client, "testuser", since=datetime(2024, 1, 1, tzinfo=timezone.utc))
+        original = commits.consume_repo
+        commits.consume_repo = lambda record: consumed.append(record.name) or original(record)
+
+        FetchPlanner(mock_github_client, "testuser").run([commits])
+
+        assert consumed == ["repo-1", "repo-2"]
+
+
+class TestEstimate:
+    """Tests for API cost estimation."""
+
+    def test_shared_listing_is_counted_once(self, mock_github_client):
+        """The repository listing should be paid for once however many metrics use it."""
+        planner = FetchPlanner(mock_github_client, "testuser")
+        profile = UserProfile("testuser", public_repos=90)
+        stars = StarMetric(mock_github_client, "testuser")
+        commits = CommitMetric(mock_github_client, "testuser")
+
+        assert planner.estimate([stars], profile) == 1 + 3
+        assert planner.estimate([commits], profile) == 1 + 3 + 90
+        assert planner.estimate([stars, commits], profile) == 1 + 3 + 90
+
+    def test_seeded_user_costs_nothing(self, mock_github_client, mock_user):
+        """A profile already fetched should not be counted."""
+        planner = FetchPlanner(mock_github_client, "testuser")
+        planner.seed_user(mock_user)
+
+        assert planner.estimate([FollowerMetric(mock_github_client, "testuser")], UserProfile("testuser")) == 0
+
+    def test_list_strategy_costs_more(self, mock_github_client):
+        """Listing commits should be estimated above contributor statistics."""
+        planner = FetchPlanner(mock_github_client, "testuser")
+        profile = UserProfile("testuser", public_repos=10)
+
+        stats = planner.estimate([CommitMetric(mock_github_client, "testuser")], profile)
+        listing = planner.estimate([CommitMetric(mock_github_client, "testuser", strategy="list")], profile)
+
+        assert listing > stats
+
+
+class TestCollectMetricsPlanning:
+    """Tests for planning in collect_metrics."""
+
+    def test_collects_with_one_listing(self, mock_github_client, mock_user):
+        """All seven metrics should share one profile and one repository listing."""
+        calendar = {'contributionCalendar': {'weeks': []}}
+        mock_github_client._Github__requester.requestJsonAndCheck.return_value = (
+            {}, {'data': {'user': {'contributionsCollection': calendar}}}
+        )
+        results = collect_metrics(mock_github_client, "testuser", user=mock_user)
+
+        assert len(results) == 7
+        mock_github_client.get_user.assert_not_called()
+        assert mock_user.get_repos.call_count == 1
+        assert results['Stars']['value'] == '60'
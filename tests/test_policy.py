@@ -0,0 +1,262 @@
+"""Tests for the request retry and hedging policy."""
+
+import threading
+
+import pytest
+import requests
+from github import Github, GithubException
+
+from github_stats import policy as policy_module
+from github_stats.concurrency import ConcurrencyController
+from github_stats.deadline import Deadline, DeadlineExceeded
+from github_stats.policy import RequestPolicy, HEDGE_MIN_SAMPLES
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    """Don't sleep between retries."""
+    monkeypatch.setattr(policy_module.time, 'sleep', lambda seconds: None)
+
+
+def _sender(*outcomes):
+    """Send function returning or raising the given outcomes in order."""
+    calls = []
+
+    def send(verb, url, parameters, headers, input):
+        calls.append(url)
+        outcome = outcomes[min(len(calls), len(outcomes)) - 1]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return {}, outcome
+
+    send.calls = calls
+    return send
+
+
+class TestRetries:
+    """Tests for retrying transient failures."""
+
+    def test_retries_server_errors(self):
+        """Should retry 5xx responses and return the eventual result."""
+        send = _sender(GithubException(502, {}, None), GithubException(503, {}, None), {'ok': True})
+        policy = RequestPolicy(hedge=False)
+
+        assert policy.request(send, "GET", "/user") == ({}, {'ok': True})
+        assert len(send.calls) == 3
+        assert policy.stats.retries == 2
+
+    def test_retries_connection_errors_and_timeouts(self):
+        """Should retry connection errors and count timeouts."""
+        send = _sender(requests.exceptions.ConnectionError(), requests.exceptions.ReadTimeout(), {'ok': True})
+        policy = RequestPolicy(hedge=False)
+
+        assert policy.request(send, "GET", "/user")[1] == {'ok': True}
+        assert policy.stats.timeouts == 1
+
+    def test_does_not_retry_client_errors(self):
+        """Should raise 4xx errors at once."""
+        send = _sender(GithubException(404, {}, None))
+
+        with pytest.raises(GithubException):
+            RequestPolicy(hedge=False).request(send, "GET", "/repos/x/y")
+        assert len(send.calls) == 1
+
+    def test_waits_out_secondary_rate_limits(self):
+        """Should retry after a secondary limit and tell the controller."""
+        limited = GithubException(403, {'message': 'You have exceeded a secondary rate limit.'}, {'retry-after': '0'})
+        send = _sender(limited, {'ok': True})
+        controller = ConcurrencyController(initial=8)
+        policy = RequestPolicy(hedge=False, controller=controller)
+
+        assert policy.request(send, "GET", "/user")[1] == {'ok': True}
+        assert controller.throttles == 1
+        assert controller.limit < 8
+
+    def test_does_not_retry_primary_rate_limit(self):
+        """Should raise at once when the hourly quota is used up."""
+        send = _sender(GithubException(403, {'message': 'API rate limit exceeded for user.'}, None))
+
+        with pytest.raises(GithubException):
+            RequestPolicy(hedge=False).request(send, "GET", "/user")
+        assert len(send.calls) == 1
+
+    def test_gives_up_after_the_last_retry(self):
+        """Should raise the last error once retries are used up."""
+        send = _sender(GithubException(500, {}, None))
+
+        with pytest.raises(GithubException):
+            RequestPolicy(retries=2, hedge=False).request(send, "GET", "/user")
+        assert len(send.calls) == 3
+
+    def test_backoff_stops_at_the_deadline(self, monkeypatch):
+        """Should sleep no longer than the deadline allows and then stop retrying."""
+        limited = GithubException(403, {'message': 'You have exceeded a secondary rate limit.'}, {'retry-after': '60'})
+        send = _sender(limited, {'ok': True})
+        deadline = Deadline(1)
+        sleeps = []
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            deadline.expires_at = 0
+
+        monkeypatch.setattr(policy_module.time, 'sleep', sleep)
+
+        with pytest.raises(DeadlineExceeded):
+            RequestPolicy(hedge=False, deadline=deadline).request(send, "GET", "/user")
+        assert len(send.calls) == 1
+        assert sleeps and sleeps[0] <= 1
+
+
+class TestHedging:
+    """Tests for hedged GET requests."""
+
+    def _warm(self, policy, latency):
+        policy.stats.latencies.extend([latency] * HEDGE_MIN_SAMPLES)
+        policy.stats.requests = HEDGE_MIN_SAMPLES * 10
+
+    def test_hedges_slow_gets(self):
+        """Should send a duplicate after the p95 latency and take the first answer."""
+        release = threading.Event()
+        calls = []
+
+        def send(verb, url, parameters, headers, input):
+            calls.append(url)
+            if len(calls) == 1:
+                release.wait(5)
+                return {}, 'slow'
+            return {}, 'fast'
+
+        policy = RequestPolicy()
+        self._warm(policy, 0.01)
+        try:
+            assert policy.request(send, "GET", "/user") == ({}, 'fast')
+        finally:
+            release.set()
+            policy.close()
+
+        assert policy.stats.hedges == 1
+        assert policy.stats.hedge_wins == 1
+
+    def test_pool_fits_the_concurrency_limit(self):
+        """Should size the hedge pool for the most concurrent requests and their hedges."""
+        policy = RequestPolicy(controller=ConcurrencyController(maximum=3))
+
+        try:
+            assert policy._get_executor()._max_workers == 6
+        finally:
+            policy.close()
+
+    def test_waits_for_enough_samples(self):
+        """Should not hedge before the latency distribution is known."""
+        policy = RequestPolicy()
+
+        policy.request(_sender({'ok': True}), "GET", "/user")
+
+        assert policy.stats.hedges == 0
+
+    def test_never_hedges_writes(self):
+        """Should only hedge idempotent GETs."""
+        send = _sender({'ok': True})
+        policy = RequestPolicy()
+        self._warm(policy, 0.0)
+
+        policy.request(send, "POST", "/graphql")
+
+        assert policy.stats.hedges == 0
+        assert len(send.calls) == 1
+
+
+class TestDeadline:
+    """Tests for stopping requests at the run deadline."""
+
+    def test_no_attempt_after_the_deadline(self):
+        """Should refuse to send once the deadline has passed."""
+        send = _sender({'ok': True})
+
+        with pytest.raises(DeadlineExceeded):
+            RequestPolicy(hedge=False, deadline=Deadline(0)).request(send, "GET", "/user")
+        assert send.calls == []
+
+    def test_abandoned_call_starts_no_queued_request(self, monkeypatch):
+        """Should stop a call abandoned at the deadline before its next request."""
+        client = Github()
+        requester = client._Github__requester
+        release, finished = threading.Event(), threading.Event()
+        urls = []
+
+        def request_json(verb, url, *args):
+            urls.append(url)
+            release.wait(5)
+            return 200, {}, '[]'
+
+        monkeypatch.setattr(requester, 'requestJson', request_json)
+        deadline = Deadline(0.05)
+        RequestPolicy(hedge=False, deadline=deadline).install(client)
+
+        def pages():
+            try:
+                for page in range(1, 4):
+                    requester.requestJsonAndCheck("GET", f"/users/octocat/repos?page={page}")
+            finally:
+                finished.set()
+
+        with pytest.raises(DeadlineExceeded):
+            deadline.call(pages)
+        release.set()
+
+        assert finished.wait(5)
+        assert urls == ["/users/octocat/repos?page=1"]
+
+    def test_bound_deadline_outlives_the_block(self, monkeypatch):
+        """Should keep abandoned work stopped after bind() ends, but not later requests."""
+        client = Github()
+        requester = client._Github__requester
+        release, finished, unbound = threading.Event(), threading.Event(), threading.Event()
+        urls = []
+
+        def request_json(verb, url, *args):
+            urls.append(url)
+            release.wait(5)
+            return 200, {}, '[]'
+
+        monkeypatch.setattr(requester, 'requestJson', request_json)
+        policy = RequestPolicy(hedge=False)
+        policy.install(client)
+        deadline = Deadline(0.05)
+
+        def pages():
+            try:
+                requester.requestJsonAndCheck("GET", "/users/octocat/repos?page=1")
+                unbound.wait(5)
+                requester.requestJsonAndCheck("GET", "/users/octocat/repos?page=2")
+            finally:
+                finished.set()
+
+        with policy.bind(deadline), pytest.raises(DeadlineExceeded):
+            deadline.call(pages)
+        release.set()
+        requester.requestJsonAndCheck("GET", "/users/octocat")
+        unbound.set()
+
+        assert finished.wait(5)
+        assert urls == ["/users/octocat/repos?page=1", "/users/octocat"]
+
+
+class TestInstall:
+    """Tests for routing client requests through the policy."""
+
+    def test_routes_client_requests(self, monkeypatch):
+        """Should send a real client's requests through the policy."""
+        client = Github()
+        requester = client._Github__requester
+        responses = [(502, {}, '{}'), (200, {}, '{"login": "octocat"}')]
+        monkeypatch.setattr(requester, 'requestJson', lambda *args: responses.pop(0))
+        policy = RequestPolicy(hedge=False)
+
+        assert policy.install(client)
+        assert requester.requestJsonAndCheck("GET", "/users/octocat")[1] == {'login': 'octocat'}
+        assert policy.stats.retries == 1
+
+    def test_ignores_test_doubles(self, mock_github_client):
+        """Should leave clients without a PyGithub requester alone."""
+        assert not RequestPolicy().install(mock_github_client)
@@ -0,0 +1,206 @@
+"""Tests for the raw REST backend."""
+
+import json
+import urllib.parse
+from datetime import datetime, timezone
+
+import pytest
+from github import Github, GithubException
+
+from github_stats import rest
+from github_stats.metrics.commits import CommitMetric
+from github_stats.metrics.planner import FetchPlanner
+from github_stats.metrics.records import UserProfile, list_repo_records
+from github_stats.metrics.stars import StarMetric
+from github_stats.policy import RequestPolicy
+from github_stats.rest import Raw, RestClient
+
+BASE = "https://api.github.com"
+
+
+class FakeApi:
+    """
+    Serves canned REST responses to a real client's requester.
+
+    Lists are paged by page/per_page with Link headers; dicts with items
+    are search results; anything else is returned as is.
+    """
+
+    def __init__(self, routes):
+        self.routes = routes
+        self.calls = []
+
+    def requestJson(self, verb, url, parameters=None, headers=None, input=None, cnx=None):
+        parsed = urllib.parse.urlparse(url)
+        params = dict(urllib.parse.parse_qsl(parsed.query))
+        params.update(parameters or {})
+        self.calls.append((parsed.path, params))
+
+        if parsed.path not in self.routes:
+            return 404, {}, '{"message": "Not Found"}'
+        body = self.routes[parsed.path]
+        if isinstance(body, dict) and 'items' in body:
+            items, link = self._page(parsed.path, body['items'], params)
+            return 200, link, json.dumps({'total_count': len(body['items']), 'items': items})
+        if isinstance(body, list):
+            items, link = self._page(parsed.path, body, params)
+            return 200, link, json.dumps(items)
+        return 200, {}, json.dumps(body)
+
+    @staticmethod
+    def _page(path, items, params):
+        page, per_page = int(params.get('page', 1)), int(params.get('per_page', 30))
+        chunk = items[(page - 1) * per_page:page * per_page]
+        if page * per_page >= len(items):
+            return chunk, {}
+        query = urllib.parse.urlencode(dict(params, page=page + 1))
+        return chunk, {'link': f'<{BASE}{path}?{query}>; rel="next"'}
+
+
+def _repos(count):
+    return [
+        {'name': f"repo{n}", 'full_name': f"octocat/repo{n}", 'stargazers_count': n, 'forks_count': 0,
+         'language': 'Python', 'pushed_at': '2024-01-01T00:00:00Z', 'fork': False, 'archived': False}
+        for n in range(count)
+    ]
+
+
+def _stats(total):
+    return [{'author': {'login': 'octocat'}, 'total': total, 'weeks': [{'w': 1704067200, 'a': 0, 'd': 0, 'c': total}]}]
+
+
+@pytest.fixture
+def api(monkeypatch):
+    """A real PyGithub client answered by a FakeApi."""
+    routes = {
+        '/users/octocat': {
+            'login': 'octocat', 'url': f"{BASE}/users/octocat", 'followers': 5, 'following': 2, 'public_repos': 3,
+        },
+        '/users/octocat/repos': _repos(3),
+        '/repos/octocat/repo0/stats/contributors': _stats(4),
+        '/repos/octocat/repo1/stats/contributors': _stats(6),
+        '/repos/octocat/repo2/stats/contributors': [{'author': {'login': 'hubot'}, 'total': 9, 'weeks': []}],
+        '/repos/octocat/repo0/commits': [{'sha': str(n)} for n in range(150)],
+        '/search/issues': {'items': [{'state': 'open' if n % 3 else 'closed'} for n in range(130)]},
+    }
+    client = Github()
+    fake = FakeApi(routes)
+    monkeypatch.setattr(client._Github__requester, 'requestJson', fake.requestJson)
+    return client, fake
+
+
+class TestDecoding:
+    """Tests for decoding responses."""
+
+    @pytest.mark.parametrize('decoder', [None, 'orjson'])
+    def test_loads_with_and_without_orjson(self, monkeypatch, decoder):
+        """Should decode str and bytes bodies with either decoder."""
+        if decoder is None:
+            monkeypatch.setattr(rest, 'orjson', None)
+        elif rest.orjson is None:
+            pytest.skip("orjson is not installed")
+
+        assert rest.loads('{"login": "octocat"}') == {'login': 'octocat'}
+        assert rest.loads(b'[1, 2]') == [1, 2]
+
+    def test_raw_reads_fields(self):
+        """Should expose JSON fields as attributes and raise for others."""
+        item = Raw({'state': 'open', 'login': None})
+
+        assert item.state == 'open'
+        assert item.login is None
+        assert getattr(item, 'title', 'missing') == 'missing'
+
+    def test_errors_raise_github_exceptions(self, api):
+        """Should raise PyGithub's exception for error statuses."""
+        client, _ = api
+
+        with pytest.raises(GithubException) as error:
+            RestClient(client).get_user('nobody')
+        assert error.value.status == 404
+
+
+class TestRestClient:
+    """Tests for the calls metrics make."""
+
+    def test_lists_repos_in_pages_of_100(self, api):
+        """Should request 100 per page and follow the next link."""
+        client, fake = api
+        fake.routes['/users/octocat/repos'] = _repos(250)
+
+        user = RestClient(client).get_user('octocat')
+        records = list(list_repo_records(user, sort='pushed'))
+
+        assert UserProfile.from_user(user).followers == 5
+        assert [record.full_name for record in records[:2]] == ["octocat/repo0", "octocat/repo1"]
+        assert len(records) == 250
+        pages = [params for path, params in fake.calls if path == '/users/octocat/repos']
+        assert len(pages) == 3
+        assert pages[0] == {'sort': 'pushed', 'per_page': 100}
+
+    def test_commit_listing_sends_window(self, api):
+        """Should send since/until as UTC timestamps and page through commits."""
+        client, fake = api
+        since = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+        commits = list(RestClient(client).get_repo("octocat/repo0").get_commits(author='octocat', since=since))
+
+        assert len(commits) == 150
+        assert fake.calls[0] == ('/repos/octocat/repo0/commits',
+                                 {'author': 'octocat', 'since': '2024-01-01T00:00:00Z', 'per_page': 100})
+
+    def test_contributor_stats(self, api):
+        """Should build weeks with UTC datetimes, and None while computing."""
+        client, fake = api
+        repo = RestClient(client).get_repo("octocat/repo0")
+
+        stats = repo.get_stats_contributors()
+        fake.routes['/repos/octocat/repo0/stats/contributors'] = {}
+
+        assert stats[0].author.login == 'octocat' and stats[0].total == 4
+        assert stats[0].weeks[0].w == datetime(2024, 1, 1, tzinfo=timezone.utc)
+        assert repo.get_stats_contributors() is None
+
+    def test_search_total_and_items(self, api):
+        """Should read the total from the first page and iterate every page."""
+        client, fake = api
+
+        results = RestClient(client).search_issues("type:issue author:octocat")
+
+        assert results.totalCount == 130
+        assert sum(1 for item in results if item.state == 'open') == 86
+        assert len(fake.calls) == 2
+
+    def test_sends_through_policy(self, api):
+        """Should retry and count requests with the run's policy."""
+        client, _ = api
+        policy = RequestPolicy(hedge=False)
+
+        RestClient(client, policy).get_user('octocat')
+
+        assert policy.stats.requests == 1
+
+    def test_passes_other_calls_through(self, api):
+        """Should leave calls it does not cover to PyGithub."""
+        client, _ = api
+
+        assert RestClient(client).get_user().__class__.__name__ == 'AuthenticatedUser'
+
+
+class TestMetricsUnchanged:
+    """Tests for running metrics on either backend."""
+
+    def test_same_results_as_pygithub(self, api):
+        """Should give the metrics the same data PyGithub does."""
+        client, _ = api
+        results = []
+        for backend in (client, RestClient(client)):
+            metrics = [CommitMetric(backend, 'octocat'), StarMetric(backend, 'octocat')]
+            assert FetchPlanner(backend, 'octocat').run(metrics) == {}
+            for metric in metrics:
+                metric.process()
+            results.append([metric.data for metric in metrics])
+
+        assert results[0] == results[1]
+        assert results[1][0]['total_commits'] == 10
+        assert results[1][1]['total_stars'] == 3
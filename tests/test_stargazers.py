@@ -0,0 +1,120 @@
+"""Tests for incremental stargazer history."""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from github_stats import stargazers as stargazers_module
+from github_stats.deadline import Deadline, DeadlineExceeded
+from github_stats.stargazers import SECONDS_PER_DAY, StarHistoryStore, refresh_repo
+
+DAY = SECONDS_PER_DAY
+REPO = "octocat/hello"
+
+
+def _iso(at):
+    return datetime.fromtimestamp(at, tz=timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+class FakeStargazers:
+    """Serves the stargazer listing of one repository, oldest first."""
+
+    def __init__(self, stars):
+        self.stars = list(stars)
+        self.pages = []
+
+    def requestJsonAndCheck(self, verb, url, parameters=None, headers=None, input=None):
+        assert (verb, url) == ("GET", f"/repos/{REPO}/stargazers")
+        assert headers == {'Accept': 'application/vnd.github.star+json'}
+        page, per_page = parameters['page'], parameters['per_page']
+        self.pages.append(page)
+        chunk = self.stars[(page - 1) * per_page:page * per_page]
+        return {}, [{'starred_at': _iso(at), 'user': {'login': login}} for at, login in chunk]
+
+    def star(self, at, login):
+        self.stars.append((at, login))
+
+
+@pytest.fixture
+def store(tmp_path):
+    with StarHistoryStore(tmp_path / "stars.db") as store:
+        yield store
+
+
+class TestRefresh:
+    """Tests for fetching only stars added since the last refresh."""
+
+    def test_first_refresh_lists_everything(self, store):
+        """Should page from the last page to the first and build the series."""
+        requester = FakeStargazers([(n * DAY, f"user{n}") for n in range(250)])
+
+        pages = refresh_repo(requester, store, REPO, 250)
+
+        assert pages == 3
+        assert requester.pages == [3, 2, 1]
+        assert store.series(REPO)[:2] == [(0, 1), (DAY, 2)]
+        assert store.total_at(REPO, 249 * DAY) == 250
+
+    def test_later_refresh_fetches_only_new_pages(self, store):
+        """Should stop at the cursor, usually on the last page."""
+        requester = FakeStargazers([(n * DAY, f"user{n}") for n in range(250)])
+        refresh_repo(requester, store, REPO, 250)
+        requester.pages.clear()
+        for n in range(250, 253):
+            requester.star(n * DAY, f"user{n}")
+
+        pages = refresh_repo(requester, store, REPO, 253)
+
+        assert pages == 1
+        assert store.total_at(REPO, 252 * DAY) == 253
+        assert store.cursor(REPO) == (252 * DAY, ['user252'])
+
+    def test_stars_in_the_cursor_second_are_kept_apart(self, store):
+        """Should count a new star given in the same second as the cursor."""
+        requester = FakeStargazers([(DAY, 'a')])
+        refresh_repo(requester, store, REPO, 1)
+        requester.star(DAY, 'b')
+
+        refresh_repo(requester, store, REPO, 2)
+
+        assert store.cursor(REPO) == (DAY, ['a', 'b'])
+        assert store.total_at(REPO, DAY) == 2
+
+    def test_unstarred_cursor_does_not_rescan(self, store):
+        """Should stop at older stars when the cursor's stargazer left."""
+        requester = FakeStargazers([(n * DAY, f"user{n}") for n in range(150)])
+        refresh_repo(requester, store, REPO, 150)
+        requester.stars.pop()
+        requester.star(200 * DAY, 'newcomer')
+        requester.pages.clear()
+
+        refresh_repo(requester, store, REPO, 150)
+
+        assert requester.pages == [2]
+        assert store.cursor(REPO) == (200 * DAY, ['newcomer'])
+
+    def test_refresh_day_records_actual_count(self, store):
+        """Should set the day of the refresh to the current star count."""
+        store.advance(REPO, [(DAY, 'a'), (DAY, 'b')], 2, now=DAY)
+        store.advance(REPO, [], 1, now=3 * DAY)
+
+        assert store.series(REPO) == [(DAY, 2), (3 * DAY, 1)]
+
+    def test_large_repositories_record_counts_only(self, store, monkeypatch):
+        """Should not list stargazers past the listing limit."""
+        monkeypatch.setattr(stargazers_module, 'STARGAZER_LIMIT', 100)
+        requester = FakeStargazers([])
+
+        assert refresh_repo(requester, store, REPO, 101) == 0
+        assert requester.pages == []
+        assert store.cursor(REPO) is None
+        assert store.total_at(REPO, 2 ** 40) == 101
+
+    def test_deadline_stores_nothing(self, store):
+        """Should leave the history untouched when cut short."""
+        requester = FakeStargazers([(n, 'x') for n in range(10)])
+
+        with pytest.raises(DeadlineExceeded):
+            refresh_repo(requester, store, REPO, 10, deadline=Deadline(0))
+
+        assert store.series(REPO) == []
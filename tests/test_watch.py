@@ -0,0 +1,94 @@
+"""Tests for event polling in --watch mode."""
+
+from github_stats.watch import DEFAULT_POLL_INTERVAL, EventFeed, EventWatcher, affected_metrics
+
+
+def _event(id, kind, actor='octocat', repo='octocat/hello'):
+    return {'id': str(id), 'type': kind, 'actor': {'login': actor}, 'repo': {'name': repo}}
+
+
+def _fetcher(*responses):
+    """Fetch function returning (headers, events) responses in order."""
+    calls = []
+
+    def fetch(url, headers):
+        calls.append((url, dict(headers)))
+        return responses[min(len(calls), len(responses)) - 1]
+
+    fetch.calls = calls
+    return fetch
+
+
+class TestEventFeed:
+    """Tests for conditional polling of one feed."""
+
+    def test_first_poll_sets_baseline(self):
+        """Should not report events from before watching started."""
+        feed = EventFeed(_fetcher(({'etag': '"a"'}, [_event(2, 'PushEvent'), _event(1, 'PushEvent')])), '/users/o/events')
+
+        assert feed.poll() == []
+        assert feed.last_id == 2
+
+    def test_reports_only_new_events(self):
+        """Should return events newer than the previous poll, oldest first."""
+        fetch = _fetcher(
+            ({'etag': '"a"'}, [_event(2, 'PushEvent')]),
+            ({'etag': '"b"'}, [_event(4, 'WatchEvent'), _event(3, 'PushEvent'), _event(2, 'PushEvent')]),
+        )
+        feed = EventFeed(fetch, '/users/o/events')
+        feed.poll()
+
+        assert [event['id'] for event in feed.poll()] == ['3', '4']
+
+    def test_sends_etag_and_honours_poll_interval(self):
+        """Should send If-None-Match and treat 304 (no body) as no news."""
+        fetch = _fetcher(({'etag': '"a"', 'x-poll-interval': '90'}, [_event(1, 'PushEvent')]), ({}, None))
+        feed = EventFeed(fetch, '/users/o/events')
+        feed.poll()
+
+        assert feed.poll() == []
+        assert fetch.calls[1][1] == {'If-None-Match': '"a"'}
+        assert feed.etag == '"a"'
+        assert feed.interval == 90
+
+    def test_defaults_poll_interval(self):
+        """Should fall back to the default interval without the header."""
+        feed = EventFeed(_fetcher(({}, None)), '/users/o/events')
+        feed.poll()
+
+        assert feed.interval == DEFAULT_POLL_INTERVAL
+
+
+class TestAffectedMetrics:
+    """Tests for mapping events to metrics."""
+
+    def test_maps_own_activity(self):
+        """Should map the user's pushes, PRs and issues to their metrics."""
+        events = [_event(1, 'PushEvent'), _event(2, 'PullRequestEvent'), _event(3, 'IssuesEvent'), _event(4, 'ForkEvent')]
+
+        assert affected_metrics(events, 'OctoCat') == {'Commits', 'Pull Requests', 'Issues'}
+
+    def test_stars_count_on_own_repositories(self):
+        """Should map stars by others on the user's repositories, not stars the user gives."""
+        received = [_event(1, 'WatchEvent', actor='fan', repo='octocat/hello')]
+        given = [_event(2, 'WatchEvent', actor='octocat', repo='other/repo')]
+
+        assert affected_metrics(received, 'octocat') == {'Stars'}
+        assert affected_metrics(given, 'octocat') == set()
+
+    def test_ignores_activity_of_others(self):
+        """Should ignore pushes by other users seen in the received feed."""
+        assert affected_metrics([_event(1, 'PushEvent', actor='friend')], 'octocat') == set()
+
+
+class TestEventWatcher:
+    """Tests for polling a user's feeds together."""
+
+    def test_polls_own_and_received_feeds(self):
+        """Should poll both feeds and use the slowest interval."""
+        fetch = _fetcher(({'x-poll-interval': '60'}, None))
+        watcher = EventWatcher(fetch, 'octocat')
+
+        assert watcher.poll() == set()
+        assert [url for url, _ in fetch.calls] == ['/users/octocat/events', '/users/octocat/received_events']
+        assert watcher.interval == 60
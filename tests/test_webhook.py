@@ -0,0 +1,171 @@
+"""Tests for the webhook receiver."""
+
+import hashlib
+import hmac
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from github_stats.cache import MetricsCache
+from github_stats.webhook import apply_delivery, create_server, verify_signature
+
+SECRET = 's3cret'
+
+
+def _sign(body, secret=SECRET):
+    return 'sha256=' + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+@pytest.fixture
+def cache(tmp_path):
+    with MetricsCache(tmp_path / "cache.db") as cache:
+        yield cache
+
+
+def _star(action, count, repo='hello', owner='octocat'):
+    return {'action': action, 'repository': {'name': repo, 'owner': {'login': owner}, 'stargazers_count': count}}
+
+
+class TestSignature:
+    """Tests for X-Hub-Signature-256 verification."""
+
+    def test_accepts_valid_signature(self):
+        """Should accept a body signed with the secret."""
+        assert verify_signature(SECRET, b'{}', _sign(b'{}'))
+
+    def test_rejects_wrong_or_missing_signature(self):
+        """Should reject other secrets, tampered bodies and missing headers."""
+        assert not verify_signature(SECRET, b'{}', _sign(b'{}', 'other'))
+        assert not verify_signature(SECRET, b'{"a": 1}', _sign(b'{}'))
+        assert not verify_signature(SECRET, b'{}', None)
+
+
+class TestApplyDelivery:
+    """Tests for turning deliveries into cache changes."""
+
+    def test_push_to_default_branch_drops_commits(self, cache):
+        """Should drop cached Commits of the pusher and commit authors."""
+        cache.put("octocat", "Commits", {})
+        cache.put("hubot", "Commits", {})
+        cache.put("octocat", "Stars", {})
+        payload = {
+            'ref': 'refs/heads/main',
+            'repository': {'default_branch': 'main'},
+            'sender': {'login': 'octocat'},
+            'commits': [{'author': {'username': 'hubot'}}],
+        }
+
+        apply_delivery(cache, 'push', payload)
+
+        assert cache.get("octocat", "Commits") is None
+        assert cache.get("hubot", "Commits") is None
+        assert cache.get("octocat", "Stars") == {}
+
+    def test_push_to_other_branch_is_ignored(self, cache):
+        """Should keep Commits when a feature branch is pushed."""
+        cache.put("octocat", "Commits", {})
+        payload = {'ref': 'refs/heads/topic', 'repository': {'default_branch': 'main'}, 'sender': {'login': 'octocat'}}
+
+        assert apply_delivery(cache, 'push', payload) == []
+        assert cache.get("octocat", "Commits") == {}
+
+    def test_star_adjusts_counts(self, cache):
+        """Should add the star to the total and the repository's count."""
+        cache.put("octocat", "Stars", {
+            'total_stars': 10, 'repositories_with_stars': 1, 'top_repositories': [['world', 10]],
+        })
+
+        apply_delivery(cache, 'star', _star('created', 1))
+        apply_delivery(cache, 'star', _star('created', 11, repo='world'))
+
+        assert cache.get("octocat", "Stars") == {
+            'total_stars': 12, 'repositories_with_stars': 2, 'top_repositories': [['world', 11], ['hello', 1]],
+        }
+
+    def test_pull_request_lifecycle(self, cache):
+        """Should count opened PRs as open and merged ones as merged."""
+        cache.put("octocat", "Pull Requests", {'total': 1, 'open': 0, 'merged': 1, 'closed': 0})
+        pull = {'user': {'login': 'octocat'}, 'created_at': '2024-05-01T10:00:00Z'}
+
+        apply_delivery(cache, 'pull_request', {'action': 'opened', 'pull_request': pull})
+        assert cache.get("octocat", "Pull Requests") == {'total': 2, 'open': 1, 'merged': 1, 'closed': 0}
+
+        apply_delivery(cache, 'pull_request', {'action': 'closed', 'pull_request': dict(pull, merged=True)})
+        assert cache.get("octocat", "Pull Requests") == {'total': 2, 'open': 0, 'merged': 2, 'closed': 0}
+
+    def test_opening_drops_contributions(self, cache):
+        """Should drop the author's Contributions when a PR or issue is opened."""
+        item = {'user': {'login': 'octocat'}, 'created_at': '2024-05-01T10:00:00Z'}
+        cache.put("octocat", "Contributions", {})
+
+        assert apply_delivery(cache, 'issues', {'action': 'opened', 'issue': item}) == [
+            "dropped Contributions of octocat",
+        ]
+        assert cache.get("octocat", "Contributions") is None
+
+        cache.put("octocat", "Contributions", {})
+        apply_delivery(cache, 'pull_request', {'action': 'closed', 'pull_request': item})
+        assert cache.get("octocat", "Contributions") == {}
+        apply_delivery(cache, 'pull_request', {'action': 'opened', 'pull_request': item})
+        assert cache.get("octocat", "Contributions") is None
+
+    def test_closing_drops_exhaustive_entry(self, cache):
+        """Should drop entries whose duration statistics a close would change."""
+        cache.put("octocat", "Issues", {'total': 1, 'open': 1, 'closed': 0, 'time_to_close': {}}, strategy='exhaustive')
+        issue = {'user': {'login': 'octocat'}, 'created_at': '2024-05-01T10:00:00Z'}
+
+        apply_delivery(cache, 'issues', {'action': 'closed', 'issue': issue})
+
+        assert cache.get("octocat", "Issues", strategy='exhaustive') is None
+
+    def test_reopened_issue_drops_entry(self, cache):
+        """Should drop counts a delta cannot express."""
+        cache.put("octocat", "Issues", {'total': 1, 'open': 0, 'closed': 1})
+        issue = {'user': {'login': 'octocat'}, 'created_at': '2024-05-01T10:00:00Z'}
+
+        apply_delivery(cache, 'issues', {'action': 'reopened', 'issue': issue})
+
+        assert cache.get("octocat", "Issues") is None
+
+
+class TestListener:
+    """Tests posting sample deliveries to a running listener."""
+
+    @pytest.fixture
+    def server(self, tmp_path):
+        server = create_server('127.0.0.1', 0, SECRET, cache_path=tmp_path / "cache.db", log=lambda message: None)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield server
+        server.shutdown()
+        server.server_close()
+
+    def _post(self, server, event, payload, signature=None):
+        body = json.dumps(payload).encode()
+        request = urllib.request.Request(
+            f"http://127.0.0.1:{server.server_address[1]}/",
+            data=body,
+            headers={'X-GitHub-Event': event, 'X-Hub-Signature-256': signature or _sign(body)},
+        )
+        try:
+            with urllib.request.urlopen(request) as response:
+                return response.status
+        except urllib.error.HTTPError as e:
+            return e.code
+
+    def test_applies_signed_delivery(self, server, tmp_path):
+        """Should apply a correctly signed delivery to the cache."""
+        with MetricsCache(tmp_path / "cache.db") as cache:
+            cache.put("octocat", "Stars", {'total_stars': 0, 'repositories_with_stars': 0, 'top_repositories': []})
+
+        assert self._post(server, 'star', _star('created', 1)) == 200
+
+        with MetricsCache(tmp_path / "cache.db") as cache:
+            assert cache.get("octocat", "Stars")['total_stars'] == 1
+
+    def test_rejects_unsigned_delivery(self, server):
+        """Should answer 401 to deliveries with a bad signature."""
+        assert self._post(server, 'star', _star('created', 1), signature='sha256=00') == 401